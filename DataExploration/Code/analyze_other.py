@@ -17,9 +17,7 @@ import os.path
 
 import matplotlib.pyplot as plt
 from category_analyzer import CategoryAnalyzer
-
-other_analyzer = CategoryAnalyzer("C:/Users/ubmen/Desktop/BA_Prog/DataExploration/CSVFiles/AllArticles/Other.csv")
-other_all_list = other_analyzer.preprocess()
+from Pipeline.Code.artifacts import default_resolver
 
 
 def other_category_specific(titles_categories: list, category_type: str):
@@ -118,7 +116,7 @@ def other_category_specific(titles_categories: list, category_type: str):
     return titles
 
 
-def plot_categories(category_list: list):
+def plot_categories(category_list: list, num_other: int):
     """
     Function to plot specific categories of type "other"
     Parameters
@@ -126,16 +124,18 @@ def plot_categories(category_list: list):
     category_list: list
         List with tuples where first element is the list of category types and second element is the length of that
         list
+    num_other: int
+        total number of articles/entities of type "other"
 
     Returns
     -------
     just plots the figures
     """
-    y_pos = len(other_all_list)
-    plt.ylim(0, len(other_all_list))
+    y_pos = num_other
+    plt.ylim(0, num_other)
     plt.title("Category statistics for all articles of category 'other")
     plt.ylabel("Other Articles total")
-    plt.xlabel("Total amount of candidate DE articles/entities as 'other': " f"{len(other_all_list)}")
+    plt.xlabel("Total amount of candidate DE articles/entities as 'other': " f"{num_other}")
     x = [elem[0] for elem in category_list]
     y = [elem[1] for elem in category_list]
     for index, value in enumerate(y):
@@ -163,268 +163,272 @@ def chunks(lst: list, n: int):
     return [lst[i:i + n] for i in range(0, len(lst), n)]
 
 
-list_lengths = []
-buildings = other_category_specific(other_all_list, "building")
-list_lengths.append(("Buildings", len(buildings)))
-
-clubs = other_category_specific(other_all_list, "club")
-list_lengths.append(("Clubs", len(clubs)))
-
-prizes = other_category_specific(other_all_list, "prize")
-list_lengths.append(("Prizes", len(prizes)))
-
-literature = other_category_specific(other_all_list, "literature")
-list_lengths.append(("Literature", len(literature)))
-
-magazines = other_category_specific(other_all_list, "magazine")
-list_lengths.append(("Magazines", len(magazines)))
-
-politics = other_category_specific(other_all_list, "politics")
-list_lengths.append(("Politics", len(politics)))
-
-newspaper = other_category_specific(other_all_list, "newspaper")
-list_lengths.append(("Newspapers", len(newspaper)))
-
-diplomacy = other_category_specific(other_all_list, "diplomacy")
-list_lengths.append(("Diplomacy", len(diplomacy)))
-
-nature = other_category_specific(other_all_list, "nature")
-list_lengths.append(("Nature", len(nature)))
-
-process = other_category_specific(other_all_list, "process")
-list_lengths.append(("Process", len(process)))
-
-companies = other_category_specific(other_all_list, "company")
-vocational = other_category_specific(other_all_list, "vocation")
-gastros = other_category_specific(other_all_list, "gastronomy")
-cafes = other_category_specific(other_all_list, "cafe")
-sport = other_category_specific(other_all_list, "sport")
-banks = other_category_specific(other_all_list, "bank")
-streets = other_category_specific(other_all_list, "street")
-history = other_category_specific(other_all_list, "history")
-corps = other_category_specific(other_all_list, "corps")
-schools = other_category_specific(other_all_list, "school")
-museums = other_category_specific(other_all_list, "museum")
-culture = other_category_specific(other_all_list, "culture")
-orgs = other_category_specific(other_all_list, "organisation")
-architecture = other_category_specific(other_all_list, "architecture")
-bridges = other_category_specific(other_all_list, "bridge")
-parks = other_category_specific(other_all_list, "park")
-memorials = other_category_specific(other_all_list, "memorial")
-music = other_category_specific(other_all_list, "music")
-ships = other_category_specific(other_all_list, "ship")
-cemetaries = other_category_specific(other_all_list, "cemetary")
-geography = other_category_specific(other_all_list, "geography")
-justice = other_category_specific(other_all_list, "justice")
-diseases = other_category_specific(other_all_list, "illness")
-
-# get all categories that are no duplicates or not within intersections
-total = buildings + clubs + prizes + literature + magazines + politics + newspaper + diplomacy + nature + process
-
-# filter categories s.text. no intersections are available
-companies_true = [company for company in companies if company not in total]
-list_lengths.append(("Companies", len(companies_true)))
-
-gastros_true = [cafe for cafe in gastros if cafe not in total]
-list_lengths.append(("Gastronomy", len(gastros_true)))
-
-sport_true = [sports for sports in sport if sports not in total]
-list_lengths.append(("Sports", len(sport_true)))
-
-banks_true = [bank for bank in banks if bank not in total]
-list_lengths.append(("Banks", len(banks_true)))
-
-cafes_true = [cafe for cafe in cafes if cafe not in total]
-list_lengths.append(("Cafés", len(cafes_true)))
-
-streets_true = [street for street in streets if street not in total]
-list_lengths.append(("Streets", len(streets_true)))
-
-history_true = [hist for hist in history if hist not in total]
-list_lengths.append(("History", len(history_true)))
-
-corps_true = [corp for corp in corps if corp not in total]
-list_lengths.append(("Corps", len(corps_true)))
-
-museums_true = [museum for museum in museums if museum not in total]
-list_lengths.append(("Museums", len(museums_true)))
-
-# update total list
-total = buildings + clubs + prizes + literature + magazines + politics + newspaper + diplomacy + nature + process
-total += companies_true
-total += vocational
-total += gastros_true
-total += sport_true
-total += banks_true
-total += cafes_true
-total += streets_true
-total += history_true
-total += corps_true
-
-
-# put schools here in order to distinguish between category "school" and "vocational"
-schools_true = [school for school in schools if school not in total]
-list_lengths.append(("Schools", len(schools_true)))
-list_lengths.append(("Vocational", len(vocational)))
-total += schools_true
-total += museums_true
-
-# put category culture here since many overlaps and intersections for this as well
-culture_true = [cult for cult in culture if cult not in total]
-list_lengths.append(("Culture", len(culture_true)))
-total += culture_true
-
-orgs_true = [org for org in orgs if org not in total]
-list_lengths.append(("Organizations", len(orgs_true)))
-total += orgs_true
-
-architecture_true = [arc for arc in architecture if arc not in total]
-list_lengths.append(("Architecture", len(architecture_true)))
-total += architecture_true
-
-parks_true = [park for park in parks if park not in total]
-list_lengths.append(("Parks", len(parks_true)))
-total += parks_true
-
-memorials_true = [mem for mem in memorials if mem not in total]
-list_lengths.append(("Memorials", len(memorials_true)))
-total += memorials_true
-
-music_true = [mus for mus in music if mus not in total]
-list_lengths.append(("Music", len(music_true)))
-total += music_true
-
-ships_true = [ship for ship in ships if ship not in total]
-list_lengths.append(("Ships", len(ships_true)))
-total += ships_true
-
-cemetaries_true = [cem for cem in cemetaries if cem not in total]
-list_lengths.append(("Cemetaries", len(cemetaries_true)))
-total += cemetaries_true
-
-geography_true = [geo for geo in geography if geo not in total]
-list_lengths.append(("Geography", len(geography_true)))
-total += geography_true
-
-justice_true = [just for just in justice if just not in total]
-list_lengths.append(("Justice", len(justice_true)))
-total += justice_true
-
-diseases_true = [illness for illness in diseases if illness not in total]
-list_lengths.append(("Illness", len(diseases_true)))
-total += diseases_true
-
-missing = [tuples for tuples in other_all_list if tuples not in total]
-# print(len(missing))
-# print(len(total))
-# print(missing)
-
-final_list_length = sorted(list_lengths, key=lambda tup: tup[1], reverse=True)
-final_list_length.append(("too specific", len(missing)))
-
-# chunk list into parts s.text. each part has 5 elements
-chunked_list = chunks(final_list_length, 5)
-
-# plot the batches
-# for items in chunked_list:
-#     other_analyzer.plot_categories(items)
-
-# create csv files --> the ones commented out are either grouped together for properties or don'text have a
-# fitting set of properties in DBpedia
-# other_analyzer.other_detailed_to_csv(literature, "Literature.csv", title_only=True)
-# other_analyzer.other_detailed_to_csv(magazines, "Magazines.csv", title_only=True)
-# other_analyzer.other_detailed_to_csv(politics, "Politics.csv", title_only=True)
-# other_analyzer.other_detailed_to_csv(newspaper, "Newspapers.csv", title_only=True)
-# other_analyzer.other_detailed_to_csv(diplomacy, "Diplomacy.csv", title_only=True)
-# other_analyzer.other_detailed_to_csv(nature, "Nature.csv", title_only=True)
-# other_analyzer.other_detailed_to_csv(companies_true, "Companies.csv", title_only=True)
-# other_analyzer.other_detailed_to_csv(vocational, "Vocational.csv", title_only=True)
-# other_analyzer.other_detailed_to_csv(gastros_true, "Gastros.csv", title_only=True)
-# other_analyzer.other_detailed_to_csv(sport_true, "Sports.csv", title_only=True)
-# other_analyzer.other_detailed_to_csv(banks_true, "Banks.csv", title_only=True)
-# other_analyzer.other_detailed_to_csv(cafes_true, "Cafes.csv", title_only=True)
-# other_analyzer.other_detailed_to_csv(streets_true, "Streets.csv", title_only=True)
-# other_analyzer.other_detailed_to_csv(history_true, "History.csv", title_only=True)
-# other_analyzer.other_detailed_to_csv(corps_true, "Corps.csv", title_only=True)
-# other_analyzer.other_detailed_to_csv(schools_true, "Schools.csv", title_only=True)
-# other_analyzer.other_detailed_to_csv(culture_true, "Culture.csv", title_only=True)
-# other_analyzer.other_detailed_to_csv(orgs_true, "Orgs.csv", title_only=True)
-# other_analyzer.other_detailed_to_csv(architecture_true, "Architecture.csv", title_only=True)
-# other_analyzer.other_detailed_to_csv(parks_true, "Parks.csv", title_only=True)
-# other_analyzer.other_detailed_to_csv(memorials_true, "Memorials.csv", title_only=True)
-# other_analyzer.other_detailed_to_csv(music_true, "Music.csv", title_only=True)
-# other_analyzer.other_detailed_to_csv(ships_true, "Ships.csv", title_only=True)
-# other_analyzer.other_detailed_to_csv(cemetaries_true, "Cemetaries.csv", title_only=True)
-# other_analyzer.other_detailed_to_csv(geography_true, "Geography.csv", title_only=True)
-# other_analyzer.other_detailed_to_csv(justice_true, "Justice.csv", title_only=True)
-# other_analyzer.other_detailed_to_csv(diseases_true, "Diseases.csv", title_only=True)
-# other_analyzer.other_detailed_to_csv(missing, "TooDetailed.csv", title_only=True)
-
-actual_other_category_lens = []
-# group the categories in order to get as much properties as possible
-buildings_general = buildings + cafes_true + architecture_true + memorials_true + cemetaries_true + streets_true
-actual_other_category_lens.append(("Buildings", len(buildings_general)))
-
-organizations_general = companies_true + orgs_true + banks_true + cafes_true + gastros_true + clubs + corps_true
-actual_other_category_lens.append(("Organizations", len(organizations_general)))
-
-parks_general = parks_true + nature
-actual_other_category_lens.append(("Parks", len(parks_general)))
-
-schools_general = schools_true + vocational
-actual_other_category_lens.append(("Schools", len(schools_general)))
-
-actual_other_category_lens.append(("Literature", len(literature)))
-actual_other_category_lens.append(("Magazines", len(magazines)))
-actual_other_category_lens.append(("Newspapers", len(newspaper)))
-actual_other_category_lens.append(("History", len(history_true)))
-actual_other_category_lens.append(("Ships", len(ships_true)))
-actual_other_category_lens.append(("Diseases", len(diseases_true)))
-
-# map them all to csv files
-# other_analyzer.other_detailed_to_csv(buildings_general, "Buildings.csv", title_only=True)
-# other_analyzer.other_detailed_to_csv(organizations_general, "Organizations.csv", title_only=True)
-# other_analyzer.other_detailed_to_csv(parks_general, "Parks.csv", title_only=True)
-# other_analyzer.other_detailed_to_csv(schools_general, "Schools.csv", title_only=True)
-
-final_other_list = buildings_general + organizations_general + parks_general + schools_general + literature + \
-                   newspaper + magazines + ships_true + diseases + history_true
-print(len(final_other_list))
-print(buildings_general)
-discarded_entities = [ent for ent in other_all_list if ent not in final_other_list]
-# remove entity "Lotosblüte" since this one has no categories to it
-discarded_entities = [ent for ent in discarded_entities if ent[0] != "Lotosblüte"]
-actual_other_category_lens = sorted(actual_other_category_lens, key=lambda tup: tup[1], reverse=True)
-actual_other_category_lens.append(("Discarded entities", len(discarded_entities)))
-chunked_final_list = chunks(actual_other_category_lens, 4)
-
-for item in chunked_final_list:
-    other_analyzer.plot_categories(item)
-
-# create joint list for comparison of entities that have properties
-
-joint_list = [("Entities with DBpedia Properties", len(final_other_list)),
-              ("Entities with no DBpedia Properties", len(discarded_entities))]
-other_analyzer.plot_categories(joint_list)
-final_amount_articles = len(final_other_list) + 1038  # 1038 is the number of "Person" in the dataset
-print(final_amount_articles)
-
-# Data selection final results in a txt file
-txtfile_path = "C:/Users/ubmen/Desktop/BA_Prog/DataExploration/"
-txt_filename = "EndResults.txt"
-with open(os.path.join(txtfile_path, txt_filename), "w") as f:
-    f.write("Total number of candidate articles/entities after Property Analysis/Extraction: " 
-            f"{final_amount_articles}\n")
-    f.write('Number of candidate articles/entities in "other" that do not have matching properties in DBpedia: '
-            f"{len(discarded_entities)}\n")
-    f.write('Total number of candidate entities/articles "other" after Property Analysis/Extraction: '
-            f"{len(final_other_list)}\n")
-    f.write('In total, ' f"{len(discarded_entities)}" ' candidate entities/articles had to be discarded due to the fact'
-            ' that they do not have a set of properties in DBpedia at this point of the research, which means that '
-            'even if valid triples will be extracted, they cannot be inserted to the DBpedia Knowledge Graph due '
-            'to the lack of proper representation (i.e. triples) for the predicates that were found.\n'
-            'For future research, this could be still of interest one these properties are curated.\n'
-            'This leaves us with a total amount of ' 
-            f"{final_amount_articles}" ' candidate articles for the triple extraction part, ' 
-            f"{len(final_other_list)}" ' of which are of type "other"')
-    f.close()
+if __name__ == "__main__":
+    other_analyzer = CategoryAnalyzer(default_resolver().all_articles_file("Other.csv"))
+    other_all_list = other_analyzer.preprocess()
+
+    list_lengths = []
+    buildings = other_category_specific(other_all_list, "building")
+    list_lengths.append(("Buildings", len(buildings)))
+
+    clubs = other_category_specific(other_all_list, "club")
+    list_lengths.append(("Clubs", len(clubs)))
+
+    prizes = other_category_specific(other_all_list, "prize")
+    list_lengths.append(("Prizes", len(prizes)))
+
+    literature = other_category_specific(other_all_list, "literature")
+    list_lengths.append(("Literature", len(literature)))
+
+    magazines = other_category_specific(other_all_list, "magazine")
+    list_lengths.append(("Magazines", len(magazines)))
+
+    politics = other_category_specific(other_all_list, "politics")
+    list_lengths.append(("Politics", len(politics)))
+
+    newspaper = other_category_specific(other_all_list, "newspaper")
+    list_lengths.append(("Newspapers", len(newspaper)))
+
+    diplomacy = other_category_specific(other_all_list, "diplomacy")
+    list_lengths.append(("Diplomacy", len(diplomacy)))
+
+    nature = other_category_specific(other_all_list, "nature")
+    list_lengths.append(("Nature", len(nature)))
+
+    process = other_category_specific(other_all_list, "process")
+    list_lengths.append(("Process", len(process)))
+
+    companies = other_category_specific(other_all_list, "company")
+    vocational = other_category_specific(other_all_list, "vocation")
+    gastros = other_category_specific(other_all_list, "gastronomy")
+    cafes = other_category_specific(other_all_list, "cafe")
+    sport = other_category_specific(other_all_list, "sport")
+    banks = other_category_specific(other_all_list, "bank")
+    streets = other_category_specific(other_all_list, "street")
+    history = other_category_specific(other_all_list, "history")
+    corps = other_category_specific(other_all_list, "corps")
+    schools = other_category_specific(other_all_list, "school")
+    museums = other_category_specific(other_all_list, "museum")
+    culture = other_category_specific(other_all_list, "culture")
+    orgs = other_category_specific(other_all_list, "organisation")
+    architecture = other_category_specific(other_all_list, "architecture")
+    bridges = other_category_specific(other_all_list, "bridge")
+    parks = other_category_specific(other_all_list, "park")
+    memorials = other_category_specific(other_all_list, "memorial")
+    music = other_category_specific(other_all_list, "music")
+    ships = other_category_specific(other_all_list, "ship")
+    cemetaries = other_category_specific(other_all_list, "cemetary")
+    geography = other_category_specific(other_all_list, "geography")
+    justice = other_category_specific(other_all_list, "justice")
+    diseases = other_category_specific(other_all_list, "illness")
+
+    # get all categories that are no duplicates or not within intersections
+    total = buildings + clubs + prizes + literature + magazines + politics + newspaper + diplomacy + nature + process
+
+    # filter categories s.text. no intersections are available
+    companies_true = [company for company in companies if company not in total]
+    list_lengths.append(("Companies", len(companies_true)))
+
+    gastros_true = [cafe for cafe in gastros if cafe not in total]
+    list_lengths.append(("Gastronomy", len(gastros_true)))
+
+    sport_true = [sports for sports in sport if sports not in total]
+    list_lengths.append(("Sports", len(sport_true)))
+
+    banks_true = [bank for bank in banks if bank not in total]
+    list_lengths.append(("Banks", len(banks_true)))
+
+    cafes_true = [cafe for cafe in cafes if cafe not in total]
+    list_lengths.append(("Cafés", len(cafes_true)))
+
+    streets_true = [street for street in streets if street not in total]
+    list_lengths.append(("Streets", len(streets_true)))
+
+    history_true = [hist for hist in history if hist not in total]
+    list_lengths.append(("History", len(history_true)))
+
+    corps_true = [corp for corp in corps if corp not in total]
+    list_lengths.append(("Corps", len(corps_true)))
+
+    museums_true = [museum for museum in museums if museum not in total]
+    list_lengths.append(("Museums", len(museums_true)))
+
+    # update total list
+    total = buildings + clubs + prizes + literature + magazines + politics + newspaper + diplomacy + nature + process
+    total += companies_true
+    total += vocational
+    total += gastros_true
+    total += sport_true
+    total += banks_true
+    total += cafes_true
+    total += streets_true
+    total += history_true
+    total += corps_true
+
+
+    # put schools here in order to distinguish between category "school" and "vocational"
+    schools_true = [school for school in schools if school not in total]
+    list_lengths.append(("Schools", len(schools_true)))
+    list_lengths.append(("Vocational", len(vocational)))
+    total += schools_true
+    total += museums_true
+
+    # put category culture here since many overlaps and intersections for this as well
+    culture_true = [cult for cult in culture if cult not in total]
+    list_lengths.append(("Culture", len(culture_true)))
+    total += culture_true
+
+    orgs_true = [org for org in orgs if org not in total]
+    list_lengths.append(("Organizations", len(orgs_true)))
+    total += orgs_true
+
+    architecture_true = [arc for arc in architecture if arc not in total]
+    list_lengths.append(("Architecture", len(architecture_true)))
+    total += architecture_true
+
+    parks_true = [park for park in parks if park not in total]
+    list_lengths.append(("Parks", len(parks_true)))
+    total += parks_true
+
+    memorials_true = [mem for mem in memorials if mem not in total]
+    list_lengths.append(("Memorials", len(memorials_true)))
+    total += memorials_true
+
+    music_true = [mus for mus in music if mus not in total]
+    list_lengths.append(("Music", len(music_true)))
+    total += music_true
+
+    ships_true = [ship for ship in ships if ship not in total]
+    list_lengths.append(("Ships", len(ships_true)))
+    total += ships_true
+
+    cemetaries_true = [cem for cem in cemetaries if cem not in total]
+    list_lengths.append(("Cemetaries", len(cemetaries_true)))
+    total += cemetaries_true
+
+    geography_true = [geo for geo in geography if geo not in total]
+    list_lengths.append(("Geography", len(geography_true)))
+    total += geography_true
+
+    justice_true = [just for just in justice if just not in total]
+    list_lengths.append(("Justice", len(justice_true)))
+    total += justice_true
+
+    diseases_true = [illness for illness in diseases if illness not in total]
+    list_lengths.append(("Illness", len(diseases_true)))
+    total += diseases_true
+
+    missing = [tuples for tuples in other_all_list if tuples not in total]
+    # print(len(missing))
+    # print(len(total))
+    # print(missing)
+
+    final_list_length = sorted(list_lengths, key=lambda tup: tup[1], reverse=True)
+    final_list_length.append(("too specific", len(missing)))
+
+    # chunk list into parts s.text. each part has 5 elements
+    chunked_list = chunks(final_list_length, 5)
+
+    # plot the batches
+    # for items in chunked_list:
+    #     other_analyzer.plot_categories(items)
+
+    # create csv files --> the ones commented out are either grouped together for properties or don'text have a
+    # fitting set of properties in DBpedia
+    # other_analyzer.other_detailed_to_csv(literature, "Literature.csv", title_only=True)
+    # other_analyzer.other_detailed_to_csv(magazines, "Magazines.csv", title_only=True)
+    # other_analyzer.other_detailed_to_csv(politics, "Politics.csv", title_only=True)
+    # other_analyzer.other_detailed_to_csv(newspaper, "Newspapers.csv", title_only=True)
+    # other_analyzer.other_detailed_to_csv(diplomacy, "Diplomacy.csv", title_only=True)
+    # other_analyzer.other_detailed_to_csv(nature, "Nature.csv", title_only=True)
+    # other_analyzer.other_detailed_to_csv(companies_true, "Companies.csv", title_only=True)
+    # other_analyzer.other_detailed_to_csv(vocational, "Vocational.csv", title_only=True)
+    # other_analyzer.other_detailed_to_csv(gastros_true, "Gastros.csv", title_only=True)
+    # other_analyzer.other_detailed_to_csv(sport_true, "Sports.csv", title_only=True)
+    # other_analyzer.other_detailed_to_csv(banks_true, "Banks.csv", title_only=True)
+    # other_analyzer.other_detailed_to_csv(cafes_true, "Cafes.csv", title_only=True)
+    # other_analyzer.other_detailed_to_csv(streets_true, "Streets.csv", title_only=True)
+    # other_analyzer.other_detailed_to_csv(history_true, "History.csv", title_only=True)
+    # other_analyzer.other_detailed_to_csv(corps_true, "Corps.csv", title_only=True)
+    # other_analyzer.other_detailed_to_csv(schools_true, "Schools.csv", title_only=True)
+    # other_analyzer.other_detailed_to_csv(culture_true, "Culture.csv", title_only=True)
+    # other_analyzer.other_detailed_to_csv(orgs_true, "Orgs.csv", title_only=True)
+    # other_analyzer.other_detailed_to_csv(architecture_true, "Architecture.csv", title_only=True)
+    # other_analyzer.other_detailed_to_csv(parks_true, "Parks.csv", title_only=True)
+    # other_analyzer.other_detailed_to_csv(memorials_true, "Memorials.csv", title_only=True)
+    # other_analyzer.other_detailed_to_csv(music_true, "Music.csv", title_only=True)
+    # other_analyzer.other_detailed_to_csv(ships_true, "Ships.csv", title_only=True)
+    # other_analyzer.other_detailed_to_csv(cemetaries_true, "Cemetaries.csv", title_only=True)
+    # other_analyzer.other_detailed_to_csv(geography_true, "Geography.csv", title_only=True)
+    # other_analyzer.other_detailed_to_csv(justice_true, "Justice.csv", title_only=True)
+    # other_analyzer.other_detailed_to_csv(diseases_true, "Diseases.csv", title_only=True)
+    # other_analyzer.other_detailed_to_csv(missing, "TooDetailed.csv", title_only=True)
+
+    actual_other_category_lens = []
+    # group the categories in order to get as much properties as possible
+    buildings_general = buildings + cafes_true + architecture_true + memorials_true + cemetaries_true + streets_true
+    actual_other_category_lens.append(("Buildings", len(buildings_general)))
+
+    organizations_general = companies_true + orgs_true + banks_true + cafes_true + gastros_true + clubs + corps_true
+    actual_other_category_lens.append(("Organizations", len(organizations_general)))
+
+    parks_general = parks_true + nature
+    actual_other_category_lens.append(("Parks", len(parks_general)))
+
+    schools_general = schools_true + vocational
+    actual_other_category_lens.append(("Schools", len(schools_general)))
+
+    actual_other_category_lens.append(("Literature", len(literature)))
+    actual_other_category_lens.append(("Magazines", len(magazines)))
+    actual_other_category_lens.append(("Newspapers", len(newspaper)))
+    actual_other_category_lens.append(("History", len(history_true)))
+    actual_other_category_lens.append(("Ships", len(ships_true)))
+    actual_other_category_lens.append(("Diseases", len(diseases_true)))
+
+    # map them all to csv files
+    # other_analyzer.other_detailed_to_csv(buildings_general, "Buildings.csv", title_only=True)
+    # other_analyzer.other_detailed_to_csv(organizations_general, "Organizations.csv", title_only=True)
+    # other_analyzer.other_detailed_to_csv(parks_general, "Parks.csv", title_only=True)
+    # other_analyzer.other_detailed_to_csv(schools_general, "Schools.csv", title_only=True)
+
+    final_other_list = buildings_general + organizations_general + parks_general + schools_general + literature + \
+                       newspaper + magazines + ships_true + diseases + history_true
+    print(len(final_other_list))
+    print(buildings_general)
+    discarded_entities = [ent for ent in other_all_list if ent not in final_other_list]
+    # remove entity "Lotosblüte" since this one has no categories to it
+    discarded_entities = [ent for ent in discarded_entities if ent[0] != "Lotosblüte"]
+    actual_other_category_lens = sorted(actual_other_category_lens, key=lambda tup: tup[1], reverse=True)
+    actual_other_category_lens.append(("Discarded entities", len(discarded_entities)))
+    chunked_final_list = chunks(actual_other_category_lens, 4)
+
+    for item in chunked_final_list:
+        other_analyzer.plot_categories(item)
+
+    # create joint list for comparison of entities that have properties
+
+    joint_list = [("Entities with DBpedia Properties", len(final_other_list)),
+                  ("Entities with no DBpedia Properties", len(discarded_entities))]
+    other_analyzer.plot_categories(joint_list)
+    final_amount_articles = len(final_other_list) + 1038  # 1038 is the number of "Person" in the dataset
+    print(final_amount_articles)
+
+    # Data selection final results in a txt file
+    txtfile_path = default_resolver().path("DataExploration/")
+    txt_filename = "EndResults.txt"
+    with open(os.path.join(txtfile_path, txt_filename), "w") as f:
+        f.write("Total number of candidate articles/entities after Property Analysis/Extraction: " 
+                f"{final_amount_articles}\n")
+        f.write('Number of candidate articles/entities in "other" that do not have matching properties in DBpedia: '
+                f"{len(discarded_entities)}\n")
+        f.write('Total number of candidate entities/articles "other" after Property Analysis/Extraction: '
+                f"{len(final_other_list)}\n")
+        f.write('In total, ' f"{len(discarded_entities)}" ' candidate entities/articles had to be discarded due to the '
+                'fact that they do not have a set of properties in DBpedia at this point of the research, which means '
+                'that even if valid triples will be extracted, they cannot be inserted to the DBpedia Knowledge Graph '
+                'due to the lack of proper representation (i.e. triples) for the predicates that were found.\n'
+                'For future research, this could be still of interest one these properties are curated.\n'
+                'This leaves us with a total amount of ' 
+                f"{final_amount_articles}" ' candidate articles for the triple extraction part, ' 
+                f"{len(final_other_list)}" ' of which are of type "other"')
+        f.close()
@@ -0,0 +1,302 @@
+# -*- coding: utf-8 -*-
+"""
+This Python file provides a memory profile of the stages which load the full Wikipedia dump at once:
+
+    * "preprocess": WikiTitleExtractor.preprocess (minidom + pretty print of the XML file)
+    * "split_wiki_xml": split_wiki_txt of split_wiki_xml.py (whole-file read + one list per regex pass)
+    * "get_wiki_texts": load of the split Wiki TXT file, the category files and the chunked Persons files
+
+For every scale (multiple of the current data, i.e. of the 1203 articles of the *WikiTXT files), build_inputs writes a
+synthetic dump (see synthetic_wiki_dump.py) and every stage runs in its own subprocess with tracemalloc. A stage
+records the peak RSS (resource.ru_maxrss, not available on Windows), the peak of tracemalloc and the top allocators (by
+line) of the memory still allocated at the end of the stage, incl. its result.
+Timeouts, memory errors (see memory_limit_mb) and killed processes are recorded as errors of the stage, s.t. the
+scaling table shows which stage breaks first.
+
+Usage (from the repository root):
+    python DataSelection/Code/memory_profile.py --scales 1 10 100 --memory-limit-mb 4096
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import tracemalloc
+import subprocess
+import pandas as pd
+from synthetic_wiki_dump import SyntheticWikiDump, wiki_categories
+
+try:
+    import resource
+except ImportError:
+    # not available on Windows
+    resource = None
+
+repository_path = os.path.dirname(os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+profile_path = os.path.join(repository_path, "DataSelection/MemoryProfiles/")
+# number of articles of the current *WikiTXT files, i.e. scale 1
+current_articles = 1203
+xml_filename = "SyntheticWiki.xml"
+parsed_filename = "ParsedWikiXMLFile.txt"
+split_filename = "FullWikiTXTsplit.txt"
+
+
+def build_inputs(directory: str, scale: int, seed=0):
+    """
+    writes the synthetic inputs of all stages to a directory with SyntheticWikiDump (scale * current_articles pages)
+
+        * SyntheticWiki.xml: MediaWiki export XML, input of WikiTitleExtractor.preprocess
+        * ParsedWikiXMLFile.txt: parsed text with "#Article:"/"#Type:" headers, input of split_wiki_txt
+        * FullWikiTXTsplit.txt and AllArticles/ (category CSV files): input of get_wiki_texts
+
+    Parameters
+    ----------
+    directory: str
+        directory of the inputs, the output directories of get_wiki_texts are created as well
+    scale: int
+        multiple of the current data
+    seed: int
+        seed of the dump. The default is 0.
+
+    Returns
+    -------
+    input_info: dict
+        number of articles and size of every input file in MB
+    """
+    for sub_directory in ["PersonsWikiTXT"] + ["OtherWikiTXT/" + category_type + "WikiTXT"
+                                               for category_type in wiki_categories[1:]]:
+        os.makedirs(os.path.join(directory, sub_directory), exist_ok=True)
+    dump_info = SyntheticWikiDump(scale * current_articles, seed=seed).write(
+        directory, ("xml", "parsed", "split", "csv"), xml_filename, parsed_filename, split_filename)
+    input_info = {"articles": dump_info["pages"]}
+    for filename in [xml_filename, parsed_filename, split_filename]:
+        input_info[filename] = dump_info[filename]
+    return input_info
+
+
+def run_preprocess(directory: str):
+    from wiki_title_extractor import WikiTitleExtractor
+    return WikiTitleExtractor(xml_filename, path=directory).preprocess()
+
+
+def run_split_wiki_xml(directory: str):
+    from TripleExtraction.Code.split_wiki_xml import split_wiki_txt
+    return split_wiki_txt(os.path.join(directory, parsed_filename),
+                          os.path.join(directory, "FullWikiTXTsplitOutput.txt"))
+
+
+def run_get_wiki_texts(directory: str):
+    from TripleExtraction.Code import get_wiki_texts
+    wiki_article_list = get_wiki_texts.load_wiki_article_list(os.path.join(directory, split_filename))
+    csv_path = os.path.join(directory, "AllArticles/")
+    persons_list = get_wiki_texts.write_and_save_wiki_texts("Persons", path=directory, write_file=False,
+                                                            return_list=True, wiki_article_list=wiki_article_list,
+                                                            csv_path=csv_path)
+    for category_type in get_wiki_texts.wiki_categories:
+        get_wiki_texts.write_and_save_wiki_texts(category_type, path=directory, wiki_article_list=wiki_article_list,
+                                                 csv_path=csv_path)
+    get_wiki_texts.save_persons_chunks(persons_list, save_path=os.path.join(directory, "PersonsWikiTXT/"))
+    return wiki_article_list, persons_list
+
+
+# registry of the profiled stages, every stage gets the directory of the inputs (with a trailing "/")
+stages = {"preprocess": run_preprocess, "split_wiki_xml": run_split_wiki_xml, "get_wiki_texts": run_get_wiki_texts}
+
+
+def peak_rss_mb():
+    """
+    returns the peak resident set size of the current process in MB, None if it isn't available
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    return round(peak / 2 ** 20 if sys.platform == "darwin" else peak / 2 ** 10, 1)
+
+
+def profile_stage(stage: str, directory: str, top=10, trace_allocations=True):
+    """
+    runs a stage in the current process and measures its memory, is called in the subprocess of run_stage
+
+    Parameters
+    ----------
+    stage: str
+        name of the stage, key of stages
+    directory: str
+        directory of the inputs
+    top: int
+        number of top allocators. The default is 10.
+    trace_allocations: bool
+        determines whether tracemalloc is used (it slows the stage down and adds to the RSS). The default is True.
+
+    Returns
+    -------
+    result: dict
+        seconds, baseline and peak RSS in MB, peak of tracemalloc in MB and the top allocators
+        ({"location", "size_mb", "count"})
+    """
+    directory = os.path.join(directory, "")
+    result = {"stage": stage, "baseline_rss_mb": peak_rss_mb()}
+    if trace_allocations is True:
+        tracemalloc.start()
+    start = time.perf_counter()
+    output = stages[stage](directory)
+    result["seconds"] = round(time.perf_counter() - start, 2)
+    result["peak_rss_mb"] = peak_rss_mb()
+    result["tracemalloc_peak_mb"] = None
+    result["top_allocators"] = []
+    if trace_allocations is True:
+        result["tracemalloc_peak_mb"] = round(tracemalloc.get_traced_memory()[1] / 2 ** 20, 1)
+        snapshot = tracemalloc.take_snapshot().filter_traces([tracemalloc.Filter(False, tracemalloc.__file__)])
+        tracemalloc.stop()
+        for statistic in snapshot.statistics("lineno")[:top]:
+            frame = statistic.traceback[0]
+            location = os.path.relpath(frame.filename, repository_path) if frame.filename.startswith(
+                repository_path) else os.path.basename(frame.filename)
+            result["top_allocators"].append({"location": location + ":" + str(frame.lineno),
+                                             "size_mb": round(statistic.size / 2 ** 20, 1),
+                                             "count": statistic.count})
+    del output
+    return result
+
+
+def run_stage(stage: str, directory: str, timeout=3600, memory_limit_mb=None, trace_allocations=True):
+    """
+    runs profile_stage in a fresh subprocess, s.t. the peak RSS of every stage is measured separately
+
+    Parameters
+    ----------
+    stage: str
+        name of the stage, key of stages
+    directory: str
+        directory of the inputs
+    timeout: int
+        seconds after which the stage is stopped. The default is 3600.
+    memory_limit_mb: None/int
+        limit of the address space of the subprocess (RLIMIT_AS, only on Linux), a stage which exceeds it fails with a
+        MemoryError instead of swapping. The default None sets no limit.
+    trace_allocations: bool
+        see profile_stage
+
+    Returns
+    -------
+    result: dict
+        output of profile_stage, or {"stage", "error"} if the stage failed
+    """
+    result_file = os.path.join(directory, stage + "_profile.json")
+    if os.path.exists(result_file):
+        os.remove(result_file)
+    command = [sys.executable, os.path.realpath(__file__), "--worker", stage, "--directory", directory,
+               "--result-file", result_file]
+    if memory_limit_mb is not None:
+        command += ["--memory-limit-mb", str(memory_limit_mb)]
+    if trace_allocations is False:
+        command.append("--no-tracemalloc")
+    environment = dict(os.environ)
+    environment["PYTHONPATH"] = os.pathsep.join([repository_path] + ([environment["PYTHONPATH"]]
+                                                                     if environment.get("PYTHONPATH") else []))
+    start = time.perf_counter()
+    try:
+        process = subprocess.run(command, env=environment, timeout=timeout, capture_output=True, text=True)
+    except subprocess.TimeoutExpired:
+        return {"stage": stage, "seconds": timeout, "error": "timeout after " + str(timeout) + " s"}
+    if os.path.exists(result_file):
+        with open(result_file, encoding="utf-8") as f:
+            result = json.load(f)
+        # a stage which failed with a MemoryError only has the duration of the subprocess
+        result.setdefault("seconds", round(time.perf_counter() - start, 2))
+        return result
+    error_lines = process.stderr.strip().splitlines()
+    return {"stage": stage, "seconds": round(time.perf_counter() - start, 2),
+            "error": error_lines[-1] if error_lines else "exit code " + str(process.returncode)}
+
+
+def scaling_table(scales=(1, 10, 100), stage_names=None, output_directory=profile_path, timeout=3600,
+                  memory_limit_mb=None, trace_allocations=True, keep_inputs=False):
+    """
+    profiles the stages for several scales of the current data
+
+    Parameters
+    ----------
+    scales: tuple
+        multiples of the current data. The default is (1, 10, 100).
+    stage_names: None/list
+        stages that will be profiled. The default None profiles all stages.
+    output_directory: str
+        directory of the inputs (one subdirectory per scale) and of MemoryProfile.json
+    timeout: int
+        see run_stage
+    memory_limit_mb: None/int
+        see run_stage
+    trace_allocations: bool
+        see profile_stage
+    keep_inputs: bool
+        determines whether the synthetic inputs are kept after profiling a scale. The default is False.
+
+    Returns
+    -------
+    scaling_df: pd.DataFrame
+        DataFrame with one row per stage and scale and the columns Stage, Scale, Articles, Input MB, Seconds,
+        Peak RSS MB, Tracemalloc Peak MB, Top Allocator and Error
+    """
+    stage_names = list(stages) if stage_names is None else stage_names
+    stage_inputs = {"preprocess": xml_filename, "split_wiki_xml": parsed_filename, "get_wiki_texts": split_filename}
+    profiles = []
+    rows = []
+    for scale in scales:
+        directory = os.path.join(output_directory, "Scale" + str(scale))
+        input_info = build_inputs(directory, scale)
+        for stage in stage_names:
+            result = run_stage(stage, directory, timeout, memory_limit_mb, trace_allocations)
+            profiles.append({"scale": scale, **input_info, **result})
+            top_allocators = result.get("top_allocators")
+            rows.append({"Stage": stage, "Scale": scale, "Articles": input_info["articles"],
+                         "Input MB": input_info[stage_inputs[stage]], "Seconds": result.get("seconds"),
+                         "Peak RSS MB": result.get("peak_rss_mb"),
+                         "Tracemalloc Peak MB": result.get("tracemalloc_peak_mb"),
+                         "Top Allocator": "{} ({} MB)".format(top_allocators[0]["location"],
+                                                              top_allocators[0]["size_mb"])
+                         if top_allocators else None,
+                         "Error": result.get("error")})
+        if keep_inputs is False:
+            for root, directories, filenames in os.walk(directory, topdown=False):
+                for filename in filenames:
+                    if not filename.endswith("_profile.json"):
+                        os.remove(os.path.join(root, filename))
+    with open(os.path.join(output_directory, "MemoryProfile.json"), "w", encoding="utf-8") as f:
+        json.dump(profiles, f, indent=2, ensure_ascii=False)
+    return pd.DataFrame(rows)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="memory profile of the data selection and exploration stages")
+    parser.add_argument("--scales", nargs="+", type=int, default=[1, 10, 100])
+    parser.add_argument("--stages", nargs="+", default=None, choices=list(stages))
+    parser.add_argument("--output", default=profile_path, help="directory of the inputs and results")
+    parser.add_argument("--timeout", type=int, default=3600, help="seconds per stage")
+    parser.add_argument("--memory-limit-mb", type=int, default=None, help="address space limit per stage")
+    parser.add_argument("--no-tracemalloc", action="store_true", help="measure only the peak RSS")
+    parser.add_argument("--keep-inputs", action="store_true", help="keep the synthetic inputs")
+    # worker mode of run_stage
+    parser.add_argument("--worker", default=None, choices=list(stages), help=argparse.SUPPRESS)
+    parser.add_argument("--directory", default=None, help=argparse.SUPPRESS)
+    parser.add_argument("--result-file", default=None, help=argparse.SUPPRESS)
+    arguments = parser.parse_args()
+    if arguments.worker is not None:
+        if arguments.memory_limit_mb is not None and resource is not None:
+            memory_limit = arguments.memory_limit_mb * 2 ** 20
+            resource.setrlimit(resource.RLIMIT_AS, (memory_limit, memory_limit))
+        try:
+            stage_result = profile_stage(arguments.worker, arguments.directory,
+                                         trace_allocations=arguments.no_tracemalloc is False)
+        except MemoryError:
+            stage_result = {"stage": arguments.worker, "peak_rss_mb": peak_rss_mb(),
+                            "error": "MemoryError (limit: " + str(arguments.memory_limit_mb) + " MB)"}
+        with open(arguments.result_file, "w", encoding="utf-8") as f:
+            json.dump(stage_result, f, indent=2, ensure_ascii=False)
+    else:
+        with pd.option_context("display.max_columns", None, "display.width", 200):
+            print(scaling_table(tuple(arguments.scales), arguments.stages, arguments.output, arguments.timeout,
+                                arguments.memory_limit_mb, arguments.no_tracemalloc is False,
+                                arguments.keep_inputs))
@@ -0,0 +1,559 @@
+# -*- coding: utf-8 -*-
+"""
+This Python file provides a Class "SyntheticWikiDump" which generates a synthetic German Wikipedia dump of arbitrary
+size for scale tests of the pipeline, offline and reproducible (fixed seed). The dump is written in one streaming pass,
+s.t. also 1M articles only need the memory of the set of used titles:
+
+    * MediaWiki export XML (input of WikiTitleExtractor): <page> elements with wikitext, infobox and taxobox templates
+      (in the spellings get_articles checks for), {{Personendaten}}, [[Kategorie:...]] links, [[Datei:...|mini|...]]
+      images, Einzelnachweise and disambiguation pages with {{Begriffsklärung}}
+    * parsed text (input of split_wiki_xml.py): the same pages as plain text with "#Article:"/"#Type:" headers,
+      "Kategorie:" lines and the "mini"/"miniatur"/"thumb" leftovers of the images, separated by "\n\n\n"
+    * split text (input of get_wiki_texts.py): (title, "#Article: title\n" + text) tuples, one per line
+    * category CSV files (AllArticles/Persons.csv, AllArticles/OtherDetailed/<Category>.csv) of the articles without
+      infobox, i.e. the tail entities, and optionally their *WikiTXT files (input of the triple extraction)
+
+Article lengths follow a log-normal distribution with the mean and spread of the current Persons articles (mean 3500,
+median 2600 characters), the categories are drawn with the shares of the current data.
+
+Usage (from the repository root):
+    python DataSelection/Code/synthetic_wiki_dump.py --articles 100000 --output DataSelection/SyntheticDump/
+"""
+
+import os
+import re
+import csv
+import math
+import random
+import argparse
+from xml.sax.saxutils import escape
+
+wiki_categories = ["Persons", "Buildings", "Diseases", "History", "Literature", "Magazines", "Newspapers",
+                   "Organizations", "Parks", "Schools", "Ships"]
+# shares of the current *WikiTXT files
+category_weights = {"Persons": 1038, "Buildings": 79, "Diseases": 2, "History": 20, "Literature": 7, "Magazines": 2,
+                    "Newspapers": 6, "Organizations": 33, "Parks": 6, "Schools": 7, "Ships": 3}
+
+first_names = ["Hans", "Karl", "Friedrich", "Wilhelm", "Heinrich", "Hermann", "Otto", "Ernst", "Paul", "Walter",
+               "Johann", "Georg", "Ludwig", "August", "Franz", "Josef", "Richard", "Kurt", "Werner", "Gerhard",
+               "Helmut", "Klaus", "Peter", "Wolfgang", "Jürgen", "Dieter", "Günter", "Rudolf", "Max", "Emil",
+               "Anna", "Maria", "Elisabeth", "Margarete", "Gertrud", "Hildegard", "Ursula", "Ingrid", "Helga",
+               "Erika", "Johanna", "Luise", "Charlotte", "Sophie", "Clara", "Martha", "Frieda", "Irmgard", "Renate",
+               "Gisela", "Barbara", "Monika", "Christa", "Brigitte", "Karin", "Sabine", "Petra", "Katharina"]
+female_first_names = set(first_names[first_names.index("Anna"):])
+last_names = ["Müller", "Schmidt", "Schneider", "Fischer", "Weber", "Meyer", "Wagner", "Becker", "Schulz", "Hoffmann",
+              "Schäfer", "Koch", "Bauer", "Richter", "Klein", "Wolf", "Schröder", "Neumann", "Schwarz", "Zimmermann",
+              "Braun", "Krüger", "Hofmann", "Hartmann", "Lange", "Schmitt", "Werner", "Schmitz", "Krause", "Meier",
+              "Lehmann", "Schmid", "Schulze", "Maier", "Köhler", "Herrmann", "König", "Walter", "Mayer", "Huber",
+              "Kaiser", "Fuchs", "Peters", "Lang", "Scholz", "Möller", "Weiß", "Jung", "Hahn", "Schubert", "Vogel",
+              "Friedrich", "Keller", "Günther", "Frank", "Berger", "Winkler", "Roth", "Beck", "Lorenz", "Baumann",
+              "Franke", "Albrecht", "Schuster", "Simon", "Ludwig", "Böhm", "Winter", "Kraus", "Martin", "Schumacher",
+              "Krämer", "Vogt", "Stein", "Jäger", "Otto", "Sommer", "Groß", "Seidel", "Heinrich", "Brandt", "Haas",
+              "Schreiber", "Graf", "Schulte", "Dietrich", "Ziegler", "Kuhn", "Kühn", "Pohl", "Engel", "Horn",
+              "Busch", "Bergmann", "Thomas", "Voigt", "Sauer", "Arnold", "Wolff", "Pfeiffer", "Dietz", "Straub"]
+occupations = ["Politiker", "Jurist", "Mediziner", "Architekt", "Maler", "Bildhauer", "Komponist", "Schriftsteller",
+               "Historiker", "Theologe", "Chemiker", "Physiker", "Mathematiker", "Ingenieur", "Unternehmer",
+               "Offizier", "Schauspieler", "Fußballspieler", "Journalist", "Verleger", "Philologe", "Pädagoge",
+               "Landwirt", "Kaufmann", "Botaniker"]
+places = ["Berlin", "Hamburg", "München", "Köln", "Frankfurt am Main", "Stuttgart", "Düsseldorf", "Leipzig",
+          "Dresden", "Hannover", "Nürnberg", "Bremen", "Essen", "Bonn", "Münster", "Karlsruhe", "Mannheim",
+          "Augsburg", "Wiesbaden", "Kiel", "Lübeck", "Rostock", "Erfurt", "Kassel", "Freiburg im Breisgau",
+          "Heidelberg", "Göttingen", "Würzburg", "Regensburg", "Marburg", "Jena", "Weimar", "Potsdam", "Halle",
+          "Magdeburg", "Schwerin", "Trier", "Koblenz", "Ulm", "Passau", "Bamberg", "Tübingen", "Wien", "Graz",
+          "Salzburg", "Zürich", "Bern", "Basel", "Straßburg", "Breslau", "Königsberg", "Danzig", "Stettin", "Posen"]
+states = ["Bayern", "Baden-Württemberg", "Nordrhein-Westfalen", "Niedersachsen", "Hessen", "Sachsen", "Thüringen",
+          "Brandenburg", "Schleswig-Holstein", "Mecklenburg-Vorpommern", "Rheinland-Pfalz", "Sachsen-Anhalt"]
+months = ["Januar", "Februar", "März", "April", "Mai", "Juni", "Juli", "August", "September", "Oktober", "November",
+          "Dezember"]
+nouns = ["Garten", "Fluss", "Berg", "Wald", "Stadt", "Turm", "Brücke", "Straße", "Weg", "Tal", "Hafen", "Markt",
+         "Quelle", "Insel", "Mühle", "Feld", "Kreuz", "Stern", "Licht", "Abend"]
+adjectives = ["stille", "alte", "neue", "grüne", "weiße", "schwarze", "lange", "kleine", "große", "letzte", "erste",
+              "verlorene", "dunkle", "helle", "ferne"]
+building_types = ["Schloss", "Burg", "Rathaus", "Bahnhof", "Wasserturm", "Kloster", "Villa", "Pfarrkirche St.",
+                  "Stadttor", "Speicher"]
+saints = ["Marien", "Johannes", "Nikolai", "Petri", "Jakobi", "Laurentius", "Martin", "Michael", "Georg", "Stephan"]
+disease_suffixes = ["Syndrom", "Krankheit", "Fieber", "Dystrophie", "Anämie", "Myopathie"]
+medical_fields = ["Neurologie", "Kardiologie", "Dermatologie", "Hämatologie", "Infektiologie", "Kinderheilkunde"]
+history_types = ["Schlacht bei", "Belagerung von", "Vertrag von", "Frieden von", "Aufstand in", "Brand von"]
+organization_types = ["Verband", "Verein", "Gesellschaft", "Stiftung", "Genossenschaft", "Bund"]
+organization_topics = ["Heimatpflege", "Denkmalschutz", "Naturkunde", "Geschichte", "Musik", "Sport", "Wissenschaft",
+                       "Kunst", "Landwirtschaft", "Wohlfahrt"]
+school_types = ["Gymnasium", "Realschule", "Gesamtschule", "Oberschule", "Berufsschule"]
+taxon_genera = ["Carabus", "Papilio", "Quercus", "Salix", "Pinus", "Rosa", "Bombus", "Formica", "Helix", "Viola",
+                "Primula", "Rana", "Lacerta", "Sorex", "Mustela", "Corvus", "Parus", "Turdus", "Picus", "Falco"]
+taxon_epithets = ["alpina", "vulgaris", "montana", "sylvestris", "arvensis", "palustris", "nigra", "alba", "rubra",
+                  "major", "minor", "communis", "aquatica", "borealis", "germanica", "europaea", "robusta"]
+
+# sections of the articles, the parsed text keeps only the headings as lines
+section_headings = {"Persons": ["Leben", "Werk", "Familie", "Schriften", "Ehrungen", "Literatur"],
+                    "Buildings": ["Geschichte", "Architektur", "Ausstattung", "Nutzung", "Literatur"],
+                    "Diseases": ["Ursachen", "Symptome", "Diagnose", "Behandlung", "Prognose"],
+                    "History": ["Vorgeschichte", "Verlauf", "Folgen", "Rezeption", "Literatur"],
+                    "Literature": ["Inhalt", "Entstehung", "Rezeption", "Ausgaben", "Literatur"],
+                    "Magazines": ["Geschichte", "Inhalt", "Herausgeber", "Auflage"],
+                    "Newspapers": ["Geschichte", "Ausrichtung", "Auflage", "Redaktion"],
+                    "Organizations": ["Geschichte", "Organisation", "Ziele", "Mitglieder"],
+                    "Parks": ["Geschichte", "Anlage", "Pflanzen", "Denkmäler"],
+                    "Schools": ["Geschichte", "Schulprofil", "Gebäude", "Bekannte Schüler"],
+                    "Ships": ["Geschichte", "Technik", "Einsatz", "Verbleib"],
+                    "Taxa": ["Merkmale", "Verbreitung", "Lebensweise", "Systematik"]}
+# sentence templates of the paragraphs, {p}: place, {y}: year, {n}: name, {s}: state, {o}: occupation, {w}: noun
+sentence_templates = ["Im Jahr {y} wurde in [[{p}]] ein neuer Abschnitt begonnen.",
+                      "Nach dem Tod von [[{n}]] übernahm die Familie die Leitung.",
+                      "Die Arbeiten dauerten bis {y} und wurden von einem [[{o}]] aus [[{p}]] geleitet.",
+                      "Zwischen {y} und {y2} fanden umfangreiche Umbauten statt.",
+                      "In den folgenden Jahren wuchs die Bedeutung für die Region [[{s}]].",
+                      "Eine erste Erwähnung findet sich in einer Urkunde aus dem Jahr {y}.",
+                      "Während des Krieges wurden große Teile zerstört und später wieder aufgebaut.",
+                      "Der Bestand umfasst heute mehr als {k} Objekte.",
+                      "Zu den bekanntesten Vertretern gehörte [[{n}]], der in [[{p}]] lebte.",
+                      "Die Zahl der Mitglieder stieg bis {y} auf etwa {k}.",
+                      "Seit {y} steht das Ensemble unter Denkmalschutz.",
+                      "Die Ergebnisse wurden {y} in der Zeitschrift ''{w}'' veröffentlicht.",
+                      "Er studierte in [[{p}]] und [[{p2}]] und wurde {y} promoviert.",
+                      "Sie arbeitete ab {y} als [[{o}]] in [[{p}]].",
+                      "Die Einweihung erfolgte am {d} in Anwesenheit zahlreicher Gäste.",
+                      "Der Name geht auf den alten Flurnamen ''{w}'' zurück.",
+                      "Eine Gedenktafel am {w} erinnert an die Ereignisse.",
+                      "Die Finanzierung übernahm zum größten Teil das Land [[{s}]].",
+                      "Heute wird das Gebäude als Museum genutzt.",
+                      "Die Gesamtlänge beträgt rund {k} Meter, die Breite etwa {k2} Meter.",
+                      "Ab {y} gab es Bestrebungen, die Tradition fortzuführen.",
+                      "Über die frühe Geschichte ist nur wenig bekannt.",
+                      "Im Zuge der Neuordnung von {y} wurde die Verwaltung nach [[{p}]] verlegt.",
+                      "Die Auflage lag zeitweise bei über {k} Exemplaren."]
+# image options, the parser keeps them as line before the caption
+image_options = ["mini", "mini", "mini", "miniatur", "thumb"]
+link_pattern = re.compile(r"\[\[(?:[^|\]]*\|)?([^\]]+)\]\]")
+
+
+class SyntheticWikiDump:
+    """
+    Class to generate a synthetic German Wikipedia dump
+
+    Attributes
+    -------------
+    num_articles: int
+        number of pages of the dump (incl. disambiguation pages)
+    seed: int
+        seed of the random generator, the same seed generates the same dump
+    mean_characters: int
+        mean length of the article texts in characters
+    infobox_share: float
+        share of the articles with an infobox
+    disambiguation_share: float
+        share of the disambiguation pages
+    taxon_share: float
+        share of the articles about taxa (with taxobox, in none of the categories)
+
+    Methods
+    ------------------------
+    pages()
+        generates the pages of the dump as dictionaries
+    wikitext(page)
+        returns the wikitext of a page
+    parsed_text(page)
+        returns the parsed text of a page
+    write(directory, files)
+        writes the dump files to a directory
+    """
+    def __init__(self, num_articles: int, seed=0, mean_characters=3500, infobox_share=0.3, disambiguation_share=0.03,
+                 taxon_share=0.02):
+        """
+        init method of the class
+
+        Parameters
+        ----------
+        num_articles: int
+            number of pages of the dump (incl. disambiguation pages)
+        seed: int
+            seed of the random generator. The default is 0.
+        mean_characters: int
+            mean length of the article texts in characters. The default is 3500 (current Persons articles).
+        infobox_share: float
+            share of the articles with an infobox. The default is 0.3.
+        disambiguation_share: float
+            share of the disambiguation pages. The default is 0.03.
+        taxon_share: float
+            share of the articles about taxa. The default is 0.02.
+        """
+        if num_articles < 1:
+            raise ValueError("Incorrect number of articles, must be at least 1")
+        for share in [infobox_share, disambiguation_share, taxon_share]:
+            if share < 0 or share > 1:
+                raise ValueError("Incorrect share input: must be a float value between 0.0 and 1.0")
+        self.num_articles = num_articles
+        self.seed = seed
+        self.mean_characters = mean_characters
+        self.infobox_share = infobox_share
+        self.disambiguation_share = disambiguation_share
+        self.taxon_share = taxon_share
+        self._rng = random.Random(seed)
+        self._paragraphs = self._paragraph_pool(400)
+        self._paragraph_length = sum(len(paragraph) for paragraph in self._paragraphs) / len(self._paragraphs)
+        # log-normal lengths with median = mean_characters / 1.35 as in the current data
+        self._sigma = 0.77
+        self._mu = math.log(mean_characters) - self._sigma ** 2 / 2
+        self._titles = set()
+
+    def _date(self, year: int):
+        return str(self._rng.randint(1, 28)) + ". " + self._rng.choice(months) + " " + str(year)
+
+    def _name(self):
+        return self._rng.choice(first_names) + " " + self._rng.choice(last_names)
+
+    def _sentence(self):
+        rng = self._rng
+        year = rng.randint(1500, 2020)
+        return rng.choice(sentence_templates).format(
+            p=rng.choice(places), p2=rng.choice(places), y=year, y2=year + rng.randint(1, 30), n=self._name(),
+            s=rng.choice(states), o=rng.choice(occupations), w=rng.choice(nouns), k=rng.randint(10, 5000),
+            k2=rng.randint(5, 200), d=self._date(year))
+
+    def _paragraph_pool(self, size: int):
+        """
+        generates a pool of paragraphs (3 to 9 sentences), the articles sample their paragraphs from the pool s.t.
+        generating 1M articles doesn't generate 40M sentences
+        """
+        return [" ".join(self._sentence() for _ in range(self._rng.randint(3, 9))) for _ in range(size)]
+
+    def _unique_title(self, title: str, qualifier: str):
+        """
+        returns the title, or if it's used already the title with a qualifier (and a number), e.g.
+        "Hans Müller (Politiker)", "Hans Müller (Politiker, 2)"
+        """
+        candidate = title
+        if candidate in self._titles:
+            candidate = title + " (" + qualifier + ")"
+        number = 2
+        while candidate in self._titles:
+            candidate = title + " (" + qualifier + ", " + str(number) + ")"
+            number += 1
+        self._titles.add(candidate)
+        return candidate
+
+    def _entity(self, category_type: str):
+        """
+        returns title, lead sentence, infobox template, categories and image caption of an entity of a category
+        """
+        rng = self._rng
+        place = rng.choice(places)
+        state = rng.choice(states)
+        year = rng.randint(1500, 2015)
+        if category_type == "Persons":
+            name = self._name()
+            occupation = rng.choice(occupations)
+            female = name.split()[0] in female_first_names
+            birth, death = year - 200, min(year - 200 + rng.randint(30, 95), 2020)
+            birth_date = self._date(birth)
+            title = self._unique_title(name, occupation)
+            # female form, e.g. "Politikerin", "Theologin"
+            occupation_form = ((occupation[:-1] if occupation.endswith("e") else occupation) + "in" if female
+                               else occupation)
+            lead = ("'''{}''' (* {} in [[{}]]; † {} in [[{}]]) war {} deutsche{} [[{}|{}]].".format(
+                name, birth_date, place, self._date(death), rng.choice(places), "eine" if female else "ein",
+                "" if female else "r", occupation, occupation_form))
+            infobox = "{{Infobox Person\n| Name = " + name + "\n| Geburtsdatum = " + birth_date + "\n}}"
+            categories = [occupation + " (" + str(birth // 100 + 1) + ". Jahrhundert)", "Deutscher",
+                          "Geboren " + str(birth), "Gestorben " + str(death), "Frau" if female else "Mann"]
+            caption = name + " um " + str(birth + 40)
+        elif category_type == "Buildings":
+            building_type = rng.choice(building_types)
+            title = self._unique_title((building_type + "-" + rng.choice(saints) + "-Kirche" if
+                                        building_type.endswith("St.") else building_type) + " " + place, place)
+            lead = "'''{}''' ist ein {} erbautes Bauwerk in [[{}]] in [[{}]].".format(title, year, place, state)
+            infobox = "{{Infobox Burg\n| Name = " + title + "\n| Entstehungszeit = " + str(year) + "\n}}"
+            categories = ["Bauwerk in " + place, "Baudenkmal in " + state, "Erbaut in den " + str(year // 10 * 10) +
+                          "er Jahren"]
+            caption = title + ", Ansicht von Süden"
+        elif category_type == "Diseases":
+            title = self._unique_title(rng.choice(last_names) + "-" + rng.choice(disease_suffixes), "Medizin")
+            field = rng.choice(medical_fields)
+            lead = "Das '''{}''' ist eine seltene Erkrankung aus dem Bereich der [[{}]].".format(title, field)
+            infobox = "{{Infobox ICD\n| 01-CODE = Q" + str(rng.randint(10, 99)) + "\n| 01-BEZEICHNUNG = " + title + \
+                      "\n}}"
+            categories = ["Krankheitsbild in der " + field, "Seltene Krankheit"]
+            caption = "Schematische Darstellung"
+        elif category_type == "History":
+            title = self._unique_title(rng.choice(history_types) + " " + place, str(year))
+            lead = "Die '''{}''' fand im Jahr {} in der Nähe von [[{}]] statt.".format(title, year, place)
+            infobox = "{{Infobox Militärischer Konflikt\n| KONFLIKT = " + title + "\n| DATUM = " + str(year) + "\n}}"
+            categories = ["Ereignis " + str(year), "Geschichte (" + state + ")"]
+            caption = "Zeitgenössische Darstellung"
+        elif category_type == "Literature":
+            title = self._unique_title("Der " + rng.choice(adjectives) + " " + rng.choice(nouns), "Roman")
+            lead = "'''{}''' ist ein Roman von [[{}]], der {} erschien.".format(title, self._name(), year)
+            infobox = "{{Infobox Literarisches Werk\n| Titel = " + title + "\n| Erscheinungsjahr = " + str(year) + \
+                      "\n}}"
+            categories = ["Literarisches Werk", "Literatur (Deutsch)", "Roman, Epik"]
+            caption = "Titelblatt der Erstausgabe"
+        elif category_type == "Magazines":
+            title = self._unique_title(rng.choice(nouns) + " und " + rng.choice(nouns), "Zeitschrift")
+            lead = "'''{}''' ist eine seit {} in [[{}]] erscheinende Zeitschrift.".format(title, year, place)
+            infobox = "{{Infobox Publikation\n| titel = " + title + "\n| erstausgabe = " + str(year) + "\n}}"
+            categories = ["Zeitschrift (Deutschland)", "Ersterscheinung " + str(year)]
+            caption = "Titelseite der ersten Ausgabe"
+        elif category_type == "Newspapers":
+            title = self._unique_title(place.split()[0] + "er " + rng.choice(["Tagblatt", "Anzeiger", "Zeitung",
+                                                                               "Volksblatt"]), "Zeitung")
+            lead = "Das '''{}''' ist eine {} gegründete Tageszeitung in [[{}]].".format(title, year, place)
+            infobox = "{{ Infobox Zeitung\n| Titel = " + title + "\n| Gründung = " + str(year) + "\n}}"
+            categories = ["Zeitung (Deutschland)", "Medien (" + place + ")"]
+            caption = "Verlagsgebäude in " + place
+        elif category_type == "Organizations":
+            title = self._unique_title(rng.choice(organization_types) + " für " + rng.choice(organization_topics) +
+                                       " " + state, place)
+            lead = "Der '''{}''' ist eine {} in [[{}]] gegründete Organisation.".format(title, year, place)
+            infobox = "{{Infobox Verband\n| Name = " + title + "\n| Gründung = " + str(year) + "\n}}"
+            categories = ["Organisation (" + place + ")", "Gegründet " + str(year)]
+            caption = "Sitz der Geschäftsstelle"
+        elif category_type == "Parks":
+            title = self._unique_title(rng.choice(["Stadtpark", "Schlosspark", "Kurpark", "Volkspark"]) + " " + place,
+                                       str(year))
+            lead = "Der '''{}''' ist eine {} angelegte Parkanlage in [[{}]].".format(title, year, place)
+            infobox = "{{infobox Park\n| Name = " + title + "\n}}"
+            categories = ["Parkanlage in " + state, "Geographie (" + place + ")"]
+            caption = "Blick über den Teich"
+        elif category_type == "Schools":
+            title = self._unique_title(self._name().split()[1] + "-" + rng.choice(school_types) + " " + place,
+                                       str(year))
+            lead = "Das '''{}''' ist eine {} gegründete Schule in [[{}]].".format(title, year, place)
+            infobox = "{{Infobox Schule\n| Name = " + title + "\n| Gründung = " + str(year) + "\n}}"
+            categories = ["Schule in " + state, "Gegründet " + str(year)]
+            caption = "Hauptgebäude"
+        elif category_type == "Ships":
+            title = self._unique_title(rng.choice(first_names) + " (Schiff, " + str(year) + ")", place)
+            lead = "Die '''{}''' war ein {} in [[{}]] gebautes Schiff.".format(title, year, place)
+            infobox = "{{Infobox Schiff\n| Name = " + title.split(" (")[0] + "\n| Bauwerft = " + place + "\n}}"
+            categories = ["Schiff (Deutschland)", "Schiffsverlust " + str(year + rng.randint(5, 60))]
+            caption = "Die " + title.split(" (")[0] + " im Hafen von " + place
+        else:
+            genus, epithet = rng.choice(taxon_genera), rng.choice(taxon_epithets)
+            title = self._unique_title(genus + " " + epithet, str(year))
+            lead = "'''''{}''''' ist eine Art der Gattung ''[[{}]]''.".format(title, genus)
+            infobox = rng.choice(["{{Taxobox", "{{ Taxobox", "{{taxobox"]) + "\n| Taxon_WissName = " + title + \
+                "\n| Taxon_Rang = Art\n}}"
+            categories = [genus, "Art (Biologie)"]
+            caption = "''" + title + "''"
+        return title, lead, infobox, categories, caption
+
+    def pages(self):
+        """
+        generates the pages of the dump
+
+        Returns
+        -------
+        generator of dictionaries with the keys id, title, type ("article"/"disambiguation"), category_type
+        (None for taxa and disambiguation pages), infobox (template or None), lead, sections (list of (heading,
+        paragraph) tuples), caption, image_option, references (bool), linked (titles of a disambiguation page) and
+        categories
+        """
+        rng = self._rng
+        category_types = list(category_weights)
+        weights = list(category_weights.values())
+        recent_titles = []
+        for page_id in range(1, self.num_articles + 1):
+            if recent_titles and rng.random() < self.disambiguation_share:
+                base = recent_titles[-1].split(" (")[0]
+                linked = [base] + [base + " (" + rng.choice(occupations + places) + ")"
+                                   for _ in range(rng.randint(1, 4))]
+                yield {"id": page_id, "title": self._unique_title(base, "Begriffsklärung"), "type": "disambiguation",
+                       "category_type": None, "infobox": None, "lead": "'''" + base + "''' steht für:",
+                       "sections": [], "caption": None, "image_option": None, "references": False, "linked": linked,
+                       "categories": []}
+                continue
+            category_type = "Taxa" if rng.random() < self.taxon_share else rng.choices(category_types, weights)[0]
+            title, lead, infobox, categories, caption = self._entity(category_type)
+            recent_titles = (recent_titles + [title])[-100:]
+            num_paragraphs = max(1, round(rng.lognormvariate(self._mu, self._sigma) / self._paragraph_length))
+            headings = section_headings[category_type]
+            # a heading every second paragraph
+            sections = [(headings[i // 2 % len(headings)] if i % 2 == 0 else None, rng.choice(self._paragraphs))
+                        for i in range(num_paragraphs)]
+            yield {"id": page_id, "title": title, "type": "article",
+                   "category_type": None if category_type == "Taxa" else category_type,
+                   "infobox": infobox if category_type == "Taxa" or rng.random() < self.infobox_share else None,
+                   "lead": lead, "sections": sections, "caption": caption if rng.random() < 0.5 else None,
+                   "image_option": rng.choice(image_options),
+                   "references": rng.random() < 0.6, "linked": [], "categories": categories}
+
+    @staticmethod
+    def wikitext(page: dict):
+        """
+        returns the wikitext of a page, i.e. the content of <text> in the XML export
+        """
+        lines = []
+        if page["infobox"] is not None:
+            lines.append(page["infobox"])
+        if page["caption"] is not None:
+            lines.append("[[Datei:" + page["title"].split(" (")[0] + ".jpg|" + page["image_option"] + "|" +
+                         page["caption"] + "]]")
+        lines.append(page["lead"])
+        for linked_title in page["linked"]:
+            lines.append("* [[" + linked_title + "]]")
+        for heading, paragraph in page["sections"]:
+            if heading is not None:
+                lines.append("\n== " + heading + " ==")
+            lines.append(paragraph)
+        if page["references"] is True:
+            lines.append("\n== Einzelnachweise ==\n<references />")
+        if page["type"] == "disambiguation":
+            lines.append("\n{{Begriffsklärung}}")
+        if page["category_type"] == "Persons":
+            lines.append("\n{{Personendaten\n|NAME=" + page["title"].split(" (")[0] + "\n}}")
+        lines.append("")
+        lines += ["[[Kategorie:" + category + "]]" for category in page["categories"]]
+        return "\n".join(lines)
+
+    @staticmethod
+    def parsed_text(page: dict, header=True):
+        """
+        returns the plain text of a page as written by the parser of the dump: templates removed, links and
+        formatting replaced by their labels, images as "mini" line with the caption, headings and categories as lines
+
+        Parameters
+        ----------
+        page: dict
+            page of pages()
+        header: bool
+            determines whether the "#Article:"/"#Type:" headers and the "Kategorie:" lines are included.
+            The default is True.
+        """
+        lines = ["#Article: " + page["title"]]
+        if header is True:
+            lines.append("#Type: " + page["type"])
+        if page["caption"] is not None:
+            lines.append(page["image_option"])
+            lines.append(link_pattern.sub(r"\1", page["caption"]).replace("''", ""))
+        lines.append(link_pattern.sub(r"\1", page["lead"]).replace("'''", "").replace("''", ""))
+        lines += [" " + linked_title for linked_title in page["linked"]]
+        for heading, paragraph in page["sections"]:
+            if heading is not None:
+                lines.append(heading)
+            lines.append(link_pattern.sub(r"\1", paragraph).replace("''", ""))
+        if page["references"] is True:
+            lines.append("Einzelnachweise")
+        if header is True:
+            lines += ["Kategorie:" + category for category in page["categories"]]
+        return "\n".join(lines)
+
+    def write(self, directory: str, files=("xml", "parsed", "split", "csv"), xml_filename="SyntheticWiki.xml",
+              parsed_filename="ParsedWikiXMLFile.txt", split_filename="FullWikiTXTsplit.txt"):
+        """
+        writes the dump in one pass to a directory
+
+        Parameters
+        ----------
+        directory: str
+            output directory
+        files: tuple
+            files that will be written: "xml", "parsed", "split", "csv" (category CSV files in AllArticles/) and
+            "category_texts" (the *WikiTXT files of the tail entities in PersonsWikiTXT/ and OtherWikiTXT/, in the
+            format of get_wiki_texts). The default writes all but the category texts.
+        xml_filename: str
+            name of the XML file
+        parsed_filename: str
+            name of the parsed text file
+        split_filename: str
+            name of the split text file
+
+        Returns
+        -------
+        dump_info: dict
+            number of pages, articles, disambiguation pages, infobox articles and tail entities per category, and the
+            size of every written file in MB
+        """
+        valid_files = ["xml", "parsed", "split", "csv", "category_texts"]
+        if any(file not in valid_files for file in files):
+            raise ValueError("Incorrect files input: must be a subset of " + str(valid_files))
+        os.makedirs(directory, exist_ok=True)
+        handles = {}
+        if "xml" in files:
+            handles["xml"] = open(os.path.join(directory, xml_filename), "w", encoding="utf-8")
+            handles["xml"].write('<mediawiki xmlns="http://www.mediawiki.org/xml/export-0.10/" version="0.10" '
+                                 'xml:lang="de">\n  <siteinfo>\n    <sitename>Wikipedia</sitename>\n    '
+                                 '<dbname>dewiki</dbname>\n  </siteinfo>\n')
+        if "parsed" in files:
+            handles["parsed"] = open(os.path.join(directory, parsed_filename), "w", encoding="utf-8")
+        if "split" in files:
+            handles["split"] = open(os.path.join(directory, split_filename), "w", encoding="utf-8")
+        csv_writers = {}
+        if "csv" in files:
+            os.makedirs(os.path.join(directory, "AllArticles/OtherDetailed"), exist_ok=True)
+            for category_type in wiki_categories:
+                csv_path = ("AllArticles/Persons.csv" if category_type == "Persons" else
+                            "AllArticles/OtherDetailed/" + category_type + ".csv")
+                handles[category_type + ".csv"] = open(os.path.join(directory, csv_path), "w", encoding="utf-8-sig",
+                                                       newline="")
+                csv_writers[category_type] = csv.writer(handles[category_type + ".csv"])
+                csv_writers[category_type].writerow(["Title", "Categories"] if category_type == "Persons" else
+                                                    ["Title"])
+        text_files = {}
+        if "category_texts" in files:
+            for category_type in wiki_categories:
+                text_path = ("PersonsWikiTXT/PersonsFullWikiTXT.txt" if category_type == "Persons" else
+                             "OtherWikiTXT/" + category_type + "WikiTXT/" + category_type + "WikiTXT.txt")
+                os.makedirs(os.path.dirname(os.path.join(directory, text_path)), exist_ok=True)
+                handles[text_path] = open(os.path.join(directory, text_path), "w", encoding="utf-8")
+                text_files[category_type] = [handles[text_path], True]
+        dump_info = {"pages": 0, "articles": 0, "disambiguation_pages": 0, "infobox_articles": 0,
+                     "tail_entities": {category_type: 0 for category_type in wiki_categories}}
+        for page in self.pages():
+            dump_info["pages"] += 1
+            dump_info["articles" if page["type"] == "article" else "disambiguation_pages"] += 1
+            if page["infobox"] is not None:
+                dump_info["infobox_articles"] += 1
+            if "xml" in files:
+                text = self.wikitext(page)
+                handles["xml"].write("  <page>\n    <title>" + escape(page["title"]) + "</title>\n    <ns>0</ns>\n"
+                                     "    <id>" + str(page["id"]) + "</id>\n    <revision>\n      <id>" +
+                                     str(page["id"] + 10 ** 8) + "</id>\n      <model>wikitext</model>\n"
+                                     "      <format>text/x-wiki</format>\n      <text bytes=\"" +
+                                     str(len(text.encode("utf-8"))) + "\" xml:space=\"preserve\">" + escape(text) +
+                                     "</text>\n    </revision>\n  </page>\n")
+            if "parsed" in files:
+                if dump_info["pages"] > 1:
+                    handles["parsed"].write("\n\n\n")
+                handles["parsed"].write(self.parsed_text(page))
+            article_tuple = None
+            if "split" in files or ("category_texts" in files and page["category_type"] is not None):
+                article_tuple = str((page["title"], self.parsed_text(page, header=False)))
+            if "split" in files:
+                if dump_info["pages"] > 1:
+                    handles["split"].write("\n")
+                handles["split"].write(article_tuple)
+            # the tail entities of the categories are the articles without infobox
+            if page["category_type"] is None or page["infobox"] is not None:
+                continue
+            dump_info["tail_entities"][page["category_type"]] += 1
+            if "csv" in files:
+                csv_writers[page["category_type"]].writerow([page["title"], str(page["categories"])]
+                                                            if page["category_type"] == "Persons"
+                                                            else [page["title"]])
+            if "category_texts" in files:
+                text_file = text_files[page["category_type"]]
+                if text_file[1] is False:
+                    text_file[0].write("\n")
+                text_file[0].write(article_tuple)
+                text_file[1] = False
+        if "xml" in files:
+            handles["xml"].write("</mediawiki>\n")
+        for handle in handles.values():
+            handle.close()
+        for file, filename in [("xml", xml_filename), ("parsed", parsed_filename), ("split", split_filename)]:
+            if file in files:
+                dump_info[filename] = round(os.path.getsize(os.path.join(directory, filename)) / 2 ** 20, 1)
+        return dump_info
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="synthetic German Wikipedia dump")
+    parser.add_argument("--articles", type=int, required=True, help="number of pages")
+    parser.add_argument("--output", required=True, help="output directory")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--mean-characters", type=int, default=3500)
+    parser.add_argument("--files", nargs="+", default=["xml", "parsed", "split", "csv"],
+                        choices=["xml", "parsed", "split", "csv", "category_texts"])
+    arguments = parser.parse_args()
+    print(SyntheticWikiDump(arguments.articles, arguments.seed, arguments.mean_characters).write(
+        arguments.output, tuple(arguments.files)))
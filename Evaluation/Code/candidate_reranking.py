@@ -0,0 +1,144 @@
+"""
+This Python file re-ranks and thresholds the candidate answers stored by TripleExtractor.dict_list2columnar for triples
+extracted with top_k, without running the QA model again:
+
+    * rerank_candidates picks the best candidate per (entity, predicate) that passes an optional candidate filter
+    * with a null margin, the model abstains (empty answer with score 0.0) if the null score exceeds the score of the
+      best candidate by more than the margin
+    * null_margin_sweep evaluates several null margins against the gold standard with the thresholded metrics, s.t.
+      abstentions don't count as false positives
+"""
+
+import pandas as pd
+from TripleExtraction.Code.triple_store import read_results
+from evaluate_answers import load_json_dicts, get_avg_metric_score
+from thresholded_answer_evaluation import entity_score_system_gold_tuple_lists, threshold_entity_precision, \
+    threshold_entity_recall, threshold_entity_f1_score, threshold_exact_match
+
+
+def load_candidates(filename: str, filters=None):
+    """
+    loads a candidate file (.parquet, .arrow or .feather) written by dict_list2columnar
+
+    Parameters
+    ----------
+    filename: str
+        full path of the candidate file
+    filters: None/list
+        row filters in the pyarrow format, e.g. [("rank", "<", 3)]. The default None loads all candidates.
+
+    Returns
+    -------
+    candidate_frame: pd.DataFrame
+        DataFrame with the candidate_columns of triple_store
+    """
+    return read_results(filename, filters=filters)
+
+
+def rerank_candidates(candidate_frame: pd.DataFrame, null_margin=None, candidate_filter=None):
+    """
+    selects one answer per (entity, predicate) from the candidates
+
+    Parameters
+    ----------
+    candidate_frame: pd.DataFrame
+        DataFrame with the candidate_columns of triple_store
+    null_margin: None/float
+        if set, the answer is empty with score 0.0 (abstention) if null_score - score of the selected candidate is
+        higher than null_margin. The default None never abstains.
+    candidate_filter: None/function
+        function which gets a candidate row and returns whether the candidate can be selected, e.g.
+        lambda row: len(row.answer.split()) <= 5. If no candidate passes, the model abstains. The default None keeps
+        all candidates, i.e. the best candidate is the answer of extract_triples.
+
+    Returns
+    -------
+    answer_frame: pd.DataFrame
+        DataFrame with the columns entity, predicate, answer, score, null_score and abstained, one row per
+        (entity, predicate) in the order of the extraction
+    """
+    candidate_frame = candidate_frame.sort_values(["rank"], kind="stable")
+    if candidate_filter is not None:
+        passed = [candidate_filter(row) for row in candidate_frame.itertuples(index=False)]
+        candidate_frame = candidate_frame.assign(passed=passed)
+    else:
+        candidate_frame = candidate_frame.assign(passed=True)
+    keys = ["entity", "predicate"]
+    # all (entity, predicate) pairs in the order of the extraction, even if none of their candidates passed
+    pairs = candidate_frame.sort_index()[keys + ["null_score"]].drop_duplicates(keys).astype({"entity": object,
+                                                                                               "predicate": object})
+    selected = candidate_frame[candidate_frame["passed"]].drop_duplicates(keys)[keys + ["answer", "score"]]
+    selected = selected.astype({"entity": object, "predicate": object, "answer": object})
+    answer_frame = pairs.merge(selected, on=keys, how="left")
+    answer_frame["abstained"] = answer_frame["answer"].isna()
+    if null_margin is not None:
+        answer_frame["abstained"] |= answer_frame["null_score"] - answer_frame["score"] > null_margin
+    answer_frame.loc[answer_frame["abstained"], "answer"] = ""
+    answer_frame.loc[answer_frame["abstained"], "score"] = 0.0
+    return answer_frame[["entity", "predicate", "answer", "score", "null_score", "abstained"]]
+
+
+def answers_to_result_dicts(answer_frame: pd.DataFrame):
+    """
+    converts the output of rerank_candidates to the format of the .json result files, i.e. a list with one
+    {entity: {predicate: {"answer", "score"}}} dictionary per entity
+    """
+    result_dicts = {}
+    for entity, predicate, answer, score in answer_frame[["entity", "predicate", "answer", "score"]].itertuples(
+            index=False, name=None):
+        result_dicts.setdefault(entity, {})[predicate] = {"answer": answer, "score": score}
+    return [{entity: predicate_dict} for entity, predicate_dict in result_dicts.items()]
+
+
+def null_margin_sweep(candidate_frame: pd.DataFrame, entity_position: str, null_margins: list, threshold=0.01,
+                      candidate_filter=None, gold_dict_list=None,
+                      file_path="C:/Users/ubmen/Desktop/BA_Prog/Evaluation/"):
+    """
+    evaluates the re-ranked candidates of the gold standard entities for several null margins
+
+    Parameters
+    ----------
+    candidate_frame: pd.DataFrame
+        DataFrame with the candidate_columns of triple_store
+    entity_position: str
+        position of the entity, i.e. either "SP" or "OP"
+    null_margins: list
+        null margins that will be evaluated, None evaluates the answers without abstention
+    threshold: float
+        score threshold of the thresholded metrics, must be higher than 0.0 s.t. abstentions are skipped. The default
+        is 0.01.
+    candidate_filter: None/function
+        see rerank_candidates
+    gold_dict_list: None/list
+        gold standard dictionaries. The default None loads them with load_json_dicts.
+    file_path: str
+        path of the Evaluation directory for load_json_dicts
+
+    Returns
+    -------
+    sweep_df: pd.DataFrame
+        DataFrame with the columns Null Margin, Abstentions, Precision, Recall, F1 and EM (averages over the entities)
+    """
+    if gold_dict_list is None:
+        gold_dict_list = load_json_dicts("gold", entity_position, file_path=file_path)
+    candidate_entities = set(candidate_frame["entity"].unique())
+    gold_entities = sorted(set(key for d in gold_dict_list for key in d) & candidate_entities)
+    if not gold_entities:
+        raise ValueError("The candidates contain no entities of the gold standard")
+    candidate_frame = candidate_frame[candidate_frame["entity"].isin(gold_entities)]
+    metric_functions = [("precision", "Precision", threshold_entity_precision),
+                        ("recall", "Recall", threshold_entity_recall),
+                        ("f1", "F1", threshold_entity_f1_score),
+                        ("exact match", "EM", threshold_exact_match)]
+    rows = []
+    for null_margin in null_margins:
+        answer_frame = rerank_candidates(candidate_frame, null_margin=null_margin, candidate_filter=candidate_filter)
+        system_result_list = answers_to_result_dicts(answer_frame)
+        joint_lists = [entity_score_system_gold_tuple_lists(ent, system_result_list, gold_dict_list)
+                       for ent in gold_entities]
+        row = {"Null Margin": null_margin, "Abstentions": int(answer_frame["abstained"].sum())}
+        for metric_type, column, metric_function in metric_functions:
+            row[column] = get_avg_metric_score(metric_type, [metric_function(ent[0], ent[1], threshold)
+                                                             for ent in joint_lists])
+        rows.append(row)
+    return pd.DataFrame(rows)
@@ -0,0 +1,126 @@
+"""
+This Python file measures the confidence-gated early termination of the triple extraction (aggregation "early_stop" of
+WindowSettings, see qa_pipeline.py) against the gold standard:
+
+    * fit_score_bound fits a ScoreBound on the window scores of a sample of entities, the sample shouldn't contain the
+      entities of the gold standard
+    * early_termination_sweep extracts the triples of the gold standard entities once with all windows (the baseline)
+      and once per early-stop setting, and reports the forwarded and the skipped windows (the work saved), the seconds,
+      the answers which differ from the baseline and the metrics of evaluate_answers.py
+"""
+
+import time
+import pandas as pd
+from TripleExtraction.Code.qa_pipeline import WindowSettings, ScoreBound
+from TripleExtraction.Code.triple_store import window_counts_to_frame
+from evaluate_answers import load_json_dicts, entity_joint_system_gold_lists
+from metric_kernel import MetricKernel
+
+
+def fit_score_bound(entity_context_tuples: list, question_matrix, sample_size=20, bins=10, margin=0.05,
+                    max_seq_len=384, doc_stride=128, nlp=None):
+    """
+    fits a ScoreBound on the windows of the questions of the first sample_size entities
+
+    Parameters
+    ----------
+    entity_context_tuples: list
+        List of (entity, Wikipedia text) tuples
+    question_matrix: QuestionMatrix
+        questions and predicates of the question type
+    sample_size: int
+        number of entities. The default is 20.
+    bins: int
+        see ScoreBound. The default is 10.
+    margin: float
+        see ScoreBound. The default is 0.05.
+    max_seq_len: int
+        window size of the extraction. The default is 384.
+    doc_stride: int
+        overlap of the windows of the extraction. The default is 128.
+    nlp: None/CandidateQuestionAnsweringPipeline
+        QA pipeline. The default None uses the pipeline of triple_extractor_cluster.py.
+
+    Returns
+    -------
+    score_bound: ScoreBound
+    """
+    if nlp is None:
+        from TripleExtraction.Code.triple_extractor_cluster import nlp
+    q_dicts = [{'question': q, "context": context} for entity, context in entity_context_tuples[:sample_size]
+               for q in question_matrix.questions(entity)]
+    relevances, scores = nlp.window_scores(q_dicts, max_seq_len=max_seq_len, doc_stride=doc_stride)
+    return ScoreBound(bins, margin).fit(relevances, scores)
+
+
+def early_termination_sweep(entity_context_tuples: list, question_matrix, entity_position: str,
+                            window_settings_list: list, baseline_settings=None, gold_dict_list=None,
+                            file_path="C:/Users/ubmen/Desktop/BA_Prog/Evaluation/", extract_function=None, **kwargs):
+    """
+    evaluates early-stop settings on the gold standard entities against the extraction with all windows
+
+    Parameters
+    ----------
+    entity_context_tuples: list
+        List of (entity, Wikipedia text) tuples, only entities of the gold standard are extracted
+    question_matrix: QuestionMatrix
+        questions and predicates of the question type
+    entity_position: str
+        position of the entity, i.e. either "SP" or "OP"
+    window_settings_list: list
+        list of WindowSettings with aggregation "early_stop"
+    baseline_settings: None/WindowSettings
+        settings of the baseline. The default None uses WindowSettings(), i.e. all windows with the defaults of
+        transformers.
+    gold_dict_list: None/list
+        gold standard dictionaries. The default None loads them with load_json_dicts.
+    file_path: str
+        path of the Evaluation directory for load_json_dicts
+    extract_function: None/function
+        extraction function with the parameter window_settings. The default None uses
+        TripleExtractor.extract_triples_batched of triple_extractor_cluster.py.
+    kwargs:
+        further parameters of the extraction function, e.g. max_tokens
+
+    Returns
+    -------
+    sweep_df: pd.DataFrame
+        DataFrame with one row for the baseline and one per settings and the columns Settings, Windows, Scored Windows,
+        Saved %, Seconds, Changed Answers, Precision, Recall, F1, EM and F1 Change
+    """
+    if extract_function is None:
+        from TripleExtraction.Code.triple_extractor_cluster import TripleExtractor
+        extract_function = TripleExtractor.extract_triples_batched
+    if gold_dict_list is None:
+        gold_dict_list = load_json_dicts("gold", entity_position, file_path=file_path)
+    gold_entities = set(key for d in gold_dict_list for key in d)
+    gold_tuples = [tup for tup in entity_context_tuples if tup[0] in gold_entities]
+    if not gold_tuples:
+        raise ValueError("The entities contain no entities of the gold standard")
+    baseline_settings = WindowSettings() if baseline_settings is None else baseline_settings
+    rows = []
+    baseline_answers = None
+    for window_settings in [baseline_settings] + list(window_settings_list):
+        start_time = time.time()
+        system_result_list = extract_function(gold_tuples, question_matrix, window_settings=window_settings, **kwargs)
+        seconds = time.time() - start_time
+        answers = [result["answer"] for d in system_result_list for predicate_dict in d.values()
+                   for result in predicate_dict.values()]
+        baseline_answers = answers if baseline_answers is None else baseline_answers
+        window_df = window_counts_to_frame(system_result_list)
+        kernel = MetricKernel([entity_joint_system_gold_lists(entity, system_result_list, gold_dict_list)
+                               for entity, _ in gold_tuples])
+        windows = int(window_df["total_windows"].sum())
+        scored_windows = int(window_df["scored_windows"].sum())
+        row = {"Settings": repr(window_settings), "Windows": windows, "Scored Windows": scored_windows,
+               "Saved %": round((windows - scored_windows) / windows * 100, 1) if windows else 0.0,
+               "Seconds": round(seconds, 1),
+               "Changed Answers": sum(answer != baseline_answer for answer, baseline_answer
+                                      in zip(answers, baseline_answers)),
+               "Precision": kernel.macro_average("precision"), "Recall": kernel.macro_average("recall"),
+               "F1": kernel.macro_average("f1"), "EM": kernel.macro_average("exact match")}
+        row["F1 Change"] = round(row["F1"] - (rows[0]["F1"] if rows else row["F1"]), 1)
+        print(f"{row['Settings']}: {scored_windows} of {windows} windows forwarded ({row['Saved %']}% saved), "
+              f"{row['Changed Answers']} changed answers, F1 {row['F1']} ({row['F1 Change']:+})")
+        rows.append(row)
+    return pd.DataFrame(rows)
@@ -5,10 +5,10 @@ import os
 import matplotlib.pyplot as plt
 
 
-def load_json_dict(entity_type: str, question_type: str, entity_position: str, file_path="C:/Users/ubmen/Desktop/"
-                                                                                         "BA_Prog/TripleExtraction/Results/"):
+def result_json_file(entity_type: str, question_type: str, entity_position: str,
+                     file_path="C:/Users/ubmen/Desktop/BA_Prog/TripleExtraction/Results/"):
     """
-    Loads dictionaries from the resulting .json files
+    Builds the full filename of the .json result file of an entity type
 
     Parameters
     ----------
@@ -24,11 +24,9 @@ def load_json_dict(entity_type: str, question_type: str, entity_position: str, f
 
     Returns
     -------
-    json_dict_list: list
-        list of dictionaries from the .json result file
-
+    json_file: str
+        full filename of the .json result file
     """
-    global json_filename
     valid_question_types = ["AG", "BL", "NL"]
     if question_type not in valid_question_types:
         raise ValueError("Incorrect input for question type!")
@@ -44,8 +42,37 @@ def load_json_dict(entity_type: str, question_type: str, entity_position: str, f
     elif entity_type == "Person":
         file_path += "PersonsResults/PersonsResultsQuestions" + question_type + "/"
         json_filename = "PersonsResults" + entity_position + "withQuestions" + question_type + "full.json"
+    else:
+        raise ValueError("Incorrect input for entity type!")
+    return os.path.join(file_path, json_filename)
+
+
+def load_json_dict(entity_type: str, question_type: str, entity_position: str, file_path="C:/Users/ubmen/Desktop/"
+                                                                                         "BA_Prog/TripleExtraction/Results/"):
+    """
+    Loads dictionaries from the resulting .json files
+
+    Parameters
+    ----------
+    entity_type: str
+        Name/Type of the entity for which results will be loaded
+    question_type: str
+        Type of the question for which the results will be loaded
+    entity_position: str
+        position of the entity for which results will be loaded
+    file_path: str
+        filepath from where the results will be extracted.
+        The default is: "C:/Users/ubmen/Desktop/BA_Prog/TripleExtraction/Results/"
+
+    Returns
+    -------
+    json_dict_list: list
+        list of dictionaries from the .json result file
+
+    """
     json_dict_list = []
-    for line in open(os.path.join(file_path, json_filename), encoding="utf-8-sig"):
+    for line in open(result_json_file(entity_type, question_type, entity_position, file_path=file_path),
+                     encoding="utf-8-sig"):
         json_dict_list.append(json.loads(line))
     return json_dict_list
 
@@ -146,110 +173,216 @@ def list_to_dataframe(question_type: str, entity_position: str):
     return entity_df
 
 
-if __name__ == "__main__":
+all_entities = ["Person"] + other_entities
+formal_question_types = {"BL": "Baseline", "AG": "Translation-Based", "NL": "Human-Generated"}
+result_frame_columns = ["entity", "predicate", "answer", "score", "category", "qtype", "position"]
+
+
+def load_result_frame(entity_types=None, question_types=None, entity_positions=None, skip_missing=False,
+                      file_path="C:/Users/ubmen/Desktop/BA_Prog/TripleExtraction/Results/"):
+    """
+    Reads the .json result files directly into one columnar dataframe, with one row per (entity, predicate) answer.
+    Every file is read exactly once and no intermediate nested lists are built.
+
+    Parameters
+    ----------
+    entity_types: None/list
+        Entity types/categories which will be loaded. The default None loads "Person" and all "Other" categories.
+    question_types: None/list
+        Question types which will be loaded. The default None loads "BL", "AG", "NL".
+    entity_positions: None/list
+        Entity positions which will be loaded. The default None loads "SP" and "OP".
+    skip_missing: bool
+        determines whether missing result files will be skipped (True) or raise an error (False).
+        The default is False.
+    file_path: str
+        filepath from where the results will be extracted.
+        The default is: "C:/Users/ubmen/Desktop/BA_Prog/TripleExtraction/Results/"
+
+    Returns
+    -------
+    result_frame: pd.DataFrame
+        dataframe with the columns entity, predicate, answer, score, category, qtype and position, where all string
+        columns except answer are categoricals
+    """
+    entity_types = all_entities if entity_types is None else entity_types
+    question_types = ["BL", "AG", "NL"] if question_types is None else question_types
+    entity_positions = ["SP", "OP"] if entity_positions is None else entity_positions
+    columns = {column: [] for column in result_frame_columns}
+    for entity_type in entity_types:
+        for question_type in question_types:
+            for entity_position in entity_positions:
+                json_file = result_json_file(entity_type, question_type, entity_position, file_path=file_path)
+                if skip_missing is True and not os.path.isfile(json_file):
+                    continue
+                with open(json_file, encoding="utf-8-sig") as f:
+                    for line in f:
+                        for entity, predicate_dict in json.loads(line).items():
+                            num_predicates = len(predicate_dict)
+                            columns["entity"].extend([entity] * num_predicates)
+                            columns["predicate"].extend(predicate_dict.keys())
+                            columns["answer"].extend(res["answer"] for res in predicate_dict.values())
+                            columns["score"].extend(res["score"] for res in predicate_dict.values())
+                            columns["category"].extend([entity_type] * num_predicates)
+                            columns["qtype"].extend([question_type] * num_predicates)
+                            columns["position"].extend([entity_position] * num_predicates)
+    result_frame = pd.DataFrame(columns)
+    result_frame["score"] = result_frame["score"].astype("float64")
+    for column in ["entity", "predicate", "category", "qtype", "position"]:
+        result_frame[column] = result_frame[column].astype("category")
+    return result_frame
+
+
+def save_result_frame(result_frame: pd.DataFrame, filename="AllResults.parquet",
+                      path="C:/Users/ubmen/Desktop/BA_Prog/Evaluation/CSVFiles"):
+    """
+    Stores a result dataframe as Parquet file, s.t. the plots can be regenerated without parsing the .json files again.
+    Requires pyarrow or fastparquet.
+
+    Parameters
+    ----------
+    result_frame: pd.DataFrame
+        dataframe as returned by load_result_frame
+    filename: str
+        name of the Parquet file. The default is "AllResults.parquet"
+    path: str
+        path where the file will be stored
 
-    # Results for "Other" SP
-    bl_sp_dataframe = list_to_dataframe("BL", "SP")
-    ag_sp_dataframe = list_to_dataframe("AG", "SP")
-    nl_sp_dataframe = list_to_dataframe("NL", "SP")
-    sp_frames_other = [bl_sp_dataframe, ag_sp_dataframe, nl_sp_dataframe]
-    sp_final_frame_other = pd.concat(sp_frames_other)
+    Returns
+    -------
+    None
+    """
+    result_frame.to_parquet(os.path.join(path, filename), index=False)
+
+
+def load_result_parquet(filename="AllResults.parquet", path="C:/Users/ubmen/Desktop/BA_Prog/Evaluation/CSVFiles"):
+    """
+    Loads a result dataframe stored with save_result_frame
+
+    Parameters
+    ----------
+    filename: str
+        name of the Parquet file. The default is "AllResults.parquet"
+    path: str
+        path where the file is stored
+
+    Returns
+    -------
+    result_frame: pd.DataFrame
+        dataframe with the columns of load_result_frame
+    """
+    return pd.read_parquet(os.path.join(path, filename))
+
+
+def score_summary(result_frame: pd.DataFrame, by=("position", "category", "qtype")):
+    """
+    computes the summary statistics (count, mean, std, min, quartiles, max) of the confidence scores per group
+
+    Parameters
+    ----------
+    result_frame: pd.DataFrame
+        dataframe as returned by load_result_frame
+    by: tuple
+        columns by which the scores will be grouped. The default is ("position", "category", "qtype").
+
+    Returns
+    -------
+    summary_df: pd.DataFrame
+        dataframe with one row per group and the statistics as columns
+    """
+    return result_frame.groupby(list(by), observed=True)["score"].describe()
+
+
+def score_frame(result_frame: pd.DataFrame, entity_position: str, entity_types=None):
+    """
+    selects the scores of one entity position in the layout of the csv files of this stage, i.e. with the columns
+    "Score", "Question Type" (Baseline, Translation-Based, Human-Generated) and "Category"
+
+    Parameters
+    ----------
+    result_frame: pd.DataFrame
+        dataframe as returned by load_result_frame
+    entity_position: str
+        position of the entity, can either be "SP", "OP"
+    entity_types: None/list
+        categories which will be selected. The default None selects all categories in the frame.
+
+    Returns
+    -------
+    entity_df: pd.DataFrame
+        dataframe containing score, question type and entity category
+    """
+    selection = result_frame["position"] == entity_position
+    if entity_types is not None:
+        selection &= result_frame["category"].isin(entity_types)
+    entity_df = result_frame.loc[selection, ["score", "qtype", "category"]]
+    entity_df = pd.DataFrame({"Score": entity_df["score"].to_numpy(),
+                              "Question Type": entity_df["qtype"].astype(str).map(formal_question_types).to_numpy(),
+                              "Category": entity_df["category"].astype(str).to_numpy()})
+    return entity_df
+
+
+def plot_score_boxplot(entity_df: pd.DataFrame, plot_title: str, legend_loc="lower left", rotate_labels=True,
+                       save_file=None):
+    """
+    plots the scores of a dataframe as returned by score_frame as seaborn boxplot, grouped by category and question type
+
+    Parameters
+    ----------
+    entity_df: pd.DataFrame
+        dataframe with the columns "Score", "Question Type" and "Category"
+    plot_title: str
+        title of the plot
+    legend_loc: str
+        location of the legend. The default is "lower left"
+    rotate_labels: bool
+        determines whether the category labels will be rotated. The default is True.
+    save_file: None/str
+        if a filename (full path) is passed, the plot will be saved to that file and closed instead of being shown.
+        The default is None.
+
+    Returns
+    -------
+    None
+    """
+    ax = sns.boxplot(x="Category", y="Score", hue="Question Type", data=entity_df,
+                     hue_order=[qt for qt in formal_question_types.values()
+                                if qt in set(entity_df["Question Type"])])
+    ax.set_title(plot_title)
+    plt.legend(loc=legend_loc)
+    if rotate_labels is True:
+        plt.xticks(rotation=20)
+    if save_file is not None:
+        plt.savefig(save_file)
+        plt.close()
+    else:
+        plt.show()
+
+
+if __name__ == "__main__":
+    # load all results once, store them as Parquet and derive all csv files and plots from the frame
+    all_results_frame = load_result_frame()
     csv_output_path = "C:/Users/ubmen/Desktop/BA_Prog/Evaluation/CSVFiles"
-    csv_filename = "OtherResultsSP.csv"
-    sp_final_frame_other.to_csv(os.path.join(csv_output_path, csv_filename), encoding="utf-8-sig", index=False)
-    sp_csv = pd.read_csv("C:/Users/ubmen/Desktop/BA_Prog/Evaluation/CSVFiles/OtherResultsSP.csv")
-    ax1 = sns.boxplot(x=sp_csv["Category"], y=sp_csv["Score"], hue=sp_csv["Question Type"])
-    ax1.set_title('Subject position scores "Other" based on question type: (e, r, ?)')
-    plt.xticks(rotation=20)
-    plt.legend(loc='lower right')
-    plt.show()
-
-    # Confidence Scores for "Other" OP
-    bl_op_dataframe = list_to_dataframe("BL", "OP")
-    ag_op_dataframe = list_to_dataframe("AG", "OP")
-    nl_op_dataframe = list_to_dataframe("NL", "OP")
-    op_frames_other = [bl_op_dataframe, ag_op_dataframe, nl_op_dataframe]
-    op_final_frame_other = pd.concat(op_frames_other)
-    csv_output_path_op = "C:/Users/ubmen/Desktop/BA_Prog/Evaluation/CSVFiles"
-    csv_filename_op = "OtherResultsOP.csv"
-    op_final_frame_other.to_csv(os.path.join(csv_output_path_op, csv_filename_op), encoding="utf-8-sig", index=False)
-    ax2 = sns.boxplot(x="Category", y="Score", hue="Question Type", data=op_final_frame_other)
-    ax2.set_title('Object position scores "Other" based on question type: (?, r, e)')
-    plt.xticks(rotation=20)
-    plt.legend(loc='lower right')
-    plt.show()
-
-    persons_bl_sp_json = load_json_dict("Person", "BL", "SP")
-    persons_ag_sp_json = load_json_dict("Person", "AG", "SP")
-    persons_nl_sp_json = load_json_dict("Person", "NL", "SP")
-
-    # noinspection PyTypeChecker
-    persons_bl_sp_list = dict_to_list(persons_bl_sp_json, "Baseline", "Person")
-    # noinspection PyTypeChecker
-    persons_ag_sp_list = dict_to_list(persons_ag_sp_json, "Translation-Based", "Person")
-    # noinspection PyTypeChecker
-    persons_nl_sp_list = dict_to_list(persons_nl_sp_json, "Human-Generated", "Person")
-
-    # Confidence Scores "Persons" SP
-    entity_df_bl_sp = pd.DataFrame(persons_bl_sp_list, columns=["Score", "Question Type", "Category"])
-    entity_df_ag_sp = pd.DataFrame(persons_ag_sp_list, columns=["Score", "Question Type", "Category"])
-    entity_df_nl_sp = pd.DataFrame(persons_nl_sp_list, columns=["Score", "Question Type", "Category"])
-    persons_sp_frames = [entity_df_bl_sp, entity_df_ag_sp, entity_df_nl_sp]
-    persons_sp_final_frame = pd.concat(persons_sp_frames)
-    persons_csv_path = "C:/Users/ubmen/Desktop/BA_Prog/Evaluation/CSVFiles"
-    persons_csv_filename = "PersonsResultsSP.csv"
-    persons_sp_final_frame.to_csv(os.path.join(persons_csv_path, persons_csv_filename), encoding="utf-8-sig", index=False)
-    ax3 = sns.boxplot(x="Category", y="Score", hue="Question Type", data=persons_sp_final_frame)
-    ax3.set_title('Subject position scores "Person" based on question type: (e, r, ?)')
-    plt.legend(loc='upper right')
-    plt.show()
-
-    # same for Object Position
-    persons_bl_op_json = load_json_dict("Person", "BL", "OP")
-    persons_ag_op_json = load_json_dict("Person", "AG", "OP")
-    persons_nl_op_json = load_json_dict("Person", "NL", "OP")
-
-    # noinspection PyTypeChecker
-    persons_bl_op_list = dict_to_list(persons_bl_op_json, "Baseline", "Person")
-    # noinspection PyTypeChecker
-    persons_ag_op_list = dict_to_list(persons_ag_op_json, "Translation-Based", "Person")
-    # noinspection PyTypeChecker
-    persons_nl_op_list = dict_to_list(persons_nl_op_json, "Human-Generated", "Person")
-
-    # Confidence Scores "Persons" OP
-    entity_df_bl_op = pd.DataFrame(persons_bl_op_list, columns=["Score", "Question Type", "Category"])
-    entity_df_ag_op = pd.DataFrame(persons_ag_op_list, columns=["Score", "Question Type", "Category"])
-    entity_df_nl_op = pd.DataFrame(persons_nl_op_list, columns=["Score", "Question Type", "Category"])
-    persons_op_frames = [entity_df_bl_op, entity_df_ag_op, entity_df_nl_op]
-    persons_op_final_frame = pd.concat(persons_op_frames)
-    persons_csv_path = "C:/Users/ubmen/Desktop/BA_Prog/Evaluation/CSVFiles"
-    persons_csv_filename_op = "PersonsResultsOP.csv"
-    persons_op_final_frame.to_csv(os.path.join(persons_csv_path, persons_csv_filename_op), encoding="utf-8-sig", index=False)
-    ax4 = sns.boxplot(x="Category", y="Score", hue="Question Type", data=persons_op_final_frame)
-    ax4.set_title('Object position scores "Person" based on question type: (?, r, e)')
-    plt.legend(loc='upper right')
-    plt.show()
-
-    # finally, plot everything to one plot for all categories
-    sp_full_frame_list = [sp_final_frame_other, persons_sp_final_frame]
-    sp_full_frame = pd.concat(sp_full_frame_list)
-    csv_outputpath = "C:/Users/ubmen/Desktop/BA_Prog/Evaluation/CSVFiles"
-    sp_csv_full_filename = "AllResultsSP.csv"
-    sp_full_frame.to_csv(os.path.join(csv_outputpath, sp_csv_full_filename), encoding="utf-8-sig", index=False)
-    ax5 = sns.boxplot(x="Category", y="Score", hue="Question Type", data=sp_full_frame)
-    ax5.set_title("Subject position scores based on question type: (e, r, ?)")
-    plt.legend(loc="lower left")
-    plt.xticks(rotation=20)
-    plt.show()
-
-    # same for object position
-    op_full_frame_list = [op_final_frame_other, persons_op_final_frame]
-    op_full_frame = pd.concat(op_full_frame_list)
-    csv_outputpath = "C:/Users/ubmen/Desktop/BA_Prog/Evaluation/CSVFiles"
-    op_csv_full_filename = "AllResultsOP.csv"
-    op_full_frame.to_csv(os.path.join(csv_outputpath, op_csv_full_filename), encoding="utf-8-sig", index=False)
-    ax6 = sns.boxplot(x="Category", y="Score", hue="Question Type", data=op_full_frame)
-    ax6.set_title("Object position scores based on question type: (?, r, e)")
-    plt.legend(loc="lower left")
-    plt.xticks(rotation=20)
-    plt.show()
+    save_result_frame(all_results_frame, path=csv_output_path)
+    print(score_summary(all_results_frame))
+
+    for position, position_title in [("SP", "Subject position scores {} based on question type: (e, r, ?)"),
+                                     ("OP", "Object position scores {} based on question type: (?, r, e)")]:
+        # Confidence Scores for "Other"
+        other_frame = score_frame(all_results_frame, position, other_entities)
+        other_frame.to_csv(os.path.join(csv_output_path, "OtherResults" + position + ".csv"), encoding="utf-8-sig",
+                           index=False)
+        plot_score_boxplot(other_frame, position_title.format('"Other"'), legend_loc="lower right")
+
+        # Confidence Scores for "Person"
+        persons_frame = score_frame(all_results_frame, position, ["Person"])
+        persons_frame.to_csv(os.path.join(csv_output_path, "PersonsResults" + position + ".csv"),
+                             encoding="utf-8-sig", index=False)
+        plot_score_boxplot(persons_frame, position_title.format('"Person"'), legend_loc="upper right",
+                           rotate_labels=False)
+
+        # finally, plot everything to one plot for all categories
+        full_frame = pd.concat([other_frame, persons_frame])
+        full_frame.to_csv(os.path.join(csv_output_path, "AllResults" + position + ".csv"), encoding="utf-8-sig",
+                          index=False)
+        plot_score_boxplot(full_frame, position_title.format("").replace("  ", " "))
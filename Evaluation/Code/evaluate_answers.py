@@ -3,6 +3,7 @@ import os
 import matplotlib.pyplot as plt
 import pandas as pd
 import seaborn as sns
+from metric_kernel import MetricKernel
 
 
 def load_json_dicts(set_type: str, entity_position: str, question_type=None,
@@ -35,11 +36,11 @@ def load_json_dicts(set_type: str, entity_position: str, question_type=None,
         raise ValueError("Incorrect input for question type!")
     set_type = set_type.lower()
     if set_type == "gold":
-        json_filename = file_path + "GoldStandardFiles/JSONFiles/GoldStandard" + entity_position + ".json"
+        json_filename = file_path + "GoldStandardFiles/JSONFIles/GoldStandard" + entity_position + ".json"
     elif set_type == "eval":
         json_filename = file_path + "EvalSetFiles/Questions" + question_type + "/EvalSet" + entity_position + question_type + ".json"
     json_dict_list = []
-    for line in open(os.path.join(file_path, json_filename), encoding="utf-8-sig"):
+    for line in open(json_filename, encoding="utf-8-sig"):
         json_dict_list.append(json.loads(line))
     return json_dict_list
 
@@ -272,7 +273,7 @@ def get_avg_metric_score(metric_type: str, entity_metric_score_list: list):
     return avg_metric_score
 
 
-def plot_averages(question_type_score_tuple_list: list, plot_title: str):
+def plot_averages(question_type_score_tuple_list: list, plot_title: str, save_file=None):
     """
     plots the average metric scores for any one of the given metrics above (Precision, Recall, Exact Match, F1)
 
@@ -283,6 +284,9 @@ def plot_averages(question_type_score_tuple_list: list, plot_title: str):
         Human-Generated) and 1st element is the average score of this question type for any given metric
     plot_title: str
         title of the plot
+    save_file: None/str
+        if a filename (full path) is passed, the plot will be saved to that file and closed instead of being shown.
+        The default is None.
 
     Returns
     -------
@@ -302,7 +306,11 @@ def plot_averages(question_type_score_tuple_list: list, plot_title: str):
         height = rect.get_height()
         ax.text(rect.get_x() + rect.get_width() / 2, height + 5, label, ha='center', va='bottom')
     plt.title(plot_title)
-    plt.show()
+    if save_file is not None:
+        plt.savefig(save_file)
+        plt.close()
+    else:
+        plt.show()
 
 
 # noinspection PyShadowingNames
@@ -362,7 +370,7 @@ def metric_stats_to_csv(bl_list: list, ag_list: list, nl_list: list, metric: str
     filename = metric + entity_position
     if to_excel is True:
         filename += ".xlsx"
-        entity_score_df.to_excel(os.path.join(path, filename), index=False, encoding="utf-ß-sig")
+        entity_score_df.to_excel(os.path.join(path, filename), index=False)
     else:
         filename += ".csv"
         entity_score_df.to_csv(os.path.join(path, filename), index=False, encoding="utf-8-sig")
@@ -408,7 +416,7 @@ def entity_score_tuple_list_to_txt(entity_score_tuple_list: list, filename: str,
     entity_score_tuple_list.sort(key=lambda tup: tup[1], reverse=True)
     if question_type == "BL":
         if entity_position == "SP":
-            with open(os.path.join(filename, path), "w", encoding="utf-8") as f:
+            with open(path, "w", encoding="utf-8") as f:
                 f.write(f"{metric_type} results for Subject Position with Baseline questions - (e, r, ?): ")
                 f.write("\n\n")
                 f.write('\n'.join("{}: {}".format(ent[0], ent[1]) for ent in entity_score_tuple_list))
@@ -418,7 +426,7 @@ def entity_score_tuple_list_to_txt(entity_score_tuple_list: list, filename: str,
                     f.write(f"Average {metric_type} score: {avg_score}")
                 f.close()
         elif entity_position == "OP":
-            with open(os.path.join(filename, path), "w", encoding="utf-8") as f:
+            with open(path, "w", encoding="utf-8") as f:
                 f.write(f"{metric_type} results for Object Position with Baseline questions - (?, r, e): ")
                 f.write("\n\n")
                 f.write('\n'.join("{}: {}".format(ent[0], ent[1]) for ent in entity_score_tuple_list))
@@ -429,7 +437,7 @@ def entity_score_tuple_list_to_txt(entity_score_tuple_list: list, filename: str,
                 f.close()
     elif question_type == "AG":
         if entity_position == "SP":
-            with open(os.path.join(filename, path), "w", encoding="utf-8") as f:
+            with open(path, "w", encoding="utf-8") as f:
                 f.write(f"{metric_type} results for Subject Position with Translation-Based questions - (e, r, ?): ")
                 f.write("\n\n")
                 f.write('\n'.join("{}: {}".format(ent[0], ent[1]) for ent in entity_score_tuple_list))
@@ -439,7 +447,7 @@ def entity_score_tuple_list_to_txt(entity_score_tuple_list: list, filename: str,
                     f.write(f"Average {metric_type} score: {avg_score}")
                 f.close()
         elif entity_position == "OP":
-            with open(os.path.join(filename, path), "w", encoding="utf-8") as f:
+            with open(path, "w", encoding="utf-8") as f:
                 f.write(
                     f"{metric_type} results for Object Position with Translation-Based questions - (?, r, e): ")
                 f.write("\n\n")
@@ -451,7 +459,7 @@ def entity_score_tuple_list_to_txt(entity_score_tuple_list: list, filename: str,
                 f.close()
     elif question_type == "NL":
         if entity_position == "SP":
-            with open(os.path.join(filename, path), "w", encoding="utf-8") as f:
+            with open(path, "w", encoding="utf-8") as f:
                 f.write(
                     f"{metric_type} results for Subject Position with Human-Generated questions - (e, r, ?): ")
                 f.write("\n\n")
@@ -462,7 +470,7 @@ def entity_score_tuple_list_to_txt(entity_score_tuple_list: list, filename: str,
                     f.write(f"Average {metric_type} score: {avg_score}")
                 f.close()
         elif entity_position == "OP":
-            with open(os.path.join(filename, path), "w", encoding="utf-8") as f:
+            with open(path, "w", encoding="utf-8") as f:
                 f.write(
                     f"{metric_type} results for Object Position with Human-Generated questions - (?, r, e): ")
                 f.write("\n\n")
@@ -475,7 +483,8 @@ def entity_score_tuple_list_to_txt(entity_score_tuple_list: list, filename: str,
 
 
 # noinspection PyGlobalUndefined
-def category_score_tuples(entity_category: str, entity_score_tuple_list: list, question_type: str):
+def category_score_tuples(entity_category: str, entity_score_tuple_list: list, question_type: str,
+                          path="C:/Users/ubmen/Desktop/BA_Prog/DataExploration/CSVFiles/AllArticles/"):
     """
     creates tuples of where entities are replaced with their respective category (e.g. "Haus Fürsteneck" will be
     replaced by "Building") and the metric score for that entity
@@ -488,6 +497,8 @@ def category_score_tuples(entity_category: str, entity_score_tuple_list: list, q
         regardless of the specific metric itself.
     question_type: str
         the corresponding question type (i.e. "BL", "AG", "NL")
+    path: str
+        path of the csv files with the articles of the categories (DataExploration/CSVFiles/AllArticles)
     Returns
     -------
     cat_score_qt_tuples: list
@@ -501,10 +512,10 @@ def category_score_tuples(entity_category: str, entity_score_tuple_list: list, q
         entity_category += "s"
     global filename
     if "Person" != entity_category:
-        csv_path = "C:/Users/ubmen/Desktop/BA_Prog/DataExploration/CSVFiles/AllArticles/OtherDetailed/"
+        csv_path = os.path.join(path, "OtherDetailed/")
         filename = entity_category + ".csv"
     elif entity_category == "Person":
-        csv_path = "C:/Users/ubmen/Desktop/BA_Prog/DataExploration/CSVFiles/AllArticles/"
+        csv_path = path
         filename = "Persons.csv"
     ent_df = pd.read_csv(os.path.join(csv_path, filename), encoding="utf-8-sig")
     entity_name_list = ent_df["Title"].to_list()
@@ -516,7 +527,8 @@ def category_score_tuples(entity_category: str, entity_score_tuple_list: list, q
 
 
 def cat_score_question_type_list_to_csv(bl_list: list, ag_list: list, nl_list: list, metric: str,
-                                        entity_position: str, return_df=False):
+                                        entity_position: str, return_df=False,
+                                        path="C:/Users/ubmen/Desktop/BA_Prog/Evaluation/CategoryMetricScores"):
     """
     creates a pd.Dataframe object and stores category, their score, and question type to a csv file
 
@@ -538,12 +550,14 @@ def cat_score_question_type_list_to_csv(bl_list: list, ag_list: list, nl_list: l
     return_df: bool
         determines whether pd.DataFrame object will be returned. The default is False; if set to True,
         an object will be returned
+    path: str
+        path of the CategoryMetricScores directory
     Returns
     -------
     flattened_tuple_df: pd.DataFrame
         A pandas Dataframe containing the input information
     """
-    csv_save_path = "C:/Users/ubmen/Desktop/BA_Prog/Evaluation/CategoryMetricScores/CategoryMetricScores" + entity_position + "/"
+    csv_save_path = os.path.join(path, "CategoryMetricScores" + entity_position + "/")
     metric = metric.capitalize()
     csv_filename = metric + "CategoryScores" + entity_position + ".csv"
     joint_qt_list = bl_list + ag_list + nl_list
@@ -554,7 +568,8 @@ def cat_score_question_type_list_to_csv(bl_list: list, ag_list: list, nl_list: l
         return flattened_tuple_df
 
 
-def category_score_boxplot(metric: str, entity_position: str, return_df=False):
+def category_score_boxplot(metric: str, entity_position: str, return_df=False, save_file=None,
+                           path="C:/Users/ubmen/Desktop/BA_Prog/Evaluation/CategoryMetricScores"):
     """
     Retrieves category scores from the corresponding csv files and plots to a seaborn boxplot which shows
     the ranges and median of the input metric for each category
@@ -568,14 +583,18 @@ def category_score_boxplot(metric: str, entity_position: str, return_df=False):
     return_df: bool
         determines whether a pd.DataFrame object will containing the data from the csv file will be returned.
         The default is False since this would only make sense for testing.
+    save_file: None/str
+        if a filename (full path) is passed, the boxplot will be saved to that file and closed instead of being shown.
+        The default is None.
+    path: str
+        path of the CategoryMetricScores directory
     Returns
     -------
     category_score_qt_df: pd.DataFrame object
         A pandas DataFrame object containing the data from the csv file.
     """
     metric = metric.capitalize()
-    csv_ret_path = "C:/Users/ubmen/Desktop/BA_Prog/Evaluation/" \
-                   "CategoryMetricScores/CategoryMetricScores" + entity_position + "/"
+    csv_ret_path = os.path.join(path, "CategoryMetricScores" + entity_position + "/")
     filename_ret = metric + "CategoryScores" + entity_position + ".csv"
     category_score_qt_df = pd.read_csv(os.path.join(csv_ret_path, filename_ret), encoding="utf-8-sig")
     ax = sns.boxplot(x="Category", y="Score", hue="Question Type", data=category_score_qt_df)
@@ -585,7 +604,11 @@ def category_score_boxplot(metric: str, entity_position: str, return_df=False):
         ax.set_title(f"Object position {metric} scores based on question type - (?, r, e)")
     plt.xticks(rotation=20)
     plt.legend(loc='upper right')
-    plt.show()
+    if save_file is not None:
+        plt.savefig(save_file)
+        plt.close()
+    else:
+        plt.show()
     if return_df is True:
         return category_score_qt_df
 
@@ -609,22 +632,26 @@ if __name__ == "__main__":
     entity_system_gold_tuple_list_sp_nl = [
         entity_joint_system_gold_lists(ent, system_result_list_sp_nl, gs_dict_list_sp)
         for ent in all_eval_entities]
+    # all four metrics are computed in one pass per question type
+    kernel_sp_bl = MetricKernel(entity_system_gold_tuple_list_sp_bl)
+    kernel_sp_ag = MetricKernel(entity_system_gold_tuple_list_sp_ag)
+    kernel_sp_nl = MetricKernel(entity_system_gold_tuple_list_sp_nl)
 
     # Computing the metrics for each and writing them to text files
     # precision scores for SP
-    precisions_sp_bl = [entity_precision(ent[0], ent[1]) for ent in entity_system_gold_tuple_list_sp_bl]
+    precisions_sp_bl = kernel_sp_bl.entity_score_tuples("precision")
     avg_precision_sp_bl = get_avg_metric_score("precision", precisions_sp_bl)
     entity_score_tuple_list_to_txt(precisions_sp_bl, "PrecisionResultBLSP", "SP", "precision", "BL",
                                    include_average=True, avg_score=avg_precision_sp_bl)
     avg_precision_sp_bl_tup = ("BL", avg_precision_sp_bl)
 
-    precisions_sp_ag = [entity_precision(ent[0], ent[1]) for ent in entity_system_gold_tuple_list_sp_ag]
+    precisions_sp_ag = kernel_sp_ag.entity_score_tuples("precision")
     avg_precision_sp_ag = get_avg_metric_score("precision", precisions_sp_ag)
     entity_score_tuple_list_to_txt(precisions_sp_ag, "PrecisionResultAGSP", "SP", "precision", "AG",
                                    include_average=True, avg_score=avg_precision_sp_ag)
     avg_precision_sp_ag_tup = ("TB", avg_precision_sp_ag)
 
-    precisions_sp_nl = [entity_precision(ent[0], ent[1]) for ent in entity_system_gold_tuple_list_sp_nl]
+    precisions_sp_nl = kernel_sp_nl.entity_score_tuples("precision")
     avg_precision_sp_nl = get_avg_metric_score("precision", precisions_sp_nl)
     entity_score_tuple_list_to_txt(precisions_sp_nl, "PrecisionResultNLSP", "SP", "precision", "NL",
                                    include_average=True, avg_score=avg_precision_sp_nl)
@@ -635,19 +662,19 @@ if __name__ == "__main__":
     metric_stats_to_csv(precisions_sp_bl, precisions_sp_ag, precisions_sp_nl, "Precision", "SP", to_excel=True)
 
     # recall scores for SP
-    recalls_sp_bl = [entity_recall(ent[0], ent[1]) for ent in entity_system_gold_tuple_list_sp_bl]
+    recalls_sp_bl = kernel_sp_bl.entity_score_tuples("recall")
     avg_recall_sp_bl = get_avg_metric_score("recall", recalls_sp_bl)
     entity_score_tuple_list_to_txt(recalls_sp_bl, "RecallResultBLSP", "SP", "recall", "BL", include_average=True,
                                    avg_score=avg_recall_sp_bl)
     avg_recall_sp_bl_tup = ("Baseline", avg_recall_sp_bl)
 
-    recalls_sp_ag = [entity_recall(ent[0], ent[1]) for ent in entity_system_gold_tuple_list_sp_ag]
+    recalls_sp_ag = kernel_sp_ag.entity_score_tuples("recall")
     avg_recall_sp_ag = get_avg_metric_score("recall", recalls_sp_ag)
     entity_score_tuple_list_to_txt(recalls_sp_ag, "RecallResultAGSP", "SP", "recall", "AG", include_average=True,
                                    avg_score=avg_recall_sp_ag)
     avg_recall_sp_ag_tup = ("Translation-Based", avg_recall_sp_ag)
 
-    recalls_sp_nl = [entity_recall(ent[0], ent[1]) for ent in entity_system_gold_tuple_list_sp_nl]
+    recalls_sp_nl = kernel_sp_nl.entity_score_tuples("recall")
     avg_recall_sp_nl = get_avg_metric_score("recall", recalls_sp_nl)
     entity_score_tuple_list_to_txt(recalls_sp_bl, "RecallResultNLSP", "SP", "recall", "NL", include_average=True,
                                    avg_score=avg_recall_sp_nl)
@@ -658,19 +685,19 @@ if __name__ == "__main__":
     metric_stats_to_csv(recalls_sp_bl, recalls_sp_ag, recalls_sp_nl, "Recall", "SP", to_excel=True)
 
     # f1 scores for SP
-    f1_scores_sp_bl = [entity_f1_score(ent[0], ent[1]) for ent in entity_system_gold_tuple_list_sp_bl]
+    f1_scores_sp_bl = kernel_sp_bl.entity_score_tuples("f1")
     avg_f1_score_sp_bl = get_avg_metric_score("f1", f1_scores_sp_bl)
     entity_score_tuple_list_to_txt(f1_scores_sp_bl, "F1ResultBLSP", "SP", "f1", "BL", include_average=True,
                                    avg_score=avg_f1_score_sp_bl)
     avg_f1_score_sp_bl_tup = ("Baseline", avg_f1_score_sp_bl)
 
-    f1_scores_sp_ag = [entity_f1_score(ent[0], ent[1]) for ent in entity_system_gold_tuple_list_sp_ag]
+    f1_scores_sp_ag = kernel_sp_ag.entity_score_tuples("f1")
     avg_f1_score_sp_ag = get_avg_metric_score("f1", f1_scores_sp_ag)
     entity_score_tuple_list_to_txt(f1_scores_sp_ag, "F1ResultAGSP", "SP", "f1", "AG", include_average=True,
                                    avg_score=avg_f1_score_sp_ag)
     avg_f1_score_sp_ag_tup = ("Translation-Based", avg_f1_score_sp_ag)
 
-    f1_scores_sp_nl = [entity_f1_score(ent[0], ent[1]) for ent in entity_system_gold_tuple_list_sp_nl]
+    f1_scores_sp_nl = kernel_sp_nl.entity_score_tuples("f1")
     avg_f1_score_sp_nl = get_avg_metric_score("f1", f1_scores_sp_nl)
     entity_score_tuple_list_to_txt(f1_scores_sp_nl, "F1ResultNLSP", "SP", "f1", "NL", include_average=True,
                                    avg_score=avg_f1_score_sp_nl)
@@ -681,19 +708,19 @@ if __name__ == "__main__":
     metric_stats_to_csv(f1_scores_sp_bl, f1_scores_sp_ag, f1_scores_sp_nl, "F1", "SP", to_excel=True)
 
     # exact matches for SP
-    em_scores_sp_bl = [entity_exact_match(ent[0], ent[1]) for ent in entity_system_gold_tuple_list_sp_bl]
+    em_scores_sp_bl = kernel_sp_bl.entity_score_tuples("exact match")
     avg_em_score_sp_bl = get_avg_metric_score("exact match", em_scores_sp_bl)
     entity_score_tuple_list_to_txt(em_scores_sp_bl, "ExactMatchBLSP", "SP", "exact match", "BL", include_average=True,
                                    avg_score=avg_em_score_sp_bl)
     avg_em_score_sp_bl_tup = ("Baseline", avg_em_score_sp_bl)
 
-    em_scores_sp_ag = [entity_exact_match(ent[0], ent[1]) for ent in entity_system_gold_tuple_list_sp_ag]
+    em_scores_sp_ag = kernel_sp_ag.entity_score_tuples("exact match")
     avg_em_score_sp_ag = get_avg_metric_score("exact match", em_scores_sp_ag)
     entity_score_tuple_list_to_txt(em_scores_sp_ag, "ExactMatchAGSP", "SP", "exact match", "AG", include_average=True,
                                    avg_score=avg_em_score_sp_ag)
     avg_em_score_sp_ag_tup = ("Translation-Based", avg_em_score_sp_ag)
 
-    em_scores_sp_nl = [entity_exact_match(ent[0], ent[1]) for ent in entity_system_gold_tuple_list_sp_nl]
+    em_scores_sp_nl = kernel_sp_nl.entity_score_tuples("exact match")
     avg_em_score_sp_nl = get_avg_metric_score("exact match", em_scores_sp_nl)
     entity_score_tuple_list_to_txt(em_scores_sp_nl, "ExactMatchNLSP", "SP", "exact match", "NL", include_average=True,
                                    avg_score=avg_em_score_sp_nl)
@@ -758,21 +785,25 @@ if __name__ == "__main__":
     entity_gold_system_tuple_list_op_nl = [
         entity_joint_system_gold_lists(ent, system_result_list_op_nl, gs_dict_list_op)
         for ent in all_eval_entities]
+    # all four metrics are computed in one pass per question type
+    kernel_op_bl = MetricKernel(entity_gold_system_tuple_list_op_bl)
+    kernel_op_ag = MetricKernel(entity_gold_system_tuple_list_op_ag)
+    kernel_op_nl = MetricKernel(entity_gold_system_tuple_list_op_nl)
 
     # precision scores for OP
-    precisions_op_bl = [entity_precision(ent[0], ent[1]) for ent in entity_gold_system_tuple_list_op_bl]
+    precisions_op_bl = kernel_op_bl.entity_score_tuples("precision")
     avg_precision_op_bl = get_avg_metric_score("precision", precisions_op_bl)
     entity_score_tuple_list_to_txt(precisions_op_bl, "PrecisionResultBLOP", "OP", "precision", "BL",
                                    include_average=True, avg_score=avg_precision_op_bl)
     avg_precision_op_bl_tup = ("Baseline", avg_precision_op_bl)
 
-    precisions_op_ag = [entity_precision(ent[0], ent[1]) for ent in entity_gold_system_tuple_list_op_ag]
+    precisions_op_ag = kernel_op_ag.entity_score_tuples("precision")
     avg_precision_op_ag = get_avg_metric_score("precision", precisions_op_ag)
     entity_score_tuple_list_to_txt(precisions_op_ag, "PrecisionResultAGOP", "OP", "precision", "AG",
                                    include_average=True, avg_score=avg_precision_op_ag)
     avg_precision_op_ag_tup = ("Translation-Based", avg_precision_op_ag)
 
-    precisions_op_nl = [entity_precision(ent[0], ent[1]) for ent in entity_gold_system_tuple_list_op_nl]
+    precisions_op_nl = kernel_op_nl.entity_score_tuples("precision")
     avg_precision_op_nl = get_avg_metric_score("precision", precisions_op_nl)
     entity_score_tuple_list_to_txt(precisions_op_nl, "PrecisionResultNLOP", "OP", "precision", "NL",
                                    include_average=True, avg_score=avg_precision_op_nl)
@@ -783,19 +814,19 @@ if __name__ == "__main__":
     metric_stats_to_csv(precisions_op_bl, precisions_op_ag, precisions_op_nl, "Precision", "OP", to_excel=True)
 
     # recall scores for OP
-    recalls_op_bl = [entity_recall(ent[0], ent[1]) for ent in entity_gold_system_tuple_list_op_bl]
+    recalls_op_bl = kernel_op_bl.entity_score_tuples("recall")
     avg_recall_op_bl = get_avg_metric_score("recall", recalls_op_bl)
     entity_score_tuple_list_to_txt(recalls_op_bl, "RecallResultBLOP", "OP", "recall", "BL", include_average=True,
                                    avg_score=avg_recall_op_bl)
     avg_recall_op_bl_tup = ("Baseline", avg_recall_op_bl)
 
-    recalls_op_ag = [entity_recall(ent[0], ent[1]) for ent in entity_gold_system_tuple_list_op_ag]
+    recalls_op_ag = kernel_op_ag.entity_score_tuples("recall")
     avg_recall_op_ag = get_avg_metric_score("recall", recalls_op_ag)
     entity_score_tuple_list_to_txt(recalls_op_ag, "RecallResultAGOP", "OP", "recall", "AG", include_average=True,
                                    avg_score=avg_recall_op_ag)
     avg_recall_op_ag_tup = ("Translation-Based", avg_recall_op_ag)
 
-    recalls_op_nl = [entity_recall(ent[0], ent[1]) for ent in entity_gold_system_tuple_list_op_nl]
+    recalls_op_nl = kernel_op_nl.entity_score_tuples("recall")
     avg_recall_op_nl = get_avg_metric_score("recall", recalls_op_nl)
     entity_score_tuple_list_to_txt(recalls_op_bl, "RecallResultNLOP", "OP", "recall", "NL", include_average=True,
                                    avg_score=avg_recall_op_nl)
@@ -806,19 +837,19 @@ if __name__ == "__main__":
     metric_stats_to_csv(recalls_op_bl, recalls_op_ag, recalls_op_nl, "Recall", "OP", to_excel=True)
 
     # f1 scores for OP
-    f1_scores_op_bl = [entity_f1_score(ent[0], ent[1]) for ent in entity_gold_system_tuple_list_op_bl]
+    f1_scores_op_bl = kernel_op_bl.entity_score_tuples("f1")
     avg_f1_score_op_bl = get_avg_metric_score("f1", f1_scores_op_bl)
     entity_score_tuple_list_to_txt(f1_scores_op_bl, "F1ResultBLOP", "OP", "f1", "BL", include_average=True,
                                    avg_score=avg_f1_score_op_bl)
     avg_f1_score_op_bl_tup = ("Baseline", avg_f1_score_op_bl)
 
-    f1_scores_op_ag = [entity_f1_score(ent[0], ent[1]) for ent in entity_gold_system_tuple_list_op_ag]
+    f1_scores_op_ag = kernel_op_ag.entity_score_tuples("f1")
     avg_f1_score_op_ag = get_avg_metric_score("f1", f1_scores_op_ag)
     entity_score_tuple_list_to_txt(f1_scores_op_ag, "F1ResultAGOP", "OP", "f1", "AG", include_average=True,
                                    avg_score=avg_f1_score_op_ag)
     avg_f1_score_op_ag_tup = ("Translation-Based", avg_f1_score_op_ag)
 
-    f1_scores_op_nl = [entity_f1_score(ent[0], ent[1]) for ent in entity_gold_system_tuple_list_op_nl]
+    f1_scores_op_nl = kernel_op_nl.entity_score_tuples("f1")
     avg_f1_score_op_nl = get_avg_metric_score("f1", f1_scores_op_nl)
     entity_score_tuple_list_to_txt(f1_scores_op_nl, "F1ResultNLOP", "OP", "f1", "NL", include_average=True,
                                    avg_score=avg_f1_score_op_nl)
@@ -829,19 +860,19 @@ if __name__ == "__main__":
     metric_stats_to_csv(f1_scores_op_bl, f1_scores_op_ag, f1_scores_op_nl, "F1", "OP", to_excel=True)
 
     # exact matches for OP
-    em_scores_op_bl = [entity_exact_match(ent[0], ent[1]) for ent in entity_gold_system_tuple_list_op_bl]
+    em_scores_op_bl = kernel_op_bl.entity_score_tuples("exact match")
     avg_em_score_op_bl = get_avg_metric_score("exact match", em_scores_op_bl)
     entity_score_tuple_list_to_txt(em_scores_op_bl, "ExactMatchBLOP", "OP", "exact match", "BL", include_average=True,
                                    avg_score=avg_em_score_op_bl)
     avg_em_score_op_bl_tup = ("Baseline", avg_em_score_op_bl)
 
-    em_scores_op_ag = [entity_exact_match(ent[0], ent[1]) for ent in entity_gold_system_tuple_list_op_ag]
+    em_scores_op_ag = kernel_op_ag.entity_score_tuples("exact match")
     avg_em_score_op_ag = get_avg_metric_score("exact match", em_scores_op_ag)
     entity_score_tuple_list_to_txt(em_scores_op_ag, "ExactMatchAGOP", "OP", "exact match", "AG", include_average=True,
                                    avg_score=avg_em_score_op_ag)
     avg_em_score_op_ag_tup = ("Translation-Based", avg_em_score_op_ag)
 
-    em_scores_op_nl = [entity_exact_match(ent[0], ent[1]) for ent in entity_gold_system_tuple_list_op_nl]
+    em_scores_op_nl = kernel_op_nl.entity_score_tuples("exact match")
     avg_em_score_op_nl = get_avg_metric_score("exact match", em_scores_op_nl)
     entity_score_tuple_list_to_txt(em_scores_op_nl, "ExactMatchNLOP", "OP", "exact match", "NL", include_average=True,
                                    avg_score=avg_em_score_op_nl)
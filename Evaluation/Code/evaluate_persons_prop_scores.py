@@ -1,25 +1,12 @@
-import json
 import pandas as pd
 import os
 import matplotlib.pyplot as plt
-import ast
+from evaluate_answer_scores import load_result_frame, all_entities
+from Pipeline.Code.artifacts import default_resolver
 
 
-persons_properties_file_sp = "C:/Users/ubmen/Desktop/BA_Prog/PropertyExtraction/Properties/" \
-                          "PersonProperties/PersonPropertiesTXTFiles/PersonTotalPropertiesSP.txt"
-with open(persons_properties_file_sp, encoding="utf-8") as f:
-    full_property_list_sp = f.readlines()
-    full_property_list_sp = [line.strip() for line in full_property_list_sp]
-    full_property_list_sp = [ast.literal_eval(tup) for tup in full_property_list_sp]
-    full_property_list_sp = [tup[0] for tup in full_property_list_sp]
-
-persons_properties_file_op = "C:/Users/ubmen/Desktop/BA_Prog/PropertyExtraction/Properties/" \
-                          "PersonProperties/PersonPropertiesTXTFiles/PersonTotalPropertiesOP.txt"
-with open(persons_properties_file_op, encoding="utf-8") as f:
-    full_property_list_op = f.readlines()
-    full_property_list_op = [line.strip() for line in full_property_list_op]
-    full_property_list_op = [ast.literal_eval(tup) for tup in full_property_list_op]
-    full_property_list_op = [tup[0] for tup in full_property_list_op]
+# cache for the property score tables, keyed by the entity types and the results filepath
+property_score_tables = {}
 
 
 def load_persons_json(question_type: str, entity_position: str):
@@ -38,13 +25,8 @@ def load_persons_json(question_type: str, entity_position: str):
         A list of the persons dictionaries
 
     """
-    persons_path = "C:/Users/ubmen/Desktop/BA_Prog/TripleExtraction/Results/PersonsResults/" \
-                   "PersonsResultsQuestions" + question_type + "/"
-    persons_filename = "PersonsResults" + entity_position + "withQuestions" + question_type + "full.json"
-    json_dict_list = []
-    for line in open(os.path.join(persons_path, persons_filename), encoding="utf-8-sig"):
-        json_dict_list.append(json.loads(line))
-    return json_dict_list
+    # the file is loaded once per process by the artifact resolver
+    return list(default_resolver().results("Person", entity_position, question_type).load())
 
 
 def d_values(d, depth):
@@ -114,6 +96,105 @@ def get_avg_property_score(nested_dict_list: list, property: str):
     return avg_val, property
 
 
+def property_score_table(entity_types=None, file_path=None, refresh=False):
+    """
+    computes the score statistics of every property for all categories, question types and entity positions at once,
+    with one grouped aggregation over the flattened results. The table is cached, s.t. rankings for any category,
+    question type and position are lookups.
+
+    Parameters
+    ----------
+    entity_types: None/list
+        categories for which the table will be computed. The default None computes it for "Person" and all categories
+        of "Other" (missing result files are skipped).
+    file_path: None/str
+        filepath from where the results will be extracted. The default None uses the Results directory of the
+        artifact resolver.
+    refresh: bool
+        determines whether a cached table will be recomputed. The default is False.
+
+    Returns
+    -------
+    property_table: pd.DataFrame
+        dataframe indexed by (category, position, qtype, predicate) with the columns count, mean, median, min, q25,
+        q75, max and rank (1 = highest mean score within category, position and question type)
+    """
+    entity_types = all_entities if entity_types is None else entity_types
+    file_path = default_resolver().path("TripleExtraction/Results/") if file_path is None else file_path
+    cache_key = (tuple(entity_types), file_path)
+    if refresh is False and cache_key in property_score_tables:
+        return property_score_tables[cache_key]
+    result_frame = load_result_frame(entity_types=entity_types, skip_missing=True, file_path=file_path)
+    grouped_scores = result_frame.groupby(["category", "position", "qtype", "predicate"], observed=True)["score"]
+    property_table = grouped_scores.agg(["count", "mean", "median", "min", "max"])
+    property_table.insert(4, "q25", grouped_scores.quantile(0.25))
+    property_table.insert(5, "q75", grouped_scores.quantile(0.75))
+    property_table["rank"] = property_table.groupby(level=["category", "position", "qtype"])["mean"].rank(
+        ascending=False, method="first").astype(int)
+    property_score_tables[cache_key] = property_table
+    return property_table
+
+
+def property_ranking(question_type: str, entity_position: str, entity_type="Person", property_table=None):
+    """
+    gets the full ranking of the properties of a category according to their average scores
+
+    Parameters
+    ----------
+    question_type: str
+        The desired question type, can either be "AG", "BL", "NL"
+    entity_position: str
+        The desired entity position, can either be "SP" or "OP"
+    entity_type: str
+        The category of the properties. The default is "Person".
+    property_table: None/pd.DataFrame
+        table as returned by property_score_table. The default None uses the cached table of all categories.
+
+    Returns
+    -------
+    ranking_df: pd.DataFrame
+        the statistics of every property of the category, sorted by the mean score (descending)
+    """
+    property_table = property_score_table() if property_table is None else property_table
+    ranking_df = property_table.loc[(entity_type, entity_position, question_type)]
+    return ranking_df.sort_values("rank")
+
+
+def get_top_or_bottom_k(question_type: str, entity_position: str, top_or_bottom: str, k=5, entity_type="Person",
+                        property_table=None):
+    """
+    gets top or bottom k properties of a category
+
+    Parameters
+    ----------
+    question_type: str
+        The desired question type, can either be "AG", "BL", "NL"
+    entity_position: str
+        The desired entity position, can either be "SP" or "OP"
+    top_or_bottom: str
+        determines whether top or bottom k properties will be retrieved
+    k: int
+        number of properties. The default is 5.
+    entity_type: str
+        The category of the properties. The default is "Person".
+    property_table: None/pd.DataFrame
+        table as returned by property_score_table. The default None uses the cached table of all categories.
+
+    Returns
+    -------
+    final_result_list: list
+        List of (average score, property) tuples ranked according to their average scores, the average scores are
+        rounded to two decimals
+    """
+    ranking_df = property_ranking(question_type, entity_position, entity_type, property_table)
+    final_result_list = [(round(avg_val, 2), prop) for prop, avg_val in zip(ranking_df.index, ranking_df["mean"])]
+    final_result_list = sorted(final_result_list, key=lambda tup: tup[0], reverse=True)
+    if top_or_bottom == "top":
+        return final_result_list[:k]
+    elif top_or_bottom == "bottom":
+        return final_result_list[-k:]
+
+
 def get_top_or_bottom_five(question_type: str, entity_position: str, top_or_bottom: str):
     """
     gets top or bottom five properties for "Person" DBpedia class
@@ -132,23 +213,7 @@ def get_top_or_bottom_five(question_type: str, entity_position: str, top_or_bott
         List of the properties ranked according to their average scores
 
     """
-    persons_dicts_list = load_persons_json(question_type, entity_position)
-    # noinspection PyTypeChecker
-    persons_nested_dicts_to_list = dict_to_list(persons_dicts_list)
-    property_avg_tuple_list = []
-    if entity_position == "SP":
-        # noinspection PyTypeChecker
-        property_avg_tuple_list = [get_avg_property_score(persons_nested_dicts_to_list, prop) for
-                                   prop in full_property_list_sp]
-    elif entity_position == "OP":
-        # noinspection PyTypeChecker
-        property_avg_tuple_list = [get_avg_property_score(persons_nested_dicts_to_list, prop) for
-                                   prop in full_property_list_op]
-    final_result_list = sorted(property_avg_tuple_list, key=lambda tup: tup[0], reverse=True)
-    if top_or_bottom == "top":
-        return final_result_list[:5]
-    elif top_or_bottom == "bottom":
-        return final_result_list[-5:]
+    return get_top_or_bottom_k(question_type, entity_position, top_or_bottom, k=5, entity_type="Person")
 
 
 def plot_tuple_list(tuple_list: list, plot_title: str):
@@ -199,7 +264,7 @@ def stats_to_txt(tuple_list: list, filename: str, question_type: str, entity_pos
     -------
 
     """
-    outputpath = "C:/Users/ubmen/Desktop/BA_Prog/Evaluation/PersonPropertiesStats/"
+    outputpath = default_resolver().path("Evaluation/PersonPropertiesStats/")
     tuple_list = [(tup[1], tup[0]) for tup in tuple_list]
     if question_type == "BL":
         if entity_position == "SP":
@@ -254,41 +319,46 @@ def stats_to_txt(tuple_list: list, filename: str, question_type: str, entity_pos
                 f.write('\n'.join('{}, avg. score: {}'.format(x[0], x[1]) for x in tuple_list[5:]))
 
 
-# get top/bottom 5 for Baseline questions, first ssubject position, then object position and plot
-top_five_sp_bl = get_top_or_bottom_five("BL", "SP", "top")
-bottom_five_sp_bl = get_top_or_bottom_five("BL", "SP", "bottom")
-joint_sp_bl_list = top_five_sp_bl + bottom_five_sp_bl
-# plot_tuple_list(joint_sp_bl_list, "Top/Bottom 5 properties Baseline Questions Subject position: (e, r, ?)")
-stats_to_txt(joint_sp_bl_list, "PersonBaselineStatsSP.txt", "BL", "SP")
-
-top_five_sp_ag = get_top_or_bottom_five("AG", "SP", "top")
-bottom_five_sp_ag = get_top_or_bottom_five("AG", "SP", "bottom")
-joint_sp_ag_list = top_five_sp_ag + bottom_five_sp_ag
-# plot_tuple_list(joint_sp_ag_list, "Top/Bottom 5 properties Translation-Based Questions Subject position: (e, r, ?)")
-stats_to_txt(joint_sp_ag_list, "PersonTranslationBasedStatsSP.txt", "AG", "SP")
-
-top_five_sp_nl = get_top_or_bottom_five("NL", "SP", "top")
-bottom_five_sp_nl = get_top_or_bottom_five("NL", "SP", "bottom")
-joint_sp_nl_list = top_five_sp_nl + bottom_five_sp_nl
-# plot_tuple_list(joint_sp_nl_list, "Top/Bottom 5 properties Human-Generated Subject position: (e, r, ?)")
-stats_to_txt(joint_sp_nl_list, "PersonHumanGeneratedStatsSP.txt", "NL", "SP")
-
-
-# same for Object Position
-top_five_op_bl = get_top_or_bottom_five("BL", "OP", "top")
-bottom_five_op_bl = get_top_or_bottom_five("BL", "OP", "bottom")
-joint_op_bl_list = top_five_op_bl + bottom_five_op_bl
-plot_tuple_list(joint_op_bl_list, "Top/Bottom 5 properties Baseline Questions Object position: (?, r, e)")
-stats_to_txt(joint_op_bl_list, "PersonBaselineStatsOP.txt", "BL", "OP")
-
-top_five_op_ag = get_top_or_bottom_five("AG", "OP", "top")
-bottom_five_op_ag = get_top_or_bottom_five("AG", "OP", "bottom")
-joint_op_ag_list = top_five_op_ag + bottom_five_op_ag
-plot_tuple_list(joint_op_ag_list, "Top/Bottom 5 properties Translation-Based Questions Object position: (?, r, e)")
-stats_to_txt(joint_op_ag_list, "PersonTranslationBasedStatsOP.txt", "AG", "OP")
-
-top_five_op_nl = get_top_or_bottom_five("NL", "OP", "top")
-bottom_five_op_nl = get_top_or_bottom_five("NL", "OP", "bottom")
-joint_op_nl_list = top_five_op_nl + bottom_five_op_nl
-plot_tuple_list(joint_op_nl_list, "Top/Bottom 5 properties Human-Generated Questions Object position: (?, r, e)")
-stats_to_txt(joint_op_nl_list, "PersonHumanGeneratedStatsOP.txt", "NL", "OP")
+if __name__ == "__main__":
+    # get top/bottom 5 for Baseline questions, first ssubject position, then object position and plot
+    top_five_sp_bl = get_top_or_bottom_five("BL", "SP", "top")
+    bottom_five_sp_bl = get_top_or_bottom_five("BL", "SP", "bottom")
+    joint_sp_bl_list = top_five_sp_bl + bottom_five_sp_bl
+    # plot_tuple_list(joint_sp_bl_list, "Top/Bottom 5 properties Baseline Questions Subject position: (e, r, ?)")
+    stats_to_txt(joint_sp_bl_list, "PersonBaselineStatsSP.txt", "BL", "SP")
+
+    top_five_sp_ag = get_top_or_bottom_five("AG", "SP", "top")
+    bottom_five_sp_ag = get_top_or_bottom_five("AG", "SP", "bottom")
+    joint_sp_ag_list = top_five_sp_ag + bottom_five_sp_ag
+    # plot_tuple_list(joint_sp_ag_list, "Top/Bottom 5 properties Translation-Based Questions Subject position: (e, r, ?)")
+    stats_to_txt(joint_sp_ag_list, "PersonTranslationBasedStatsSP.txt", "AG", "SP")
+
+    top_five_sp_nl = get_top_or_bottom_five("NL", "SP", "top")
+    bottom_five_sp_nl = get_top_or_bottom_five("NL", "SP", "bottom")
+    joint_sp_nl_list = top_five_sp_nl + bottom_five_sp_nl
+    # plot_tuple_list(joint_sp_nl_list, "Top/Bottom 5 properties Human-Generated Subject position: (e, r, ?)")
+    stats_to_txt(joint_sp_nl_list, "PersonHumanGeneratedStatsSP.txt", "NL", "SP")
+
+
+    # same for Object Position
+    top_five_op_bl = get_top_or_bottom_five("BL", "OP", "top")
+    bottom_five_op_bl = get_top_or_bottom_five("BL", "OP", "bottom")
+    joint_op_bl_list = top_five_op_bl + bottom_five_op_bl
+    plot_tuple_list(joint_op_bl_list, "Top/Bottom 5 properties Baseline Questions Object position: (?, r, e)")
+    stats_to_txt(joint_op_bl_list, "PersonBaselineStatsOP.txt", "BL", "OP")
+
+    top_five_op_ag = get_top_or_bottom_five("AG", "OP", "top")
+    bottom_five_op_ag = get_top_or_bottom_five("AG", "OP", "bottom")
+    joint_op_ag_list = top_five_op_ag + bottom_five_op_ag
+    plot_tuple_list(joint_op_ag_list, "Top/Bottom 5 properties Translation-Based Questions Object position: (?, r, e)")
+    stats_to_txt(joint_op_ag_list, "PersonTranslationBasedStatsOP.txt", "AG", "OP")
+
+    top_five_op_nl = get_top_or_bottom_five("NL", "OP", "top")
+    bottom_five_op_nl = get_top_or_bottom_five("NL", "OP", "bottom")
+    joint_op_nl_list = top_five_op_nl + bottom_five_op_nl
+    plot_tuple_list(joint_op_nl_list, "Top/Bottom 5 properties Human-Generated Questions Object position: (?, r, e)")
+    stats_to_txt(joint_op_nl_list, "PersonHumanGeneratedStatsOP.txt", "NL", "OP")
+
+    # statistics and ranks of the properties of all categories, question types and positions
+    property_score_table().to_csv(default_resolver().path("Evaluation/CSVFiles/PropertyScoreStats.csv"),
+                                  encoding="utf-8-sig")
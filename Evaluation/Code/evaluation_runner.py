@@ -0,0 +1,287 @@
+# -*- coding: utf-8 -*-
+"""
+This Python file provides a runner for the complete answer quality evaluation. The evaluation matrix (entity positions x
+question types x thresholds) is declared once, every cell of the matrix is evaluated on a process pool and all outputs
+are written afterwards by a separate writer stage:
+    * txt files with the ranked entity scores and averages (EvalResultsFiles, ThresholdedResults)
+    * csv/xlsx files with the entity scores of all question types (CSVFiles, CSVFilesThresholded)
+    * csv files with the category scores (CategoryMetricScores)
+    * plots of the averages and category boxplots, which are rendered by the pool in the background and saved to the
+      Plots directory instead of being shown
+
+This replaces the sequential main blocks of evaluate_answers.py and thresholded_answer_evaluation.py.
+"""
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+import matplotlib.pyplot as plt
+from evaluate_answers import load_json_dicts, entity_joint_system_gold_lists, get_avg_metric_score, plot_averages, \
+    metric_stats_to_csv, entity_score_tuple_list_to_txt, category_score_tuples, cat_score_question_type_list_to_csv, \
+    category_score_boxplot
+from thresholded_answer_evaluation import entity_score_system_gold_tuple_lists, threshold_entity_precision, \
+    threshold_entity_recall, threshold_entity_f1_score, threshold_exact_match, \
+    thresholded_entity_score_tuple_list_2_txt, threshold_metrics_to_csv
+from metric_kernel import MetricKernel
+
+entity_positions = ["SP", "OP"]
+question_types = ["BL", "AG", "NL"]
+thresholds = [None, 0.2, 0.4, 0.6, 0.8]
+metric_types = ["precision", "recall", "f1", "exact match"]
+category_list = ["Person", "Building", "Disease", "History", "Literature", "Magazine", "Newspaper", "Organization",
+                 "Park", "School", "Ship"]
+
+formal_question_types = {"BL": "Baseline", "AG": "Translation-Based", "NL": "Human-Generated"}
+formal_positions = {"SP": "Subject Position - (e, r, ?)", "OP": "Object Position - (?, r, e)"}
+# names used by the existing result files for every metric:
+# (csv metric, txt filename prefix, thresholded txt filename prefix, category csv metric, plot name)
+metric_file_names = {"precision": ("Precision", "PrecisionResult", "ThresholdedPrecision", "Precision", "Precision"),
+                     "recall": ("Recall", "RecallResult", "ThresholdedRecall", "Recall", "Recall"),
+                     "f1": ("F1", "F1Result", "ThresholdedF1", "F1-Score", "F1Score"),
+                     "exact match": ("EM", "ExactMatch", "ThresholdedExactMatch", "Exact Match", "ExactMatch")}
+threshold_metric_functions = {"precision": threshold_entity_precision, "recall": threshold_entity_recall,
+                              "f1": threshold_entity_f1_score, "exact match": threshold_exact_match}
+
+
+def evaluation_matrix(positions=None, qtypes=None, threshold_list=None):
+    """
+    declares the evaluation matrix, i.e. every combination of entity position, question type and threshold
+
+    Parameters
+    ----------
+    positions: None/list
+        entity positions to evaluate. The default None evaluates "SP" and "OP".
+    qtypes: None/list
+        question types to evaluate. The default None evaluates "BL", "AG" and "NL".
+    threshold_list: None/list
+        thresholds for the answer scores, None within the list stands for the unthresholded evaluation.
+        The default None evaluates [None, 0.2, 0.4, 0.6, 0.8].
+
+    Returns
+    -------
+    cells: list
+        list of (entity_position, question_type, threshold) tuples
+    """
+    positions = entity_positions if positions is None else positions
+    qtypes = question_types if qtypes is None else qtypes
+    threshold_list = thresholds if threshold_list is None else threshold_list
+    return [(position, qt, threshold) for position in positions for qt in qtypes for threshold in threshold_list]
+
+
+def evaluate_cell(cell: tuple, file_path="C:/Users/ubmen/Desktop/BA_Prog/Evaluation/"):
+    """
+    evaluates one cell of the evaluation matrix for all metrics. Runs inside the worker processes, hence it only
+    computes and does not write any files.
+
+    Parameters
+    ----------
+    cell: tuple
+        (entity_position, question_type, threshold) tuple, where threshold is None for the unthresholded evaluation
+    file_path: str
+        filepath of the Evaluation directory from where the gold standard and evaluation set will be loaded
+
+    Returns
+    -------
+    cell_result: dict
+        dictionary with the cell, the entity score tuple lists of every metric ("scores") and their averages
+        ("averages")
+    """
+    entity_position, question_type, threshold = cell
+    gs_dict_list = load_json_dicts("gold", entity_position, file_path=file_path)
+    system_result_list = load_json_dicts("eval", entity_position, question_type, file_path=file_path)
+    all_eval_entities = sorted(set([key for d in gs_dict_list for key in d]))
+    scores = {}
+    if threshold is None:
+        kernel = MetricKernel([entity_joint_system_gold_lists(ent, system_result_list, gs_dict_list)
+                               for ent in all_eval_entities])
+        for metric in metric_types:
+            scores[metric] = kernel.entity_score_tuples(metric)
+    else:
+        # noinspection PyTypeChecker
+        ent_gold_system_tup_list = [entity_score_system_gold_tuple_lists(ent, system_result_list, gs_dict_list)
+                                    for ent in all_eval_entities]
+        for metric in metric_types:
+            metric_function = threshold_metric_functions[metric]
+            scores[metric] = [metric_function(ent[0], ent[1], threshold) for ent in ent_gold_system_tup_list]
+    averages = {metric: get_avg_metric_score(metric, scores[metric]) for metric in metric_types}
+    return {"cell": cell, "scores": scores, "averages": averages}
+
+
+def plot_job(plot_type: str, save_file: str, *args, **kwargs):
+    """
+    renders a plot without a display and saves it to a file, used to run the plotting on the process pool
+
+    Parameters
+    ----------
+    plot_type: str
+        either "averages" (plot_averages) or "boxplot" (category_score_boxplot)
+    save_file: str
+        full path of the png file
+    args:
+        arguments for the plot function
+    kwargs:
+        keyword arguments for the plot function, e.g. the path of category_score_boxplot
+
+    Returns
+    -------
+    save_file: str
+        the file that was written
+    """
+    plt.switch_backend("Agg")
+    os.makedirs(os.path.dirname(save_file), exist_ok=True)
+    if plot_type == "averages":
+        plot_averages(*args, save_file=save_file, **kwargs)
+    elif plot_type == "boxplot":
+        category_score_boxplot(*args, save_file=save_file, **kwargs)
+    return save_file
+
+
+def threshold_suffix(threshold: float):
+    """
+    formats a threshold the way the result files do, e.g. 0.2 -> "02"
+    """
+    return str(threshold).replace(".", "")
+
+
+def write_results(cell_results: list, pool=None, plot=True, file_path="C:/Users/ubmen/Desktop/BA_Prog/Evaluation/",
+                  articles_path=None):
+    """
+    writer stage of the runner: writes txt, csv and xlsx files for every cell result and submits the plots to the pool.
+    All files are written to (and the category scores read from) the directories below file_path, the articles of the
+    categories are read from DataExploration next to it unless articles_path is given.
+
+    Parameters
+    ----------
+    cell_results: list
+        list of dictionaries as returned by evaluate_cell
+    pool: None/ProcessPoolExecutor
+        pool on which the plots will be rendered. If None, the plots are rendered in this process.
+    plot: bool
+        determines whether plots will be created at all. The default is True.
+    file_path: str
+        filepath of the Evaluation directory
+    articles_path: None/str
+        path of the csv files with the articles of the categories. The default None uses
+        DataExploration/CSVFiles/AllArticles next to file_path.
+
+    Returns
+    -------
+    plot_futures: list
+        futures of the submitted plot jobs (empty if pool is None or plot is False)
+    """
+    plot_futures = []
+    results_path = os.path.join(file_path, "EvalResultsFiles")
+    category_path = os.path.join(file_path, "CategoryMetricScores")
+    plot_path = os.path.join(file_path, "Plots")
+    if articles_path is None:
+        articles_path = os.path.join(os.path.dirname(os.path.normpath(file_path)), "DataExploration", "CSVFiles",
+                                     "AllArticles")
+
+    def submit_plot(*args, **kwargs):
+        if pool is None:
+            plot_job(*args, **kwargs)
+        else:
+            plot_futures.append(pool.submit(plot_job, *args, **kwargs))
+
+    results = {result["cell"]: result for result in cell_results}
+    # txt files, one per cell and metric
+    for (entity_position, question_type, threshold), result in results.items():
+        for metric in metric_types:
+            # lists are copied since the txt writers sort them in place
+            entity_scores = list(result["scores"][metric])
+            txt_name, thresholded_txt_name = metric_file_names[metric][1:3]
+            if threshold is None:
+                entity_score_tuple_list_to_txt(entity_scores, txt_name + question_type + entity_position,
+                                               entity_position, metric, question_type, include_average=True,
+                                               avg_score=result["averages"][metric], path=results_path)
+            else:
+                thresholded_entity_score_tuple_list_2_txt(entity_scores, thresholded_txt_name
+                                                          + threshold_suffix(threshold) + question_type
+                                                          + entity_position, entity_position, metric,
+                                                          question_type, threshold, include_average=True,
+                                                          avg_score=result["averages"][metric],
+                                                          path=os.path.join(results_path, "ThresholdedResults"))
+    # csv/xlsx files and plots across the three question types
+    position_thresholds = sorted(set((cell[0], cell[2]) for cell in results), key=lambda tup: (tup[0], tup[1] or 0))
+    for entity_position, threshold in position_thresholds:
+        if any((entity_position, qt, threshold) not in results for qt in question_types):
+            continue
+        qt_results = [results[(entity_position, qt, threshold)] for qt in question_types]
+        for metric in metric_types:
+            csv_metric, category_metric, plot_name = (metric_file_names[metric][0], metric_file_names[metric][3],
+                                                      metric_file_names[metric][4])
+            bl_list, ag_list, nl_list = [list(result["scores"][metric]) for result in qt_results]
+            averages = [(formal_question_types[qt], result["averages"][metric])
+                        for qt, result in zip(question_types, qt_results)]
+            if threshold is None:
+                csv_path = os.path.join(results_path, "CSVFiles")
+                metric_stats_to_csv(bl_list, ag_list, nl_list, csv_metric, entity_position, path=csv_path)
+                metric_stats_to_csv(bl_list, ag_list, nl_list, csv_metric, entity_position, path=csv_path,
+                                    to_excel=True)
+                category_lists = [[category_score_tuples(category, result["scores"][metric],
+                                                         formal_question_types[qt], path=articles_path)
+                                   for category in category_list]
+                                  for qt, result in zip(question_types, qt_results)]
+                cat_score_question_type_list_to_csv(*category_lists, category_metric, entity_position,
+                                                    path=category_path)
+                if plot is True:
+                    plot_title = f"{csv_metric} averages for {formal_positions[entity_position]}"
+                    submit_plot("averages", os.path.join(plot_path, "MetricsAverages/Averages" + entity_position,
+                                                         plot_name + "Averages" + entity_position + ".png"),
+                                averages, plot_title)
+                    submit_plot("boxplot", os.path.join(plot_path, "CategoryMetricScores/CategoryMetricScores"
+                                                        + entity_position, "Category" + csv_metric + entity_position
+                                                        + ".png"), category_metric, entity_position,
+                                path=category_path)
+            else:
+                threshold_metrics_to_csv(bl_list, ag_list, nl_list, csv_metric, entity_position, threshold,
+                                         path=os.path.join(results_path, "ThresholdedResults", "CSVFilesThresholded",
+                                                           "CSVFilesThreshold"))
+                if plot is True:
+                    plot_title = f"{csv_metric} averages for {formal_positions[entity_position]} " \
+                                 f"with threshold {threshold}"
+                    suffix = threshold_suffix(threshold)
+                    submit_plot("averages", os.path.join(plot_path, "ThresholdedMetricAverages/Threshold" + suffix
+                                                         + "/Threshold" + suffix + entity_position, csv_metric
+                                                         + entity_position + suffix + ".png"), averages, plot_title)
+    return plot_futures
+
+
+def run_evaluation_matrix(cells=None, max_workers=None, plot=True,
+                          file_path="C:/Users/ubmen/Desktop/BA_Prog/Evaluation/", articles_path=None):
+    """
+    evaluates all cells of the evaluation matrix on a process pool and writes the results afterwards
+
+    Parameters
+    ----------
+    cells: None/list
+        cells of the evaluation matrix as returned by evaluation_matrix. The default None evaluates the full matrix.
+    max_workers: None/int
+        number of worker processes. The default None uses the number of CPUs.
+    plot: bool
+        determines whether the plots will be rendered. The default is True.
+    file_path: str
+        filepath of the Evaluation directory
+    articles_path: None/str
+        path of the csv files with the articles of the categories, see write_results
+
+    Returns
+    -------
+    cell_results: list
+        list of dictionaries as returned by evaluate_cell, in the order of the input cells
+    """
+    cells = evaluation_matrix() if cells is None else cells
+    start_time = time.time()
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        cell_results = list(pool.map(evaluate_cell, cells, [file_path] * len(cells)))
+        print(f"Evaluated {len(cells)} cells in {time.time() - start_time:2f} seconds")
+        plot_futures = write_results(cell_results, pool=pool, plot=plot, file_path=file_path,
+                                     articles_path=articles_path)
+        print(f"Results written after {time.time() - start_time:2f} seconds")
+        for future in plot_futures:
+            future.result()
+    print(f"Execution time: {time.time() - start_time:2f} seconds")
+    return cell_results
+
+
+if __name__ == "__main__":
+    run_evaluation_matrix()
@@ -46,7 +46,7 @@ def list_of_dict2json(filename: str, list_of_dicts: list):
     -------
     None
     """
-    json_path = "C:/Users/ubmen/Desktop/BA_Prog/Evaluation/GoldStandardFiles/JSONFiles/"
+    json_path = "C:/Users/ubmen/Desktop/BA_Prog/Evaluation/GoldStandardFiles/JSONFIles/"
     filename += ".json"
     with open(os.path.join(json_path, filename), 'w', encoding="utf-8-sig") as f:
         for file in list_of_dicts:
@@ -0,0 +1,213 @@
+import numpy as np
+
+
+class MetricKernel:
+    """
+    Class which computes precision, recall, F1 score and exact match for all entities of an evaluation set in one
+    pass. The joint system/gold lists are integer-encoded once, match flags and gold set sizes are stored as NumPy arrays
+    and the per-entity counts are aggregated with np.bincount.
+
+    The scores are identical to the ones of entity_precision, entity_recall, entity_f1_score and entity_exact_match in
+    evaluate_answers.py, including the skip of "nan" gold answers and the rounding to one decimal.
+
+    Attributes
+    -------------
+    entities: list
+        Names of the entities in the order of the input list
+    vocabulary: dict
+        Mapping of every system and gold answer string to its integer code
+
+    Methods
+    ------------------------
+    entity_scores(metric_type)
+        returns a NumPy array with the metric score of every entity
+    entity_score_tuples(metric_type)
+        returns a list of (entity, score) tuples in the format of the entity_* functions of evaluate_answers.py
+    macro_average(metric_type)
+        returns the macro-averaged score of a metric
+    micro_average(metric_type)
+        returns the micro-averaged score of a metric
+    """
+    valid_metrics = ["precision", "recall", "f1", "exact match"]
+
+    def __init__(self, entity_system_gold_tuple_list: list, nan_answer="nan"):
+        """
+        init method of the class, encodes the input list and computes all counts
+
+        Parameters
+        ----------
+        entity_system_gold_tuple_list: list
+            List of tuples as returned by entity_joint_system_gold_lists, where the 0th element is the entity name and
+            the 1st element is a list of (system_answer, [gold_standard_answer(s)]) tuples
+        nan_answer: str
+            Gold standard answer that marks a property without gold answer. The default is "nan".
+        """
+        self.entities = [tup[0] for tup in entity_system_gold_tuple_list]
+        self.vocabulary = {}
+        self._nan_code = self._encode(nan_answer)
+        entity_index = []
+        answer_codes = []
+        gold_codes = []
+        gold_sizes = []
+        for i, (entity, joint_system_gold_list) in enumerate(entity_system_gold_tuple_list):
+            for ans in joint_system_gold_list:
+                if len(ans[1]) == 0:
+                    raise ValueError(f"Empty gold standard answer list for entity {entity}")
+                entity_index.append(i)
+                answer_codes.append(self._encode(ans[0]))
+                gold_codes.extend(self._encode(gold) for gold in ans[1])
+                gold_sizes.append(len(ans[1]))
+        self.entity_index = np.array(entity_index, dtype=np.int64)
+        self.answer_codes = np.array(answer_codes, dtype=np.int64)
+        self.gold_codes = np.array(gold_codes, dtype=np.int64)
+        self.gold_sizes = np.array(gold_sizes, dtype=np.int64)
+        self._count()
+
+    def _encode(self, answer: str):
+        """
+        returns the integer code of an answer string, new strings get the next free code
+        """
+        return self.vocabulary.setdefault(answer, len(self.vocabulary))
+
+    def _count(self):
+        """
+        computes the match flags and the true positive, false positive, false negative and exact match counts of
+        every entity
+        """
+        num_entities = len(self.entities)
+        gold_offsets = np.zeros(len(self.gold_sizes), dtype=np.int64)
+        np.cumsum(self.gold_sizes[:-1], out=gold_offsets[1:])
+        # an answer is a match if its code equals any code of the gold set of its row
+        answer_per_gold = np.repeat(self.answer_codes, self.gold_sizes)
+        if len(self.answer_codes) > 0:
+            self.match_flags = np.logical_or.reduceat(answer_per_gold == self.gold_codes, gold_offsets)
+        else:
+            self.match_flags = np.zeros(0, dtype=bool)
+        valid = self.gold_codes[gold_offsets] != self._nan_code if len(gold_offsets) > 0 else np.zeros(0, dtype=bool)
+        valid_matches = valid & self.match_flags
+        valid_misses = valid & ~self.match_flags
+        # for a match, the remaining gold answers are false negatives, for a miss all gold answers are
+        false_negatives = np.where(valid_matches, self.gold_sizes - 1, 0) + np.where(valid_misses, self.gold_sizes, 0)
+        self.true_positives = np.bincount(self.entity_index, weights=valid_matches, minlength=num_entities)
+        self.false_positives = np.bincount(self.entity_index, weights=valid_misses, minlength=num_entities)
+        self.false_negatives = np.bincount(self.entity_index, weights=false_negatives, minlength=num_entities)
+        self.exact_matches = np.bincount(self.entity_index, weights=self.match_flags, minlength=num_entities)
+        self.answer_counts = np.bincount(self.entity_index, minlength=num_entities).astype(np.float64)
+
+    @staticmethod
+    def _round(scores: np.ndarray):
+        """
+        rounds every score to one decimal with Python's round, as np.round can differ for halfway values
+        """
+        return np.array([round(score, 1) for score in scores.tolist()], dtype=np.float64)
+
+    @staticmethod
+    def _f1(precision: np.ndarray, recall: np.ndarray):
+        """
+        computes the f1 score from (already rounded) precision and recall scores, 0.0 where both are 0.0
+        """
+        counter = precision * recall
+        denom = precision + recall
+        f1 = np.zeros(len(denom), dtype=np.float64)
+        nonzero = denom != 0
+        f1[nonzero] = 2 * (counter[nonzero] / denom[nonzero])
+        f1 = MetricKernel._round(f1)
+        f1[~nonzero] = 0.0
+        return f1
+
+    def _check_metric(self, metric_type: str):
+        metric_type = metric_type.lower()
+        if metric_type not in self.valid_metrics:
+            raise ValueError("Incorrect metric type")
+        return metric_type
+
+    def entity_scores(self, metric_type: str):
+        """
+        computes the score of the input metric for every entity
+
+        Parameters
+        ----------
+        metric_type: str
+            the desired metric type, can be "precision", "recall", "f1", "exact match"
+
+        Returns
+        -------
+        scores: np.ndarray
+            Array with the metric score of every entity, in the order of self.entities. Raises a ZeroDivisionError
+            for precision/recall/f1 if an entity has no gold answer other than "nan", just like entity_precision.
+        """
+        metric_type = self._check_metric(metric_type)
+        if metric_type == "exact match":
+            return self._round(self.exact_matches / self.answer_counts * 100)
+        precision_denom = self.true_positives + self.false_positives
+        recall_denom = self.true_positives + self.false_negatives
+        if np.any(precision_denom == 0) or np.any(recall_denom == 0):
+            raise ZeroDivisionError("division by zero")
+        precision = self._round(self.true_positives / precision_denom * 100)
+        recall = self._round(self.true_positives / recall_denom * 100)
+        if metric_type == "precision":
+            return precision
+        elif metric_type == "recall":
+            return recall
+        return self._f1(precision, recall)
+
+    def entity_score_tuples(self, metric_type: str):
+        """
+        returns the entity scores for the input metric as a list of (entity_name, score) tuples
+
+        Parameters
+        ----------
+        metric_type: str
+            the desired metric type, can be "precision", "recall", "f1", "exact match"
+
+        Returns
+        -------
+        entity_score_tuple_list: list
+            list of tuples where the 0th element is the entity name and the 1st element is its score
+        """
+        return list(zip(self.entities, self.entity_scores(metric_type).tolist()))
+
+    def macro_average(self, metric_type: str):
+        """
+        computes the macro-averaged score (mean of the entity scores) of the input metric, same as
+        get_avg_metric_score
+
+        Parameters
+        ----------
+        metric_type: str
+            the desired metric type, can be "precision", "recall", "f1", "exact match"
+
+        Returns
+        -------
+        avg_metric_score: float
+            the macro-averaged score for the input metric
+        """
+        score_only_list = self.entity_scores(metric_type).tolist()
+        return round((sum(score_only_list) / len(score_only_list)), 1)
+
+    def micro_average(self, metric_type: str):
+        """
+        computes the micro-averaged score of the input metric, i.e. the metric computed on the counts of all entities
+        pooled together
+
+        Parameters
+        ----------
+        metric_type: str
+            the desired metric type, can be "precision", "recall", "f1", "exact match"
+
+        Returns
+        -------
+        micro_score: float
+            the micro-averaged score for the input metric
+        """
+        metric_type = self._check_metric(metric_type)
+        true_positives = self.true_positives.sum()
+        if metric_type == "exact match":
+            return round(float(self.exact_matches.sum() / self.answer_counts.sum() * 100), 1)
+        precision = round(float(true_positives / (true_positives + self.false_positives.sum()) * 100), 1)
+        recall = round(float(true_positives / (true_positives + self.false_negatives.sum()) * 100), 1)
+        if metric_type == "precision":
+            return precision
+        elif metric_type == "recall":
+            return recall
+        return float(self._f1(np.array([precision]), np.array([recall]))[0])
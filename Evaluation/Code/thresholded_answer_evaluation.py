@@ -242,7 +242,7 @@ def thresholded_entity_score_tuple_list_2_txt(entity_score_tuple_list: list, fil
     entity_score_tuple_list.sort(key=lambda tup: tup[1], reverse=True)
     if question_type == "BL":
         if entity_position == "SP":
-            with open(os.path.join(filename, path), "w", encoding="utf-8") as f:
+            with open(path, "w", encoding="utf-8") as f:
                 f.write(f"{metric_type} results for Subject Position with Baseline questions "
                         f" with a threshold of {threshold} for answer scores - (e, r, ?): ")
                 f.write("\n\n")
@@ -253,7 +253,7 @@ def thresholded_entity_score_tuple_list_2_txt(entity_score_tuple_list: list, fil
                     f.write(f"Average {metric_type} score: {avg_score}")
                 f.close()
         elif entity_position == "OP":
-            with open(os.path.join(filename, path), "w", encoding="utf-8") as f:
+            with open(path, "w", encoding="utf-8") as f:
                 f.write(f"{metric_type} results for Object Position with Baseline questions"
                         f" with a threshold of {threshold} for answer scores - (?, r, e): ")
                 f.write("\n\n")
@@ -265,7 +265,7 @@ def thresholded_entity_score_tuple_list_2_txt(entity_score_tuple_list: list, fil
                 f.close()
     elif question_type == "AG":
         if entity_position == "SP":
-            with open(os.path.join(filename, path), "w", encoding="utf-8") as f:
+            with open(path, "w", encoding="utf-8") as f:
                 f.write(f"{metric_type} results for Subject Position with Translation-Based questions"
                         f" with a threshold of {threshold} for answer scores - (e, r, ?): ")
                 f.write("\n\n")
@@ -276,7 +276,7 @@ def thresholded_entity_score_tuple_list_2_txt(entity_score_tuple_list: list, fil
                     f.write(f"Average {metric_type} score: {avg_score}")
                 f.close()
         elif entity_position == "OP":
-            with open(os.path.join(filename, path), "w", encoding="utf-8") as f:
+            with open(path, "w", encoding="utf-8") as f:
                 f.write(
                     f"{metric_type} results for Object Position with Translation-Based questions"
                     f" with a threshold of {threshold} for answer scores - (?, r, e): ")
@@ -289,7 +289,7 @@ def thresholded_entity_score_tuple_list_2_txt(entity_score_tuple_list: list, fil
                 f.close()
     elif question_type == "NL":
         if entity_position == "SP":
-            with open(os.path.join(filename, path), "w", encoding="utf-8") as f:
+            with open(path, "w", encoding="utf-8") as f:
                 f.write(
                     f"{metric_type} results for Subject Position with Human-Generated questions"
                     f" with a threshold of {threshold} for answer scores - (e, r, ?): ")
@@ -301,7 +301,7 @@ def thresholded_entity_score_tuple_list_2_txt(entity_score_tuple_list: list, fil
                     f.write(f"Average {metric_type} score: {avg_score}")
                 f.close()
         elif entity_position == "OP":
-            with open(os.path.join(filename, path), "w", encoding="utf-8") as f:
+            with open(path, "w", encoding="utf-8") as f:
                 f.write(
                     f"{metric_type} results for Object Position with Human-Generated questions"
                     f" with a threshold of {threshold} for answer scores - (?, r, e): ")
@@ -370,7 +370,7 @@ def threshold_metrics_to_csv(bl_list: list, ag_list: list, nl_list: list, metric
     filename = metric + "Threshold" + str(threshold).replace(".", "") + entity_position
     if to_excel is True:
         filename += ".xlsx"
-        entity_score_df.to_excel(os.path.join(path, filename), index=False, encoding="utf-ß-sig")
+        entity_score_df.to_excel(os.path.join(path, filename), index=False)
     else:
         filename += ".csv"
         entity_score_df.to_csv(os.path.join(path, filename), index=False, encoding="utf-8-sig")
@@ -0,0 +1,439 @@
+# -*- coding: utf-8 -*-
+"""
+This Python file provides the central artifact resolver of the thesis, i.e. the root directory of the data and the
+layout of the files of all stages (category, entity position and question type -> file):
+
+    * ArtifactResolver returns the full path of every file of the stages relative to its root directory
+    * Artifact is a handle of a file which is only loaded on its first use and cached until the file changes (size or
+      modification time), the handles are shared per resolver, s.t. a file is loaded at most once per process
+    * default_resolver returns the shared resolver of the process
+
+The root directory is the repository. On another machine (e.g. the cluster) it can be set with the environment
+variable BA_PROG_ROOT. Modules which get their files from the resolver do no work on import, the data is only read
+when a function is called.
+
+The layout is the one of the repository, including the names which were spelled differently by hand (e.g.
+"JSONFIles"). ArtifactResolver.missing_files checks that every file of the layout exists; the files which are built
+from the Wikipedia dump and the Person results are too large for the repository and are only checked with
+include_external=True (python artifacts.py --external).
+
+Usage (from the repository root):
+    python Pipeline/Code/artifacts.py
+"""
+
+import os
+import sys
+import ast
+import json
+import pandas as pd
+
+repository_path = os.path.dirname(os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+# the stages are imported as packages of the repository root (e.g. QuestionGeneration.Code), also by the scripts of
+# Pipeline/Code, which are run from the repository root as files
+if repository_path not in sys.path:
+    sys.path.append(repository_path)
+root_variable = "BA_PROG_ROOT"
+category_list = ["Person", "Building", "Disease", "History", "Literature", "Magazine", "Newspaper", "Organization",
+                 "Park", "School", "Ship"]
+# names of the categories in the CSV files of DataExploration, the Wiki TXT files and the result files
+wiki_names = {"Person": "Persons", "Building": "Buildings", "Disease": "Diseases", "History": "History",
+              "Literature": "Literature", "Magazine": "Magazines", "Newspaper": "Newspapers",
+              "Organization": "Organizations", "Park": "Parks", "School": "Schools", "Ship": "Ships"}
+entity_positions = ["SP", "OP"]
+question_types = ["BL", "AG", "NL"]
+# directories and files of the properties whose names on disk differ from the names of the layout
+property_csv_directories = {"Building": "BuildingPropertiesCSVFIles"}
+property_csv_names = {("Newspaper", "SP"): "NewsPaperPropertiesSP.csv"}
+
+
+def read_tuples(filename: str, encoding="utf-8"):
+    """
+    reads a txt file with one tuple (or list) per line
+    """
+    with open(filename, encoding=encoding) as f:
+        return [ast.literal_eval(line.strip()) for line in f if line.strip()]
+
+
+def read_lines(filename: str, encoding="utf-8-sig"):
+    """
+    reads the stripped lines of a txt file
+    """
+    with open(filename, encoding=encoding) as f:
+        return [line.strip() for line in f]
+
+
+def read_json_lines(filename: str, encoding="utf-8-sig"):
+    """
+    reads a file with one JSON dictionary per line
+    """
+    with open(filename, encoding=encoding) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def read_csv(filename: str, **kwargs):
+    """
+    reads a csv file into a DataFrame, kwargs are passed to pd.read_csv
+    """
+    return pd.read_csv(filename, **kwargs)
+
+
+class Artifact:
+    """
+    Class for a lazily loaded file
+
+    Attributes
+    -------------
+    path: str
+        full path of the file
+    loader: function
+        function which loads the file, is called as loader(path, **kwargs)
+    kwargs: dict
+        further parameters of the loader
+
+    Methods
+    ------------------------
+    exists()
+        checks whether the file exists
+    load()
+        returns the content of the file, loads it on the first call and after it changed
+    invalidate()
+        drops the cached content
+    """
+    def __init__(self, path: str, loader, **kwargs):
+        """
+        init method of the class, doesn't access the file
+
+        Parameters
+        ----------
+        path: str
+            full path of the file
+        loader: function
+            function which loads the file, e.g. read_tuples
+        kwargs:
+            further parameters of the loader, e.g. encoding
+        """
+        self.path = path
+        self.loader = loader
+        self.kwargs = kwargs
+        self._stamp = None
+        self._content = None
+
+    def __repr__(self):
+        return f"Artifact({self.path}, loaded={self._stamp is not None})"
+
+    def exists(self):
+        return os.path.isfile(self.path)
+
+    def load(self):
+        """
+        returns the content of the file. The file is loaded again if its size or modification time changed since the
+        last load.
+
+        Raises
+        ------
+        FileNotFoundError
+            if the file doesn't exist
+        """
+        stat = os.stat(self.path)
+        stamp = (stat.st_size, stat.st_mtime_ns)
+        if stamp != self._stamp:
+            self._content = self.loader(self.path, **self.kwargs)
+            self._stamp = stamp
+        return self._content
+
+    def invalidate(self):
+        self._stamp = None
+        self._content = None
+
+
+class ArtifactResolver:
+    """
+    Class for the layout of the files of all stages
+
+    Attributes
+    -------------
+    root: str
+        root directory of the data
+
+    Methods
+    ------------------------
+    path(*relative_paths)
+        returns a full path below the root directory
+    handle(path, loader, **kwargs)
+        returns the shared Artifact of a file
+    *_file(...)
+        return the full paths of the files of the stages
+    layout_files(include_external)
+        returns the full paths of all files of the layout
+    missing_files(include_external)
+        returns the files of the layout which don't exist
+    wiki_articles(), category_titles(category), entity_texts(category), properties(category, position),
+    questions(category, position, qtype), results(category, position, qtype), gold_standard(position)
+        return the Artifact handles of the files which are loaded by several stages
+    """
+    def __init__(self, root=None):
+        """
+        init method of the class
+
+        Parameters
+        ----------
+        root: None/str
+            root directory of the data. The default None uses the environment variable BA_PROG_ROOT or, if it isn't
+            set, the repository.
+        """
+        self.root = (os.environ.get(root_variable) or repository_path) if root is None else root
+        self._handles = {}
+
+    def __repr__(self):
+        return f"ArtifactResolver({self.root})"
+
+    def path(self, *relative_paths):
+        """
+        returns the full path of a path relative to the root directory, the result ends with "/" if the last relative
+        path does (the existing code concatenates filenames to directories)
+        """
+        return os.path.join(self.root, *relative_paths)
+
+    def handle(self, path: str, loader, **kwargs):
+        """
+        returns the Artifact of a file, one per file, loader and kwargs
+        """
+        key = (path, loader, tuple(sorted(kwargs.items())))
+        if key not in self._handles:
+            self._handles[key] = Artifact(path, loader, **kwargs)
+        return self._handles[key]
+
+    # DataSelection
+    def xml_file(self, filename: str):
+        """
+        returns the full path of an XML file of DataSelection, e.g. "FullDEdisambiguated.xml"
+        """
+        return self.path("DataSelection/XMLFiles/", filename)
+
+    def titles_file(self, filename: str):
+        """
+        returns the full path of a title file of DataSelection, e.g. "OnlyDeArticlesFinal"
+        """
+        return self.path("DataSelection/TXTFiles/", filename)
+
+    # DataExploration
+    def all_articles_file(self, filename: str):
+        """
+        returns the full path of a file in DataExploration/CSVFiles/AllArticles, e.g. "Other.csv"
+        """
+        return self.path("DataExploration/CSVFiles/AllArticles/", filename)
+
+    def dbpedia_entry_file(self, exists=True, extension=".csv"):
+        """
+        returns the full path of the file with the articles with (exists=True) or without a German DBpedia entry
+        """
+        if exists is True:
+            return self.path("DataExploration/CSVFiles/DBpediaEntryExists/DBpedia_de_exists" + extension)
+        return self.path("DataExploration/CSVFiles/NoDBpediaEntry/DBpedia_de_no_entry" + extension)
+
+    def category_csv_file(self, category: str):
+        """
+        returns the full path of the CSV file with the entities (titles) of a category
+        """
+        if category == "Person":
+            return self.all_articles_file("Persons.csv")
+        return self.all_articles_file("OtherDetailed/" + wiki_names[category] + ".csv")
+
+    # TripleExtraction
+    def text_path(self):
+        """
+        returns the directory of the Wikipedia texts of the categories (PersonsWikiTXT and OtherWikiTXT)
+        """
+        return self.path("TripleExtraction/")
+
+    def parsed_wiki_file(self):
+        """
+        returns the full path of the parsed Wikipedia dump, input of split_wiki_xml.py (next to its ParsingDetails)
+        """
+        return self.path("TripleExtraction/PreprocessedTXTFiles/FullWikiTXT/ParsedWikiXMLFile.txt")
+
+    def split_wiki_file(self):
+        """
+        returns the full path of the split Wiki TXT file with the (entity, text) tuples of all articles
+        """
+        return self.path("TripleExtraction/PreprocessedTXTFiles/FullWikiTXT/FullWikiTXTsplit.txt")
+
+    def text_file(self, category: str, persons_file_num=None):
+        """
+        returns the full path of the (entity, text) tuple file of a category, as written by get_wiki_texts.py. For
+        "Person", persons_file_num selects one of the chunked files instead of the full file.
+        """
+        if category == "Person":
+            filename = "PersonsFullWikiTXT.txt" if persons_file_num is None \
+                else "PersonsWikiTXT" + str(persons_file_num) + ".txt"
+            return os.path.join(self.text_path(), "PersonsWikiTXT/", filename)
+        return os.path.join(self.text_path(), "OtherWikiTXT/" + wiki_names[category] + "WikiTXT/"
+                            + wiki_names[category] + "WikiTXT.txt")
+
+    def result_file(self, category: str, entity_position: str, question_type: str, extension=".json",
+                    persons_file_num=None):
+        """
+        returns the full path of the result file of a category, entity position and question type in the layout of
+        the evaluation (see result_json_file of evaluate_answer_scores.py). For "Person", persons_file_num selects the
+        result file of one of the chunked text files as written by TripleExtractor.result_file, the evaluation reads
+        the merged ("full") file.
+        """
+        name = wiki_names[category]
+        if category == "Person" and persons_file_num is not None:
+            return self.path("TripleExtraction/Results/PersonsResults/", "PersonsResults" + entity_position
+                             + "withQuestions" + question_type + str(persons_file_num) + extension)
+        if category == "Person":
+            return self.path("TripleExtraction/Results/PersonsResults/PersonsResultsQuestions" + question_type + "/",
+                             "PersonsResults" + entity_position + "withQuestions" + question_type + "full" + extension)
+        return self.path("TripleExtraction/Results/OtherResults/" + name + "Results/" + name + "ResultsQuestions"
+                         + question_type + "/", name + "Results" + entity_position + "withQuestions" + question_type
+                         + extension)
+
+    # PropertyExtraction
+    def property_csv_file(self, category: str, entity_position: str):
+        """
+        returns the full path of the CSV file of the DBpedia properties of a category and entity position
+        """
+        if category == "Person":
+            position_name = "Subject" if entity_position == "SP" else "Object"
+            return self.path("PropertyExtraction/Properties/PersonProperties/PersonPropertiesCSVFiles/",
+                             "PersonProperties" + position_name + ".csv")
+        directory = property_csv_directories.get(category, category + "PropertiesCSVFiles")
+        filename = property_csv_names.get((category, entity_position),
+                                          category + "Properties" + entity_position + ".csv")
+        return self.path("PropertyExtraction/Properties/OtherProperties/" + category + "Properties/" + directory + "/",
+                         filename)
+
+    def property_txt_path(self, category: str):
+        """
+        returns the directory of the property txt files of a category
+        """
+        if category == "Person":
+            return self.path("PropertyExtraction/Properties/PersonProperties/PersonPropertiesTXTFiles/")
+        return self.path("PropertyExtraction/Properties/OtherProperties/" + category + "Properties/" + category
+                         + "PropertiesTXTFiles/")
+
+    @staticmethod
+    def property_filenames(category: str, entity_position: str):
+        """
+        returns the filenames of the properties without German label, with German label and of all properties
+        """
+        if category == "Person":
+            return ("PersonNoTranslationProperties" + entity_position + ".txt",
+                    "PersonTranslationExists" + entity_position + ".txt",
+                    "PersonTotalProperties" + entity_position + ".txt")
+        return (category + "PropertiesNt" + entity_position + ".txt",
+                category + "PropertiesExists" + entity_position + ".txt",
+                category + "TotalProperties" + entity_position + ".txt")
+
+    def property_file(self, category: str, entity_position: str):
+        """
+        returns the full path of the file with all (German, English) properties of a category and entity position
+        """
+        return os.path.join(self.property_txt_path(category), self.property_filenames(category, entity_position)[2])
+
+    # QuestionGeneration
+    def question_file(self, category: str, entity_position: str, question_type: str):
+        """
+        returns the full path of a question file, see question_file of question_engine.py
+        """
+        from QuestionGeneration.Code.question_engine import question_file
+        return question_file(category, entity_position, question_type, path=self.path("QuestionGeneration/"))
+
+    # Evaluation
+    def evaluation_path(self):
+        """
+        returns the Evaluation directory (with "/", the evaluation concatenates the filenames)
+        """
+        return self.path("Evaluation/")
+
+    def gold_standard_file(self, entity_position: str):
+        """
+        returns the full path of the JSON gold standard file of an entity position
+        """
+        return self.path("Evaluation/GoldStandardFiles/JSONFIles/GoldStandard" + entity_position + ".json")
+
+    def eval_set_file(self, entity_position: str, question_type: str):
+        """
+        returns the full path of the evaluation set of an entity position and question type, see load_json_dicts
+        """
+        return self.path("Evaluation/EvalSetFiles/Questions" + question_type + "/EvalSet" + entity_position
+                         + question_type + ".json")
+
+    def layout_files(self, include_external=False):
+        """
+        returns the full paths of all files of the layout: the inputs of the pipeline and the files of the stages of
+        all categories, entity positions and question types. With include_external, also the files which aren't part
+        of the repository (the Wikipedia dump, the files built from it by split_wiki_xml.py and the Person results).
+        """
+        files = [self.titles_file("OnlyDeArticlesFinal"), self.titles_file("LanglinkDeArticlesFinal"),
+                 self.dbpedia_entry_file(True), self.dbpedia_entry_file(False)]
+        if include_external is True:
+            files += [self.xml_file("FullDEdisambiguated.xml"), self.xml_file("OnlyDeArticlesFinal.xml"),
+                      self.parsed_wiki_file(), self.split_wiki_file()]
+        for category in category_list:
+            files += [self.category_csv_file(category), self.text_file(category)]
+            if category == "Person":
+                files += [self.text_file(category, persons_file_num) for persons_file_num in [1, 2, 3]]
+            for entity_position in entity_positions:
+                files.append(self.property_csv_file(category, entity_position))
+                files += [os.path.join(self.property_txt_path(category), filename)
+                          for filename in self.property_filenames(category, entity_position)]
+                files += [self.question_file(category, entity_position, question_type)
+                          for question_type in question_types]
+                if category != "Person" or include_external is True:
+                    files += [self.result_file(category, entity_position, question_type)
+                              for question_type in question_types]
+        for entity_position in entity_positions:
+            files.append(self.gold_standard_file(entity_position))
+            files += [self.eval_set_file(entity_position, question_type) for question_type in question_types]
+        return files
+
+    def missing_files(self, include_external=False):
+        """
+        returns the files of the layout (see layout_files) which don't exist below the root directory
+        """
+        return [filename for filename in self.layout_files(include_external) if not os.path.isfile(filename)]
+
+    # handles of the files which are loaded by several stages
+    def wiki_articles(self):
+        return self.handle(self.split_wiki_file(), read_tuples)
+
+    def category_titles(self, category: str):
+        return self.handle(self.category_csv_file(category), read_csv)
+
+    def entity_texts(self, category: str, persons_file_num=None):
+        return self.handle(self.text_file(category, persons_file_num), read_tuples)
+
+    def properties(self, category: str, entity_position: str):
+        return self.handle(self.property_file(category, entity_position), read_tuples, encoding="utf-8-sig")
+
+    def questions(self, category: str, entity_position: str, question_type: str):
+        return self.handle(self.question_file(category, entity_position, question_type), read_lines)
+
+    def results(self, category: str, entity_position: str, question_type: str):
+        return self.handle(self.result_file(category, entity_position, question_type), read_json_lines)
+
+    def gold_standard(self, entity_position: str):
+        return self.handle(self.gold_standard_file(entity_position), read_json_lines)
+
+
+_default_resolver = None
+
+
+def default_resolver():
+    """
+    returns the resolver shared within the process, it's created on the first call
+    """
+    global _default_resolver
+    if _default_resolver is None:
+        _default_resolver = ArtifactResolver()
+    return _default_resolver
+
+
+if __name__ == "__main__":
+    # checks the layout of the repository (or of BA_PROG_ROOT), --external also checks the files outside of it
+    check_external = "--external" in sys.argv[1:]
+    missing = default_resolver().missing_files(include_external=check_external)
+    print("\n".join(missing) if missing else "All files of the layout exist")
+    sys.exit(1 if missing else 0)
@@ -0,0 +1,569 @@
+# -*- coding: utf-8 -*-
+"""
+This Python file provides an incremental orchestrator for the stages of the thesis. Every stage is declared as a set of
+tasks with their input and output files (or directories), the pipeline of the thesis is declared in pipeline_tasks.py:
+
+    * the key of a task is the sha256 hash of its function (name and source), its arguments, the source files of the
+      code it runs and the contents of its inputs. A task whose key has a record in the store and whose outputs are
+      still on disk isn't executed again.
+    * the outputs of every executed task are stored in a local content-addressed artifact store (objects/<sha256>), s.t.
+      outputs which were deleted or overwritten by another run are restored from the store instead of being recomputed
+    * a task depends on the tasks which write its inputs, tasks whose dependencies are done run in parallel on a
+      process pool, e.g. the branches of the eleven categories
+    * if a task is executed again but writes the same outputs as before, the keys of its dependents don't change and
+      they aren't executed either (early cutoff)
+
+The hashes of the files are cached by size and modification time (hash_cache.json), s.t. a run without changes only
+calls os.stat on the inputs.
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import fnmatch
+import hashlib
+import inspect
+import subprocess
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+import pandas as pd
+
+repository_path = os.path.dirname(os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+# statuses of tasks which didn't produce their outputs, their dependents are skipped
+failed_statuses = ["failed", "missing input", "skipped"]
+
+
+def file_digest(filename: str, chunk_size=1 << 20):
+    """
+    returns the sha256 hash of the content of a file
+    """
+    sha = hashlib.sha256()
+    with open(filename, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+
+def list_files(path: str):
+    """
+    returns the path itself if it's a file, all files below it (sorted) if it's a directory and an empty list otherwise
+    """
+    if os.path.isfile(path):
+        return [path]
+    files = []
+    for directory, _, filenames in os.walk(path):
+        files.extend(os.path.join(directory, filename) for filename in filenames)
+    return sorted(files)
+
+
+def contains(directory: str, path: str):
+    """
+    checks whether a path is equal to or lies within a directory
+    """
+    return path == directory or path.startswith(directory.rstrip(os.sep) + os.sep)
+
+
+class ArtifactStore:
+    """
+    Class for the local content-addressed store of the task outputs
+
+    Attributes
+    -------------
+    root: str
+        directory of the store with the subdirectories objects (file contents, named by their sha256 hash) and tasks
+        (one json record per task key) and the hash cache
+    hash_cache: dict
+        mapping of file to [size, modification time in ns, sha256 hash]
+
+    Methods
+    ------------------------
+    digest(path)
+        returns the content hash of a file or directory
+    put(filename)
+        stores a file, returns its hash
+    restore(digest, filename)
+        writes a stored file to filename
+    load_record(key), save_record(key, record)
+        reads/writes the record of a task key
+    save()
+        writes the hash cache
+    """
+    def __init__(self, root: str):
+        """
+        init method of the class
+
+        Parameters
+        ----------
+        root: str
+            directory of the store, is created if it doesn't exist
+        """
+        self.root = root
+        os.makedirs(os.path.join(root, "objects"), exist_ok=True)
+        os.makedirs(os.path.join(root, "tasks"), exist_ok=True)
+        self._cache_file = os.path.join(root, "hash_cache.json")
+        self.hash_cache = {}
+        if os.path.isfile(self._cache_file):
+            with open(self._cache_file, encoding="utf-8") as f:
+                self.hash_cache = json.load(f)
+
+    def object_file(self, digest: str):
+        """
+        returns the path of a stored file
+        """
+        return os.path.join(self.root, "objects", digest[:2], digest)
+
+    def file_hash(self, filename: str):
+        """
+        returns the sha256 hash of a file, the file is only read if its size or modification time changed
+        """
+        filename = os.path.abspath(filename)
+        stat = os.stat(filename)
+        cached = self.hash_cache.get(filename)
+        if cached is not None and cached[0] == stat.st_size and cached[1] == stat.st_mtime_ns:
+            return cached[2]
+        digest = file_digest(filename)
+        self.hash_cache[filename] = [stat.st_size, stat.st_mtime_ns, digest]
+        return digest
+
+    def digest(self, path: str):
+        """
+        returns the content hash of a file or of a directory (hash of the relative names and hashes of all its files),
+        None if the path doesn't exist
+        """
+        if os.path.isfile(path):
+            return self.file_hash(path)
+        if os.path.isdir(path):
+            entries = [os.path.relpath(filename, path).replace(os.sep, "/") + " " + self.file_hash(filename)
+                       for filename in list_files(path)]
+            return hashlib.sha256("\n".join(entries).encode("utf-8")).hexdigest()
+        return None
+
+    def has(self, digest: str):
+        """
+        checks whether a file with the hash is stored
+        """
+        return os.path.isfile(self.object_file(digest))
+
+    def put(self, filename: str):
+        """
+        stores a file under its hash (files with the same content are only stored once)
+
+        Returns
+        -------
+        digest: str
+            sha256 hash of the file
+        """
+        digest = self.file_hash(filename)
+        object_file = self.object_file(digest)
+        if not os.path.isfile(object_file):
+            os.makedirs(os.path.dirname(object_file), exist_ok=True)
+            shutil.copyfile(filename, object_file + ".tmp")
+            os.replace(object_file + ".tmp", object_file)
+        return digest
+
+    def restore(self, digest: str, filename: str):
+        """
+        writes the stored file with the hash to filename (atomically, temporary file + os.replace)
+        """
+        if os.path.dirname(filename):
+            os.makedirs(os.path.dirname(filename), exist_ok=True)
+        shutil.copyfile(self.object_file(digest), filename + ".tmp")
+        os.replace(filename + ".tmp", filename)
+        stat = os.stat(filename)
+        self.hash_cache[os.path.abspath(filename)] = [stat.st_size, stat.st_mtime_ns, digest]
+
+    def load_record(self, key: str):
+        """
+        returns the record of a task key, None if the key wasn't executed yet
+        """
+        record_file = os.path.join(self.root, "tasks", key + ".json")
+        if not os.path.isfile(record_file):
+            return None
+        with open(record_file, encoding="utf-8") as f:
+            return json.load(f)
+
+    def save_record(self, key: str, record: dict):
+        """
+        writes the record of a task key, i.e. the hashes of its output files
+        """
+        record_file = os.path.join(self.root, "tasks", key + ".json")
+        with open(record_file + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(record, f, indent=2, ensure_ascii=False)
+        os.replace(record_file + ".tmp", record_file)
+
+    def save(self):
+        """
+        writes the hash cache
+        """
+        with open(self._cache_file + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(self.hash_cache, f)
+        os.replace(self._cache_file + ".tmp", self._cache_file)
+
+
+class Task:
+    """
+    Class for a task of the pipeline, i.e. a call of a function with fixed arguments, which reads its inputs and writes
+    its outputs
+
+    Attributes
+    -------------
+    name: str
+        unique name of the task, e.g. "properties/Building/SP"
+    function: function
+        module-level function (it's executed in a worker process), is called as function(**kwargs)
+    kwargs: dict
+        arguments of the function, must be json serializable
+    inputs: list
+        files and directories the function reads
+    outputs: list
+        files and directories the function writes
+    code: list
+        source files of the code the function runs, their contents are part of the key
+    cwd: None/str
+        working directory of the function, for code with relative paths
+
+    Methods
+    ------------------------
+    key(store)
+        returns the content hash of the task
+    """
+    def __init__(self, name: str, function, kwargs=None, inputs=None, outputs=None, code=None, cwd=None):
+        """
+        init method of the class
+
+        Parameters
+        ----------
+        name: str
+            unique name of the task
+        function: function
+            module-level function which executes the task
+        kwargs: None/dict
+            arguments of the function. The default None calls the function without arguments.
+        inputs: None/list
+            files and directories the function reads. The default None means no inputs.
+        outputs: None/list
+            files and directories the function writes. The default None means no outputs.
+        code: None/list
+            source files of the code the function runs (the source of the function itself is always part of the key).
+            The default None means no further files.
+        cwd: None/str
+            working directory of the function. The default None keeps the working directory of the worker.
+        """
+        self.name = name
+        self.function = function
+        self.kwargs = {} if kwargs is None else kwargs
+        self.inputs = [os.path.normpath(path) for path in (inputs or [])]
+        self.outputs = [os.path.normpath(path) for path in (outputs or [])]
+        self.code = [os.path.normpath(path) for path in (code or [])]
+        self.cwd = cwd
+
+    def __repr__(self):
+        return f"Task({self.name})"
+
+    def key(self, store: ArtifactStore):
+        """
+        returns the sha256 hash of the function, its arguments, its code and the contents of its inputs
+
+        Raises
+        ------
+        FileNotFoundError
+            if an input or a code file doesn't exist
+        """
+        # the qualified name without the module, s.t. the key is the same if the module is run as __main__
+        definition = {"function": self.function.__qualname__,
+                      "source": hashlib.sha256(inspect.getsource(self.function).encode("utf-8")).hexdigest(),
+                      "kwargs": json.dumps(self.kwargs, sort_keys=True, default=repr), "inputs": {}, "code": {}}
+        for field, paths in [("inputs", self.inputs), ("code", self.code)]:
+            for path in paths:
+                digest = store.digest(path)
+                if digest is None:
+                    raise FileNotFoundError(f"{field[:-1]} {path} doesn't exist")
+                definition[field][path] = digest
+        return hashlib.sha256(json.dumps(definition, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def execute_task(function, kwargs: dict, cwd=None):
+    """
+    executes the function of a task in a worker process
+
+    Returns
+    -------
+    seconds: float
+        wall time of the function
+    """
+    previous_cwd = os.getcwd()
+    start_time = time.time()
+    try:
+        if cwd is not None:
+            os.chdir(cwd)
+        function(**kwargs)
+    finally:
+        os.chdir(previous_cwd)
+    return time.time() - start_time
+
+
+def run_script(script: str, arguments=None):
+    """
+    runs one of the module-level scripts of the thesis in its directory (its sibling modules and relative paths are
+    resolved from there), the packages of the other stages are resolved from the repository root and plots are
+    rendered without a window
+    """
+    environment = dict(os.environ, MPLBACKEND="Agg")
+    environment["PYTHONPATH"] = os.pathsep.join([repository_path] + ([environment["PYTHONPATH"]]
+                                                                     if environment.get("PYTHONPATH") else []))
+    subprocess.run([sys.executable, os.path.basename(script)] + list(arguments or []),
+                   cwd=os.path.dirname(os.path.abspath(script)), env=environment, check=True)
+
+
+class Pipeline:
+    """
+    Class for the graph of tasks, the dependencies follow from the input and output paths of the tasks
+
+    Attributes
+    -------------
+    store: ArtifactStore
+        content-addressed store of the outputs
+    tasks: dict
+        mapping of task name to Task, in the order of declaration
+
+    Methods
+    ------------------------
+    add(task)
+        adds a task
+    dependencies(name)
+        returns the names of the tasks which write the inputs of a task
+    select(patterns, upstream)
+        returns the tasks which match the patterns and all tasks they depend on
+    run(targets, max_workers, force, dry_run, verbose, upstream)
+        executes the outdated tasks
+    """
+    def __init__(self, store_path: str):
+        """
+        init method of the class
+
+        Parameters
+        ----------
+        store_path: str
+            directory of the artifact store
+        """
+        self.store = ArtifactStore(store_path)
+        self.tasks = {}
+        self._dependencies = None
+
+    def add(self, task: Task):
+        """
+        adds a task, its outputs mustn't overlap with the outputs of another task
+        """
+        if task.name in self.tasks:
+            raise ValueError(f"Incorrect task name, {task.name} was already declared")
+        for other in self.tasks.values():
+            for output in task.outputs:
+                if any(contains(output, path) or contains(path, output) for path in other.outputs):
+                    raise ValueError(f"Incorrect outputs, {output} of {task.name} is also written by {other.name}")
+        self.tasks[task.name] = task
+        self._dependencies = None
+        return task
+
+    def dependencies(self, name: str):
+        """
+        returns the names of the tasks which write an input of the task (or a file within an input directory)
+        """
+        if self._dependencies is None:
+            self._dependencies = {}
+            for task in self.tasks.values():
+                self._dependencies[task.name] = [other.name for other in self.tasks.values() if other is not task
+                                                 and any(contains(path, output) or contains(output, path)
+                                                         for path in task.inputs for output in other.outputs)]
+        return self._dependencies[name]
+
+    def select(self, patterns=None, upstream=True):
+        """
+        returns the names of the tasks which match one of the patterns (fnmatch, e.g. "extract/Building/*") and of all
+        tasks they depend on, in topological order
+
+        Parameters
+        ----------
+        patterns: None/list
+            patterns of task names. The default None selects all tasks.
+        upstream: bool
+            determines whether the tasks the matching tasks depend on are selected as well. The default is True.
+        """
+        if patterns is None:
+            selected = set(self.tasks)
+        else:
+            selected = {name for name in self.tasks if any(fnmatch.fnmatchcase(name, pattern) for pattern in patterns)}
+            if not selected:
+                raise ValueError("Incorrect targets, no task matches " + ", ".join(patterns))
+        stack = list(selected) if upstream is True else []
+        while stack:
+            for dependency in self.dependencies(stack.pop()):
+                if dependency not in selected:
+                    selected.add(dependency)
+                    stack.append(dependency)
+        order = []
+        visiting = set()
+
+        def visit(name):
+            if name in order:
+                return
+            if name in visiting:
+                raise ValueError(f"Incorrect tasks, {name} depends on itself")
+            visiting.add(name)
+            for dependency in self.dependencies(name):
+                if dependency in selected:
+                    visit(dependency)
+            visiting.remove(name)
+            order.append(name)
+
+        for task_name in self.tasks:
+            if task_name in selected:
+                visit(task_name)
+        return order
+
+    def _outputs_on_disk(self, record: dict):
+        """
+        checks whether all output files of a record exist with their recorded content
+        """
+        for filename, digest in record["outputs"].items():
+            if not os.path.isfile(filename) or self.store.file_hash(filename) != digest:
+                return False
+        return True
+
+    def _check(self, task: Task, force: bool):
+        """
+        computes the key of a task and restores its outputs if the key was already executed
+
+        Returns
+        -------
+        key, status: tuple
+            status is "unchanged", "restored" or None (the task has to be executed)
+        """
+        key = task.key(self.store)
+        record = None if force is True else self.store.load_record(key)
+        if record is None:
+            return key, None
+        if self._outputs_on_disk(record):
+            return key, "unchanged"
+        if all(self.store.has(digest) for digest in record["outputs"].values()):
+            for filename, digest in record["outputs"].items():
+                if not os.path.isfile(filename) or self.store.file_hash(filename) != digest:
+                    self.store.restore(digest, filename)
+            return key, "restored"
+        return key, None
+
+    def _record(self, task: Task, key: str, seconds: float):
+        """
+        stores the outputs of an executed task and writes its record
+        """
+        outputs = {}
+        for output in task.outputs:
+            files = list_files(output)
+            if not files:
+                raise FileNotFoundError(f"output {output} wasn't written")
+            for filename in files:
+                outputs[filename] = self.store.put(filename)
+        self.store.save_record(key, {"task": task.name, "seconds": seconds, "outputs": outputs,
+                                     "created": time.strftime("%Y-%m-%d %H:%M:%S")})
+
+    def run(self, targets=None, max_workers=None, force=False, dry_run=False, verbose=True, upstream=True):
+        """
+        executes the outdated tasks of the targets and of all tasks they depend on. A task is submitted to the pool as
+        soon as all its dependencies are done.
+
+        Parameters
+        ----------
+        targets: None/list
+            patterns of the task names, see select. The default None runs all tasks.
+        max_workers: None/int
+            number of worker processes. The default None uses the number of CPUs.
+        force: bool
+            determines whether the tasks are executed regardless of their records. The default is False.
+        dry_run: bool
+            determines whether the statuses are only determined without executing or restoring anything. Dependents
+            of outdated tasks are "outdated (upstream)", their keys are only known after the upstream tasks ran.
+            The default is False.
+        verbose: bool
+            determines whether the status of every task is printed. The default is True.
+        upstream: bool
+            determines whether the tasks the targets depend on are run as well. With False, the outputs of unselected
+            tasks are used as they are on disk. The default is True.
+
+        Returns
+        -------
+        run_df: pd.DataFrame
+            DataFrame with the status ("unchanged", "restored", "executed", "failed", "missing input", "skipped" or
+            the statuses of the dry run), the seconds and the error of every task
+        """
+        order = self.select(targets, upstream)
+        selected = set(order)
+        rows = {}
+
+        def dependencies(task_name):
+            return [dependency for dependency in self.dependencies(task_name) if dependency in selected]
+
+        if dry_run is True:
+            for name in order:
+                task = self.tasks[name]
+                if any(rows[dependency]["Status"] != "unchanged" for dependency in dependencies(name)):
+                    rows[name] = {"Task": name, "Status": "outdated (upstream)", "Seconds": 0.0, "Error": None}
+                    continue
+                try:
+                    key = task.key(self.store)
+                except FileNotFoundError as error:
+                    rows[name] = {"Task": name, "Status": "missing input", "Seconds": 0.0, "Error": str(error)}
+                    continue
+                record = None if force is True else self.store.load_record(key)
+                status = "outdated" if record is None else "unchanged" if self._outputs_on_disk(record) \
+                    else "restorable" if all(self.store.has(digest) for digest in record["outputs"].values()) \
+                    else "outdated"
+                rows[name] = {"Task": name, "Status": status, "Seconds": 0.0, "Error": None}
+            self.store.save()
+            return pd.DataFrame([rows[name] for name in order])
+
+        start_time = time.time()
+        remaining = list(order)
+        running = {}
+
+        def finish(name, status, seconds=0.0, error=None):
+            rows[name] = {"Task": name, "Status": status, "Seconds": seconds, "Error": error}
+            if verbose is True:
+                print(f"[{len(rows)}/{len(order)}] {name}: {status} ({seconds:.1f} s)"
+                      + ("" if error is None else f" - {error}"))
+
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            while remaining or running:
+                for name in list(remaining):
+                    task_dependencies = dependencies(name)
+                    if any(dependency not in rows for dependency in task_dependencies):
+                        continue
+                    remaining.remove(name)
+                    task = self.tasks[name]
+                    if any(rows[dependency]["Status"] in failed_statuses for dependency in task_dependencies):
+                        finish(name, "skipped", error="upstream task failed")
+                        continue
+                    try:
+                        key, status = self._check(task, force)
+                    except FileNotFoundError as error:
+                        finish(name, "missing input", error=str(error))
+                        continue
+                    if status is not None:
+                        finish(name, status)
+                        continue
+                    future = pool.submit(execute_task, task.function, task.kwargs, task.cwd)
+                    running[future] = (name, key)
+                if not running:
+                    continue
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name, key = running.pop(future)
+                    try:
+                        seconds = future.result()
+                        self._record(self.tasks[name], key, seconds)
+                        finish(name, "executed", seconds)
+                    except Exception as error:
+                        finish(name, "failed", error=f"{type(error).__name__}: {error}")
+        self.store.save()
+        if verbose is True:
+            print(f"Execution time: {time.time() - start_time:2f} seconds")
+        return pd.DataFrame([rows[name] for name in order])
@@ -0,0 +1,410 @@
+# -*- coding: utf-8 -*-
+"""
+This Python file declares the stages of the thesis as tasks of the orchestrator (see orchestrator.py):
+
+    * "select" and "explore/*": the module-level scripts of DataSelection and DataExploration, they query Wikipedia and
+      DBpedia and are only part of the pipeline with online=True. Otherwise their outputs (the title files and the
+      category CSV files) are inputs of the pipeline.
+    * "split": split_wiki_txt of the parsed Wikipedia dump
+    * "texts/<category>": the (entity, text) tuple file of a category
+    * "properties/<category>/<position>": the property files of a category (PropertyHandler + translation)
+    * "questions/<category>/<position>": the generated question files (BL and AG) of the question engine
+    * "extract/<category>/<position>/<question type>": the triple extraction of a category
+    * "evalset/<position>/<question type>": the results of the gold standard entities across all categories
+    * "goldset/<position>": only for a subset of the categories, the gold standard of the entities of the subset
+    * "evaluate": the evaluation matrix of evaluation_runner.py
+
+The evaluation sets and the evaluation of the repository (Evaluation/) cover all categories. A pipeline of a subset
+of the categories writes its evaluation sets, gold standard and evaluation results below Subsets/ of the artifact
+store instead (see subset_path), so it never overwrites the evaluation of all categories.
+
+The branches of the categories are independent of each other, e.g. a changed property CSV file of Building (SP) only
+executes properties/Building/SP, questions/Building/SP, the three extract/Building/SP tasks, the evalset tasks of SP and
+the evaluation again.
+
+Usage (from the repository root):
+    python Pipeline/Code/pipeline_tasks.py --dry-run
+    python Pipeline/Code/pipeline_tasks.py "extract/Building/*" --workers 4
+"""
+
+import os
+import json
+import argparse
+from orchestrator import Pipeline, Task, run_script
+from artifacts import ArtifactResolver, read_tuples, category_list, wiki_names, entity_positions, question_types
+
+repository_path = os.path.dirname(os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+store_path = os.path.join(repository_path, "Pipeline/ArtifactStore/")
+# question types generated by the question engine, NL questions are human-generated and inputs of the pipeline
+generated_question_types = ["BL", "AG"]
+# source files of the code every stage runs, relative to the repository
+stage_code = {"split": ["TripleExtraction/Code/split_wiki_xml.py"],
+              "texts": ["TripleExtraction/Code/get_wiki_texts.py"],
+              "properties": ["PropertyExtraction/Code/property_handler.py",
+                             "PropertyExtraction/Code/translation_service.py"],
+              "questions": ["QuestionGeneration/Code/question_engine.py"],
+              "extract": ["TripleExtraction/Code/triple_extractor_cluster.py", "TripleExtraction/Code/qa_pipeline.py",
+                          "TripleExtraction/Code/question_matrix.py", "TripleExtraction/Code/pair_filter.py",
+                          "TripleExtraction/Code/runtime_settings.py"],
+              "evaluate": ["Evaluation/Code/evaluation_runner.py", "Evaluation/Code/evaluate_answers.py",
+                           "Evaluation/Code/thresholded_answer_evaluation.py", "Evaluation/Code/metric_kernel.py"]}
+
+
+def category_csv_file(category: str, path=repository_path):
+    """
+    returns the full path of the CSV file with the entities of a category
+    """
+    return ArtifactResolver(path).category_csv_file(category)
+
+
+def property_files(category: str, entity_position: str, path=repository_path):
+    """
+    returns the full paths of the property CSV file (DBpedia query) and of the directory of the property txt files
+    of a category, and the filenames of the properties without and with German label and of all properties
+    """
+    resolver = ArtifactResolver(path)
+    return (resolver.property_csv_file(category, entity_position), resolver.property_txt_path(category)) \
+        + resolver.property_filenames(category, entity_position)
+
+
+def result_file(category: str, entity_position: str, question_type: str, path=repository_path):
+    """
+    returns the full path of the JSON result file of a category in the layout of the evaluation
+    """
+    return ArtifactResolver(path).result_file(category, entity_position, question_type)
+
+
+def gold_standard_file(entity_position: str, path=repository_path):
+    """
+    returns the full path of the JSON gold standard file of an entity position
+    """
+    return ArtifactResolver(path).gold_standard_file(entity_position)
+
+
+def subset_path(categories: list, store=store_path):
+    """
+    returns the root directory (in the layout of the repository) of the evaluation of a subset of the categories, or
+    None if the categories are all categories
+    """
+    if set(categories) == set(category_list):
+        return None
+    return os.path.join(store, "Subsets", "-".join(category for category in category_list if category in categories))
+
+
+def eval_set_file(entity_position: str, question_type: str, path=repository_path):
+    """
+    returns the full path of the evaluation set of an entity position and question type, see load_json_dicts
+    """
+    return ArtifactResolver(path).eval_set_file(entity_position, question_type)
+
+
+def split_texts(parsed_file: str, split_file: str):
+    """
+    task of "split", see split_wiki_xml.py
+    """
+    from TripleExtraction.Code.split_wiki_xml import split_wiki_txt
+    split_wiki_txt(parsed_file, split_file)
+
+
+def category_texts(category: str, split_file: str, text_path: str, csv_path: str, output_file: str):
+    """
+    task of "texts/<category>", writes the (entity, text) tuple file of a category, see get_wiki_texts.py
+    """
+    from TripleExtraction.Code.get_wiki_texts import load_wiki_article_list, write_and_save_wiki_texts
+    os.makedirs(os.path.dirname(output_file), exist_ok=True)
+    write_and_save_wiki_texts(wiki_names[category], path=text_path,
+                              wiki_article_list=load_wiki_article_list(split_file), csv_path=csv_path)
+
+
+def category_properties(category: str, csv_file: str, txt_path: str, nt_filename: str, exists_filename: str,
+                        total_filename: str, cache_file: str):
+    """
+    task of "properties/<category>/<position>", partitions the properties of the CSV file into the ones with and
+    without German label and translates the latter (with the translation cache of cache_file), see
+    get_other_properties_german.py
+    """
+    from PropertyExtraction.Code.property_handler import PropertyHandler
+    from PropertyExtraction.Code.translation_service import TranslationService
+    os.makedirs(txt_path, exist_ok=True)
+    handler = PropertyHandler(csv_file, persons=category == "Person")
+    properties_nt, properties_wt = handler.partition_properties()
+    handler.write_property_file(properties_nt, nt_filename, path=txt_path)
+    handler.write_property_file(properties_wt, exists_filename, path=txt_path)
+    handler.full_properties(nt_filename, properties_wt, write2file=True, properties_filename=total_filename,
+                            path=txt_path, translation_service=TranslationService(cache_file=cache_file))
+
+
+def category_questions(category: str, entity_position: str, qtypes: list, property_path: str, question_path: str,
+                       manifest_file: str, cache_file: str):
+    """
+    task of "questions/<category>/<position>", writes the generated question files (with the translation cache of
+    cache_file), see question_engine.py
+    """
+    from QuestionGeneration.Code.question_engine import generate_questions
+    from PropertyExtraction.Code.translation_service import TranslationService
+    # the orchestrator decides whether the files are outdated, the manifest of the engine is per task
+    generate_questions([category], [entity_position], qtypes, force=True,
+                       translation_service=TranslationService(cache_file=cache_file), property_path=property_path,
+                       question_path=question_path, manifest_file=manifest_file)
+
+
+def category_extraction(category: str, entity_position: str, question_type: str, text_filename: str,
+                        question_filename: str, property_filename: str, output_file: str):
+    """
+    task of "extract/<category>/<position>/<question type>", extracts the triples with the runtime settings of the
+    EXTRACTION_* environment variables and writes the JSON result file, see runfile_other.py
+    """
+    from TripleExtraction.Code.triple_extractor_cluster import TripleExtractor, model
+    from TripleExtraction.Code.runtime_settings import run_extraction
+    entity_text_tuples = read_tuples(text_filename)
+    with open(question_filename, encoding="utf-8-sig") as f:
+        questions = [line.strip() for line in f]
+    properties = read_tuples(property_filename, encoding="utf-8-sig")
+    # the extraction builds the question matrix of questions and properties itself, s.t. no QuestionMatrix of another
+    # module object is passed to the workers
+    result_list = run_extraction(TripleExtractor.extract_triples_batched, entity_text_tuples, questions,
+                                 shared_model=model, predicate_list=properties)
+    os.makedirs(os.path.dirname(output_file), exist_ok=True)
+    TripleExtractor(category, entity_position).dict_list2json(result_list, question_type, filename=output_file)
+
+
+def eval_set(gold_file: str, result_files: list, output_file: str):
+    """
+    task of "evalset/<position>/<question type>", writes the results of the gold standard entities (in the order of the
+    gold standard) to the evaluation set
+    """
+    with open(gold_file, encoding="utf-8-sig") as f:
+        gold_entities = [next(iter(json.loads(line))) for line in f if line.strip()]
+    results = {}
+    for filename in result_files:
+        with open(filename, encoding="utf-8-sig") as f:
+            for line in f:
+                if line.strip():
+                    results.update(json.loads(line))
+    os.makedirs(os.path.dirname(output_file), exist_ok=True)
+    with open(output_file, "w", encoding="utf-8-sig") as f:
+        for entity in gold_entities:
+            if entity in results:
+                json.dump({entity: results[entity]}, f, ensure_ascii=False)
+                f.write("\n")
+
+
+def gold_set(gold_file: str, result_files: list, output_file: str):
+    """
+    task of "goldset/<position>", writes the gold standard of the entities in the results (in the order of the gold
+    standard), i.e. the gold standard of the evaluation sets of a subset of the categories
+    """
+    entities = set()
+    for filename in result_files:
+        with open(filename, encoding="utf-8-sig") as f:
+            entities.update(entity for line in f if line.strip() for entity in json.loads(line))
+    os.makedirs(os.path.dirname(output_file), exist_ok=True)
+    with open(gold_file, encoding="utf-8-sig") as f, open(output_file, "w", encoding="utf-8-sig") as out:
+        for line in f:
+            if line.strip() and next(iter(json.loads(line))) in entities:
+                out.write(line.rstrip("\n") + "\n")
+
+
+def evaluate(file_path: str, positions: list, qtypes: list, plot: bool, articles_path=None, layout_path=None):
+    """
+    task of "evaluate", see evaluation_runner.py. With layout_path (the Evaluation directory of the repository), the
+    directories the evaluation writes to are created below file_path first.
+    """
+    from Evaluation.Code.evaluation_runner import evaluation_matrix, run_evaluation_matrix
+    if layout_path is not None:
+        for directory in ["EvalResultsFiles", "CategoryMetricScores"]:
+            for root, _, _ in os.walk(os.path.join(layout_path, directory)):
+                os.makedirs(os.path.join(file_path, os.path.relpath(root, layout_path)), exist_ok=True)
+    run_evaluation_matrix(evaluation_matrix(positions, qtypes), plot=plot, file_path=file_path,
+                          articles_path=articles_path)
+
+
+def build_pipeline(path=repository_path, categories=None, positions=None, qtypes=None, online=False, plot=False,
+                   store=store_path):
+    """
+    declares the tasks of all stages
+
+    Parameters
+    ----------
+    path: str
+        root directory of the data, i.e. the repository
+    categories: None/list
+        categories of the pipeline. The default None uses all eleven categories.
+    positions: None/list
+        entity positions. The default None uses "SP" and "OP".
+    qtypes: None/list
+        question types of the question generation (only "BL" and "AG" are generated), the extraction and the
+        evaluation. The default None uses "BL", "AG" and "NL".
+    online: bool
+        determines whether the scripts of DataSelection and DataExploration (Wikipedia and DBpedia queries) are part
+        of the pipeline. The default is False.
+    plot: bool
+        determines whether the evaluation renders its plots. The default is False.
+    store: str
+        directory of the artifact store, the evaluation of a subset of the categories is written below it (see
+        subset_path)
+
+    Returns
+    -------
+    pipeline: Pipeline
+    """
+    from QuestionGeneration.Code.question_engine import question_file
+    categories = category_list if categories is None else categories
+    positions = entity_positions if positions is None else positions
+    qtypes = question_types if qtypes is None else qtypes
+    for category in categories:
+        if category not in category_list:
+            raise ValueError("Incorrect category, must be one of " + ", ".join(category_list))
+
+    def repo(*relative_paths):
+        return [os.path.join(path, relative_path) for relative_path in relative_paths]
+
+    resolver = ArtifactResolver(path)
+    pipeline = Pipeline(store)
+    if online is True:
+        selection_txt = repo("DataSelection/TXTFiles/OnlyDeArticlesFinal",
+                             "DataSelection/TXTFiles/LanglinkDeArticlesFinal")
+        pipeline.add(Task("select", run_script, {"script": repo("DataSelection/Code/get_final_de_titles.py")[0]},
+                          inputs=[resolver.xml_file("FullDEdisambiguated.xml")], outputs=selection_txt,
+                          code=repo("DataSelection/Code/get_final_de_titles.py",
+                                    "DataSelection/Code/wiki_title_extractor.py")))
+        dbpedia_csv = repo("DataExploration/CSVFiles/DBpediaEntryExists/DBpedia_de_exists.csv",
+                           "DataExploration/CSVFiles/NoDBpediaEntry/DBpedia_de_no_entry.csv")
+        pipeline.add(Task("explore/dbpedia", run_script, {"script": repo("DataExploration/Code/check_DBpedia.py")[0]},
+                          inputs=selection_txt[:1], outputs=dbpedia_csv,
+                          code=repo("DataExploration/Code/check_DBpedia.py")))
+        pipeline.add(Task("explore/categories", run_script,
+                          {"script": repo("DataExploration/Code/get_categories.py")[0]},
+                          inputs=[resolver.xml_file("OnlyDeArticlesFinal.xml")] + dbpedia_csv,
+                          outputs=repo("DataExploration/CSVFiles/AllArticles/Persons.csv",
+                                       "DataExploration/CSVFiles/AllArticles/Other.csv",
+                                       "DataExploration/CSVFiles/AllArticles/DeFullCategoryMappings.csv"),
+                          code=repo("DataExploration/Code/get_categories.py",
+                                    "DataSelection/Code/wiki_title_extractor.py")))
+
+    text_path = resolver.text_path()
+    split_file = resolver.split_wiki_file()
+    parsed_file = resolver.parsed_wiki_file()
+    pipeline.add(Task("split", split_texts, {"parsed_file": parsed_file, "split_file": split_file},
+                      inputs=[parsed_file], outputs=[split_file],
+                      code=repo(*stage_code["split"])))
+
+    property_path = os.path.join(path, "PropertyExtraction/Properties/")
+    question_path = os.path.join(path, "QuestionGeneration/")
+    # the translation cache of the properties and questions tasks belongs to the store, not to the default cache file
+    # of translation_service.py
+    cache_file = os.path.join(store, "TranslationCache.sqlite")
+    for category in categories:
+        pipeline.add(Task("texts/" + category, category_texts,
+                          {"category": category, "split_file": split_file, "text_path": text_path,
+                           "csv_path": os.path.join(path, "DataExploration/CSVFiles/AllArticles/"),
+                           "output_file": resolver.text_file(category)},
+                          inputs=[split_file, category_csv_file(category, path)],
+                          outputs=[resolver.text_file(category)],
+                          code=repo(*stage_code["texts"])))
+        for position in positions:
+            csv_file, txt_path, nt_filename, exists_filename, total_filename = property_files(category, position, path)
+            total_file = os.path.join(txt_path, total_filename)
+            pipeline.add(Task(f"properties/{category}/{position}", category_properties,
+                              {"category": category, "csv_file": csv_file, "txt_path": txt_path,
+                               "nt_filename": nt_filename, "exists_filename": exists_filename,
+                               "total_filename": total_filename, "cache_file": cache_file},
+                              inputs=[csv_file], outputs=[os.path.join(txt_path, filename) for filename
+                                                          in [nt_filename, exists_filename, total_filename]],
+                              code=repo(*stage_code["properties"])))
+            question_files = {qt: question_file(category, position, qt, path=question_path) for qt in question_types}
+            generated_qtypes = [qt for qt in generated_question_types if qt in qtypes]
+            if generated_qtypes:
+                pipeline.add(Task(f"questions/{category}/{position}", category_questions,
+                                  {"category": category, "entity_position": position, "qtypes": generated_qtypes,
+                                   "property_path": property_path, "question_path": question_path,
+                                   "manifest_file": os.path.join(store, "QuestionManifests/" + category + position
+                                                                 + ".json"), "cache_file": cache_file},
+                                  inputs=[total_file],
+                                  outputs=[question_files[qt] for qt in generated_qtypes],
+                                  code=repo(*stage_code["questions"])))
+            for qt in qtypes:
+                pipeline.add(Task(f"extract/{category}/{position}/{qt}", category_extraction,
+                                  {"category": category, "entity_position": position, "question_type": qt,
+                                   "text_filename": resolver.text_file(category),
+                                   "question_filename": question_files[qt],
+                                   "property_filename": total_file,
+                                   "output_file": result_file(category, position, qt, path)},
+                                  inputs=[resolver.text_file(category), question_files[qt], total_file],
+                                  outputs=[result_file(category, position, qt, path)],
+                                  code=repo(*stage_code["extract"])))
+
+    evaluation_root = subset_path(categories, store) or path
+    for position in positions:
+        if evaluation_root != path:
+            position_results = [result_file(category, position, qt, path) for category in categories
+                                for qt in qtypes]
+            pipeline.add(Task(f"goldset/{position}", gold_set,
+                              {"gold_file": gold_standard_file(position, path), "result_files": position_results,
+                               "output_file": gold_standard_file(position, evaluation_root)},
+                              inputs=[gold_standard_file(position, path)] + position_results,
+                              outputs=[gold_standard_file(position, evaluation_root)]))
+        for qt in qtypes:
+            result_files = [result_file(category, position, qt, path) for category in categories]
+            pipeline.add(Task(f"evalset/{position}/{qt}", eval_set,
+                              {"gold_file": gold_standard_file(position, path), "result_files": result_files,
+                               "output_file": eval_set_file(position, qt, evaluation_root)},
+                              inputs=[gold_standard_file(position, path)] + result_files,
+                              outputs=[eval_set_file(position, qt, evaluation_root)]))
+    evaluation_path = os.path.join(evaluation_root, "Evaluation/")
+    evaluation_outputs = ["EvalResultsFiles"]
+    # the category scores and the plots compare the question types, they are only written for all three of them
+    if all(qt in qtypes for qt in question_types):
+        evaluation_outputs += ["CategoryMetricScores"] + (["Plots"] if plot is True else [])
+    articles_path = os.path.join(path, "DataExploration/CSVFiles/AllArticles")
+    layout_path = None if evaluation_root == path else os.path.join(path, "Evaluation/")
+    pipeline.add(Task("evaluate", evaluate, {"file_path": evaluation_path, "positions": positions, "qtypes": qtypes,
+                                             "plot": plot, "articles_path": articles_path, "layout_path": layout_path},
+                      inputs=[eval_set_file(position, qt, evaluation_root) for position in positions for qt in qtypes]
+                      + [gold_standard_file(position, evaluation_root) for position in positions],
+                      outputs=[os.path.join(evaluation_path, directory) for directory in evaluation_outputs],
+                      code=repo(*stage_code["evaluate"])))
+    return pipeline
+
+
+def share_cpus(workers: int):
+    """
+    divides the CPUs among the extract tasks which run at the same time: every task runs its extraction in one process
+    (EXTRACTION_WORKERS) with its share of the CPUs as torch threads (EXTRACTION_INTRA_OP_THREADS), s.t. the tasks
+    don't oversubscribe the cores. Variables which are already set are kept, see runtime_settings.py.
+    """
+    cpus = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else os.cpu_count()
+    os.environ.setdefault("EXTRACTION_WORKERS", "1")
+    os.environ.setdefault("EXTRACTION_INTRA_OP_THREADS", str(max(1, cpus // workers)))
+
+
+def run_pipeline(pipeline: Pipeline, targets=None, max_workers=None, **kwargs):
+    """
+    runs the pipeline (see Pipeline.run) with the CPUs divided among its worker processes (see share_cpus), since
+    every extract task loads the QA model and would use all CPUs for its torch threads otherwise
+    """
+    share_cpus(os.cpu_count() if max_workers is None else max_workers)
+    return pipeline.run(targets, max_workers=max_workers, **kwargs)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Runs the outdated tasks of the pipeline")
+    parser.add_argument("targets", nargs="*", help="patterns of task names, e.g. \"extract/Building/*\" (default: all)")
+    parser.add_argument("--path", default=repository_path)
+    parser.add_argument("--store", default=store_path)
+    parser.add_argument("--categories", nargs="+", default=None)
+    parser.add_argument("--positions", nargs="+", default=None)
+    parser.add_argument("--qtypes", nargs="+", default=None)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--online", action="store_true", help="include the Wikipedia/DBpedia scripts")
+    parser.add_argument("--plot", action="store_true")
+    parser.add_argument("--force", action="store_true")
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args()
+
+    thesis_pipeline = build_pipeline(args.path, args.categories, args.positions, args.qtypes, online=args.online,
+                                     plot=args.plot, store=args.store)
+    run_df = run_pipeline(thesis_pipeline, args.targets or None, max_workers=args.workers, force=args.force,
+                          dry_run=args.dry_run)
+    print(run_df.groupby("Status").size().to_string())
+    print(run_df[run_df["Status"].isin(["failed", "missing input"])].to_string(index=False))
@@ -0,0 +1,165 @@
+# -*- coding: utf-8 -*-
+"""
+This Python file provides one command line interface for the stages of the thesis. Every stage is a subcommand, the
+units of a stage (e.g. one category and entity position of the property extraction) are the tasks of the pipeline
+(see pipeline_tasks.py) and are run in parallel by the orchestrator, which prints the progress of every unit:
+
+    * select: the titles of the candidate articles (DataSelection, queries Wikipedia)
+    * explore: the DBpedia entries and categories of the candidate articles (DataExploration, queries DBpedia)
+    * properties: the property files of the categories, see get_other_properties_german.py
+    * questions: the BL and AG question files, see generate_other_automated_questions.py
+    * extract: the triple extraction of the categories, see runfile_other.py and runfile_persons.py
+    * evaluate: the evaluation sets and the evaluation matrix, see evaluation_runner.py
+
+The units of a stage are selected with --categories, --positions and --qtypes (default: all). By default only the
+units of the stage are run on the files as they are on disk, --upstream runs the outdated units of the previous stages
+first. Units which are unchanged since their last run are restored from the artifact store instead of being run again.
+After the run, the wall time of every unit and of the whole stage is printed.
+
+Usage (from the repository root):
+    python Pipeline/Code/stage_cli.py properties --categories Building Disease --positions SP
+    python Pipeline/Code/stage_cli.py questions --qtypes AG
+    python Pipeline/Code/stage_cli.py extract --qtypes BL AG --workers 4
+"""
+
+import os
+import time
+import argparse
+from pipeline_tasks import build_pipeline, run_pipeline, repository_path, store_path, category_list, \
+    entity_positions, question_types
+
+# patterns of the task names of every stage, formatted with the category, entity position and question type
+stage_patterns = {"select": ["select"],
+                  "explore": ["explore/*"],
+                  "properties": ["properties/{category}/{position}"],
+                  "questions": ["questions/{category}/{position}"],
+                  "extract": ["extract/{category}/{position}/{qtype}"],
+                  "evaluate": ["goldset/{position}", "evalset/{position}/{qtype}", "evaluate"]}
+# stages which query Wikipedia or DBpedia
+online_stages = ["select", "explore"]
+
+
+def stage_targets(stage: str, categories: list, positions: list, qtypes: list):
+    """
+    returns the task names of the units of a stage
+
+    Parameters
+    ----------
+    stage: str
+        name of the stage, see stage_patterns
+    categories: list
+        selected categories
+    positions: list
+        selected entity positions
+    qtypes: list
+        selected question types
+
+    Returns
+    -------
+    targets: list
+        names (or patterns) of the tasks, without duplicates
+    """
+    if stage not in stage_patterns:
+        raise ValueError("Incorrect stage, must be one of " + ", ".join(stage_patterns))
+    targets = []
+    for pattern in stage_patterns[stage]:
+        for category in categories:
+            for position in positions:
+                for qtype in qtypes:
+                    target = pattern.format(category=category, position=position, qtype=qtype)
+                    if target not in targets:
+                        targets.append(target)
+    return targets
+
+
+def print_summary(run_df, wall_time: float):
+    """
+    prints the status and the wall time of every unit (longest first), the total time of the units and the wall time
+    of the stage
+    """
+    units_df = run_df.sort_values("Seconds", ascending=False)
+    print(units_df[["Task", "Status", "Seconds"]].to_string(index=False, float_format="%.1f"))
+    failed_df = run_df[run_df["Status"].isin(["failed", "missing input", "skipped"])]
+    if len(failed_df) > 0:
+        print(failed_df[["Task", "Status", "Error"]].to_string(index=False))
+    unit_time = run_df["Seconds"].sum()
+    print(f"Units: {len(run_df)}, " + ", ".join(f"{status}: {count}" for status, count
+                                                 in run_df.groupby("Status").size().items()))
+    print(f"Total time of the units: {unit_time:.1f} seconds, wall time: {wall_time:.1f} seconds"
+          + (f", speedup: {unit_time / wall_time:.2f}" if wall_time > 0 else ""))
+
+
+def run_stage(stage: str, categories=None, positions=None, qtypes=None, workers=None, upstream=False, force=False,
+              dry_run=False, plot=False, path=repository_path, store=store_path):
+    """
+    runs the units of a stage in a process pool and prints the summary
+
+    Parameters
+    ----------
+    stage: str
+        name of the stage, see stage_patterns
+    categories: None/list
+        categories of the units. The default None uses all eleven categories.
+    positions: None/list
+        entity positions of the units. The default None uses "SP" and "OP".
+    qtypes: None/list
+        question types of the units. The default None uses "BL", "AG" and "NL".
+    workers: None/int
+        number of worker processes. The default None uses the number of CPUs.
+    upstream: bool
+        determines whether the outdated units of the previous stages are run first. The default is False.
+    force: bool
+        determines whether the units are run regardless of their last run. The default is False.
+    dry_run: bool
+        determines whether the statuses of the units are only printed. The default is False.
+    plot: bool
+        determines whether the evaluation renders its plots. The default is False.
+    path: str
+        root directory of the data, i.e. the repository
+    store: str
+        directory of the artifact store
+
+    Returns
+    -------
+    run_df: pd.DataFrame
+        status, seconds and error of every unit, see Pipeline.run
+    """
+    categories = category_list if categories is None else categories
+    positions = entity_positions if positions is None else positions
+    qtypes = question_types if qtypes is None else qtypes
+    workers = os.cpu_count() if workers is None else workers
+    if workers < 1:
+        raise ValueError("Incorrect number of workers, must be at least 1")
+    pipeline = build_pipeline(path, categories, positions, qtypes, online=stage in online_stages, plot=plot,
+                              store=store)
+    targets = stage_targets(stage, categories, positions, qtypes)
+    start_time = time.time()
+    run_df = run_pipeline(pipeline, targets, max_workers=workers, force=force, dry_run=dry_run, upstream=upstream)
+    if dry_run is True:
+        print(run_df.to_string(index=False))
+    else:
+        print_summary(run_df, time.time() - start_time)
+    return run_df
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Runs the units of a stage of the thesis in parallel")
+    subparsers = parser.add_subparsers(dest="stage", required=True)
+    for stage_name in stage_patterns:
+        subparser = subparsers.add_parser(stage_name)
+        subparser.add_argument("--categories", nargs="+", default=None, choices=category_list)
+        subparser.add_argument("--positions", nargs="+", default=None, choices=entity_positions)
+        subparser.add_argument("--qtypes", nargs="+", default=None, choices=question_types)
+        subparser.add_argument("--workers", type=int, default=None, help="worker processes (default: all CPUs)")
+        subparser.add_argument("--upstream", action="store_true", help="run the outdated previous stages first")
+        subparser.add_argument("--force", action="store_true")
+        subparser.add_argument("--dry-run", action="store_true")
+        subparser.add_argument("--path", default=repository_path)
+        subparser.add_argument("--store", default=store_path)
+        if stage_name == "evaluate":
+            subparser.add_argument("--plot", action="store_true")
+    args = parser.parse_args()
+
+    run_stage(args.stage, args.categories, args.positions, args.qtypes, workers=args.workers, upstream=args.upstream,
+              force=args.force, dry_run=args.dry_run, plot=getattr(args, "plot", False), path=args.path,
+              store=args.store)
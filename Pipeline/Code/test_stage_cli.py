@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+"""
+This Python test file tests that the evaluate stage of a subset of the categories writes its evaluation sets and
+results below the artifact store and leaves the evaluation of all categories (Evaluation/) untouched.
+
+Usage (from the repository root):
+    python -m pytest Pipeline/Code/test_stage_cli.py
+"""
+
+import os
+import hashlib
+import pytest
+from artifacts import ArtifactResolver, category_list
+from pipeline_tasks import build_pipeline, repository_path, subset_path
+from stage_cli import run_stage
+
+
+def evaluation_hashes():
+    """
+    returns the content hashes of the files below Evaluation/ which aren't code
+    """
+    hashes = {}
+    for root, directories, filenames in os.walk(os.path.join(repository_path, "Evaluation")):
+        directories[:] = [directory for directory in directories if directory != "Code"]
+        for filename in filenames:
+            with open(os.path.join(root, filename), "rb") as f:
+                hashes[os.path.join(root, filename)] = hashlib.sha256(f.read()).hexdigest()
+    return hashes
+
+
+def test_subset_outputs(tmp_path):
+    """
+    the tasks of a subset of the categories don't write to Evaluation/ of the repository
+    """
+    store = str(tmp_path)
+    pipeline = build_pipeline(categories=["Building"], store=store)
+    evaluation_path = os.path.join(repository_path, "Evaluation")
+    for name in pipeline.select(["goldset/*", "evalset/*", "evaluate"], upstream=False):
+        for output in pipeline.tasks[name].outputs:
+            assert not os.path.normpath(output).startswith(evaluation_path)
+            assert os.path.normpath(output).startswith(subset_path(["Building"], store))
+
+
+def test_full_outputs(tmp_path):
+    """
+    the evaluation sets of all categories are the ones of the repository
+    """
+    assert subset_path(category_list, str(tmp_path)) is None
+    pipeline = build_pipeline(store=str(tmp_path))
+    assert pipeline.tasks["evalset/SP/BL"].outputs == [ArtifactResolver(repository_path).eval_set_file("SP", "BL")]
+    assert not [name for name in pipeline.tasks if name.startswith("goldset/")]
+
+
+def test_evaluate_subset(tmp_path):
+    """
+    evaluate on a subset of the categories runs on the gold standard of the subset and leaves Evaluation/ untouched
+    """
+    pytest.importorskip("matplotlib")
+    pytest.importorskip("seaborn")
+    pytest.importorskip("openpyxl")
+    before = evaluation_hashes()
+    run_df = run_stage("evaluate", categories=["Building"], positions=["SP"], qtypes=["BL"], store=str(tmp_path))
+    assert (run_df["Status"] == "executed").all(), run_df.to_string()
+    assert evaluation_hashes() == before
+    resolver = ArtifactResolver(subset_path(["Building"], str(tmp_path)))
+    with open(resolver.eval_set_file("SP", "BL"), encoding="utf-8-sig") as f:
+        eval_set = [line for line in f if line.strip()]
+    with open(resolver.gold_standard_file("SP"), encoding="utf-8-sig") as f:
+        gold_standard = [line for line in f if line.strip()]
+    assert len(eval_set) == len(gold_standard) == 2
@@ -36,8 +36,7 @@ def get2translate_and_exists_files(filepath: str, csv_filename: str, to_translat
     global default_other_handler
     properties_file = os.path.join(filepath, csv_filename)
     default_other_handler = PropertyHandler(properties_file, persons=False)
-    properties_nt = default_other_handler.propertycsv2list()
-    properties_wt = default_other_handler.propertycsv2list(no_translation=False)
+    properties_nt, properties_wt = default_other_handler.partition_properties()
     default_other_handler.write_property_file(properties_nt, to_translate_filename, path=outputpath)
     default_other_handler.write_property_file(properties_wt, exists_filename, path=outputpath)
     if write_only is not True:
@@ -8,16 +8,14 @@ subject_properties_file = os.path.join(filepath, "PersonPropertiesSubject.csv")
 sp_entity_handler = PropertyHandler(subject_properties_file)
 # no input necessary here, as the csv file will be transformed into a list already by calling this function
 # each row will be a tuple where each element corresponds to a column entry in a row
-subject_properties_no_translation = sp_entity_handler.propertycsv2list()
-subject_properties_translation_exists = sp_entity_handler.propertycsv2list(no_translation=False)
+subject_properties_no_translation, subject_properties_translation_exists = sp_entity_handler.partition_properties()
 sp_entity_handler.write_property_file(subject_properties_no_translation, "PersonNoTranslationPropertiesSP.txt")
 sp_entity_handler.write_property_file(subject_properties_translation_exists, "PersonTranslationExistsSP.txt")
 
 # same for entities at object position
 object_properties_file = os.path.join(filepath, "PersonPropertiesObject.csv")
 op_entity_handler = PropertyHandler(object_properties_file)
-object_properties_no_translation = op_entity_handler.propertycsv2list()
-object_properties_translation_exists = op_entity_handler.propertycsv2list(no_translation=False)
+object_properties_no_translation, object_properties_translation_exists = op_entity_handler.partition_properties()
 op_entity_handler.write_property_file(object_properties_no_translation, "PersonNoTranslationPropertiesOP.txt")
 op_entity_handler.write_property_file(object_properties_translation_exists, "PersonTranslationExistsOP.txt")
 
@@ -0,0 +1,355 @@
+# -*- coding: utf-8 -*-
+"""
+This Python file provides a Class "OntologyIndex" which extracts the properties of every DBpedia ontology class from a
+local dump of the DBpedia ontology instead of exporting them per category via SPARQL.
+
+The ontology (N-Triples .nt or RDF/XML .owl, optionally gzipped) and any additional label files (N-Triples, e.g. the
+German ontology labels) are streamed once. From the rdfs:domain/rdfs:range statements a domain -> property and a
+range -> property index is built, properties are inherited along rdfs:subClassOf. For every class, the properties for
+entities at subject position (class in the domain of the property) and at object position (class in the range of the
+property) can then be looked up and written in the format of the SPARQL exports ("p", "lde", "len"), s.t. they can be
+processed by PropertyHandler like the hand-exported csv files.
+"""
+
+import os
+import re
+import gzip
+import xml.etree.ElementTree as ElementTree
+from collections import defaultdict
+import pandas as pd
+from property_handler import PropertyHandler
+
+dbo = "http://dbpedia.org/ontology/"
+rdf_type = "http://www.w3.org/1999/02/22-rdf-syntax-ns#type"
+rdfs_label = "http://www.w3.org/2000/01/rdf-schema#label"
+rdfs_domain = "http://www.w3.org/2000/01/rdf-schema#domain"
+rdfs_range = "http://www.w3.org/2000/01/rdf-schema#range"
+rdfs_subclass = "http://www.w3.org/2000/01/rdf-schema#subClassOf"
+owl_class = "http://www.w3.org/2002/07/owl#Class"
+rdf_namespace = "{http://www.w3.org/1999/02/22-rdf-syntax-ns#}"
+xml_lang = "{http://www.w3.org/XML/1998/namespace}lang"
+relevant_predicates = {rdf_type, rdfs_label, rdfs_domain, rdfs_range, rdfs_subclass}
+
+ntriple_pattern = re.compile(r'^<([^>]*)>\s+<([^>]*)>\s+(?:<([^>]*)>|"((?:[^"\\]|\\.)*)"(?:@([\w-]+)|\^\^<[^>]*>)?)'
+                             r'\s*\.\s*$')
+escape_pattern = re.compile(r'\\(?:u([0-9A-Fa-f]{4})|U([0-9A-Fa-f]{8})|(.))')
+escape_characters = {"t": "\t", "n": "\n", "r": "\r", "b": "\b", "f": "\f", '"': '"', "'": "'", "\\": "\\"}
+
+
+def open_dump(filename: str):
+    """
+    opens a (gzipped) dump file in binary mode
+    """
+    if filename.endswith(".gz"):
+        return gzip.open(filename, "rb")
+    return open(filename, "rb")
+
+
+def unescape_literal(literal: str):
+    """
+    resolves the escape sequences of an N-Triples literal
+    """
+    if "\\" not in literal:
+        return literal
+
+    def replace(match):
+        if match.group(3) is not None:
+            return escape_characters.get(match.group(3), match.group(3))
+        return chr(int(match.group(1) or match.group(2), 16))
+    return escape_pattern.sub(replace, literal)
+
+
+def stream_ntriples(filename: str):
+    """
+    streams the triples of an N-Triples file which are relevant for the index (type, label, domain, range, subClassOf)
+
+    Parameters
+    ----------
+    filename: str
+        full path of the .nt or .nt.gz file
+
+    Returns
+    -------
+    triples: generator
+        generator of (subject, predicate, object, language) tuples, where language is None for URIs and literals
+        without language tag
+    """
+    with open_dump(filename) as f:
+        for line in f:
+            line = line.decode("utf-8")
+            # cheap check before the line is parsed, most triples of a dump are not relevant
+            if not any(predicate in line for predicate in relevant_predicates):
+                continue
+            match = ntriple_pattern.match(line)
+            if match is None or match.group(2) not in relevant_predicates:
+                continue
+            subject, predicate, uri, literal, language = match.groups()
+            if uri is not None:
+                yield subject, predicate, uri, None
+            else:
+                yield subject, predicate, unescape_literal(literal), language
+
+
+def stream_owl(filename: str):
+    """
+    streams the relevant triples of an RDF/XML (.owl) ontology file, see stream_ntriples
+
+    Parameters
+    ----------
+    filename: str
+        full path of the .owl or .owl.gz file
+
+    Returns
+    -------
+    triples: generator
+        generator of (subject, predicate, object, language) tuples
+    """
+    tag_predicates = {"{http://www.w3.org/2000/01/rdf-schema#}label": rdfs_label,
+                      "{http://www.w3.org/2000/01/rdf-schema#}domain": rdfs_domain,
+                      "{http://www.w3.org/2000/01/rdf-schema#}range": rdfs_range,
+                      "{http://www.w3.org/2000/01/rdf-schema#}subClassOf": rdfs_subclass}
+    with open_dump(filename) as f:
+        depth = 0
+        for event, element in ElementTree.iterparse(f, events=("start", "end")):
+            if event == "start":
+                depth += 1
+                continue
+            depth -= 1
+            # elements directly below rdf:RDF describe one resource each
+            if depth != 1:
+                continue
+            subject = element.get(rdf_namespace + "about")
+            if subject is not None:
+                if element.tag == "{http://www.w3.org/2002/07/owl#}Class":
+                    yield subject, rdf_type, owl_class, None
+                for child in element:
+                    if child.tag in tag_predicates:
+                        resource = child.get(rdf_namespace + "resource")
+                        if resource is not None:
+                            yield subject, tag_predicates[child.tag], resource, None
+                        elif child.text is not None:
+                            yield subject, tag_predicates[child.tag], child.text, child.get(xml_lang)
+            element.clear()
+
+
+def class_uri(class_name: str):
+    """
+    returns the full URI of a DBpedia ontology class, e.g. "Building" -> "http://dbpedia.org/ontology/Building"
+    """
+    return class_name if class_name.startswith("http") else dbo + class_name
+
+
+class OntologyIndex:
+    """
+    Class which indexes the properties of the DBpedia ontology by the classes of their domain and range.
+
+    Attributes
+    -------------
+    labels: dict
+        mapping of every URI to a dictionary of its labels per language, e.g. {"de": "Sterbeort", "en": "death place"}
+    classes: set
+        URIs of all ontology classes
+    superclasses: dict
+        mapping of every class URI to the list of its direct superclasses
+    domain_index: dict
+        mapping of every class URI to the list of properties with that class as domain
+    range_index: dict
+        mapping of every class URI to the list of properties with that class as range
+
+    Methods
+    ------------------------
+    from_files(ontology_file, label_files)
+        builds the index from the ontology and label files
+    class_properties(class_name, entity_position)
+        returns the (p, lde, len) tuples of a class for an entity position
+    property_table(class_names)
+        returns the properties of all classes as one DataFrame
+    property_handler(class_name, entity_position)
+        returns a PropertyHandler for the properties of a class
+    write_property_csvs(class_names, path)
+        writes the property csv files of the classes
+    """
+    valid_positions = ["SP", "OP"]
+
+    def __init__(self):
+        """
+        init method of the class, creates an empty index which is filled by add_triples
+        """
+        self.labels = defaultdict(dict)
+        self.classes = set()
+        self.superclasses = defaultdict(list)
+        self.domain_index = defaultdict(list)
+        self.range_index = defaultdict(list)
+        self._ancestors = {}
+
+    @classmethod
+    def from_files(cls, ontology_file="C:/Users/ubmen/Desktop/BA_Prog/PropertyExtraction/Ontology/dbpedia_ontology.nt",
+                   label_files=None):
+        """
+        builds the index by streaming the ontology file and the label files once
+
+        Parameters
+        ----------
+        ontology_file: str
+            full path of the ontology dump, either N-Triples (.nt) or RDF/XML (.owl), optionally gzipped
+        label_files: None/list
+            full paths of additional N-Triples files with rdfs:label triples, e.g. the German labels
+
+        Returns
+        -------
+        ontology_index: OntologyIndex
+            the filled index
+        """
+        index = cls()
+        if ontology_file.endswith((".owl", ".owl.gz", ".xml", ".xml.gz")):
+            index.add_triples(stream_owl(ontology_file))
+        else:
+            index.add_triples(stream_ntriples(ontology_file))
+        for label_file in [] if label_files is None else label_files:
+            index.add_triples(stream_ntriples(label_file))
+        return index
+
+    def add_triples(self, triples):
+        """
+        adds (subject, predicate, object, language) triples to the index
+
+        Parameters
+        ----------
+        triples: iterable
+            triples as generated by stream_ntriples or stream_owl
+        """
+        for subject, predicate, obj, language in triples:
+            if predicate == rdfs_label:
+                # the first label per language is kept, as in the SPARQL exports
+                self.labels[subject].setdefault(language or "", obj)
+            elif predicate == rdfs_domain:
+                self.domain_index[obj].append(subject)
+            elif predicate == rdfs_range:
+                self.range_index[obj].append(subject)
+            elif predicate == rdfs_subclass:
+                self.superclasses[subject].append(obj)
+                self.classes.add(subject)
+            elif predicate == rdf_type and obj == owl_class:
+                self.classes.add(subject)
+        self._ancestors = {}
+
+    def ancestors(self, uri: str):
+        """
+        returns the class and all of its superclasses, from the class upwards
+        """
+        if uri not in self._ancestors:
+            ancestors = [uri]
+            for superclass in self.superclasses.get(uri, []):
+                ancestors += [ancestor for ancestor in self.ancestors(superclass) if ancestor not in ancestors]
+            self._ancestors[uri] = ancestors
+        return self._ancestors[uri]
+
+    def class_properties(self, class_name: str, entity_position: str, inherited=True):
+        """
+        looks up the properties of a class for an entity position
+
+        Parameters
+        ----------
+        class_name: str
+            name (e.g. "Building") or URI of the ontology class
+        entity_position: str
+            "SP" for properties with the class in their domain, "OP" for properties with the class in their range
+        inherited: bool
+            determines whether the properties of the superclasses will be included. The default is True.
+
+        Returns
+        -------
+        property_tuples: list
+            list of (p, lde, len) tuples, where lde is None if no German label exists
+        """
+        if entity_position not in self.valid_positions:
+            raise ValueError("Invalid input for entity position, must be either SP or OP")
+        uri = class_uri(class_name)
+        property_index = self.domain_index if entity_position == "SP" else self.range_index
+        property_uris = []
+        for ancestor in self.ancestors(uri) if inherited is True else [uri]:
+            property_uris += property_index.get(ancestor, [])
+        property_uris = list(dict.fromkeys(property_uris))
+        return [(prop, self.labels.get(prop, {}).get("de"), self.labels.get(prop, {}).get("en", prop.split("/")[-1]))
+                for prop in property_uris]
+
+    def property_table(self, class_names=None):
+        """
+        returns the properties of every class at both entity positions as one DataFrame
+
+        Parameters
+        ----------
+        class_names: None/list
+            classes that will be included. The default None includes every class of the ontology.
+
+        Returns
+        -------
+        property_df: pd.DataFrame
+            DataFrame with the columns "class", "position", "p", "lde" and "len"
+        """
+        class_names = sorted(self.classes) if class_names is None else class_names
+        rows = [(class_uri(class_name).split("/")[-1], position) + prop for class_name in class_names
+                for position in self.valid_positions for prop in self.class_properties(class_name, position)]
+        return pd.DataFrame(rows, columns=["class", "position", "p", "lde", "len"])
+
+    def property_handler(self, class_name: str, entity_position: str):
+        """
+        returns a PropertyHandler whose property table is filled from the index instead of a csv file, s.t. the
+        properties can be partitioned and translated without an export
+
+        Parameters
+        ----------
+        class_name: str
+            name or URI of the ontology class
+        entity_position: str
+            "SP" or "OP"
+
+        Returns
+        -------
+        property_handler: PropertyHandler
+            handler for the properties of the class
+        """
+        property_df = pd.DataFrame(self.class_properties(class_name, entity_position), columns=["p", "lde", "len"],
+                                   dtype=object)
+        return PropertyHandler.from_table(property_df, persons=class_uri(class_name) == dbo + "Person")
+
+    def write_property_csvs(self, class_names=None,
+                            path="C:/Users/ubmen/Desktop/BA_Prog/PropertyExtraction/Properties/OntologyProperties/"):
+        """
+        writes the properties of every class to csv files in the format of the SPARQL exports, i.e.
+        {path}/{Class}Properties/{Class}PropertiesCSVFiles/{Class}PropertiesSP.csv (and OP)
+
+        Parameters
+        ----------
+        class_names: None/list
+            classes for which the files will be written. The default None writes every class of the ontology.
+        path: str
+            path where the class directories will be created
+
+        Returns
+        -------
+        written_files: list
+            list of the written csv files
+        """
+        class_names = sorted(self.classes) if class_names is None else class_names
+        written_files = []
+        for class_name in class_names:
+            name = class_uri(class_name).split("/")[-1]
+            csv_path = os.path.join(path, name + "Properties", name + "PropertiesCSVFiles")
+            os.makedirs(csv_path, exist_ok=True)
+            for position in self.valid_positions:
+                csv_file = os.path.join(csv_path, name + "Properties" + position + ".csv")
+                # strings are quoted and missing labels are left empty, as in the SPARQL exports
+                rows = [("p", "lde", "len")] + self.class_properties(class_name, position)
+                with open(csv_file, "w", encoding="utf-8", newline="") as f:
+                    f.write("".join(",".join("" if value is None else '"' + value.replace('"', '""') + '"'
+                                             for value in row) + "\n" for row in rows))
+                written_files.append(csv_file)
+        return written_files
+
+
+if __name__ == "__main__":
+    ontology_index = OntologyIndex.from_files()
+    print(f"{len(ontology_index.classes)} classes, {len(ontology_index.labels)} labeled resources")
+    ontology_files = ontology_index.write_property_csvs()
+    print(f"{len(ontology_files)} property files written")
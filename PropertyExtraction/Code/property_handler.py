@@ -9,12 +9,107 @@ This Python file provides a Class "PropertyHandler" to both handle Properties of
 """
 
 import os
+import re
 import ast
-from deep_translator import GoogleTranslator
-import time
+from translation_service import default_translation_service
 import pandas as pd
 
 
+class PropertyFilter:
+    """
+    Class which filters lists of (German property, English property) tuples with declarative include and exclude rules.
+    The rules are compiled once into one regular expression per label, s.t. every property is checked in a single pass
+    and only the dropped properties are attributed to their rule.
+
+    A rule is a (label, substring) tuple, where label is either "de" (German property) or "en" (English property).
+    A property is dropped if it contains the substring of any exclude rule or, if include rules are given, if it
+    contains none of their substrings.
+
+    Attributes
+    -------------
+    exclude: list
+        list of exclude rules, the drops are attributed to the first matching rule in this order
+    include: list
+        list of include rules
+    drop_counts: dict
+        number of dropped properties per rule of the last call of apply, the key of a rule is e.g.
+        'exclude en "thumbnail"' and all properties dropped by the include rules are counted under "include"
+    """
+    valid_labels = {"de": 0, "en": 1}
+
+    def __init__(self, exclude=None, include=None):
+        """
+        init method of the class, validates and compiles the rules
+
+        Parameters
+        ----------
+        exclude: None/list
+            list of (label, substring) exclude rules
+        include: None/list
+            list of (label, substring) include rules
+        """
+        self.exclude = [] if exclude is None else list(exclude)
+        self.include = [] if include is None else list(include)
+        for label, substring in self.exclude + self.include:
+            if label not in self.valid_labels:
+                raise ValueError("Incorrect label for filter rule, must be either de or en")
+        self._exclude_patterns = self._compile(self.exclude)
+        self._include_patterns = self._compile(self.include)
+        self.drop_counts = {}
+
+    def _compile(self, rules: list):
+        """
+        compiles the substrings of the rules into one regular expression per label index
+        """
+        patterns = {}
+        for index in set(self.valid_labels[label] for label, substring in rules):
+            substrings = [substring for label, substring in rules if self.valid_labels[label] == index]
+            patterns[index] = re.compile("|".join(re.escape(substring) for substring in substrings))
+        return patterns
+
+    @staticmethod
+    def rule_name(action: str, rule: tuple):
+        return f'{action} {rule[0]} "{rule[1]}"'
+
+    def apply(self, property_list: list):
+        """
+        filters a list of property tuples and updates drop_counts
+
+        Parameters
+        ----------
+        property_list: list
+            List of tuples where the first element is the German property and the second the English property
+
+        Returns
+        -------
+        filtered_properties: list
+            List of the property tuples that pass all rules, in the order of the input list
+        """
+        drop_counts = {self.rule_name("exclude", rule): 0 for rule in self.exclude}
+        if self.include:
+            drop_counts["include"] = 0
+        filtered_properties = []
+        for prop in property_list:
+            if any(pattern.search(prop[index]) for index, pattern in self._exclude_patterns.items()):
+                for rule in self.exclude:
+                    if rule[1] in prop[self.valid_labels[rule[0]]]:
+                        drop_counts[self.rule_name("exclude", rule)] += 1
+                        break
+            elif self._include_patterns and not any(pattern.search(prop[index])
+                                                    for index, pattern in self._include_patterns.items()):
+                drop_counts["include"] += 1
+            else:
+                filtered_properties.append(prop)
+        self.drop_counts = drop_counts
+        return filtered_properties
+
+
+# rules used for Person and all categories of "other": Wikipedia page properties, thumbnails, abstracts and sound
+# recordings can't be answered from the article text
+default_property_filter = PropertyFilter(exclude=[("de", "Wiki"), ("en", "thumbnail"), ("en", "has abstract"),
+                                                  ("en", "sound recording")])
+
+
 class PropertyHandler:
     def __init__(self, csv_file: str, persons=True):
         """
@@ -28,6 +123,72 @@ class PropertyHandler:
         """
         self.csv_file = csv_file
         self.persons = persons
+        self._property_table = None
+        self.drop_counts = {}
+
+    @classmethod
+    def from_table(cls, property_df: pd.DataFrame, persons=True):
+        """
+        creates a PropertyHandler from a DataFrame with the columns of the property csv files ("p", "lde", "len")
+        instead of a csv file, e.g. for the properties looked up in the ontology index
+
+        Parameters
+        ----------
+        property_df: pd.DataFrame
+            DataFrame with the properties, a missing German label is None/NaN
+        persons: True/False
+            determines whether DBpedia properties of type person or of other types will be handled
+
+        Returns
+        -------
+        property_handler: PropertyHandler
+            handler with the cached property table
+        """
+        handler = cls(None, persons=persons)
+        property_df = property_df.copy()
+        property_df["has_de_label"] = property_df.iloc[:, 1].notna()
+        handler._property_table = property_df
+        return handler
+
+    def property_table(self, refresh=False):
+        """
+        reads the property csv file into a DataFrame, the file is only read once and the table is cached afterwards
+
+        Parameters
+        ----------
+        refresh: bool
+            determines whether the csv file will be read again even if the table is cached. The default is False.
+
+        Returns
+        -------
+        property_table: pd.DataFrame
+            DataFrame with the string columns of the csv file ("p", "lde", "len"), where a missing German label is
+            NaN, and the boolean column "has_de_label"
+        """
+        if self._property_table is None or refresh is True:
+            property_df = pd.read_csv(self.csv_file, dtype=str)
+            property_df["has_de_label"] = property_df.iloc[:, 1].notna()
+            self._property_table = property_df
+        return self._property_table
+
+    def partition_properties(self):
+        """
+        splits the properties into the ones that need a translation and the ones with an existing German label in a
+        single pass over the cached property table
+
+        Returns
+        -------
+        no_translation_list: list
+            List of tuples for which the property needs translation, the missing German label is 0
+        translation_exists: list
+            List of tuples for which the German label of the property exists
+        """
+        property_df = self.property_table()
+        has_de_label = property_df["has_de_label"]
+        property_columns = property_df.drop(columns="has_de_label").astype(object).fillna(0)
+        no_translation_list = list(property_columns[~has_de_label].itertuples(index=False, name=None))
+        translation_exists = list(property_columns[has_de_label].itertuples(index=False, name=None))
+        return no_translation_list, translation_exists
 
     def propertycsv2list(self, no_translation=True):
         """
@@ -52,13 +213,7 @@ class PropertyHandler:
             German translation of the property will be returned (translation_exists)
 
         """
-        property_csv = self.csv_file
-        property_df = pd.read_csv(property_csv)
-        property_df = property_df.fillna(0)
-        property_df = property_df.to_records(index=False)
-        property_list = list(property_df)
-        no_translation_list = [nt for nt in property_list if nt[1] == 0]
-        translation_exists = [tup for tup in property_list if tup not in no_translation_list]
+        no_translation_list, translation_exists = self.partition_properties()
         if no_translation is not True:
             return translation_exists
         else:
@@ -113,9 +268,10 @@ class PropertyHandler:
             return lines_stripped
 
     @staticmethod
-    def translate_properties(property_list: list, return_tuple_list=False):
+    def translate_properties(property_list: list, return_tuple_list=False, translation_service=None):
         """
-        translate list of English DBpedia properties to German via Google translate
+        translate list of English DBpedia properties to German via the translation service (Google translate with
+        a persistent cache, properties that were translated before are not requested again)
         Parameters
         ----------
         property_list: list
@@ -124,6 +280,8 @@ class PropertyHandler:
             Determines whether a list of tuples with English property and corresponding German property (True) or a list
             with just German properties will be created (False).
             The default is False
+        translation_service: None/TranslationService
+            service used for the translation. The default None uses the shared service of default_translation_service.
         Returns
         -------
         translated_properties: list
@@ -134,10 +292,9 @@ class PropertyHandler:
         """
         prop_list_ast = [ast.literal_eval(prop) for prop in property_list]
         properties = [prop[2] for prop in prop_list_ast]
-        translated_properties = []
-        for prop in properties:
-            translated_properties.append(GoogleTranslator(source='auto', target='german').translate(prop))
-            time.sleep(0.5)
+        if translation_service is None:
+            translation_service = default_translation_service()
+        translated_properties = translation_service.translate_batch(properties)
         if return_tuple_list is True:
             en_de_tuple_list = list(zip(translated_properties, properties))
             return en_de_tuple_list
@@ -148,7 +305,7 @@ class PropertyHandler:
     def full_properties(self, to_translate_file: str, properties_with_de_label: list, write2file=False,
                         path="C:/Users/ubmen/Desktop/BA_Prog/PropertyExtraction/Properties/"
                              "PersonProperties/PersonPropertiesTXTFiles", properties_filename=None,
-                        return_property_list=False):
+                        return_property_list=False, property_filter=None, translation_service=None):
         """
         gets the full set of properties for both English and German properties of any entity class in DBpedia.
         Does an internal translation of the properties as well
@@ -172,18 +329,24 @@ class PropertyHandler:
         return_property_list: True/False
             Determines whether a the list of tuples with English and German will be returned or not.
             The default is False (since it's of no further use in the program)
+        property_filter: None/PropertyFilter
+            filter which is applied to the full set of properties, its drop counts are stored in self.drop_counts.
+            The default None uses default_property_filter.
+        translation_service: None/TranslationService
+            service used for the translation, see translate_properties
         Returns
         -------
 
         """
         to_translate_properties = self.read_txt(to_translate_file, path=path)
-        properties_translated = self.translate_properties(to_translate_properties, return_tuple_list=True)
+        properties_translated = self.translate_properties(to_translate_properties, return_tuple_list=True,
+                                                          translation_service=translation_service)
         properties_finalized = [tuple(list(tup)[1:]) for tup in properties_with_de_label]
         properties_total = properties_finalized + properties_translated
-        properties_total = [prop for prop in properties_total if "Wiki" not in prop[0]]
-        properties_total = [prop for prop in properties_total if "thumbnail" not in prop[1]]
-        properties_total = [prop for prop in properties_total if "has abstract" not in prop[1]]
-        properties_total = [prop for prop in properties_total if "sound recording" not in prop[1]]
+        if property_filter is None:
+            property_filter = default_property_filter
+        properties_total = property_filter.apply(properties_total)
+        self.drop_counts = property_filter.drop_counts
         if write2file is True and type(properties_filename) == str and return_property_list is True:
             self.write_property_file(properties_total, properties_filename, path=path)
             return properties_total
@@ -0,0 +1,322 @@
+# -*- coding: utf-8 -*-
+"""
+This Python file provides a Class "TranslationService" which translates DBpedia properties and questions with a
+pluggable backend. Translations are batched and deduplicated, stored in a persistent SQLite cache keyed by
+(source, target, text) and requested in chunks (one batch call of the backend per chunk) concurrently under a rate
+limit, so that properties and questions which repeat across the categories are only translated once. Every chunk is
+written to the cache as soon as it arrives, texts which can't be translated are kept unchanged and recorded in
+TranslationService.failures instead of aborting the whole batch.
+
+Backends:
+    * GoogleTranslatorBackend: Google Translate via deep_translator (one translator per language pair and thread)
+    * DictionaryBackend: offline dictionary lookup, e.g. for tests or manually curated translations
+
+Only backends which send requests over the network (attribute network, True if missing) are rate limited. Backends
+without a translate_batch method are called once per text.
+
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+
+class GoogleTranslatorBackend:
+    """
+    Backend which translates via Google Translate (deep_translator). The translator objects are created once per
+    language pair and thread and reused for every request of the thread, since a GoogleTranslator stores the text of
+    the current request in the object and can't be shared by the threads of translate_batch.
+    """
+    network = True
+
+    def __init__(self):
+        self._local = threading.local()
+
+    def _translator(self, source: str, target: str):
+        if not hasattr(self._local, "translators"):
+            self._local.translators = {}
+        if (source, target) not in self._local.translators:
+            from deep_translator import GoogleTranslator
+            self._local.translators[(source, target)] = GoogleTranslator(source=source, target=target)
+        return self._local.translators[(source, target)]
+
+    def translate(self, text: str, source: str, target: str):
+        """
+        translates a single text
+
+        Parameters
+        ----------
+        text: str
+            text that will be translated
+        source: str
+            source language, e.g. "auto" or "english"
+        target: str
+            target language, e.g. "german"
+
+        Returns
+        -------
+        translation: str
+            the translated text
+        """
+        return self._translator(source, target).translate(text)
+
+    def translate_batch(self, texts: list, source: str, target: str):
+        """
+        translates a list of texts with the batch call of deep_translator, see translate
+        """
+        return self._translator(source, target).translate_batch(texts)
+
+
+class DictionaryBackend:
+    """
+    Offline backend which looks translations up in a dictionary. Texts that are not in the dictionary are either
+    returned unchanged (missing="identity") or raise a KeyError (missing="raise").
+    """
+    network = False
+
+    def __init__(self, dictionary=None, missing="identity"):
+        if missing not in ["identity", "raise"]:
+            raise ValueError("Invalid input for missing, must either be identity or raise")
+        self.dictionary = {} if dictionary is None else dictionary
+        self.missing = missing
+
+    def translate(self, text: str, source: str, target: str):
+        """
+        looks up the translation of a single text, source and target are ignored
+        """
+        if text in self.dictionary:
+            return self.dictionary[text]
+        if self.missing == "raise":
+            raise KeyError(f"No translation for {text}")
+        return text
+
+    def translate_batch(self, texts: list, source: str, target: str):
+        """
+        looks up the translations of a list of texts, see translate
+        """
+        return [self.translate(text, source, target) for text in texts]
+
+
+class RateLimiter:
+    """
+    Thread-safe rate limiter, which spaces the requests of all threads at least 1/requests_per_second seconds apart
+    """
+    def __init__(self, requests_per_second: float):
+        self.interval = 1.0 / requests_per_second if requests_per_second else 0.0
+        self._next_request = time.monotonic()
+        self._lock = threading.Lock()
+
+    def wait(self):
+        with self._lock:
+            now = time.monotonic()
+            wait_time = self._next_request - now
+            self._next_request = max(now, self._next_request) + self.interval
+        if wait_time > 0:
+            time.sleep(wait_time)
+
+
+class TranslationService:
+    """
+    Class to translate texts with a pluggable backend and a persistent SQLite cache.
+
+    Attributes
+    -------------
+    backend: object
+        any object with a translate(text, source, target) method and optionally a translate_batch(texts, source,
+        target) method, the default is GoogleTranslatorBackend
+    cache_file: str/None
+        SQLite file of the cache, None keeps the cache in memory only
+    hits: int
+        number of texts that were answered from the cache
+    misses: int
+        number of texts that were sent to the backend
+    failures: dict
+        texts that couldn't be translated by the last call of translate_batch with the raised exceptions, these texts
+        are returned unchanged and aren't cached
+
+    Methods
+    ------------------------
+    translate(text)
+        translates a single text
+    translate_batch(texts)
+        translates a list of texts, duplicates and cached texts are not sent to the backend
+    """
+    def __init__(self, backend=None, cache_file="C:/Users/ubmen/Desktop/BA_Prog/PropertyExtraction/"
+                                                "TranslationCache.sqlite", source="auto", target="german",
+                 max_workers=4, requests_per_second=5.0, batch_size=20):
+        """
+        init method of the class
+
+        Parameters
+        ----------
+        backend: object
+            translation backend. The default None uses GoogleTranslatorBackend.
+        cache_file: str/None
+            SQLite file in which the translations will be cached. None keeps the cache in memory.
+        source: str
+            default source language. The default is "auto".
+        target: str
+            default target language. The default is "german".
+        max_workers: int
+            maximum number of concurrent requests to the backend. The default is 4.
+        requests_per_second: float
+            maximum number of requests per second across all workers, only applies to network backends. The default
+            is 5.0.
+        batch_size: int
+            number of texts that are sent to the backend in one request. The default is 20.
+        """
+        self.backend = GoogleTranslatorBackend() if backend is None else backend
+        self.cache_file = cache_file
+        self.source = source
+        self.target = target
+        self.max_workers = max_workers
+        self.batch_size = batch_size
+        # offline backends (e.g. DictionaryBackend) aren't throttled
+        self.rate_limiter = RateLimiter(requests_per_second if getattr(self.backend, "network", True) else 0)
+        self.hits = 0
+        self.misses = 0
+        self.failures = {}
+        if cache_file is not None and os.path.dirname(cache_file):
+            os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+        # the worker threads of translate_batch write to the cache, the lock serializes the access to the connection
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(":memory:" if cache_file is None else cache_file, check_same_thread=False)
+        self._connection.execute("CREATE TABLE IF NOT EXISTS translations (source TEXT, target TEXT, text TEXT, "
+                                 "translation TEXT, PRIMARY KEY (source, target, text))")
+        self._connection.commit()
+
+    def _cached(self, texts: list, source: str, target: str):
+        """
+        returns a dictionary with the cached translations of the input texts
+        """
+        cached = {}
+        with self._lock:
+            cursor = self._connection.cursor()
+            # chunks stay below SQLite's limit for the number of variables in a statement
+            for i in range(0, len(texts), 500):
+                chunk = texts[i:i + 500]
+                rows = cursor.execute("SELECT text, translation FROM translations WHERE source = ? AND target = ? AND "
+                                      "text IN (" + ",".join("?" * len(chunk)) + ")", [source, target] + chunk)
+                cached.update(rows.fetchall())
+        return cached
+
+    def _store(self, translations: dict, source: str, target: str):
+        """
+        writes the translations (text -> translation) to the cache
+        """
+        with self._lock:
+            self._connection.executemany("INSERT OR REPLACE INTO translations VALUES (?, ?, ?, ?)",
+                                         [(source, target, text, translation)
+                                          for text, translation in translations.items()])
+            self._connection.commit()
+
+    def _request(self, texts: list, source: str, target: str):
+        """
+        translates a chunk of texts with one batch call of the backend. If the batch call fails, the texts are
+        translated one by one, s.t. a single text can't fail the whole chunk.
+
+        Returns
+        -------
+        translations: dict
+            text -> translation of the texts that were translated
+        failures: dict
+            text -> exception of the texts that couldn't be translated
+        """
+        if hasattr(self.backend, "translate_batch"):
+            self.rate_limiter.wait()
+            try:
+                return dict(zip(texts, self.backend.translate_batch(texts, source, target))), {}
+            except Exception as e:
+                if len(texts) == 1:
+                    return {}, {texts[0]: e}
+        translations, failures = {}, {}
+        for text in texts:
+            self.rate_limiter.wait()
+            try:
+                translations[text] = self.backend.translate(text, source, target)
+            except Exception as e:
+                failures[text] = e
+        return translations, failures
+
+    def _translate_chunk(self, texts: list, source: str, target: str):
+        """
+        translates a chunk of texts and writes the translations to the cache as soon as they arrive
+        """
+        translations, failures = self._request(texts, source, target)
+        if translations:
+            self._store(translations, source, target)
+        return translations, failures
+
+    def translate_batch(self, texts: list, source=None, target=None):
+        """
+        translates a list of texts. Every distinct text is translated only once, cached texts are not sent to the
+        backend and the missing texts are sent in chunks of batch_size texts. The translations of every chunk are
+        stored in the cache as soon as they arrive. Texts which can't be translated are returned unchanged and
+        recorded in failures, s.t. one failing text doesn't lose the translations of the others.
+
+        Parameters
+        ----------
+        texts: list
+            list of texts (str) that will be translated
+        source: None/str
+            source language. The default None uses the source language of the service.
+        target: None/str
+            target language. The default None uses the target language of the service.
+
+        Returns
+        -------
+        translations: list
+            list of the translated texts in the order of the input texts
+        """
+        source = self.source if source is None else source
+        target = self.target if target is None else target
+        unique_texts = list(dict.fromkeys(texts))
+        translations = self._cached(unique_texts, source, target)
+        missing_texts = [text for text in unique_texts if text not in translations]
+        self.hits += len(unique_texts) - len(missing_texts)
+        self.misses += len(missing_texts)
+        self.failures = {}
+        if missing_texts:
+            chunks = [missing_texts[i:i + self.batch_size] for i in range(0, len(missing_texts), self.batch_size)]
+            with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+                futures = [pool.submit(self._translate_chunk, chunk, source, target) for chunk in chunks]
+                for future in as_completed(futures):
+                    new_translations, failures = future.result()
+                    translations.update(new_translations)
+                    self.failures.update(failures)
+        return [translations.get(text, text) for text in texts]
+
+    def translate(self, text: str, source=None, target=None):
+        """
+        translates a single text, see translate_batch
+        """
+        return self.translate_batch([text], source=source, target=target)[0]
+
+    def close(self):
+        """
+        closes the connection to the cache
+        """
+        with self._lock:
+            self._connection.close()
+
+
+# shared service of this process, s.t. all stages use the same cache
+_default_service = None
+
+
+def default_translation_service():
+    """
+    returns the shared TranslationService of this process (Google Translate backend, default cache file), the
+    service is created at the first call
+
+    Returns
+    -------
+    translation_service: TranslationService
+        the shared service
+    """
+    global _default_service
+    if _default_service is None:
+        _default_service = TranslationService()
+    return _default_service
@@ -1,7 +1,6 @@
 import os
 import ast
-import time
-from deep_translator import GoogleTranslator
+from PropertyExtraction.Code.translation_service import default_translation_service
 
 
 def generate_other_english_questions(property_filename: str, other_type: str,
@@ -37,7 +36,7 @@ def generate_other_english_questions(property_filename: str, other_type: str,
 
 def translate_english_other_questions(questions_list: list, other_type: str, position: str,
                                       path="C:/Users/ubmen/Desktop/BA_Prog/QuestionGeneration/OtherQuestions/"
-                                           "OtherQuestionsAG/", return_list=False):
+                                           "OtherQuestionsAG/", return_list=False, translation_service=None):
     """
     Translates a list of English Questions for categories of "other" to German
     Parameters
@@ -53,6 +52,8 @@ def translate_english_other_questions(questions_list: list, other_type: str, pos
         The default is "C:/Users/ubmen/Desktop/BA_Prog/QuestionGeneration/OtherQuestions/OtherQuestionsAG/"
     return_list: bool
         determines whether a list of questions translated to German will be returned (True) or not (False)
+    translation_service: None/TranslationService
+        service used for the translation. The default None uses the shared service of default_translation_service.
 
     Returns
     -------
@@ -65,10 +66,9 @@ def translate_english_other_questions(questions_list: list, other_type: str, pos
         raise ValueError("Invalid input for entity position, must be either SP or OP")
     path = path + other_type + "QuestionsAG/"
     filename = other_type + "Questions" + position + "_AG.txt"
-    english2german_translated = []
-    for q in questions_list:
-        english2german_translated.append(GoogleTranslator(source='auto', target='german').translate(q))
-        time.sleep(0.3)
+    if translation_service is None:
+        translation_service = default_translation_service()
+    english2german_translated = translation_service.translate_batch(questions_list)
     with open(os.path.join(path, filename), "w", encoding="utf-8") as f:
         f.write("\n".join(map(str, english2german_translated)))
         f.close()
@@ -98,6 +98,14 @@ def save_other_ag_questions(ag_questions_filename: str, other_type: str, positio
     translate_english_other_questions(english_questions_list, other_type, position)
 
 
+# translate the questions of all categories in one deduplicated batch first, the calls below are answered by the cache
+other_ag_categories = ["Building", "Disease", "History", "Literature", "Magazine", "Newspaper", "Organization", "Park",
+                       "School", "Ship"]
+default_translation_service().translate_batch([question for other_type in other_ag_categories
+                                               for position in ["SP", "OP"]
+                                               for question in generate_other_english_questions(
+                                                   other_type + "TotalProperties" + position + ".txt", other_type)])
+
 # Building SP and OP
 save_other_ag_questions("BuildingTotalPropertiesSP.txt", "Building", "SP")
 save_other_ag_questions("BuildingTotalPropertiesOP.txt", "Building", "OP")
@@ -1,7 +1,6 @@
 import os
 import ast
-import time
-from deep_translator import GoogleTranslator
+from PropertyExtraction.Code.translation_service import default_translation_service
 
 
 def generate_english_person_questions(property_filename: str, path="C:/Users/ubmen/Desktop/BA_Prog/PropertyExtraction/"
@@ -34,9 +33,9 @@ def generate_english_person_questions(property_filename: str, path="C:/Users/ubm
 
 def translate_english_person_questions(questions_list: list, filename: str,
                                        path="C:/Users/ubmen/Desktop/BA_Prog/QuestionGeneration/PersonQuestions/"
-                                            "PersonQuestionsAG", return_list=False):
+                                            "PersonQuestionsAG", return_list=False, translation_service=None):
     """
-    translates the english questions to German via Google Translator
+    translates the english questions to German via the translation service (Google Translator with a persistent cache)
 
     Parameters
     ----------
@@ -48,15 +47,16 @@ def translate_english_person_questions(questions_list: list, filename: str,
         Designated filepath where the file will be stored
     return_list: bool
         determines whether a list containing the translated questions will be returned. The default is False.
+    translation_service: None/TranslationService
+        service used for the translation. The default None uses the shared service of default_translation_service.
 
     Returns
     -------
 
     """
-    english2german_translated = []
-    for q in questions_list:
-        english2german_translated.append(GoogleTranslator(source='auto', target='german').translate(q))
-        time.sleep(0.3)
+    if translation_service is None:
+        translation_service = default_translation_service()
+    english2german_translated = translation_service.translate_batch(questions_list)
     with open(os.path.join(path, filename), "w", encoding="utf-8") as f:
         f.write("\n".join(map(str, english2german_translated)))
         f.close()
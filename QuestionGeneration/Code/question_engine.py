@@ -0,0 +1,266 @@
+# -*- coding: utf-8 -*-
+"""
+This Python file provides the question generation engine for all categories, entity positions and question types. It
+replaces the per-category calls of generate_person_baseline_questions.py, generate_other_baseline_questions.py,
+generate_person_automated_questions.py and generate_other_automated_questions.py:
+
+    * the property files are read once into a property index per (category, position)
+    * the templates of the question types are compiled once into a prefix and suffix around the property
+    * the English AG questions of all categories are translated in one batch by the translation service
+    * the question files are written atomically (temporary file + os.replace)
+    * a manifest stores the content hash of the inputs of every question file, files whose property file and template
+      didn't change are not written again
+
+NL questions are human-generated and can't be generated from templates, they are only checked against the property
+index (one question per property).
+"""
+
+import os
+import ast
+import json
+import hashlib
+from PropertyExtraction.Code.translation_service import default_translation_service
+
+category_list = ["Person", "Building", "Disease", "History", "Literature", "Magazine", "Newspaper", "Organization",
+                 "Park", "School", "Ship"]
+entity_positions = ["SP", "OP"]
+# templates of the generated question types, "{de}" is replaced by the German and "{en}" by the English property
+question_templates = {"BL": "{de} von __?", "AG": "What is the {en} of __?"}
+# question types whose rendered questions are translated to German
+translated_question_types = ["AG"]
+
+
+class QuestionTemplate:
+    """
+    Class for a question template which is compiled once into the text before and after the property placeholder
+
+    Attributes
+    -------------
+    question_type: str
+        question type of the template
+    pattern: str
+        template with exactly one placeholder, either "{de}" or "{en}"
+    """
+    placeholders = {"{de}": 0, "{en}": 1}
+
+    def __init__(self, question_type: str, pattern: str):
+        """
+        init method of the class, compiles the pattern
+
+        Parameters
+        ----------
+        question_type: str
+            question type of the template, e.g. "BL"
+        pattern: str
+            template with exactly one placeholder, e.g. "{de} von __?"
+        """
+        self.question_type = question_type
+        self.pattern = pattern
+        found = [placeholder for placeholder in self.placeholders if placeholder in pattern]
+        if len(found) != 1 or pattern.count(found[0]) != 1:
+            raise ValueError("Incorrect template, must contain exactly one placeholder {de} or {en}")
+        self._index = self.placeholders[found[0]]
+        self._prefix, self._suffix = pattern.split(found[0])
+
+    def render(self, property_tuples: list):
+        """
+        renders the template for a list of (German property, English property) tuples
+
+        Returns
+        -------
+        questions: list
+            one question per property tuple
+        """
+        prefix, suffix, index = self._prefix, self._suffix, self._index
+        return [prefix + prop[index] + suffix for prop in property_tuples]
+
+
+def property_file(category: str, entity_position: str,
+                  path="C:/Users/ubmen/Desktop/BA_Prog/PropertyExtraction/Properties/"):
+    """
+    returns the full path of the property file of a category and entity position
+    """
+    if category == "Person":
+        return os.path.join(path, "PersonProperties/PersonPropertiesTXTFiles/PersonTotalProperties"
+                            + entity_position + ".txt")
+    return os.path.join(path, "OtherProperties/" + category + "Properties/" + category + "PropertiesTXTFiles/"
+                        + category + "TotalProperties" + entity_position + ".txt")
+
+
+def question_file(category: str, entity_position: str, question_type: str,
+                  path="C:/Users/ubmen/Desktop/BA_Prog/QuestionGeneration/"):
+    """
+    returns the full path of the question file of a category, entity position and question type
+    """
+    filename = category + "Questions" + entity_position + "_" + question_type + ".txt"
+    if category == "Person":
+        return os.path.join(path, "PersonQuestions/PersonQuestions" + question_type, filename)
+    category_directory = category + "Questions" + question_type
+    if (category, question_type) == ("Organization", "NL"):
+        category_directory = "OrganizationsQuestionsNL"
+    return os.path.join(path, "OtherQuestions/OtherQuestions" + question_type, category_directory, filename)
+
+
+def load_property_index(categories=None, positions=None,
+                        path="C:/Users/ubmen/Desktop/BA_Prog/PropertyExtraction/Properties/"):
+    """
+    reads every property file once
+
+    Parameters
+    ----------
+    categories: None/list
+        categories that will be loaded. The default None loads all categories.
+    positions: None/list
+        entity positions that will be loaded. The default None loads "SP" and "OP".
+    path: str
+        path of the Properties directory
+
+    Returns
+    -------
+    property_index: dict
+        mapping of (category, position) to a dictionary with the "properties" (list of (German, English) tuples) and
+        the sha256 "hash" of the property file
+    """
+    categories = category_list if categories is None else categories
+    positions = entity_positions if positions is None else positions
+    property_index = {}
+    for category in categories:
+        for position in positions:
+            with open(property_file(category, position, path=path), "rb") as f:
+                content = f.read()
+            lines = content.decode("utf-8").splitlines()
+            property_index[(category, position)] = {
+                "properties": [ast.literal_eval(line.strip()) for line in lines if line.strip()],
+                "hash": hashlib.sha256(content).hexdigest()}
+    return property_index
+
+
+def input_hash(property_hash: str, pattern: str, question_type: str, target_language="german"):
+    """
+    returns the content hash of all inputs of a question file
+    """
+    inputs = property_hash + "\n" + pattern
+    if question_type in translated_question_types:
+        inputs += "\n" + target_language
+    return hashlib.sha256(inputs.encode("utf-8")).hexdigest()
+
+
+def write_atomic(questions: list, filename: str):
+    """
+    writes the questions to a temporary file in the same directory and replaces the question file with it, s.t. an
+    interrupted run never leaves a partially written question file
+    """
+    os.makedirs(os.path.dirname(filename), exist_ok=True)
+    temporary_file = filename + ".tmp"
+    with open(temporary_file, "w", encoding="utf-8") as f:
+        f.write("\n".join(map(str, questions)))
+    os.replace(temporary_file, filename)
+
+
+def generate_questions(categories=None, positions=None, question_types=None, force=False, translation_service=None,
+                       property_path="C:/Users/ubmen/Desktop/BA_Prog/PropertyExtraction/Properties/",
+                       question_path="C:/Users/ubmen/Desktop/BA_Prog/QuestionGeneration/",
+                       manifest_file="C:/Users/ubmen/Desktop/BA_Prog/QuestionGeneration/QuestionManifest.json"):
+    """
+    generates the question files of all combinations of category, entity position and question type whose inputs
+    changed since the last run
+
+    Parameters
+    ----------
+    categories: None/list
+        categories for which questions will be generated. The default None generates all categories.
+    positions: None/list
+        entity positions. The default None generates "SP" and "OP".
+    question_types: None/list
+        generated question types, must be keys of question_templates. The default None generates "BL" and "AG".
+    force: bool
+        determines whether all files will be written regardless of the manifest. The default is False.
+    translation_service: None/TranslationService
+        service for the translated question types. The default None uses the shared service of
+        default_translation_service.
+    property_path: str
+        path of the Properties directory
+    question_path: str
+        path of the QuestionGeneration directory
+    manifest_file: str
+        json file in which the input hashes of the question files are stored
+
+    Returns
+    -------
+    written_files: dict
+        dictionary with the list of "written" and the list of "unchanged" question files
+    """
+    question_types = list(question_templates) if question_types is None else question_types
+    for question_type in question_types:
+        if question_type not in question_templates:
+            raise ValueError("Invalid input for question type, must be either " + " or ".join(question_templates))
+    templates = {question_type: QuestionTemplate(question_type, question_templates[question_type])
+                 for question_type in question_types}
+    property_index = load_property_index(categories, positions, path=property_path)
+    manifest = {}
+    if os.path.isfile(manifest_file):
+        with open(manifest_file, encoding="utf-8") as f:
+            manifest = json.load(f)
+    # determine the outdated files first, s.t. all translations can be requested in one batch
+    outdated = []
+    unchanged = []
+    for (category, position), entry in property_index.items():
+        for question_type, template in templates.items():
+            filename = question_file(category, position, question_type, path=question_path)
+            file_hash = input_hash(entry["hash"], template.pattern, question_type)
+            if force is True or manifest.get(filename) != file_hash or not os.path.isfile(filename):
+                outdated.append((filename, file_hash, template.render(entry["properties"]), question_type))
+            else:
+                unchanged.append(filename)
+    to_translate = [question for filename, file_hash, questions, question_type in outdated
+                    if question_type in translated_question_types for question in questions]
+    if to_translate:
+        if translation_service is None:
+            translation_service = default_translation_service()
+        translations = dict(zip(to_translate, translation_service.translate_batch(to_translate)))
+        outdated = [(filename, file_hash, [translations[question] for question in questions]
+                     if question_type in translated_question_types else questions, question_type)
+                    for filename, file_hash, questions, question_type in outdated]
+    for filename, file_hash, questions, question_type in outdated:
+        write_atomic(questions, filename)
+        manifest[filename] = file_hash
+    if outdated:
+        os.makedirs(os.path.dirname(manifest_file), exist_ok=True)
+        with open(manifest_file + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2, sort_keys=True)
+        os.replace(manifest_file + ".tmp", manifest_file)
+    return {"written": [outdated_file[0] for outdated_file in outdated], "unchanged": unchanged}
+
+
+def check_nl_questions(categories=None, positions=None,
+                       property_path="C:/Users/ubmen/Desktop/BA_Prog/PropertyExtraction/Properties/",
+                       question_path="C:/Users/ubmen/Desktop/BA_Prog/QuestionGeneration/"):
+    """
+    checks whether the human-generated NL question files contain one question per property
+
+    Returns
+    -------
+    mismatches: list
+        list of (question_file, number of questions, number of properties) tuples for all files that are missing
+        (number of questions is None) or don't match the property index
+    """
+    property_index = load_property_index(categories, positions, path=property_path)
+    mismatches = []
+    for (category, position), entry in property_index.items():
+        filename = question_file(category, position, "NL", path=question_path)
+        if not os.path.isfile(filename):
+            mismatches.append((filename, None, len(entry["properties"])))
+            continue
+        with open(filename, encoding="utf-8") as f:
+            num_questions = len(f.read().split("\n"))
+        if num_questions != len(entry["properties"]):
+            mismatches.append((filename, num_questions, len(entry["properties"])))
+    return mismatches
+
+
+if __name__ == "__main__":
+    generated_files = generate_questions()
+    print(f"{len(generated_files['written'])} question files written, "
+          f"{len(generated_files['unchanged'])} unchanged")
+    for mismatch in check_nl_questions():
+        print(f"NL questions don't match the properties: {mismatch}")
@@ -0,0 +1,497 @@
+# -*- coding: utf-8 -*-
+"""
+This Python file provides an offline benchmark of the triple extraction hot path (questions of an entity -> QA model ->
+result dictionaries). It reports entities/sec, questions/sec, p50/p95 latency per question, the number of processed
+tokens, the peak RSS and the model load time, and stores the results as JSON s.t. runs can be compared.
+
+    * build_corpus samples a small fixed corpus (fixed seed) from the Wikipedia text files of the categories and the
+      question and property files of the question generation, and stores it as JSON
+    * the model is either a locally cached model (HF_HUB_OFFLINE is set, nothing is downloaded) or, with --tiny, a tiny
+      random-weight BERT model with a WordPiece vocabulary built from the corpus, for CI-speed runs
+    * backends is a registry of the ways to call the QA model, every backend is run for every batch size
+    * window_sweep runs the bucketed backend under several window settings (window size, overlap and aggregation, see
+      WindowSettings of qa_pipeline.py) and reports the windows and the questions/sec of each of them
+    * token_cache_check answers the corpus with and without the token cache of QuestionMatrix and checks that the
+      answers are the same and that the tokenizer isn't called for the cached questions
+
+The corpus, the results and the tiny model are stored in the temporary directory of the system (benchmark_path)
+unless --corpus and --output are given, s.t. a run doesn't write into the repository.
+
+Usage (from the repository root):
+    python -m TripleExtraction.Code.benchmark_extraction --tiny --backends sequential bucketed --batch-sizes 2048 8192
+    python -m TripleExtraction.Code.benchmark_extraction --model Sahajtomar/GELECTRAQA --compare baseline.json
+    python -m TripleExtraction.Code.benchmark_extraction --tiny --backends bucketed --windows 384:128 384:64 256:32
+    python -m TripleExtraction.Code.benchmark_extraction --tiny --backends bucketed --check-token-cache
+"""
+
+import os
+import sys
+import ast
+import json
+import time
+import random
+import argparse
+import tempfile
+import platform
+import collections
+
+os.environ.setdefault("HF_HUB_OFFLINE", "1")
+import numpy as np
+import torch
+from transformers import BertConfig, BertForQuestionAnswering, BertTokenizerFast, pipeline
+from qa_pipeline import CandidateQuestionAnsweringPipeline, WindowSettings
+from question_matrix import QuestionMatrix
+
+from Pipeline.Code.artifacts import ArtifactResolver, category_list, repository_path
+from DataSelection.Code.memory_profile import peak_rss_mb
+
+# default directory of the corpus, the results and the tiny model
+benchmark_path = os.path.join(tempfile.gettempdir(), "TripleExtractionBenchmarks")
+
+
+def build_corpus(entities_per_category=1, questions_per_entity=10, max_characters=20000, question_type="BL",
+                 entity_position="SP", categories=None, seed=0, path=repository_path):
+    """
+    samples the benchmark corpus
+
+    Parameters
+    ----------
+    entities_per_category: int
+        number of entities per category. The default is 1.
+    questions_per_entity: int
+        number of questions (the first ones of the question file) per entity. The default is 10.
+    max_characters: None/int
+        texts are cut after max_characters characters, s.t. single long biographies don't dominate the run time.
+        The default is 20000.
+    question_type: str
+        question type of the questions. The default is "BL".
+    entity_position: str
+        entity position of the questions. The default is "SP".
+    categories: None/list
+        categories of the entities. The default None uses all categories.
+    seed: int
+        seed of the sampling. The default is 0.
+    path: str
+        path of the repository
+
+    Returns
+    -------
+    corpus: dict
+        dictionary with the "settings" of the sampling and the "entities", a list of dictionaries with the entity,
+        category, text, questions (with the placeholder) and predicates
+    """
+    from QuestionGeneration.Code.question_engine import question_file, property_file
+    categories = category_list if categories is None else categories
+    sampler = random.Random(seed)
+    entities = []
+    for category in categories:
+        with open(ArtifactResolver(path).text_file(category), encoding="utf-8") as f:
+            entity_text_tuples = [ast.literal_eval(line.strip()) for line in f if line.strip()]
+        with open(question_file(category, entity_position, question_type,
+                                path=os.path.join(path, "QuestionGeneration/")), encoding="utf-8-sig") as f:
+            questions = [line.strip() for line in f][:questions_per_entity]
+        with open(property_file(category, entity_position,
+                                path=os.path.join(path, "PropertyExtraction/Properties/")), encoding="utf-8-sig") as f:
+            predicates = [ast.literal_eval(line.strip())[0] for line in f if line.strip()][:len(questions)]
+        for entity, text in sampler.sample(entity_text_tuples, min(entities_per_category, len(entity_text_tuples))):
+            entities.append({"entity": entity, "category": category, "text": text[:max_characters],
+                             "questions": questions, "predicates": predicates})
+    return {"settings": {"entities_per_category": entities_per_category, "questions_per_entity": questions_per_entity,
+                         "max_characters": max_characters, "question_type": question_type,
+                         "entity_position": entity_position, "seed": seed},
+            "entities": entities}
+
+
+def load_corpus(corpus_file: str, **kwargs):
+    """
+    loads the corpus from corpus_file, or builds it with build_corpus(**kwargs) and stores it there if the file doesn't
+    exist yet, s.t. all runs use the same corpus
+    """
+    if os.path.isfile(corpus_file):
+        with open(corpus_file, encoding="utf-8") as f:
+            return json.load(f)
+    corpus = build_corpus(**kwargs)
+    if os.path.dirname(corpus_file):
+        os.makedirs(os.path.dirname(corpus_file), exist_ok=True)
+    with open(corpus_file, "w", encoding="utf-8") as f:
+        json.dump(corpus, f, ensure_ascii=False)
+    return corpus
+
+
+def tiny_model(directory: str, corpus: dict, vocabulary_size=2000, seed=0):
+    """
+    creates a tiny random-weight BERT QA model with a WordPiece vocabulary of the most frequent words and all
+    characters of the corpus and saves it with its tokenizer to directory
+
+    Returns
+    -------
+    directory: str
+        the directory of the model, can be passed as model name to the pipeline
+    """
+    texts = [entity["text"] for entity in corpus["entities"]]
+    texts += [question for entity in corpus["entities"] for question in entity["questions"]]
+    characters = sorted(set("".join(texts)) - set(" \n\t"))
+    words = collections.Counter(word for text in texts for word in text.split() if word.isalpha())
+    vocabulary = ["[PAD]", "[UNK]", "[CLS]", "[SEP]", "[MASK]"] + characters + ["##" + c for c in characters]
+    vocabulary += [word for word, count in words.most_common(vocabulary_size) if len(word) > 1]
+    os.makedirs(directory, exist_ok=True)
+    with open(os.path.join(directory, "vocab.txt"), "w", encoding="utf-8") as f:
+        f.write("\n".join(vocabulary))
+    BertTokenizerFast(os.path.join(directory, "vocab.txt"), do_lower_case=False).save_pretrained(directory)
+    torch.manual_seed(seed)
+    config = BertConfig(vocab_size=len(vocabulary), hidden_size=32, num_hidden_layers=2, num_attention_heads=2,
+                        intermediate_size=64, max_position_embeddings=512)
+    BertForQuestionAnswering(config).save_pretrained(directory)
+    return directory
+
+
+def load_model(model_name: str):
+    """
+    loads the QA pipeline of a local model
+
+    Returns
+    -------
+    nlp, load_seconds: tuple
+        the CandidateQuestionAnsweringPipeline and the time it took to load it
+    """
+    start = time.perf_counter()
+    nlp = pipeline('question-answering', model=model_name, tokenizer=model_name,
+                   pipeline_class=CandidateQuestionAnsweringPipeline)
+    return nlp, time.perf_counter() - start
+
+
+def run_sequential(nlp, q_dicts: list, batch_size: int):
+    """
+    one pipeline call per question, as in extract_triples (batch_size is ignored)
+
+    Returns
+    -------
+    answers, latencies: tuple
+        the answers and the latency of every question
+    """
+    answers = []
+    latencies = []
+    for q_dict in q_dicts:
+        start = time.perf_counter()
+        answers.append(nlp(q_dict))
+        latencies.append(time.perf_counter() - start)
+    return answers, latencies
+
+
+def run_pipeline_batches(nlp, q_dicts: list, batch_size: int):
+    """
+    one pipeline call for all questions of an entity with the batching of transformers (batch_size windows per
+    forward pass). The latency of a question is the time until all questions of the entity are answered.
+    """
+    start = time.perf_counter()
+    answers = nlp(q_dicts, batch_size=batch_size)
+    answers = answers if isinstance(answers, list) else [answers]
+    return answers, [time.perf_counter() - start] * len(q_dicts)
+
+
+def run_bucketed(nlp, q_dicts: list, batch_size: int):
+    """
+    length-bucketed batches as in extract_triples_batched, batch_size is the max_tokens budget. The latency of a
+    question is the time until all questions of the entity are answered.
+    """
+    start = time.perf_counter()
+    answers = nlp.answer_batch(q_dicts, max_tokens=batch_size)
+    return answers, [time.perf_counter() - start] * len(q_dicts)
+
+
+backends = {"sequential": run_sequential, "pipeline_batch": run_pipeline_batches, "bucketed": run_bucketed}
+
+
+def count_tokens(nlp, q_dicts: list):
+    """
+    counts the tokens of all context windows the model processes for the questions
+    """
+    return sum(feature["input_ids"].shape[1] for q_dict in q_dicts for feature in nlp.preprocess(q_dict))
+
+
+def benchmark(nlp, corpus: dict, backend: str, batch_size: int, warmup=1):
+    """
+    runs one backend with one batch size on the corpus
+
+    Parameters
+    ----------
+    nlp: CandidateQuestionAnsweringPipeline
+        the QA pipeline
+    corpus: dict
+        the corpus of build_corpus
+    backend: str
+        key of backends
+    batch_size: int
+        batch size (windows per forward pass, or the max_tokens budget for "bucketed")
+    warmup: int
+        number of entities which are answered once before the measurement. The default is 1.
+
+    Returns
+    -------
+    metrics: dict
+        entities_per_second, questions_per_second, p50_latency_ms, p95_latency_ms, seconds, entities, questions
+    """
+    if backend not in backends:
+        raise ValueError("Invalid input for backend, must be either " + " or ".join(backends))
+    entity_q_dicts = [[{'question': question, "context": entity["text"]}
+                       for question in QuestionMatrix(entity["questions"],
+                                                      [(p,) for p in entity["predicates"]]).questions(entity["entity"])]
+                      for entity in corpus["entities"]]
+    for q_dicts in entity_q_dicts[:warmup]:
+        backends[backend](nlp, q_dicts, batch_size)
+    latencies = []
+    start = time.perf_counter()
+    for q_dicts in entity_q_dicts:
+        latencies += backends[backend](nlp, q_dicts, batch_size)[1]
+    seconds = time.perf_counter() - start
+    num_questions = sum(len(q_dicts) for q_dicts in entity_q_dicts)
+    return {"entities": len(entity_q_dicts), "questions": num_questions, "seconds": round(seconds, 4),
+            "entities_per_second": round(len(entity_q_dicts) / seconds, 3),
+            "questions_per_second": round(num_questions / seconds, 3),
+            "p50_latency_ms": round(float(np.percentile(latencies, 50)) * 1000, 3),
+            "p95_latency_ms": round(float(np.percentile(latencies, 95)) * 1000, 3)}
+
+
+def window_sweep(nlp, corpus: dict, window_settings_list: list, max_tokens=8192):
+    """
+    answers all questions of the corpus with the bucketed backend under every window settings
+
+    Parameters
+    ----------
+    nlp: CandidateQuestionAnsweringPipeline
+        the QA pipeline
+    corpus: dict
+        the corpus of build_corpus
+    window_settings_list: list
+        list of WindowSettings
+    max_tokens: int
+        max_tokens budget of the batches. The default is 8192.
+
+    Returns
+    -------
+    window_runs: list
+        one dictionary per window settings with the settings, the windows of all questions, the forwarded windows, the
+        forwarded tokens, the seconds and the questions/sec
+    """
+    entity_q_dicts = [[{'question': question, "context": entity["text"]}
+                       for question in QuestionMatrix(entity["questions"],
+                                                      [(p,) for p in entity["predicates"]]).questions(entity["entity"])]
+                      for entity in corpus["entities"]]
+    window_runs = []
+    for window_settings in window_settings_list:
+        parameters = window_settings.call_parameters()
+        windows = scored_windows = tokens = 0
+        start = time.perf_counter()
+        for q_dicts in entity_q_dicts:
+            nlp.answer_batch(q_dicts, max_tokens=max_tokens, **parameters)
+            windows += nlp.bucket_stats["windows"]
+            scored_windows += nlp.bucket_stats["scored_windows"]
+            tokens += nlp.bucket_stats["tokens"]
+        seconds = time.perf_counter() - start
+        num_questions = sum(len(q_dicts) for q_dicts in entity_q_dicts)
+        window_runs.append({"max_seq_len": window_settings.max_seq_len, "doc_stride": window_settings.doc_stride,
+                            "aggregation": window_settings.aggregation, "windows": windows,
+                            "scored_windows": scored_windows, "tokens": tokens, "seconds": round(seconds, 4),
+                            "windows_per_question": round(windows / num_questions, 3),
+                            "questions_per_second": round(num_questions / seconds, 3)})
+    return window_runs
+
+
+class RecordingTokenizer:
+    """
+    Class which passes every call and attribute on to a tokenizer and records the texts of its calls, s.t. a pipeline
+    can be run with it instead of its tokenizer
+
+    Attributes
+    -------------
+    tokenizer: PreTrainedTokenizerFast
+        the tokenizer the calls are passed on to
+    texts: list
+        list of (text, text_pair) tuples of the calls
+    """
+    def __init__(self, tokenizer):
+        self.tokenizer = tokenizer
+        self.texts = []
+
+    def __call__(self, text=None, text_pair=None, *args, **kwargs):
+        self.texts.append((text, text_pair))
+        return self.tokenizer(text, text_pair, *args, **kwargs)
+
+    def __getattr__(self, name: str):
+        return getattr(self.tokenizer, name)
+
+
+def token_cache_check(nlp, corpus: dict, max_tokens=8192):
+    """
+    answers the questions of every entity of the corpus with the bucketed backend, once as in benchmark and once with
+    the question encodings of the token cache (see QuestionMatrix.question_encodings), and records the texts the
+    tokenizer is called with during the second run (see RecordingTokenizer)
+
+    Returns
+    -------
+    check: dict
+        questions, seconds and cached_seconds, tokenizer_calls (of the second run), question_tokenizations (calls
+        whose text contains one of the cached questions), different_answers and passed (no question tokenization and
+        no different answer)
+    """
+    tokenizer = nlp.tokenizer
+    check = {"questions": 0, "seconds": 0.0, "cached_seconds": 0.0, "tokenizer_calls": 0, "question_tokenizations": 0,
+             "different_answers": 0}
+    for entity in corpus["entities"]:
+        question_matrix = QuestionMatrix(entity["questions"], [(p,) for p in entity["predicates"]],
+                                         tokenizer=nlp.tokenizer)
+        questions = question_matrix.questions(entity["entity"])
+        encodings = question_matrix.question_encodings(entity["entity"])
+        start = time.perf_counter()
+        answers = nlp.answer_batch([{'question': question, "context": entity["text"]} for question in questions],
+                                   max_tokens=max_tokens)
+        check["seconds"] += time.perf_counter() - start
+        nlp.tokenizer = RecordingTokenizer(tokenizer)
+        try:
+            start = time.perf_counter()
+            cached_answers = nlp.answer_batch([{'question': question, "context": entity["text"],
+                                                "question_encoding": encoding}
+                                               for question, encoding in zip(questions, encodings)],
+                                              max_tokens=max_tokens)
+            check["cached_seconds"] += time.perf_counter() - start
+            tokenized_texts = nlp.tokenizer.texts
+        finally:
+            nlp.tokenizer = tokenizer
+        cached_questions = {question for question, encoding in zip(questions, encodings) if encoding is not None}
+        check["questions"] += len(questions)
+        check["tokenizer_calls"] += len(tokenized_texts)
+        check["question_tokenizations"] += sum(1 for texts in tokenized_texts
+                                               for text in texts if text in cached_questions)
+        check["different_answers"] += sum(answer != cached_answer for answer, cached_answer
+                                          in zip(answers, cached_answers))
+    check["seconds"] = round(check["seconds"], 4)
+    check["cached_seconds"] = round(check["cached_seconds"], 4)
+    check["passed"] = check["question_tokenizations"] == 0 and check["different_answers"] == 0
+    return check
+
+
+def run_benchmarks(model_name=None, tiny=False, backend_names=None, batch_sizes=(8192,), corpus_file=None,
+                   output_file=None, tiny_directory=None, window_settings_list=None, check_token_cache=False):
+    """
+    runs all backends with all batch sizes and stores the results as JSON
+
+    Parameters
+    ----------
+    model_name: None/str
+        name or path of a locally cached model. The default None uses the tiny model.
+    tiny: bool
+        determines whether the tiny random-weight model is used. The default is False.
+    backend_names: None/list
+        keys of backends. The default None runs all backends.
+    batch_sizes: tuple
+        batch sizes of the backends. The default is (8192,).
+    corpus_file: None/str
+        JSON file of the corpus. The default None uses BenchmarkCorpus.json in benchmark_path.
+    output_file: None/str
+        JSON file of the results. The default None uses BenchmarkResults.json in benchmark_path.
+    tiny_directory: None/str
+        directory of the tiny model. The default None uses TinyModel in benchmark_path.
+    window_settings_list: None/list
+        list of WindowSettings for window_sweep, with the largest batch size. The default None doesn't run the sweep.
+    check_token_cache: bool
+        determines whether token_cache_check is run, with the largest batch size. The default is False.
+
+    Returns
+    -------
+    results: dict
+        the stored results
+    """
+    corpus_file = os.path.join(benchmark_path, "BenchmarkCorpus.json") if corpus_file is None else corpus_file
+    output_file = os.path.join(benchmark_path, "BenchmarkResults.json") if output_file is None else output_file
+    corpus = load_corpus(corpus_file)
+    if tiny is True or model_name is None:
+        model_name = tiny_model(os.path.join(benchmark_path, "TinyModel") if tiny_directory is None
+                                else tiny_directory, corpus)
+    nlp, load_seconds = load_model(model_name)
+    all_q_dicts = [{'question': question.replace("__", entity["entity"]), "context": entity["text"]}
+                   for entity in corpus["entities"] for question in entity["questions"]]
+    results = {"timestamp": time.strftime("%Y-%m-%d %H:%M:%S"), "model": model_name, "tiny": tiny is True,
+               "model_load_seconds": round(load_seconds, 3), "tokens": count_tokens(nlp, all_q_dicts),
+               "corpus": corpus["settings"],
+               "environment": {"python": platform.python_version(), "torch": torch.__version__,
+                               "threads": torch.get_num_threads(), "platform": platform.platform()},
+               "runs": []}
+    for backend in (list(backends) if backend_names is None else backend_names):
+        # the sequential backend doesn't batch, it's run once
+        for batch_size in (batch_sizes[:1] if backend == "sequential" else batch_sizes):
+            metrics = benchmark(nlp, corpus, backend, batch_size)
+            metrics["tokens_per_second"] = round(results["tokens"] / metrics["seconds"], 1)
+            results["runs"].append({"backend": backend, "batch_size": batch_size, **metrics})
+    if window_settings_list is not None:
+        results["window_runs"] = window_sweep(nlp, corpus, window_settings_list, max(batch_sizes))
+    if check_token_cache is True:
+        results["token_cache"] = token_cache_check(nlp, corpus, max(batch_sizes))
+    results["peak_rss_mb"] = peak_rss_mb()
+    if os.path.dirname(output_file):
+        os.makedirs(os.path.dirname(output_file), exist_ok=True)
+    with open(output_file, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    return results
+
+
+def compare_results(baseline: dict, current: dict, tolerance=0.1):
+    """
+    compares the questions/sec of the runs of two result files
+
+    Parameters
+    ----------
+    baseline: dict
+        results of the earlier run
+    current: dict
+        results of the current run
+    tolerance: float
+        relative slowdown which is still accepted. The default is 0.1.
+
+    Returns
+    -------
+    comparison: list
+        list of (backend, batch_size, baseline questions/sec, current questions/sec, ratio, regression) tuples for all
+        runs contained in both results
+    """
+    baseline_runs = {(run["backend"], run["batch_size"]): run for run in baseline["runs"]}
+    comparison = []
+    for run in current["runs"]:
+        key = (run["backend"], run["batch_size"])
+        if key in baseline_runs:
+            ratio = run["questions_per_second"] / baseline_runs[key]["questions_per_second"]
+            comparison.append((*key, baseline_runs[key]["questions_per_second"], run["questions_per_second"],
+                               round(ratio, 3), ratio < 1 - tolerance))
+    return comparison
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="offline benchmark of the triple extraction")
+    parser.add_argument("--model", default=None, help="name or path of a locally cached model")
+    parser.add_argument("--tiny", action="store_true", help="use a tiny random-weight model")
+    parser.add_argument("--backends", nargs="+", default=None, choices=list(backends))
+    parser.add_argument("--batch-sizes", nargs="+", type=int, default=[8192])
+    parser.add_argument("--corpus", default=None, help="JSON file of the corpus, created if it doesn't exist")
+    parser.add_argument("--output", default=None, help="JSON file of the results")
+    parser.add_argument("--compare", default=None, help="JSON results of an earlier run")
+    parser.add_argument("--windows", nargs="+", default=None, help="window settings max_seq_len:doc_stride")
+    parser.add_argument("--aggregation", default="max", help="aggregation of the windows of --windows")
+    parser.add_argument("--check-token-cache", action="store_true",
+                        help="check that the token cache gives the same answers without tokenizing the questions")
+    arguments = parser.parse_args()
+    benchmark_windows = None if arguments.windows is None else \
+        [WindowSettings(*[int(value) for value in window.split(":")], aggregation=arguments.aggregation)
+         for window in arguments.windows]
+    benchmark_results = run_benchmarks(arguments.model, arguments.tiny, arguments.backends,
+                                       tuple(arguments.batch_sizes), arguments.corpus, arguments.output,
+                                       window_settings_list=benchmark_windows,
+                                       check_token_cache=arguments.check_token_cache)
+    print(json.dumps(benchmark_results, indent=2))
+    if arguments.compare is not None:
+        with open(arguments.compare, encoding="utf-8") as f:
+            baseline_results = json.load(f)
+        for compared_run in compare_results(baseline_results, benchmark_results):
+            print("{} (batch size {}): {} -> {} questions/sec, ratio {}{}".format(
+                *compared_run[:5], ", REGRESSION" if compared_run[5] else ""))
+    if arguments.check_token_cache is True and benchmark_results["token_cache"]["passed"] is False:
+        sys.exit("token cache check failed: {question_tokenizations} question tokenizations, {different_answers} "
+                 "different answers".format(**benchmark_results["token_cache"]))
@@ -0,0 +1,332 @@
+# -*- coding: utf-8 -*-
+"""
+This Python file provides the optional instrumentation of the triple extraction. The QA pipeline and TripleExtractor
+record spans for
+
+    * "entity" and "question" (extract_triples), "chunk" (extract_triples_batched), whose questions are answered
+      together: its "entity" and "question" spans have the time answer_batch attributes to every question (see
+      record_attributed_spans) and the argument attributed=True
+    * "tokenization" (preprocess of the pipeline), "forward" (model forward pass), "decoding" (postprocess)
+    * "serialization" (dict_list2json, dict_list2columnar)
+
+Every span updates a counter (count and total time) and a histogram (power-of-two millisecond buckets) of its name, and
+is written as trace event, either as JSONL (one span per line) or in the Chrome trace format (chrome://tracing or
+https://ui.perfetto.dev), depending on the extension of the trace file (.jsonl or .json).
+
+Tracing is enabled with the environment variable EXTRACTION_TRACE=<trace file> or with TripleExtractor(...,
+trace_file=...). If it isn't enabled, span returns one shared no-op context manager, s.t. the extraction only pays for a
+function call per span.
+
+The worker processes of run_extraction (see runtime_settings.py) trace into their own file <name>.worker<pid><extension>
+next to the trace file, which is flushed after every chunk (the workers of a pool exit without the atexit handlers).
+The counters and histograms of the workers are merged into the tracer of the parent, s.t. its summary covers all spans.
+"""
+
+import os
+import json
+import time
+import atexit
+import itertools
+import threading
+import multiprocessing
+
+
+class _NoSpan:
+    """
+    no-op context manager of a disabled tracer
+    """
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+
+_no_span = _NoSpan()
+
+
+class _Span:
+    """
+    context manager which measures one span and passes it to the tracer
+    """
+    __slots__ = ("tracer", "name", "args", "start")
+
+    def __init__(self, tracer, name: str, args: dict):
+        self.tracer = tracer
+        self.name = name
+        self.args = args
+        self.start = 0
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.tracer.record(self.name, self.start, time.perf_counter_ns() - self.start, self.args)
+        return False
+
+
+class Tracer:
+    """
+    Class for the spans, counters and histograms of the extraction
+
+    Attributes
+    -------------
+    enabled: bool
+        determines whether spans are recorded
+    trace_file: None/str
+        file the trace events are written to, None keeps only the counters and histograms
+    trace_format: str
+        "jsonl" or "chrome"
+    counters: dict
+        mapping of span name to [count, total nanoseconds]
+    histograms: dict
+        mapping of span name to a dictionary of bucket (upper bound in ms, power of two) to count
+
+    Methods
+    ------------------------
+    span(name, **args)
+        returns the context manager of a span
+    summary()
+        returns counters and histograms as dictionary
+    flush()
+        writes the buffered trace events
+    worker_settings()
+        returns the settings of the tracers of worker processes
+    drain()
+        returns and resets the counters and histograms
+    merge(state)
+        adds counters and histograms of another tracer
+    """
+    def __init__(self, enabled=True, trace_file=None, buffer_size=10000, origin=None):
+        """
+        init method of the class
+
+        Parameters
+        ----------
+        enabled: bool
+            determines whether spans are recorded. The default is True.
+        trace_file: None/str
+            file for the trace events, the format depends on the extension (.jsonl: JSONL, .json: Chrome trace).
+            The default None doesn't write trace events.
+        buffer_size: int
+            number of JSONL events which are buffered before they are appended to the file. The default is 10000.
+        origin: None/int
+            time (time.perf_counter_ns) the start of the events refers to, e.g. the origin of the tracer of the parent
+            process. The default None uses the time of the creation.
+        """
+        self.enabled = enabled
+        self.trace_file = trace_file
+        self.trace_format = None
+        if trace_file is not None:
+            extension = os.path.splitext(trace_file)[1].lower()
+            if extension not in [".jsonl", ".json"]:
+                raise ValueError("Incorrect trace file extension, must be either .jsonl or .json")
+            self.trace_format = "jsonl" if extension == ".jsonl" else "chrome"
+            if os.path.dirname(trace_file):
+                os.makedirs(os.path.dirname(trace_file), exist_ok=True)
+            open(trace_file, "w").close()
+        self.buffer_size = buffer_size
+        self.counters = {}
+        self.histograms = {}
+        self._events = []
+        self._lock = threading.Lock()
+        self._origin = time.perf_counter_ns() if origin is None else origin
+        self._pid = os.getpid()
+        if trace_file is not None:
+            atexit.register(self.flush)
+
+    @classmethod
+    def from_environment(cls):
+        """
+        creates an enabled tracer if the environment variable EXTRACTION_TRACE is set (its value is the trace file),
+        otherwise a disabled tracer. In a (spawned) worker process, the tracer writes to the file of the worker, s.t.
+        it doesn't truncate the file of the parent.
+        """
+        trace_file = os.environ.get("EXTRACTION_TRACE")
+        if trace_file is None or trace_file == "":
+            return cls(enabled=False)
+        if multiprocessing.parent_process() is not None:
+            trace_file = worker_trace_file(trace_file)
+        return cls(trace_file=trace_file)
+
+    def worker_settings(self):
+        """
+        returns the settings of the tracers of the worker processes as (picklable) dictionary, see start_worker_tracer.
+        The workers keep the origin of this tracer, s.t. the events of all processes are on one time axis.
+        """
+        return {"enabled": self.enabled, "trace_file": self.trace_file, "buffer_size": self.buffer_size,
+                "origin": self._origin}
+
+    def span(self, name: str, **args):
+        """
+        returns the context manager of a span, args are stored with the trace event (e.g. entity, predicate)
+        """
+        if self.enabled is False:
+            return _no_span
+        return _Span(self, name, args)
+
+    def record(self, name: str, start: int, duration: int, args=None):
+        """
+        records a span with start and duration in nanoseconds
+        """
+        bucket = 1
+        while bucket * 1000000 < duration:
+            bucket *= 2
+        with self._lock:
+            counter = self.counters.setdefault(name, [0, 0])
+            counter[0] += 1
+            counter[1] += duration
+            histogram = self.histograms.setdefault(name, {})
+            histogram[bucket] = histogram.get(bucket, 0) + 1
+            if self.trace_file is not None:
+                self._events.append((name, start - self._origin, duration, threading.get_ident(), args))
+                if self.trace_format == "jsonl" and len(self._events) >= self.buffer_size:
+                    self._write_jsonl()
+
+    def _write_jsonl(self):
+        with open(self.trace_file, "a", encoding="utf-8") as f:
+            for name, start, duration, thread, args in self._events:
+                f.write(json.dumps({"name": name, "start_us": start / 1000, "duration_us": duration / 1000,
+                                    "pid": self._pid, "tid": thread, "args": args or {}}, ensure_ascii=False))
+                f.write("\n")
+        self._events = []
+
+    def flush(self):
+        """
+        writes the buffered trace events and empties the buffer. JSONL events are appended, the Chrome trace is written
+        as a whole (it's a single JSON document) with the events of the previous flushes and the new ones.
+        """
+        if self.trace_file is None:
+            return
+        with self._lock:
+            if self.trace_format == "jsonl":
+                self._write_jsonl()
+                return
+            trace_events = []
+            if os.path.isfile(self.trace_file) and os.path.getsize(self.trace_file) > 0:
+                with open(self.trace_file, encoding="utf-8") as f:
+                    trace_events = json.load(f)["traceEvents"]
+            trace_events += [{"name": name, "ph": "X", "ts": start / 1000, "dur": duration / 1000, "pid": self._pid,
+                              "tid": thread, "args": args or {}}
+                             for name, start, duration, thread, args in self._events]
+            with open(self.trace_file, "w", encoding="utf-8") as f:
+                json.dump({"traceEvents": trace_events, "displayTimeUnit": "ms",
+                           "otherData": {"summary": self._summary()}}, f, ensure_ascii=False)
+            self._events = []
+
+    def _summary(self):
+        return {name: {"count": count, "total_ms": round(total / 1000000, 3),
+                       "mean_ms": round(total / count / 1000000, 3),
+                       "histogram_ms": {str(bucket): self.histograms[name][bucket]
+                                        for bucket in sorted(self.histograms[name])}}
+                for name, (count, total) in self.counters.items()}
+
+    def drain(self):
+        """
+        returns the counters and histograms and resets them, s.t. a worker returns the spans of every chunk only once
+        """
+        with self._lock:
+            state = {"counters": self.counters, "histograms": self.histograms}
+            self.counters = {}
+            self.histograms = {}
+        return state
+
+    def merge(self, state: dict):
+        """
+        adds the counters and histograms of another tracer (as returned by drain) to the tracer
+        """
+        with self._lock:
+            for name, (count, total) in state["counters"].items():
+                counter = self.counters.setdefault(name, [0, 0])
+                counter[0] += count
+                counter[1] += total
+            for name, histogram in state["histograms"].items():
+                own_histogram = self.histograms.setdefault(name, {})
+                for bucket, count in histogram.items():
+                    own_histogram[bucket] = own_histogram.get(bucket, 0) + count
+
+    def summary(self):
+        """
+        returns the counters and histograms
+
+        Returns
+        -------
+        summary: dict
+            mapping of span name to a dictionary with count, total_ms, mean_ms and histogram_ms (upper bound of the
+            bucket in ms -> number of spans)
+        """
+        with self._lock:
+            return self._summary()
+
+
+_tracer = Tracer.from_environment()
+
+
+def get_tracer():
+    """
+    returns the tracer of the extraction
+    """
+    return _tracer
+
+
+def set_tracer(tracer: Tracer, flush=True):
+    """
+    replaces the tracer of the extraction, the previous tracer is flushed unless flush is False (e.g. in a forked
+    worker, whose previous tracer is the copy of the tracer of the parent) or the new tracer writes to the same trace
+    file (which it has started anew). The flush of the previous tracer at exit is unregistered, s.t. it doesn't write
+    its events over the trace file later.
+    """
+    global _tracer
+    if flush is True and (_tracer.trace_file is None or _tracer.trace_file != tracer.trace_file):
+        _tracer.flush()
+    atexit.unregister(_tracer.flush)
+    _tracer = tracer
+    return tracer
+
+
+def start_worker_tracer(worker_settings: dict):
+    """
+    replaces the tracer in a worker process by a tracer with the settings of the parent (see Tracer.worker_settings)
+    and its own trace file (see worker_trace_file), the copy of the tracer of the parent isn't flushed
+    """
+    trace_file = worker_settings["trace_file"]
+    return set_tracer(Tracer(**dict(worker_settings, trace_file=None if trace_file is None
+                                    else worker_trace_file(trace_file))), flush=False)
+
+
+def worker_trace_file(trace_file: str, pid=None):
+    """
+    returns the trace file of a worker process, <name>.worker<pid><extension>. The default pid None uses the current
+    process.
+    """
+    root, extension = os.path.splitext(trace_file)
+    return f"{root}.worker{os.getpid() if pid is None else pid}{extension}"
+
+
+def record_attributed_spans(tracer: Tracer, start: int, entity_predicates: list, question_times: list):
+    """
+    records the "question" and "entity" spans of questions which were answered together (see
+    CandidateQuestionAnsweringPipeline.answer_batch): the duration of a question span is the time attributed to the
+    question, the spans are laid out one after another from start (in nanoseconds, time.perf_counter_ns) and the
+    span of an entity covers its questions
+
+    Parameters
+    ----------
+    tracer: Tracer
+        tracer of the spans
+    start: int
+        start of the first span
+    entity_predicates: list
+        (entity, predicate) tuple of every question, the questions of an entity are consecutive
+    question_times: list
+        attributed time of every question in nanoseconds
+    """
+    offset = start
+    for entity, questions in itertools.groupby(zip(entity_predicates, question_times), key=lambda tup: tup[0][0]):
+        entity_start = offset
+        for (_, predicate), duration in questions:
+            tracer.record("question", offset, duration,
+                          {"entity": entity, "predicate": predicate, "attributed": True})
+            offset += duration
+        tracer.record("entity", entity_start, offset - entity_start, {"entity": entity, "attributed": True})
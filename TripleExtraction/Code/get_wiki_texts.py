@@ -2,24 +2,43 @@ import os
 import ast
 import pandas as pd
 import numpy as np
+from Pipeline.Code.artifacts import default_resolver
 
-# load split Wiki TXT file containing entity name and entity text tuples
-wiki_split_txt = "C:/Users/ubmen/Desktop/BA_Prog/TripleExtraction/PreprocessedTXTFiles/FullWikiTXT/FullWikiTXTsplit.txt"
-with open(wiki_split_txt, encoding="utf-8") as f:
-    wiki_article_list = f.readlines()
-    wiki_article_list = [line.strip() for line in wiki_article_list]
-    wiki_article_list = [ast.literal_eval(tup) for tup in wiki_article_list]
+
+def load_wiki_article_list(wiki_split_file=None):
+    """
+    loads the split Wiki TXT file containing entity name and entity text tuples
+
+    Parameters
+    ----------
+    wiki_split_file: None/str
+        full path of the split Wiki TXT file (written by split_wiki_xml.py). The default None loads the file of the
+        artifact resolver once per process.
+
+    Returns
+    -------
+    wiki_article_list: list
+        List of (entity name, article text) tuples
+    """
+    if wiki_split_file is None:
+        return default_resolver().wiki_articles().load()
+    with open(wiki_split_file, encoding="utf-8") as f:
+        wiki_article_list = f.readlines()
+        wiki_article_list = [line.strip() for line in wiki_article_list]
+        wiki_article_list = [ast.literal_eval(tup) for tup in wiki_article_list]
+    return wiki_article_list
 
 
-def wiki_csv2list(category_type: str, path="C:/Users/ubmen/Desktop/BA_Prog/DataExploration/CSVFiles/AllArticles/"):
+def wiki_csv2list(category_type: str, path=None):
     """
     Reads and transforms a CSV file containing Wikipedia entities to a list
     Parameters
     ----------
     category_type: str
         Specific type/name of an entity
-    path: str
-        Filepath from which the entities will be retrieved
+    path: None/str
+        Filepath from which the entities will be retrieved. The default None uses the AllArticles directory of the
+        artifact resolver.
 
     Returns
     -------
@@ -31,6 +50,7 @@ def wiki_csv2list(category_type: str, path="C:/Users/ubmen/Desktop/BA_Prog/DataE
                         "Parks", "Schools", "Ships", "History"]
     if category_type not in valid_categories:
         raise ValueError("Invalid input category")
+    path = default_resolver().all_articles_file("") if path is None else path
     if category_type == "Persons":
         wiki_df = pd.read_csv(path + "Persons.csv", encoding="utf-8-sig")
         wiki_df = wiki_df.drop("Categories", axis=1)
@@ -42,9 +62,8 @@ def wiki_csv2list(category_type: str, path="C:/Users/ubmen/Desktop/BA_Prog/DataE
     return wiki_df_list
 
 
-def write_and_save_wiki_texts(category_type: str,
-                              path="C:/Users/ubmen/Desktop/BA_Prog/TripleExtraction/"
-                                   "PreprocessedTXTFiles/", write_file=True, return_list=False):
+def write_and_save_wiki_texts(category_type: str, path=None, write_file=True, return_list=False,
+                              wiki_article_list=None, csv_path=None):
     """
     writes and saves Wikipedia texts to the corresponding directory/file according to their respective category
 
@@ -52,26 +71,34 @@ def write_and_save_wiki_texts(category_type: str,
     ----------
     category_type: str
         Specific type/name of the category
-    path: str
-        File/Directory path
+    path: None/str
+        File/Directory path. The default None uses the text directory of the artifact resolver (TripleExtraction/).
     write_file: bool
         determines whether the file should actually be written and saved
     return_list: bool
         Determines whether a list containing the article texts will be returned
+    wiki_article_list: None/list
+        List of (entity name, article text) tuples. The default None loads the split Wiki TXT file.
+    csv_path: None/str
+        Filepath of the CSV files of the categories, see wiki_csv2list
 
     Returns
     -------
     title_article_text: list
 
     """
+    path = default_resolver().text_path() if path is None else path
     if category_type != "Persons":
         path = path + "OtherWikiTXT/" + category_type + "WikiTXT"
         filename = category_type + "WikiTXT.txt"
     else:
         path = path + category_type + "WikiTXT/"
         filename = category_type + "FullWikiTXT.txt"
-    category_list = wiki_csv2list(category_type)
-    title_article_text = [article for article in wiki_article_list if article[0] in category_list]
+    if wiki_article_list is None:
+        wiki_article_list = load_wiki_article_list()
+    # set instead of list, the lookup is done for every article of the full Wiki file
+    category_titles = set(wiki_csv2list(category_type, path=csv_path))
+    title_article_text = [article for article in wiki_article_list if article[0] in category_titles]
     if write_file is True:
         with open(os.path.join(path, filename), "w", encoding="utf-8") as f:
             f.write("\n".join(map(str, title_article_text)))
@@ -122,35 +149,40 @@ wiki_categories = ["Persons", "Buildings", "Diseases", "History", "Literature",
                    "Organizations", "Parks", "Schools", "Ships"]
 
 
-# chunk Persons
-persons_list = write_and_save_wiki_texts("Persons", write_file=False, return_list=True)
-# chunked_persons_list = chunks(persons_list, 50)
-# print(len(chunked_persons_list))
-
-persons_chunked_to_three = np.array_split(persons_list, 3)
-persons_list_1 = list(persons_chunked_to_three[0])
-persons_list_1 = [tuple(elem) for elem in persons_list_1]
-
-persons_list_2 = list(persons_chunked_to_three[1])
-persons_list_2 = [tuple(elem) for elem in persons_list_2]
+def save_persons_chunks(persons_list: list, save_path=None, n=3):
+    """
+    splits the Persons articles into n parts and saves them as PersonsWikiTXT1.txt, ..., PersonsWikiTXTn.txt
 
-persons_list_3 = list(persons_chunked_to_three[2])
-persons_list_3 = [tuple(elem) for elem in persons_list_3]
+    Parameters
+    ----------
+    persons_list: list
+        List of (entity name, article text) tuples of the Persons category
+    save_path: None/str
+        Directory path of the chunked files. The default None uses the directory of the Persons files of the artifact
+        resolver.
+    n: int
+        number of parts. The default is 3.
+    """
+    # chunked_persons_list = chunks(persons_list, 50)
+    save_path = os.path.dirname(default_resolver().text_file("Person")) if save_path is None else save_path
+    persons_chunked = np.array_split(persons_list, n)
+    for i, persons_chunk in enumerate(persons_chunked, start=1):
+        # str() of the elements, numpy >= 2.0 would write np.str_('...') instead of the string
+        persons_chunk = [tuple(str(e) for e in elem) for elem in list(persons_chunk)]
+        with open(os.path.join(save_path, "PersonsWikiTXT" + str(i) + ".txt"), "w", encoding="utf-8") as f:
+            f.write("\n".join(map(str, persons_chunk)))
+            f.close()
 
-for w in wiki_categories:
-    write_and_save_wiki_texts(w)
 
-# save chunked Persons fo filepath
-save_path = "C:/Users/ubmen/Desktop/BA_Prog/TripleExtraction/PreprocessedTXTFiles/PersonsWikiTXT/"
+if __name__ == "__main__":
+    wiki_article_list = load_wiki_article_list()
 
-with open(os.path.join(save_path, "PersonsWikiTXT1.txt"), "w", encoding="utf-8") as f:
-    f.write("\n".join(map(str, persons_list_1)))
-    f.close()
+    # chunk Persons
+    persons_list = write_and_save_wiki_texts("Persons", write_file=False, return_list=True,
+                                             wiki_article_list=wiki_article_list)
 
-with open(os.path.join(save_path, "PersonsWikiTXT2.txt"), "w", encoding="utf-8") as f:
-    f.write("\n".join(map(str, persons_list_2)))
-    f.close()
+    for w in wiki_categories:
+        write_and_save_wiki_texts(w, wiki_article_list=wiki_article_list)
 
-with open(os.path.join(save_path, "PersonsWikiTXT3.txt"), "w", encoding="utf-8") as f:
-    f.write("\n".join(map(str, persons_list_3)))
-    f.close()
+    # save chunked Persons fo filepath
+    save_persons_chunks(persons_list)
@@ -0,0 +1,243 @@
+# -*- coding: utf-8 -*-
+"""
+This Python file provides a Class "PairFilter", a cheap pre-filter which scores every (entity, predicate) pair before
+the QA model is called. Pairs whose score is below the cutoff are skipped by extract_triples and recorded as not
+attempted (empty answer, score 0.0, "attempted": False).
+
+The score of a pair is the lexical overlap between the German predicate label and the Wikipedia text of the entity:
+the fraction of the content words of the label whose prefix (default: 4 characters, s.t. "Architekt" also matches
+"Architekten") occurs in the text. Labels with a numeric cue (e.g. "Datum", "Jahr", "Anzahl") get the score 1.0 if the
+text contains a digit, since their answers are dates and numbers rather than words of the label. Predicates in
+always_attempt are never skipped.
+
+recall_cost_report compares the skipped pairs with the gold standard, i.e. how many gold answers would be lost for a
+list of cutoffs, gold_standard_report computes it for all entities of the gold standard of an entity position. On the
+gold standard, every cutoff between 0.1 and 0.5 skips 46-48% (SP) / 57-58% (OP) of the pairs and loses 37% of the
+gold answers, since the lost answers are the ones of pairs with score 0.0. Above 0.5 the recall cost rises to 42% (SP)
+/ 46% (OP). The default cutoff 0.5 is therefore the largest cutoff before this step. Because of the recall cost, the
+filter is only used if it's passed to the extraction (pair_filter), the default extraction attempts every pair.
+
+Usage (from the repository root), writes the reports of SP and OP to Evaluation/EvalResultsFiles/PairFilter:
+    python -m TripleExtraction.Code.pair_filter
+"""
+
+import os
+import re
+import argparse
+import pandas as pd
+
+word_pattern = re.compile(r"\w+")
+default_stopwords = {"von", "vom", "der", "die", "das", "des", "dem", "den", "ein", "eine", "einer", "eines", "und",
+                     "oder", "im", "in", "am", "an", "auf", "aus", "bei", "mit", "nach", "für", "zu", "zum", "zur",
+                     "über", "unter", "als", "ist", "hat", "sich", "wird", "id"}
+default_numeric_cues = {"datum", "jahr", "anzahl", "zahl", "nummer", "höhe", "länge", "breite", "fläche", "gewicht",
+                        "größe", "kapazität", "einwohner", "alter", "jahre", "tage", "kosten", "preis", "auflage"}
+
+
+class PairFilter:
+    """
+    Class for the pre-filter of (entity, predicate) pairs
+
+    Attributes
+    -------------
+    cutoff: float
+        pairs with a score lower than the cutoff are not attempted
+    prefix_length: int
+        number of characters of a word that have to match
+    stopwords: set
+        words of the predicate labels which are ignored
+    numeric_cues: set
+        words of the predicate labels which expect a date or number as answer
+    always_attempt: set
+        predicates which are never skipped
+
+    Methods
+    ------------------------
+    score(predicate, context)
+        returns the score of a pair
+    attempted(predicates, context)
+        returns for every predicate whether the pair will be attempted
+    """
+    def __init__(self, cutoff=0.5, prefix_length=4, stopwords=None, numeric_cues=None, always_attempt=None):
+        """
+        init method of the class
+
+        Parameters
+        ----------
+        cutoff: float
+            pairs with a score lower than the cutoff are not attempted, must be between 0.0 and 1.0.
+            The default is 0.5, see the recall cost in the module docstring.
+        prefix_length: int
+            number of characters of a word that have to match. The default is 4.
+        stopwords: None/set
+            words of the predicate labels which are ignored. The default None uses default_stopwords.
+        numeric_cues: None/set
+            words of the predicate labels which expect a date or number. The default None uses default_numeric_cues.
+        always_attempt: None/set
+            predicates which are never skipped. The default None skips every predicate below the cutoff.
+        """
+        if cutoff < 0 or cutoff > 1:
+            raise ValueError("Incorrect cutoff input: must be a float value between 0.0 and 1.0")
+        self.cutoff = cutoff
+        self.prefix_length = prefix_length
+        self.stopwords = default_stopwords if stopwords is None else stopwords
+        self.numeric_cues = default_numeric_cues if numeric_cues is None else numeric_cues
+        self.always_attempt = set() if always_attempt is None else set(always_attempt)
+        self._predicate_words = {}
+        self._context = None
+        self._context_prefixes = None
+        self._context_has_digits = False
+
+    def _words(self, predicate: str):
+        """
+        returns the content words (as prefixes) of a predicate label and whether the label has a numeric cue
+        """
+        if predicate not in self._predicate_words:
+            words = [word for word in word_pattern.findall(predicate.lower()) if word not in self.stopwords]
+            numeric = any(cue in word for word in words for cue in self.numeric_cues)
+            prefixes = {word[:self.prefix_length] for word in words if not word.isdigit()}
+            self._predicate_words[predicate] = (prefixes, numeric)
+        return self._predicate_words[predicate]
+
+    def _index_context(self, context: str):
+        """
+        indexes the word prefixes of a text once, the questions of one entity share the same text
+        """
+        if context is not self._context:
+            self._context = context
+            self._context_prefixes = {word[:self.prefix_length] for word in word_pattern.findall(context.lower())}
+            self._context_has_digits = any(character.isdigit() for character in context)
+
+    def score(self, predicate: str, context: str):
+        """
+        computes the score of a pair
+
+        Parameters
+        ----------
+        predicate: str
+            German predicate label
+        context: str
+            Wikipedia text of the entity
+
+        Returns
+        -------
+        score: float
+            fraction of the content words of the label that occur in the text, 1.0 for numeric labels if the text
+            contains a digit, for labels without content words and for predicates in always_attempt
+        """
+        if predicate in self.always_attempt:
+            return 1.0
+        self._index_context(context)
+        prefixes, numeric = self._words(predicate)
+        if numeric is True and self._context_has_digits is True:
+            return 1.0
+        if not prefixes:
+            return 1.0
+        return len(prefixes & self._context_prefixes) / len(prefixes)
+
+    def attempted(self, predicates: list, context: str):
+        """
+        returns for every predicate whether the pair will be attempted, i.e. whether its score is at least the cutoff
+        """
+        return [self.score(predicate, context) >= self.cutoff for predicate in predicates]
+
+
+def not_attempted_result(top_k=None):
+    """
+    returns the result dictionary of a skipped pair
+    """
+    result_dict = {'answer': "", 'score': 0.0, 'start': None, 'end': None, 'attempted': False}
+    if top_k is not None:
+        result_dict['candidates'] = []
+        result_dict['null_score'] = None
+    return result_dict
+
+
+def recall_cost_report(entity_context_tuples: list, gold_dict_list: list, cutoffs: list, pair_filter=None):
+    """
+    computes the share of skipped pairs and the recall cost of the pre-filter against the gold standard
+
+    Parameters
+    ----------
+    entity_context_tuples: list
+        List of (entity, Wikipedia text) tuples, only entities of the gold standard are evaluated
+    gold_dict_list: list
+        gold standard dictionaries ({entity: {predicate: {"answer": [...]}}}), e.g. from load_json_dicts("gold", "SP")
+    cutoffs: list
+        cutoffs that will be evaluated
+    pair_filter: None/PairFilter
+        filter whose scores are used, the cutoff of the filter is ignored. The default None uses PairFilter().
+
+    Returns
+    -------
+    report_df: pd.DataFrame
+        DataFrame with one row per cutoff and the columns Cutoff, Pairs, Skipped, Skipped %, Gold Answers,
+        Gold Answers Skipped and Recall Cost %. Gold answers are pairs whose gold answer isn't "nan".
+    """
+    pair_filter = PairFilter() if pair_filter is None else pair_filter
+    gold_dict = {entity: predicate_dict for d in gold_dict_list for entity, predicate_dict in d.items()}
+    scores = []
+    for entity, context in entity_context_tuples:
+        if entity not in gold_dict:
+            continue
+        for predicate, gold in gold_dict[entity].items():
+            scores.append((pair_filter.score(predicate, context), gold["answer"][0] != "nan"))
+    if not scores:
+        raise ValueError("The entities contain no entities of the gold standard")
+    rows = []
+    for cutoff in cutoffs:
+        skipped = [has_answer for score, has_answer in scores if score < cutoff]
+        gold_answers = sum(has_answer for score, has_answer in scores)
+        rows.append({"Cutoff": cutoff, "Pairs": len(scores), "Skipped": len(skipped),
+                     "Skipped %": round(len(skipped) / len(scores) * 100, 1), "Gold Answers": gold_answers,
+                     "Gold Answers Skipped": sum(skipped),
+                     "Recall Cost %": round(sum(skipped) / gold_answers * 100, 1) if gold_answers else 0.0})
+    return pd.DataFrame(rows)
+
+
+def gold_standard_report(entity_position: str, cutoffs: list, pair_filter=None, resolver=None):
+    """
+    computes recall_cost_report for the entities of the gold standard of an entity position with the Wikipedia texts
+    of all categories
+
+    Parameters
+    ----------
+    entity_position: str
+        position of the entities, can either be "SP" or "OP"
+    cutoffs: list
+        cutoffs that will be evaluated
+    pair_filter: None/PairFilter
+        see recall_cost_report
+    resolver: None/ArtifactResolver
+        resolver of the text and gold standard files. The default None uses the resolver of the repository.
+
+    Returns
+    -------
+    report_df: pd.DataFrame
+        see recall_cost_report
+    """
+    from Pipeline.Code.artifacts import default_resolver, category_list
+    resolver = default_resolver() if resolver is None else resolver
+    entity_context_tuples = [entity_context_tuple for category in category_list
+                             for entity_context_tuple in resolver.entity_texts(category).load()]
+    return recall_cost_report(entity_context_tuples, list(resolver.gold_standard(entity_position).load()), cutoffs,
+                              pair_filter=pair_filter)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="writes the recall cost report of the pre-filter for the gold "
+                                                 "standard of both entity positions")
+    parser.add_argument("--cutoffs", nargs="+", type=float, default=[0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9, 1.0])
+    parser.add_argument("--output", default=None, help="directory of the CSV files "
+                                                       "(default: Evaluation/EvalResultsFiles/PairFilter)")
+    arguments = parser.parse_args()
+    from Pipeline.Code.artifacts import repository_path
+    output_path = os.path.join(repository_path, "Evaluation/EvalResultsFiles/PairFilter") if arguments.output is None \
+        else arguments.output
+    os.makedirs(output_path, exist_ok=True)
+    for position in ["SP", "OP"]:
+        report_df = gold_standard_report(position, arguments.cutoffs)
+        report_df.to_csv(os.path.join(output_path, "RecallCost" + position + ".csv"), encoding="utf-8-sig",
+                         index=False)
+        print(position)
+        print(report_df.to_string(index=False))
@@ -0,0 +1,622 @@
+# -*- coding: utf-8 -*-
+"""
+This Python file provides the QA pipeline "CandidateQuestionAnsweringPipeline", a question-answering pipeline of
+transformers which can additionally return the top-k candidate answers with their character spans and the null (no
+answer) score of the model. All of them are computed from the same forward pass as the best answer, s.t. alternative
+answers and no-answer thresholds can be evaluated offline without running the QA model again.
+
+Without num_candidates the pipeline returns exactly the output of the standard question-answering pipeline.
+
+For many questions at once, answer_batch schedules the forward passes with length buckets: the context windows of all
+questions are sorted by their token length and packed into batches under a max_tokens budget (number of windows times
+the longest window of the batch), s.t. short contexts aren't padded to the length of long biographies. The answers are
+returned in the original order of the questions. A question can carry the encoding of its question text
+("question_encoding", see QuestionMatrix.question_encodings), then only its context is tokenized, once for all
+consecutive questions with the same context.
+
+Long contexts are split into overlapping windows of max_seq_len tokens. WindowSettings makes the window size, the
+overlap (doc_stride) and the aggregation of the answers of the windows explicit:
+    * "max": the best answer over all windows, as in the standard pipeline
+    * "merge": the top answers of every window are merged, an answer text found in several windows gets a combined score
+    * "early_stop": answer_batch forwards the windows in rounds (the first window of every question, then the second
+      window of the questions without a confident answer, ...) and a question stops once one of its windows answers
+      with at least stop_score, the remaining windows are never forwarded
+With window settings, every answer gets the number of windows of its context ("windows") and the number of windows
+which were actually forwarded ("scored_windows").
+
+With early_stop, the windows of a question can also be forwarded in the order of their retrieval relevance (window_order
+"relevance": the share of the words of the question which occur in the window, see window_relevance), s.t. the window
+with the answer tends to be forwarded first. A ScoreBound, fitted on the window scores of a sample (see window_scores),
+bounds the score a window of a given relevance reaches: a question also stops once its best answer can't be beaten by
+its remaining windows under this bound.
+
+If tracing is enabled (see extraction_trace.py), preprocess, _forward and postprocess record the spans
+"tokenization", "forward" and "decoding". answer_batch additionally attributes its time to the questions
+(question_times: the tokenization and decoding of a question and an equal share of every forward pass per window in
+the batch).
+"""
+
+import copy
+import time
+import torch
+from transformers import QuestionAnsweringPipeline, SquadExample
+from transformers.pipelines.question_answering import select_starts_ends
+from transformers.tokenization_utils_base import TruncationStrategy
+from transformers.utils import PaddingStrategy
+from extraction_trace import get_tracer
+from pair_filter import default_stopwords, word_pattern
+
+aggregations = ["max", "merge", "early_stop"]
+window_orders = ["position", "relevance"]
+
+
+def window_relevance(question: str, window_text: str, prefix_length=4):
+    """
+    returns the retrieval relevance of a window for a question, i.e. the share of the content words of the question (as
+    prefixes of prefix_length characters, as in pair_filter.py) which occur in the text of the window
+    """
+    question_prefixes = {word[:prefix_length] for word in word_pattern.findall(question.lower())
+                         if word not in default_stopwords}
+    if not question_prefixes:
+        return 0.0
+    window_prefixes = {word[:prefix_length] for word in word_pattern.findall(window_text.lower())}
+    return len(question_prefixes & window_prefixes) / len(question_prefixes)
+
+
+class ScoreBound:
+    """
+    Class for an empirical upper bound of the score of a window given its relevance. The relevances are divided into
+    bins of the same width, the bound of a bin is the highest score of all windows in this bin or in a bin of lower
+    relevance plus a margin (at most 1.0), s.t. the bound never decreases with the relevance.
+
+    Attributes
+    -------------
+    bins: int
+        number of relevance bins between 0.0 and 1.0
+    margin: float
+        margin which is added to the highest scores
+    bounds: list
+        bound of every bin, 1.0 for every bin before fit
+
+    Methods
+    ------------------------
+    fit(relevances, scores)
+        fits the bounds to the relevances and scores of windows
+    """
+    def __init__(self, bins=10, margin=0.05):
+        """
+        init method of the class
+
+        Parameters
+        ----------
+        bins: int
+            number of relevance bins. The default is 10.
+        margin: float
+            margin which is added to the highest scores, must be between 0.0 and 1.0. The default is 0.05.
+        """
+        if bins < 1:
+            raise ValueError("Incorrect number of bins, must be at least 1")
+        if margin < 0 or margin > 1:
+            raise ValueError("Incorrect margin, must be between 0.0 and 1.0")
+        self.bins = bins
+        self.margin = margin
+        self.bounds = [1.0] * bins
+
+    def __repr__(self):
+        return f"ScoreBound(bins={self.bins}, margin={self.margin}, bounds={[round(b, 3) for b in self.bounds]})"
+
+    def _bin(self, relevance: float):
+        return min(int(relevance * self.bins), self.bins - 1)
+
+    def fit(self, relevances: list, scores: list):
+        """
+        fits the bounds to the relevances and scores of windows, e.g. as returned by window_scores, returns the instance
+        """
+        if not scores:
+            raise ValueError("Incorrect input, no windows to fit the bound on")
+        highest = [0.0] * self.bins
+        for relevance, score in zip(relevances, scores):
+            highest[self._bin(relevance)] = max(highest[self._bin(relevance)], score)
+        running = 0.0
+        for index in range(self.bins):
+            running = max(running, highest[index])
+            self.bounds[index] = min(running + self.margin, 1.0)
+        return self
+
+    def __call__(self, relevance: float):
+        return self.bounds[self._bin(relevance)]
+
+
+def length_buckets(lengths: list, max_tokens: int):
+    """
+    groups items by their token length into batches under a token budget
+
+    Parameters
+    ----------
+    lengths: list
+        token length of every item
+    max_tokens: int
+        maximum number of (padded) tokens per batch, i.e. number of items times the longest item of the batch. An item
+        which is longer than max_tokens forms a batch of its own.
+
+    Returns
+    -------
+    batches: list
+        list of lists of item indices, the items of a batch have similar lengths
+    """
+    if max_tokens < 1:
+        raise ValueError(f"max_tokens parameter should be >= 1 (got {max_tokens})")
+    batches = []
+    batch = []
+    for index in sorted(range(len(lengths)), key=lambda i: lengths[i]):
+        # sorted ascending, so the current item is the longest item of the batch
+        if batch and (len(batch) + 1) * lengths[index] > max_tokens:
+            batches.append(batch)
+            batch = []
+        batch.append(index)
+    if batch:
+        batches.append(batch)
+    return batches
+
+
+class WindowSettings:
+    """
+    Class for the sliding windows over long contexts and the aggregation of the answers of the windows
+
+    Attributes
+    -------------
+    max_seq_len: int
+        number of tokens of a window (question and context)
+    doc_stride: int
+        number of tokens by which consecutive windows overlap (the stride of the tokenizer), a larger doc_stride means
+        more windows per context
+    aggregation: str
+        "max", "merge" or "early_stop", see the description of this file
+    merge_k: int
+        number of answers per window which are merged ("merge")
+    stop_score: float
+        score of a window's answer at which the remaining windows of the question are skipped ("early_stop")
+    window_order: str
+        order in which the windows are forwarded with "early_stop": "position" (in the text) or "relevance"
+    score_bound: None/ScoreBound
+        if set, a question also stops once no remaining window can beat its best answer under the bound ("early_stop")
+
+    Methods
+    ------------------------
+    call_parameters()
+        returns the call parameters of the pipeline (or of answer_batch)
+    """
+    def __init__(self, max_seq_len=384, doc_stride=128, aggregation="max", merge_k=3, stop_score=0.9,
+                 window_order="position", score_bound=None):
+        """
+        init method of the class
+
+        Parameters
+        ----------
+        max_seq_len: int
+            number of tokens of a window. The default is 384, the default of transformers.
+        doc_stride: int
+            overlap of consecutive windows in tokens, must be smaller than max_seq_len. The default is 128, the
+            default of transformers.
+        aggregation: str
+            "max", "merge" or "early_stop". The default is "max".
+        merge_k: int
+            number of answers per window which are merged. The default is 3.
+        stop_score: float
+            score at which the remaining windows are skipped, must be between 0.0 and 1.0. The default is 0.9.
+        window_order: str
+            "position" or "relevance". The default is "position".
+        score_bound: None/ScoreBound
+            fitted bound of the window scores. The default None only stops at stop_score.
+        """
+        if max_seq_len < 1 or doc_stride < 0 or doc_stride >= max_seq_len:
+            raise ValueError("Incorrect window settings, doc_stride must be between 0 and max_seq_len - 1")
+        if aggregation not in aggregations:
+            raise ValueError("Incorrect aggregation, must be one of " + ", ".join(aggregations))
+        if merge_k < 1:
+            raise ValueError("Incorrect merge_k, must be at least 1")
+        if stop_score < 0 or stop_score > 1:
+            raise ValueError("Incorrect stop_score, must be between 0.0 and 1.0")
+        if window_order not in window_orders:
+            raise ValueError("Incorrect window order, must be one of " + ", ".join(window_orders))
+        self.max_seq_len = max_seq_len
+        self.doc_stride = doc_stride
+        self.aggregation = aggregation
+        self.merge_k = merge_k
+        self.stop_score = stop_score
+        self.window_order = window_order
+        self.score_bound = score_bound
+
+    def __repr__(self):
+        return (f"WindowSettings(max_seq_len={self.max_seq_len}, doc_stride={self.doc_stride}, "
+                f"aggregation={self.aggregation!r}, merge_k={self.merge_k}, stop_score={self.stop_score}, "
+                f"window_order={self.window_order!r}, score_bound={self.score_bound})")
+
+    def call_parameters(self):
+        """
+        returns the call parameters of the pipeline, stop_score, window_order and score_bound are only parameters of
+        answer_batch
+        """
+        parameters = {"max_seq_len": self.max_seq_len, "doc_stride": self.doc_stride, "aggregation": self.aggregation,
+                      "count_windows": True}
+        if self.aggregation == "merge":
+            parameters["merge_k"] = self.merge_k
+        if self.aggregation == "early_stop":
+            parameters["stop_score"] = self.stop_score
+            parameters["window_order"] = self.window_order
+            if self.score_bound is not None:
+                parameters["score_bound"] = self.score_bound
+        return parameters
+
+
+class CandidateQuestionAnsweringPipeline(QuestionAnsweringPipeline):
+    """
+    Question-answering pipeline with the additional call parameter num_candidates. If num_candidates is set, the best
+    answer dictionary gets the additional keys
+        * "candidates": list of the num_candidates best {"answer", "score", "start", "end"} dictionaries
+        * "null_score": score of the empty answer (minimum over all windows of the context, as in transformers)
+
+    Create it with pipeline("question-answering", ..., pipeline_class=CandidateQuestionAnsweringPipeline).
+
+    The call parameters aggregation, merge_k and count_windows (see WindowSettings.call_parameters) control the
+    aggregation of the windows, max_seq_len and doc_stride are parameters of the standard pipeline.
+
+    answer_batch(inputs, max_tokens) answers a list of {"question", "context"} dictionaries (optionally with the
+    "question_encoding" of the question) with length-bucketed batches, the statistics of the last call are stored in
+    bucket_stats ("batches", "tokens", "padded_tokens", "windows", "scored_windows"). With tracing, question_times is
+    the time in nanoseconds attributed to every question of the last call.
+    """
+    bucket_stats = None
+    question_times = None
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # (context, encoding of the context, SquadExample of the context) of the last question with a question
+        # encoding, per pipeline
+        self._context_cache = None
+
+    def _sanitize_parameters(self, num_candidates=None, aggregation=None, merge_k=None, count_windows=None, **kwargs):
+        preprocess_params, forward_params, postprocess_params = super()._sanitize_parameters(**kwargs)
+        if num_candidates is not None:
+            if num_candidates < 1:
+                raise ValueError(f"num_candidates parameter should be >= 1 (got {num_candidates})")
+            postprocess_params["num_candidates"] = num_candidates
+        if aggregation is not None:
+            if aggregation not in aggregations:
+                raise ValueError(f"aggregation parameter should be one of {aggregations} (got {aggregation})")
+            postprocess_params["aggregation"] = aggregation
+        if merge_k is not None:
+            if merge_k < 1:
+                raise ValueError(f"merge_k parameter should be >= 1 (got {merge_k})")
+            postprocess_params["merge_k"] = merge_k
+        if count_windows is not None:
+            postprocess_params["count_windows"] = count_windows
+        return preprocess_params, forward_params, postprocess_params
+
+    def preprocess(self, example, **kwargs):
+        tracer = get_tracer()
+        if tracer.enabled is False:
+            return self._preprocess(example, **kwargs)
+        # preprocess is a generator, the features are created within the span
+        with tracer.span("tokenization"):
+            features = list(self._preprocess(example, **kwargs))
+        return iter(features)
+
+    def _preprocess(self, example, **kwargs):
+        if isinstance(example, dict) and example.get("question_encoding") is not None \
+                and kwargs.get("padding", "do_not_pad") == "do_not_pad" and self.tokenizer.padding_side == "right":
+            return self.preprocess_encoded(example, **kwargs)
+        return super().preprocess(example, **kwargs)
+
+    def preprocess_encoded(self, example: dict, padding="do_not_pad", doc_stride=None, max_question_len=64,
+                           max_seq_len=None):
+        """
+        preprocess of a question with its question encoding: the windows are built from the encodings of the question
+        and of the context like the fast tokenizer builds them for the pair (truncation of the context with doc_stride
+        and the special tokens of the post processor), the features are the same as those of preprocess. The context
+        is tokenized once for consecutive questions with the same context.
+        """
+        if max_seq_len is None:
+            max_seq_len = min(self.tokenizer.model_max_length, 384)
+        if doc_stride is None:
+            doc_stride = min(max_seq_len // 2, 128)
+        if doc_stride > max_seq_len:
+            raise ValueError(f"`doc_stride` ({doc_stride}) is larger than `max_seq_len` ({max_seq_len})")
+        if self._context_cache is None or self._context_cache[0] != example["context"]:
+            # the context as second sequence of a pair, s.t. its tokens get the token type of the context
+            self._context_cache = (example["context"],
+                                   self.tokenizer("", example["context"], add_special_tokens=False).encodings[0],
+                                   SquadExample(None, "", example["context"], None, None, None))
+        _, context_encoding, context_example = self._context_cache
+        squad_example = copy.copy(context_example)
+        squad_example.question_text = example["question"]
+        self.tokenizer.set_truncation_and_padding(PaddingStrategy.DO_NOT_PAD, TruncationStrategy.ONLY_SECOND,
+                                                  max_seq_len, doc_stride, None, None)
+        encoding = self.tokenizer.backend_tokenizer.post_process(example["question_encoding"], context_encoding,
+                                                                 add_special_tokens=True)
+        spans = [encoding] + encoding.overflowing
+        tensor_names = self.tokenizer.model_input_names + ["p_mask", "token_type_ids"]
+        for span_index, span in enumerate(spans):
+            # as in transformers, only the tokens of the context and the CLS token can be part of the answer
+            p_mask = [int(sequence_id != 1 and token_id != self.tokenizer.cls_token_id)
+                      for sequence_id, token_id in zip(span.sequence_ids, span.ids)]
+            fields = {"input_ids": span.ids, "attention_mask": span.attention_mask, "token_type_ids": span.type_ids,
+                      "p_mask": p_mask}
+            yield {"example": squad_example, "is_last": span_index == len(spans) - 1, "encoding": span,
+                   **{key: torch.tensor([value]) if key in tensor_names else value for key, value in fields.items()}}
+
+    def _forward(self, inputs):
+        with get_tracer().span("forward", windows=inputs["input_ids"].shape[0], length=inputs["input_ids"].shape[1]):
+            return super()._forward(inputs)
+
+    def postprocess(self, model_outputs, num_candidates=None, aggregation="max", merge_k=3, count_windows=False,
+                    **kwargs):
+        with get_tracer().span("decoding", windows=len(model_outputs)):
+            return self._postprocess(model_outputs, num_candidates, aggregation, merge_k, count_windows, **kwargs)
+
+    def _postprocess(self, model_outputs, num_candidates=None, aggregation="max", merge_k=3, count_windows=False,
+                     **kwargs):
+        candidate_kwargs = {key: value for key, value in kwargs.items() if key in ["max_answer_len", "align_to_words"]}
+        if aggregation == "merge":
+            answers = self.merge_windows(model_outputs, merge_k, kwargs.get("handle_impossible_answer", False),
+                                         **candidate_kwargs)
+            top_k = kwargs.get("top_k", 1)
+            best_answer = answers[0] if top_k == 1 else answers[:top_k]
+        else:
+            # "early_stop" only forwards part of the windows (see answer_batch), the best of them is the answer
+            best_answer = super().postprocess(model_outputs, **kwargs)
+        if not isinstance(best_answer, dict) or (num_candidates is None and count_windows is False):
+            return best_answer
+        best_answer = dict(best_answer)
+        if num_candidates is not None:
+            if aggregation == "merge":
+                candidates = self.merge_windows(model_outputs, merge_k, False, **candidate_kwargs)[:num_candidates]
+            else:
+                candidates = super().postprocess(model_outputs, top_k=num_candidates, handle_impossible_answer=False,
+                                                 **candidate_kwargs)
+            if isinstance(candidates, dict):
+                candidates = [candidates]
+            best_answer["candidates"] = candidates
+            best_answer["null_score"] = self.null_score(model_outputs)
+        if count_windows is True:
+            # answer_batch replaces "windows" by the number of all windows if not all of them were forwarded
+            best_answer["windows"] = len(model_outputs)
+            best_answer["scored_windows"] = len(model_outputs)
+        return best_answer
+
+    def merge_windows(self, model_outputs, merge_k=3, handle_impossible_answer=False, **kwargs):
+        """
+        merges the top merge_k answers of every window: a span which is found by several (overlapping) windows keeps its
+        best score, the spans of the same answer text (case-insensitive) are combined to 1 - product of (1 - score),
+        s.t. an answer which occurs several times in the article gets a higher score than each of its occurrences
+
+        Returns
+        -------
+        answers: list
+            the merged {"answer", "score", "start", "end"} dictionaries (the span of the best occurrence), best first.
+            With handle_impossible_answer, the empty answer with the null score is one of them.
+        """
+        spans = {}
+        for output in model_outputs:
+            window_answers = super().postprocess([output], top_k=merge_k, handle_impossible_answer=False, **kwargs)
+            for answer in [window_answers] if isinstance(window_answers, dict) else window_answers:
+                span = (answer["start"], answer["end"])
+                if span not in spans or spans[span]["score"] < answer["score"]:
+                    spans[span] = answer
+        merged = {}
+        for answer in sorted(spans.values(), key=lambda x: x["score"], reverse=True):
+            text = answer["answer"].lower()
+            if text not in merged:
+                merged[text] = dict(answer, score=min(answer["score"], 1.0))
+            else:
+                merged[text]["score"] = 1 - (1 - merged[text]["score"]) * (1 - min(answer["score"], 1.0))
+        answers = list(merged.values())
+        if handle_impossible_answer is True:
+            answers.append({"score": self.null_score(model_outputs), "start": 0, "end": 0, "answer": ""})
+        return sorted(answers, key=lambda x: x["score"], reverse=True)
+
+    def window_score(self, model_output, max_answer_len=15, align_to_words=True):
+        """
+        returns the score of the best (non-empty) answer of one window
+        """
+        answer = super().postprocess([model_output], top_k=1, handle_impossible_answer=False,
+                                     max_answer_len=max_answer_len, align_to_words=align_to_words)
+        if isinstance(answer, list):
+            return answer[0]["score"] if answer else 0.0
+        return answer["score"]
+
+    def answer_batch(self, inputs: list, max_tokens=8192, stop_score=0.9, window_order="position", score_bound=None,
+                     **kwargs):
+        """
+        answers a list of questions with length-bucketed batches
+
+        Parameters
+        ----------
+        inputs: list
+            list of {"question", "context"} dictionaries, optionally with the "question_encoding" of the question
+        max_tokens: int
+            maximum number of padded tokens per forward pass. The default is 8192.
+        stop_score: float
+            with aggregation="early_stop", the remaining windows of a question are skipped once one of its windows
+            answers with at least stop_score. The default is 0.9.
+        window_order: str
+            with aggregation="early_stop", the order of the windows of a question, "position" or "relevance" (see
+            window_relevance). The default is "position".
+        score_bound: None/ScoreBound
+            with aggregation="early_stop", a question also stops once its best score is at least the bound of all its
+            remaining windows. The default None only stops at stop_score.
+        kwargs:
+            call parameters of the pipeline, e.g. num_candidates, max_answer_len or the parameters of WindowSettings
+
+        Returns
+        -------
+        answers: list
+            one answer (as returned by calling the pipeline) per input, in the order of the inputs
+        """
+        preprocess_params, forward_params, postprocess_params = self._sanitize_parameters(**kwargs)
+        preprocess_params = {**self._preprocess_params, **preprocess_params}
+        forward_params = {**self._forward_params, **forward_params}
+        postprocess_params = {**self._postprocess_params, **postprocess_params}
+        self.question_times = [0] * len(inputs) if get_tracer().enabled is True else None
+        input_features = [self._timed(input_index, lambda: list(self.preprocess(example, **preprocess_params)))
+                          for input_index, example in enumerate(inputs)]
+        input_outputs = [[] for _ in inputs]
+        self.bucket_stats = {"batches": 0, "tokens": 0, "padded_tokens": 0,
+                             "windows": sum(len(features) for features in input_features), "scored_windows": 0}
+        if postprocess_params.get("aggregation") != "early_stop":
+            self._forward_windows([(input_index, window) for input_index, features in enumerate(input_features)
+                                   for window in range(len(features))], input_features, input_outputs, max_tokens,
+                                  forward_params)
+        else:
+            if window_order not in window_orders:
+                raise ValueError(f"window_order parameter should be one of {window_orders} (got {window_order})")
+            score_kwargs = {key: value for key, value in postprocess_params.items()
+                            if key in ["max_answer_len", "align_to_words"]}
+            relevances = None
+            orders = [list(range(len(features))) for features in input_features]
+            if window_order == "relevance" or score_bound is not None:
+                relevances = [[window_relevance(example["question"], self.window_text(feature)) for feature in features]
+                              for example, features in zip(inputs, input_features)]
+            if window_order == "relevance":
+                # stable, windows of the same relevance keep their order in the text
+                orders = [sorted(order, key=lambda window: -input_relevances[window])
+                          for order, input_relevances in zip(orders, relevances)]
+            best_scores = [0.0] * len(inputs)
+            active = list(range(len(inputs)))
+            step = 0
+            while active:
+                windows = [(input_index, orders[input_index][step]) for input_index in active
+                           if step < len(orders[input_index])]
+                self._forward_windows(windows, input_features, input_outputs, max_tokens, forward_params)
+                active = []
+                for input_index, _ in windows:
+                    best_scores[input_index] = max(best_scores[input_index],
+                                                   self.window_score(input_outputs[input_index][-1], **score_kwargs))
+                    remaining = orders[input_index][step + 1:]
+                    if best_scores[input_index] >= stop_score or not remaining:
+                        continue
+                    if score_bound is not None and best_scores[input_index] >= max(
+                            score_bound(relevances[input_index][window]) for window in remaining):
+                        continue
+                    active.append(input_index)
+                step += 1
+        answers = [self._timed(input_index, lambda: self.postprocess(model_outputs, **postprocess_params))
+                   for input_index, model_outputs in enumerate(input_outputs)]
+        if postprocess_params.get("count_windows") is True:
+            for answer, features in zip(answers, input_features):
+                if isinstance(answer, dict):
+                    answer["windows"] = len(features)
+        return answers
+
+    def window_text(self, feature: dict):
+        """
+        returns the context text of a window (the tokens which aren't masked by p_mask)
+        """
+        p_mask = torch.as_tensor(feature["p_mask"]).reshape(-1)
+        return self.tokenizer.decode(feature["input_ids"][0][p_mask == 0], skip_special_tokens=True)
+
+    def window_scores(self, inputs: list, max_tokens=8192, **kwargs):
+        """
+        forwards all windows of the inputs and returns the relevance (see window_relevance) and the score of the best
+        (non-empty) answer of every window, e.g. to fit a ScoreBound
+
+        Parameters
+        ----------
+        inputs: list
+            list of {"question", "context"} dictionaries
+        max_tokens: int
+            maximum number of padded tokens per forward pass. The default is 8192.
+        kwargs:
+            call parameters of the pipeline, e.g. max_seq_len and doc_stride
+
+        Returns
+        -------
+        relevances, scores: tuple
+            lists with the relevance and the score of every window
+        """
+        preprocess_params, forward_params, postprocess_params = self._sanitize_parameters(**kwargs)
+        preprocess_params = {**self._preprocess_params, **preprocess_params}
+        forward_params = {**self._forward_params, **forward_params}
+        score_kwargs = {key: value for key, value in {**self._postprocess_params, **postprocess_params}.items()
+                        if key in ["max_answer_len", "align_to_words"]}
+        input_features = [list(self.preprocess(example, **preprocess_params)) for example in inputs]
+        input_outputs = [[] for _ in inputs]
+        self.bucket_stats = {"batches": 0, "tokens": 0, "padded_tokens": 0,
+                             "windows": sum(len(features) for features in input_features), "scored_windows": 0}
+        self.question_times = None
+        self._forward_windows([(input_index, window) for input_index, features in enumerate(input_features)
+                               for window in range(len(features))], input_features, input_outputs, max_tokens,
+                              forward_params)
+        relevances = []
+        scores = []
+        for example, features, outputs in zip(inputs, input_features, input_outputs):
+            for feature, output in zip(features, outputs):
+                relevances.append(window_relevance(example["question"], self.window_text(feature)))
+                scores.append(self.window_score(output, **score_kwargs))
+        return relevances, scores
+
+    def _forward_windows(self, windows: list, input_features: list, input_outputs: list, max_tokens: int,
+                         forward_params: dict):
+        """
+        forwards windows (list of (input index, window index) tuples) with length-bucketed batches and appends the
+        outputs to the outputs of their inputs, in the order of the windows
+        """
+        features = [input_features[input_index][window] for input_index, window in windows]
+        lengths = [feature["input_ids"].shape[1] for feature in features]
+        batches = length_buckets(lengths, max_tokens)
+        feature_outputs = [None] * len(features)
+        padded_tokens = 0
+        for batch in batches:
+            batch_length = max(lengths[index] for index in batch)
+            padded_tokens += batch_length * len(batch)
+            model_inputs = {}
+            for key in self.tokenizer.model_input_names:
+                padding_value = self.tokenizer.pad_token_id if key == "input_ids" else 0
+                padded = torch.full((len(batch), batch_length), padding_value, dtype=features[batch[0]][key].dtype)
+                for row, index in enumerate(batch):
+                    padded[row, :lengths[index]] = features[index][key][0]
+                model_inputs[key] = padded
+            batch_start = time.perf_counter_ns()
+            output = self.forward({"example": None, **model_inputs}, **forward_params)
+            if self.question_times is not None:
+                # the windows of a batch are padded to the same length, i.e. every window costs the same
+                window_time = (time.perf_counter_ns() - batch_start) // len(batch)
+                for index in batch:
+                    self.question_times[windows[index][0]] += window_time
+            for row, index in enumerate(batch):
+                # cut the padding off again, s.t. postprocess gets the same input as without batching
+                feature_outputs[index] = {**features[index], "start": output["start"][row:row + 1, :lengths[index]],
+                                          "end": output["end"][row:row + 1, :lengths[index]]}
+        for (input_index, _), feature_output in zip(windows, feature_outputs):
+            input_outputs[input_index].append(feature_output)
+        self.bucket_stats["batches"] += len(batches)
+        self.bucket_stats["tokens"] += sum(lengths)
+        self.bucket_stats["padded_tokens"] += padded_tokens
+        self.bucket_stats["scored_windows"] += len(windows)
+
+    def _timed(self, input_index: int, function):
+        """
+        calls function and, with tracing, adds its time to the time of the input (see question_times)
+        """
+        if self.question_times is None:
+            return function()
+        start = time.perf_counter_ns()
+        result = function()
+        self.question_times[input_index] += time.perf_counter_ns() - start
+        return result
+
+    @staticmethod
+    def null_score(model_outputs):
+        """
+        computes the score of the empty answer (start and end at the CLS token) like the standard pipeline with
+        handle_impossible_answer=True, i.e. the minimum over all windows of the context
+        """
+        min_null_score = 1000000
+        for output in model_outputs:
+            start = output["start"].float() if hasattr(output["start"], "float") else output["start"]
+            end = output["end"].float() if hasattr(output["end"], "float") else output["end"]
+            attention_mask = output["attention_mask"].numpy() if output.get("attention_mask", None) is not None \
+                else None
+            min_null_score = select_starts_ends(start, end, output["p_mask"], attention_mask, min_null_score, 1,
+                                                True)[3]
+        return min_null_score
@@ -0,0 +1,146 @@
+# -*- coding: utf-8 -*-
+"""
+This Python file provides a Class "QuestionMatrix" which prepares the questions and predicates of one
+(category, entity position, question type) combination once, s.t. extract_triples doesn't have to rebuild them for
+every entity:
+
+    * every question is pre-split around the "__" placeholder, instantiating the questions for an entity is a join
+    * the German predicates are indexed once
+    * optionally, the parts of the questions are tokenized once and the encodings of the questions for an entity are
+      merged from the cached parts and the tokens of the entity. answer_batch of qa_pipeline.py takes them as
+      "question_encoding" and doesn't tokenize these questions again.
+"""
+
+import unicodedata
+from tokenizers import Encoding
+
+
+def is_word_boundary(text: str, at_start: bool):
+    """
+    checks whether the start/end of a text part is a word boundary for the tokenizer, i.e. whether the text is empty or
+    the character is a whitespace or punctuation character
+    """
+    if text == "":
+        return True
+    character = text[0] if at_start is True else text[-1]
+    return character.isspace() or unicodedata.category(character).startswith("P")
+
+
+class QuestionMatrix:
+    """
+    Class for the questions and predicates of one (category, entity position, question type) combination
+
+    Attributes
+    -------------
+    predicates: list
+        German predicates, the i-th predicate belongs to the i-th question
+    templates: list
+        list of the question parts around the placeholder for every question
+    tokenizer: None/tokenizer
+        tokenizer for the token cache, None if no token cache is used
+
+    Methods
+    ------------------------
+    questions(entity)
+        returns the questions for an entity
+    question_encodings(entity)
+        returns the encodings of the questions for an entity
+    """
+    def __init__(self, questions_list: list, predicate_list: list, placeholder="__", tokenizer=None):
+        """
+        init method of the class
+
+        Parameters
+        ----------
+        questions_list: list
+            List of questions with the placeholder for the entity
+        predicate_list: list
+            List of predicate tuples (German predicate first) which matches the questions_list
+        placeholder: str
+            placeholder for the entity within the questions. The default is "__".
+        tokenizer: None/tokenizer
+            fast tokenizer of the QA model. If given, the question parts are tokenized once for question_encodings.
+        """
+        if len(questions_list) != len(predicate_list):
+            raise ValueError("Questions and lengths have different lengths, they are most likely "
+                             "incompatible!")
+        self.predicates = [tup[0] for tup in predicate_list]
+        self.templates = [q.split(placeholder) for q in questions_list]
+        if tokenizer is not None and tokenizer.is_fast is False:
+            raise ValueError("Incorrect tokenizer, the token cache needs a fast tokenizer")
+        self.tokenizer = tokenizer
+        self._part_encodings = None
+        if tokenizer is not None:
+            self._part_encodings = [self._tokenize_parts(parts) for parts in self.templates]
+
+    def __len__(self):
+        return len(self.templates)
+
+    def _encode(self, text: str):
+        """
+        returns the encoding of a text without special tokens
+        """
+        return self.tokenizer(text, add_special_tokens=False).encodings[0]
+
+    @staticmethod
+    def _merge(part_encodings: list, entity_encoding):
+        """
+        merges the encodings of the question parts with the encoding of the entity at the placeholders
+        """
+        encodings = [part_encodings[0]]
+        for encoding_after in part_encodings[1:]:
+            encodings += [entity_encoding, encoding_after]
+        return Encoding.merge(encodings, growing_offsets=True)
+
+    def _tokenize_parts(self, parts: list, probe_entity="Beispiel"):
+        """
+        tokenizes the parts of a question. Returns None if a part touches the placeholder within a word or if the
+        merged tokens differ from the tokens of the full question for a probe entity (e.g. for tokenizers which encode
+        the preceding whitespace), since then the cache would change the input of the model.
+        """
+        for i, part in enumerate(parts):
+            if (i > 0 and not is_word_boundary(part, at_start=True)) or \
+                    (i < len(parts) - 1 and not is_word_boundary(part, at_start=False)):
+                return None
+        part_encodings = [self._encode(part) for part in parts]
+        if self._merge(part_encodings, self._encode(probe_entity)).ids != self._encode(probe_entity.join(parts)).ids:
+            return None
+        return part_encodings
+
+    def questions(self, entity: str):
+        """
+        instantiates all questions for an entity
+
+        Parameters
+        ----------
+        entity: str
+            the entity which replaces the placeholder
+
+        Returns
+        -------
+        questions: list
+            list of questions, same order as the predicates
+        """
+        return [entity.join(parts) for parts in self.templates]
+
+    def question_encodings(self, entity: str):
+        """
+        returns the encodings (without special tokens) of all questions for an entity, merged from the cached encodings
+        of the question parts and the encoding of the entity, i.e. the entity is the only text which is tokenized
+
+        Parameters
+        ----------
+        entity: str
+            the entity which replaces the placeholder
+
+        Returns
+        -------
+        encodings: list
+            list of tokenizers.Encoding, same order as the predicates. None for the questions whose parts couldn't be
+            cached and for all questions if the matrix has no tokenizer, the pipeline tokenizes them as a whole.
+        """
+        if self.tokenizer is None:
+            return [None] * len(self.templates)
+        entity_encoding = self._encode(entity)
+        return [None if part_encodings is None else self._merge(part_encodings, entity_encoding)
+                for part_encodings in self._part_encodings]
@@ -1,17 +1,24 @@
-from triple_extractor_cluster import TripleExtractor
+import os
+from triple_extractor_cluster import TripleExtractor, model
+from runtime_settings import RuntimeSettings, run_extraction, auto_tune
+
+settings = RuntimeSettings.from_environment()
 
 entity_obj_sp = TripleExtractor("Building", "SP")
 entities_sp = entity_obj_sp.load_entity_text_list()
-entity_questions_sp = entity_obj_sp.load_questions("BL")
-entity_properties_sp = entity_obj_sp.load_properties()
+entity_question_matrix_sp = entity_obj_sp.question_matrix("BL")
 
-entity_res_list_sp = [entity_obj_sp.extract_triples(entity, entity_questions_sp, entity_properties_sp) for entity in entities_sp]
+if os.environ.get("EXTRACTION_AUTO_TUNE") == "1":
+    settings, timing_df = auto_tune(TripleExtractor.extract_triples_batched, entities_sp, entity_question_matrix_sp)
+    print(timing_df)
+entity_res_list_sp = run_extraction(TripleExtractor.extract_triples_batched, entities_sp, entity_question_matrix_sp,
+                                    settings, shared_model=model)
 entity_obj_sp.dict_list2json(entity_res_list_sp, "BL")
 
 entity_obj_op = TripleExtractor("Building", "OP")
 entities_op = entity_obj_op.load_entity_text_list()
-entity_questions_op = entity_obj_op.load_questions("BL")
-entity_properties_op = entity_obj_op.load_properties()
+entity_question_matrix_op = entity_obj_op.question_matrix("BL")
 
-entity_res_list_op = [entity_obj_op.extract_triples(entity, entity_questions_op, entity_properties_op) for entity in entities_op]
+entity_res_list_op = run_extraction(TripleExtractor.extract_triples_batched, entities_op, entity_question_matrix_op,
+                                    settings, shared_model=model)
 entity_obj_op.dict_list2json(entity_res_list_op, "BL")
@@ -1,16 +1,29 @@
-from triple_extractor_cluster import TripleExtractor
+import os
+from triple_extractor_cluster import TripleExtractor, model
+from runtime_settings import RuntimeSettings, run_extraction, auto_tune
+
+# threads, workers, CPU pinning and shared weights from the EXTRACTION_* environment variables
+settings = RuntimeSettings.from_environment()
 
 # get all entities of Persons
 entity_obj_sp = TripleExtractor("Person", "SP")
 # load the entity-text tuple list for the first batch of Person
 entities_sp = entity_obj_sp.load_entity_text_list(persons_full=False, persons_file_num=1)
-# load the Baseline questions for Person
-entity_questions_sp = entity_obj_sp.load_questions("BL")
-# load all properties for Person
-entity_properties_sp = entity_obj_sp.load_properties()
+# load the Baseline questions and all properties for Person once, pre-split into the question matrix
+entity_question_matrix_sp = entity_obj_sp.question_matrix("BL")
+
+# with EXTRACTION_AUTO_TUNE=1 the fastest settings for the node are determined on a sample of the entities first
+if os.environ.get("EXTRACTION_AUTO_TUNE") == "1":
+    settings, timing_df = auto_tune(TripleExtractor.extract_triples_batched, entities_sp, entity_question_matrix_sp)
+    print(timing_df)
 
-# extract the triples by calling the QA-system and passing entities, the respective questions and propertie as input
-entity_res_list_sp = [entity_obj_sp.extract_triples(entity, entity_questions_sp, entity_properties_sp) for entity in entities_sp]
+# extract the triples by calling the QA-system and passing entities and the question matrix as input,
+# the questions are answered in length-bucketed batches by settings.workers worker processes, which share the weights
+# of the model with EXTRACTION_SHARE_WEIGHTS=1. The private memory of every worker is its overhead over this process.
+entity_res_list_sp, memory_df = run_extraction(TripleExtractor.extract_triples_batched, entities_sp,
+                                               entity_question_matrix_sp, settings, shared_model=model,
+                                               memory_report=True)
+print(memory_df)
 # save result dicts for each entity in json Files
 entity_obj_sp.dict_list2json(entity_res_list_sp, "BL")
 
@@ -18,8 +31,8 @@ entity_obj_sp.dict_list2json(entity_res_list_sp, "BL")
 # same procedure for Object position
 entity_obj_op = TripleExtractor("Building", "OP")
 entities_op = entity_obj_op.load_entity_text_list(persons_full=False, persons_file_num=1)
-entity_questions_op = entity_obj_op.load_questions("BL")
-entity_properties_op = entity_obj_op.load_properties()
+entity_question_matrix_op = entity_obj_op.question_matrix("BL")
 
-entity_res_list_op = [entity_obj_op.extract_triples(entity, entity_questions_op, entity_properties_op) for entity in entities_op]
+entity_res_list_op = run_extraction(TripleExtractor.extract_triples_batched, entities_op, entity_question_matrix_op,
+                                    settings, shared_model=model)
 entity_obj_op.dict_list2json(entity_res_list_op, "BL")
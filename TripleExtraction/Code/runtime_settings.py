@@ -0,0 +1,353 @@
+# -*- coding: utf-8 -*-
+"""
+This Python file provides the runtime settings of the triple extraction: the number of intra-op and inter-op threads of
+torch, the number of worker processes and the pinning of the workers to CPUs (os.sched_setaffinity, only on Linux).
+Without settings, torch uses all cores in every process, s.t. several workers on one node oversubscribe the cores.
+
+    * RuntimeSettings.from_environment reads the settings from the EXTRACTION_* environment variables
+    * run_extraction splits the entities into one chunk per worker and runs an extraction function in a process pool
+      (or in the current process for one worker), the results are returned in the order of the entities
+    * memory_usage measures the RSS, PSS, shared and private memory of a process, run_extraction reports it per worker
+
+With share_weights, the workers are forked from the process which loaded the model (only on Linux/macOS) and read its
+weights from the pages of the parent (copy-on-write) instead of loading their own copy. The model is put into evaluation
+mode without gradients and the objects of the parent are frozen for the garbage collection (gc.freeze) before the fork,
+s.t. the workers don't write to these pages. The private memory of a worker is then its overhead over the parent, and
+the number of workers is limited by the cores instead of the memory for one copy of the weights per worker.
+
+With tracing (see extraction_trace.py), every worker traces into its own file, which is flushed after every chunk, and
+the counters and histograms of the workers are merged into the tracer of the parent.
+    * auto_tune benchmarks a sample of entities under several configurations and returns the fastest one
+"""
+
+import os
+import gc
+import time
+import multiprocessing
+import torch
+import pandas as pd
+from extraction_trace import get_tracer, start_worker_tracer
+
+environment_variables = {"intra_op_threads": "EXTRACTION_INTRA_OP_THREADS",
+                         "inter_op_threads": "EXTRACTION_INTER_OP_THREADS",
+                         "workers": "EXTRACTION_WORKERS", "pin_cpus": "EXTRACTION_PIN_CPUS",
+                         "share_weights": "EXTRACTION_SHARE_WEIGHTS"}
+boolean_settings = ["pin_cpus", "share_weights"]
+
+
+def available_cpus():
+    """
+    returns the list of CPUs the current process may run on
+    """
+    if hasattr(os, "sched_getaffinity"):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count()))
+
+
+class RuntimeSettings:
+    """
+    Class for the thread, worker and CPU pinning settings of the extraction
+
+    Attributes
+    -------------
+    intra_op_threads: int
+        number of threads torch uses within an operation, per worker
+    inter_op_threads: int
+        number of threads torch uses for independent operations, per worker
+    workers: int
+        number of worker processes
+    pin_cpus: bool
+        determines whether every worker is pinned to its own intra_op_threads CPUs
+    share_weights: bool
+        determines whether the workers are forked and share the model weights of the parent process
+
+    Methods
+    ------------------------
+    from_environment()
+        creates the settings from the EXTRACTION_* environment variables
+    worker_cpus(worker_index)
+        returns the CPUs of a worker
+    apply(worker_index)
+        applies the settings to the current process
+    """
+    def __init__(self, intra_op_threads=None, inter_op_threads=1, workers=1, pin_cpus=False, share_weights=False):
+        """
+        init method of the class
+
+        Parameters
+        ----------
+        intra_op_threads: None/int
+            number of intra-op threads per worker. The default None divides the available CPUs by the workers.
+        inter_op_threads: int
+            number of inter-op threads per worker. The default is 1, the QA model is a sequential stack of layers.
+        workers: int
+            number of worker processes. The default is 1.
+        pin_cpus: bool
+            determines whether every worker is pinned to its own CPUs. The default is False.
+        share_weights: bool
+            determines whether the workers are forked from the current process and share the weights of its model
+            (copy-on-write) instead of loading their own copy. Needs the fork start method. The default is False.
+        """
+        if workers < 1:
+            raise ValueError("Incorrect number of workers, must be at least 1")
+        self.workers = workers
+        if intra_op_threads is None:
+            intra_op_threads = max(1, len(available_cpus()) // workers)
+        if intra_op_threads < 1 or inter_op_threads < 1:
+            raise ValueError("Incorrect number of threads, must be at least 1")
+        self.intra_op_threads = intra_op_threads
+        self.inter_op_threads = inter_op_threads
+        self.pin_cpus = pin_cpus
+        if share_weights is True and "fork" not in multiprocessing.get_all_start_methods():
+            raise ValueError("Incorrect runtime settings, share_weights needs the fork start method")
+        self.share_weights = share_weights
+
+    def __repr__(self):
+        return (f"RuntimeSettings(intra_op_threads={self.intra_op_threads}, inter_op_threads={self.inter_op_threads}, "
+                f"workers={self.workers}, pin_cpus={self.pin_cpus}, share_weights={self.share_weights})")
+
+    @classmethod
+    def from_environment(cls):
+        """
+        creates the settings from the environment variables EXTRACTION_INTRA_OP_THREADS, EXTRACTION_INTER_OP_THREADS,
+        EXTRACTION_WORKERS, EXTRACTION_PIN_CPUS and EXTRACTION_SHARE_WEIGHTS ("1"/"true"), missing variables keep the
+        defaults of the class
+        """
+        kwargs = {}
+        for key, variable in environment_variables.items():
+            value = os.environ.get(variable)
+            if value is None or value == "":
+                continue
+            if key in boolean_settings:
+                kwargs[key] = value.lower() in ["1", "true", "yes"]
+            else:
+                kwargs[key] = int(value)
+        return cls(**kwargs)
+
+    def worker_cpus(self, worker_index: int):
+        """
+        returns the CPUs of a worker, i.e. the worker_index-th block of intra_op_threads available CPUs (wrapping
+        around if there are less CPUs than workers * intra_op_threads)
+        """
+        cpus = available_cpus()
+        first = (worker_index * self.intra_op_threads) % len(cpus)
+        return [cpus[(first + i) % len(cpus)] for i in range(min(self.intra_op_threads, len(cpus)))]
+
+    def apply(self, worker_index=0):
+        """
+        applies the settings to the current process: thread counts of torch (and of OpenMP/MKL for libraries which are
+        loaded later) and, if pin_cpus is True, the CPU affinity
+        """
+        os.environ["OMP_NUM_THREADS"] = str(self.intra_op_threads)
+        os.environ["MKL_NUM_THREADS"] = str(self.intra_op_threads)
+        torch.set_num_threads(self.intra_op_threads)
+        try:
+            torch.set_num_interop_threads(self.inter_op_threads)
+        except RuntimeError:
+            # the inter-op thread pool can only be set once per process, before it's used
+            pass
+        if self.pin_cpus is True and hasattr(os, "sched_setaffinity"):
+            os.sched_setaffinity(0, self.worker_cpus(worker_index))
+
+
+def memory_usage():
+    """
+    returns the memory of the current process in MB from /proc/self/smaps_rollup (only on Linux, None otherwise): the
+    RSS, the PSS (every shared page divided among the processes which share it) and the shared and private pages. For a
+    forked worker, the private pages are its overhead over the parent.
+    """
+    try:
+        with open("/proc/self/smaps_rollup") as f:
+            fields = {line.split(":")[0]: int(line.split()[1]) for line in f if line.split()[-1] == "kB"}
+    except OSError:
+        return None
+    return {"RSS MB": fields.get("Rss", 0) / 1024, "PSS MB": fields.get("Pss", 0) / 1024,
+            "Shared MB": (fields.get("Shared_Clean", 0) + fields.get("Shared_Dirty", 0)) / 1024,
+            "Private MB": (fields.get("Private_Clean", 0) + fields.get("Private_Dirty", 0)) / 1024}
+
+
+def prepare_shared_model(model):
+    """
+    prepares the model of the parent process for forked workers: evaluation mode and no gradients, s.t. no worker
+    writes to the weights and their pages stay shared
+    """
+    model.eval()
+    for parameter in model.parameters():
+        parameter.requires_grad_(False)
+
+
+def _init_worker(settings: RuntimeSettings, worker_counter, trace_settings: dict):
+    """
+    initializer of the worker processes, every worker gets its own index for the CPU pinning and, with the settings of
+    the tracer of the parent, its own tracer
+    """
+    with worker_counter.get_lock():
+        worker_index = worker_counter.value
+        worker_counter.value += 1
+    settings.apply(worker_index)
+    start_worker_tracer(trace_settings)
+
+
+def _run_chunk(arguments: tuple):
+    """
+    runs the extraction function on one chunk of entities in a worker process, returns the results, the memory of
+    the worker and the counters and histograms of the spans of the chunk
+    """
+    extract_function, entity_chunk, question_matrix, kwargs = arguments
+    with torch.inference_mode():
+        chunk_result = extract_function(entity_chunk, question_matrix, **kwargs)
+    # the workers of a pool exit without running the atexit handlers, so the trace is written after every chunk
+    tracer = get_tracer()
+    tracer.flush()
+    return chunk_result, memory_usage(), tracer.drain()
+
+
+def split_chunks(items: list, num_chunks: int):
+    """
+    splits a list into num_chunks consecutive chunks of (almost) the same size
+    """
+    chunk_size, remainder = divmod(len(items), num_chunks)
+    chunks = []
+    start = 0
+    for i in range(num_chunks):
+        end = start + chunk_size + (1 if i < remainder else 0)
+        chunks.append(items[start:end])
+        start = end
+    return chunks
+
+
+def run_extraction(extract_function, entity_context_tuples: list, question_matrix, settings=None, shared_model=None,
+                   memory_report=False, **kwargs):
+    """
+    runs an extraction function with the runtime settings
+
+    Parameters
+    ----------
+    extract_function: function
+        function which gets a list of (entity, text) tuples, the question matrix and kwargs and returns a list of
+        result dictionaries, e.g. TripleExtractor.extract_triples_batched
+    entity_context_tuples: list
+        List of (entity, Wikipedia text) tuples
+    question_matrix: QuestionMatrix
+        questions and predicates of the question type
+    settings: None/RuntimeSettings
+        runtime settings. The default None uses RuntimeSettings.from_environment().
+    shared_model: None/torch.nn.Module
+        model of the extraction function, with settings.share_weights it's prepared for the forked workers (see
+        prepare_shared_model). The default is None.
+    memory_report: bool
+        determines whether the memory of the parent and of every worker is returned as well. The default is False.
+    kwargs:
+        further parameters of the extraction function, e.g. max_tokens
+
+    Returns
+    -------
+    list_of_dicts: list
+        the results of all entities in the order of entity_context_tuples
+    memory_df: pd.DataFrame
+        only if memory_report is True: entities, RSS, PSS, shared and private memory (MB) of the parent ("parent") and
+        of every worker after its chunk, all measured while the workers are running, see memory_usage
+    """
+    settings = RuntimeSettings.from_environment() if settings is None else settings
+    if settings.workers == 1:
+        settings.apply()
+        list_of_dicts = extract_function(entity_context_tuples, question_matrix, **kwargs)
+        memory_rows = [dict({"Worker": "parent", "Entities": len(entity_context_tuples)}, **(memory_usage() or {}))]
+        return (list_of_dicts, pd.DataFrame(memory_rows)) if memory_report is True else list_of_dicts
+    context = multiprocessing.get_context("fork") if settings.share_weights is True else multiprocessing
+    if settings.share_weights is True:
+        if shared_model is not None:
+            prepare_shared_model(shared_model)
+        # the objects of the parent are exempt from the garbage collection of the workers, which would write to their
+        # headers and thus copy their pages into every worker
+        gc.collect()
+        gc.freeze()
+    worker_counter = context.Value("i", 0)
+    chunks = [chunk for chunk in split_chunks(entity_context_tuples, settings.workers) if chunk]
+    try:
+        with context.Pool(settings.workers, initializer=_init_worker,
+                          initargs=(settings, worker_counter, get_tracer().worker_settings())) as pool:
+            chunk_results = pool.map(_run_chunk, [(extract_function, chunk, question_matrix, kwargs)
+                                                  for chunk in chunks], chunksize=1)
+            # the workers measure themselves in _run_chunk, the parent is measured before the pool exits, s.t. the
+            # shared pages are divided among the same processes in all measurements
+            parent_memory = memory_usage() if memory_report is True else None
+    finally:
+        if settings.share_weights is True:
+            gc.unfreeze()
+    list_of_dicts = [result for chunk_result, _, _ in chunk_results for result in chunk_result]
+    for _, _, trace_state in chunk_results:
+        get_tracer().merge(trace_state)
+    if memory_report is False:
+        return list_of_dicts
+    memory_rows = [dict({"Worker": "parent", "Entities": 0}, **(parent_memory or {}))]
+    memory_rows += [dict({"Worker": index, "Entities": len(chunk)}, **(memory or {}))
+                    for index, (chunk, (_, memory, _)) in enumerate(zip(chunks, chunk_results))]
+    return list_of_dicts, pd.DataFrame(memory_rows)
+
+
+def candidate_settings(num_cpus=None, pin_cpus=False):
+    """
+    returns the configurations of auto_tune: every power of two of workers up to num_cpus, each with all CPUs divided
+    among the workers, and for one worker additionally half of the CPUs
+
+    Parameters
+    ----------
+    num_cpus: None/int
+        number of CPUs. The default None uses all available CPUs.
+    pin_cpus: bool
+        pin_cpus of the configurations. The default is False.
+    """
+    num_cpus = len(available_cpus()) if num_cpus is None else num_cpus
+    configurations = []
+    workers = 1
+    while workers <= num_cpus:
+        configurations.append(RuntimeSettings(num_cpus // workers, 1, workers, pin_cpus))
+        workers *= 2
+    if num_cpus >= 4:
+        configurations.append(RuntimeSettings(num_cpus // 2, 1, 1, pin_cpus))
+    return configurations
+
+
+def auto_tune(extract_function, entity_context_tuples: list, question_matrix, sample_size=8, configurations=None,
+              **kwargs):
+    """
+    benchmarks a sample of entities under several configurations. Every configuration runs in fresh worker processes
+    (the inter-op threads can only be set once per process), so also configurations with one worker use a pool here.
+
+    Parameters
+    ----------
+    extract_function: function
+        see run_extraction
+    entity_context_tuples: list
+        List of (entity, Wikipedia text) tuples, the first sample_size * workers entities are used
+    question_matrix: QuestionMatrix
+        questions and predicates of the question type
+    sample_size: int
+        number of entities per worker. The default is 8.
+    configurations: None/list
+        list of RuntimeSettings. The default None uses candidate_settings().
+    kwargs:
+        further parameters of the extraction function
+
+    Returns
+    -------
+    best_settings, timing_df: tuple
+        the fastest RuntimeSettings and a DataFrame with the entities per second of every configuration
+    """
+    configurations = candidate_settings() if configurations is None else configurations
+    rows = []
+    for settings in configurations:
+        sample = entity_context_tuples[:sample_size * settings.workers]
+        worker_counter = multiprocessing.Value("i", 0)
+        with multiprocessing.Pool(settings.workers, initializer=_init_worker,
+                                  initargs=(settings, worker_counter, get_tracer().worker_settings())) as pool:
+            start = time.perf_counter()
+            pool.map(_run_chunk, [(extract_function, chunk, question_matrix, kwargs)
+                                  for chunk in split_chunks(sample, settings.workers) if chunk], chunksize=1)
+            seconds = time.perf_counter() - start
+        rows.append({"Settings": settings, "Workers": settings.workers, "Intra-Op Threads": settings.intra_op_threads,
+                     "Inter-Op Threads": settings.inter_op_threads, "Entities": len(sample), "Seconds": seconds,
+                     "Entities per Second": len(sample) / seconds})
+    timing_df = pd.DataFrame(rows).sort_values("Entities per Second", ascending=False).reset_index(drop=True)
+    return timing_df["Settings"][0], timing_df.drop(columns="Settings")
@@ -1,42 +1,64 @@
 import os
 import re
 
-# get parsed Wiki File, delete info about categories and types
-"C:/Users/ubmen/Desktop/BA_Prog/TripleExtraction/PreprocessedTXTFiles/preprocessed_xml.txt"
-txt_file = open("C:/Users/ubmen/Desktop/BA_Prog/TripleExtraction/PreprocessedTXTFiles/"
-                "FullWikiTXT/ParsedWikiXMLFile.txt", "r", encoding="utf-8")
-wiki_content = txt_file.read()
-wiki_content_split = wiki_content.split("\n\n\n")
-remove_patterns = ["#Type: (.*)", "Kategorie:(.*)", "Einzelnachweise", "minimini", "miniatur"]
-wiki_content_split = [re.sub("#Type: (.*)", "", article_text) for article_text in wiki_content_split]
-wiki_content_split = [re.sub("Kategorie:(.*)", "", article_text) for article_text in wiki_content_split]
-wiki_content_split = [re.sub("Einzelnachweise", "", article_text) for article_text in wiki_content_split]
-wiki_content_split = [re.sub("minimini", "", article_text) for article_text in wiki_content_split]
-wiki_content_split = [re.sub("miniatur", "", article_text) for article_text in wiki_content_split]
-wiki_content_split = [re.sub("thumb", "", article_text) for article_text in wiki_content_split]
-wiki_content_split = [re.sub("\nmini", "", article_text) for article_text in wiki_content_split]
-wiki_content_split = [re.sub("mini\n", "", article_text) for article_text in wiki_content_split]
-wiki_content_split = [re.sub("\n+", "\n", article_text) for article_text in wiki_content_split]
-wiki_content_split = [re.sub("\t", "", article_text) for article_text in wiki_content_split]
-pattern = "#Article: (.*)"
-
-
-# for loop for better clarity, alternatively:
-# tatl = [(re.search(pattern, article).group(1), article) for article in wiki_content_split]
-# elems are tuples where the 0th element (m.group(1)) of the tuple is the entity name as str (hence the pattern that was matched
-# and 1st element is the corresponding Wiki article text (article)
-title_article_tuple_list = []
-for article in wiki_content_split:
-    m = re.search(pattern, article)
-    title_article_tuple_list.append((m.group(1), article))
-
-# strip Wiki Text of unnecessary chars
-title_article_tuple_list = [(article[0], article[1].strip()) for article in title_article_tuple_list]
-# print(len(wiki_content_split))
-
-# save wiki text
-filepath = "C:/Users/ubmen/Desktop/BA_Prog/TripleExtraction/PreprocessedTXTFiles/FullWikiTXT/"
-json_filename = "FullWikiTXTsplit.txt"
-with open(os.path.join(filepath, json_filename), "w", encoding="utf-8") as f:
-    f.write("\n".join(map(str, title_article_tuple_list)))
-    f.close()
+
+def split_wiki_txt(parsed_file="C:/Users/ubmen/Desktop/BA_Prog/TripleExtraction/PreprocessedTXTFiles/"
+                               "FullWikiTXT/ParsedWikiXMLFile.txt",
+                   output_file="C:/Users/ubmen/Desktop/BA_Prog/TripleExtraction/PreprocessedTXTFiles/"
+                               "FullWikiTXT/FullWikiTXTsplit.txt"):
+    """
+    splits the parsed Wiki file into (entity name, article text) tuples, deletes info about categories and types and
+    saves the tuples (one per line) to the output file
+
+    Parameters
+    ----------
+    parsed_file: str
+        full path of the parsed Wiki file, articles are separated by "\n\n\n" and start with "#Article: <title>"
+    output_file: None/str
+        full path of the split Wiki file. None doesn't write the file.
+
+    Returns
+    -------
+    title_article_tuple_list: list
+        List of (entity name, article text) tuples
+    """
+    # get parsed Wiki File, delete info about categories and types
+    txt_file = open(parsed_file, "r", encoding="utf-8")
+    wiki_content = txt_file.read()
+    txt_file.close()
+    wiki_content_split = wiki_content.split("\n\n\n")
+    wiki_content_split = [re.sub("#Type: (.*)", "", article_text) for article_text in wiki_content_split]
+    wiki_content_split = [re.sub("Kategorie:(.*)", "", article_text) for article_text in wiki_content_split]
+    wiki_content_split = [re.sub("Einzelnachweise", "", article_text) for article_text in wiki_content_split]
+    wiki_content_split = [re.sub("minimini", "", article_text) for article_text in wiki_content_split]
+    wiki_content_split = [re.sub("miniatur", "", article_text) for article_text in wiki_content_split]
+    wiki_content_split = [re.sub("thumb", "", article_text) for article_text in wiki_content_split]
+    wiki_content_split = [re.sub("\nmini", "", article_text) for article_text in wiki_content_split]
+    wiki_content_split = [re.sub("mini\n", "", article_text) for article_text in wiki_content_split]
+    wiki_content_split = [re.sub("\n+", "\n", article_text) for article_text in wiki_content_split]
+    wiki_content_split = [re.sub("\t", "", article_text) for article_text in wiki_content_split]
+    pattern = "#Article: (.*)"
+
+    # for loop for better clarity, alternatively:
+    # tatl = [(re.search(pattern, article).group(1), article) for article in wiki_content_split]
+    # elems are tuples where the 0th element (m.group(1)) of the tuple is the entity name as str (hence the pattern
+    # that was matched and 1st element is the corresponding Wiki article text (article)
+    title_article_tuple_list = []
+    for article in wiki_content_split:
+        m = re.search(pattern, article)
+        title_article_tuple_list.append((m.group(1), article))
+
+    # strip Wiki Text of unnecessary chars
+    title_article_tuple_list = [(article[0], article[1].strip()) for article in title_article_tuple_list]
+
+    # save wiki text
+    if output_file is not None:
+        with open(output_file, "w", encoding="utf-8") as f:
+            f.write("\n".join(map(str, title_article_tuple_list)))
+            f.close()
+    return title_article_tuple_list
+
+
+if __name__ == "__main__":
+    filepath = "C:/Users/ubmen/Desktop/BA_Prog/TripleExtraction/PreprocessedTXTFiles/FullWikiTXT/"
+    split_wiki_txt(os.path.join(filepath, "ParsedWikiXMLFile.txt"), os.path.join(filepath, "FullWikiTXTsplit.txt"))
@@ -1,22 +1,48 @@
 import os
 import ast
-from transformers import AutoModelForQuestionAnswering, AutoTokenizer, pipeline
+import time
+from transformers import pipeline
 import json
+from question_matrix import QuestionMatrix
+from triple_store import results_to_frame, candidates_to_frame, write_results
+from qa_pipeline import CandidateQuestionAnsweringPipeline
+from pair_filter import not_attempted_result
+from extraction_trace import Tracer, get_tracer, set_tracer, record_attributed_spans
 
 # model_name = "deepset/roberta-base-squad2"
 model_name = "Sahajtomar/GELECTRAQA"
+# QA pipelines of the process by model name, see load_pipeline
+_pipelines = {}
 
-# a) Get predictions
-nlp = pipeline('question-answering', model=model_name, tokenizer=model_name)
 
+def load_pipeline(name: str):
+    """
+    returns the QA pipeline (CandidateQuestionAnsweringPipeline) of a model, every model is loaded once per process.
+    The model and the tokenizer are the ones of the pipeline (another from_pretrained would keep a second copy of the
+    weights in memory).
+    """
+    if name not in _pipelines:
+        _pipelines[name] = pipeline('question-answering', model=name, tokenizer=name,
+                                    pipeline_class=CandidateQuestionAnsweringPipeline)
+    return _pipelines[name]
 
-# b) Load model & tokenizer
-model = AutoModelForQuestionAnswering.from_pretrained(model_name)
-tokenizer = AutoTokenizer.from_pretrained(model_name)
+
+def __getattr__(name: str):
+    # a) nlp, b) model & tokenizer of model_name are loaded on their first use, s.t. importing the TripleExtractor
+    # (e.g. in triple_extractor_cluster.py) doesn't load a model
+    if name in ["nlp", "model", "tokenizer"]:
+        nlp = load_pipeline(model_name)
+        return {"nlp": nlp, "model": nlp.model, "tokenizer": nlp.tokenizer}[name]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 class TripleExtractor:
-    def __init__(self, category_type: str, entity_position):
+    # model of the extraction and directory of the data (the repository), subclasses set their own (see
+    # triple_extractor_cluster.py)
+    model_name = model_name
+    data_path = "C:/Users/ubmen/Desktop/BA_Prog/"
+
+    def __init__(self, category_type: str, entity_position, trace_file=None):
         """
         init method of the TripleExtractor class
         Parameters
@@ -25,9 +51,16 @@ class TripleExtractor:
             The exact category for which the entities and their texts will be loaded
         entity_position: str
             The position of the entities, can either be "SP" or "OP"
+        trace_file: None/str
+            if set, the extraction is traced (see extraction_trace.py) and the trace events are written to this file
+            (.jsonl: JSONL, .json: Chrome trace). The default None keeps the tracing of the environment variable
+            EXTRACTION_TRACE.
         """
         self.category_type = category_type
         self.entity_position = entity_position
+        self._question_matrices = {}
+        if trace_file is not None:
+            set_tracer(Tracer(trace_file=trace_file))
 
     def load_entity_text_list(self, persons_full=False, persons_file_num=None):
         """
@@ -50,7 +83,7 @@ class TripleExtractor:
         if persons_file_num not in valid_persons_file_nums:
             raise ValueError("Incorrect input number for persons file, must be between 1 and 4 or of type None")
         plural_entities = ["Building", "Disease", "Magazine", "Organization", "Park", "School", "Ship"]
-        entity_filepath = "C:/Users/ubmen/Desktop/BA_Prog/TripleExtraction/PreprocessedTXTFiles/"
+        entity_filepath = self.data_path + "TripleExtraction/PreprocessedTXTFiles/"
         if self.category_type != "Person" and self.category_type not in plural_entities:
             entity_filepath += "OtherWikiTXT/" + self.category_type + "WikiTXT/" + self.category_type + "WikiTXT.txt"
         elif self.category_type != "Person" and self.category_type in plural_entities:
@@ -86,7 +119,7 @@ class TripleExtractor:
         if question_type not in valid_question_types:
             raise ValueError("Invalid input for question types: Must either be BL (baseline),"
                              "AG (automatically generated) or NL (natural language)")
-        question_file = "C:/Users/ubmen/Desktop/BA_Prog/QuestionGeneration/"
+        question_file = self.data_path + "QuestionGeneration/"
         if self.category_type != "Person":
             question_file += "OtherQuestions/"
             if question_type == "AG":
@@ -139,7 +172,7 @@ class TripleExtractor:
             List of properties for the input class on the input entity position
 
         """
-        properties_file = "C:/Users/ubmen/Desktop/BA_Prog/PropertyExtraction/Properties/"
+        properties_file = self.data_path + "PropertyExtraction/Properties/"
         if self.category_type != "Person":
             properties_file += "OtherProperties/" + self.category_type + "Properties/" + self.category_type
             properties_file += "PropertiesTXTFiles/" + self.category_type + "TotalProperties" + self.entity_position + ".txt"
@@ -151,8 +184,41 @@ class TripleExtractor:
             properties = [ast.literal_eval(tup) for tup in properties]
         return properties
 
-    @staticmethod
-    def extract_triples(entity_context_tuple: tuple, questions_list: list, predicate_list: list):
+    def question_matrix(self, question_type: str, use_token_cache=False):
+        """
+        builds the QuestionMatrix (questions pre-split around the placeholder and the German predicates) for a question
+        type once, later calls return the cached matrix
+
+        Parameters
+        ----------
+        question_type: str
+            Determines the question type of the questions that will be loaded.
+            Can only be "AG", "BL", "NL"
+        use_token_cache: bool
+            determines whether the question parts will be tokenized once with the tokenizer of the model, s.t.
+            extract_triples_batched only tokenizes the entities and the contexts. The default is False.
+
+        Returns
+        -------
+        question_matrix: QuestionMatrix
+            the questions and predicates for the category and entity position of the instance
+        """
+        if (question_type, use_token_cache) not in self._question_matrices:
+            self._question_matrices[(question_type, use_token_cache)] = QuestionMatrix(
+                self.load_questions(question_type), self.load_properties(),
+                tokenizer=self.nlp().tokenizer if use_token_cache is True else None)
+        return self._question_matrices[(question_type, use_token_cache)]
+
+    @classmethod
+    def nlp(cls):
+        """
+        returns the QA pipeline of the model of the class, see load_pipeline
+        """
+        return load_pipeline(cls.model_name)
+
+    @classmethod
+    def extract_triples(cls, entity_context_tuple: tuple, questions_list, predicate_list=None, top_k=None,
+                        pair_filter=None, window_settings=None):
         """
         Extracts the triples with the GELECTRAQA model from a tuple consisting of an entity (String, 1st element)
         and its Wikipedia text (String, 2nd element)
@@ -160,76 +226,245 @@ class TripleExtractor:
         ----------
         entity_context_tuple: tuple
             Tuple where the entity is the 1st element, and its Wikipedia text is the 2nd element
-        questions_list: list
-            List of questions for the entity
-        predicate_list: list
-            List of predicates (i.e. properties) which matches the questions_list
+        questions_list: list/QuestionMatrix
+            List of questions for the entity or the QuestionMatrix of the question type (see question_matrix), which
+            avoids splitting the questions and predicates again for every entity
+        predicate_list: None/list
+            List of predicates (i.e. properties) which matches the questions_list, not needed for a QuestionMatrix
+        top_k: None/int
+            if set, the top_k candidate answers (answer, score, start, end) and the null score of the model are stored
+            as well ("candidates", "null_score"), computed from the same forward pass. The default is None.
+        pair_filter: None/PairFilter
+            if set, pairs with a score below the cutoff of the filter are not attempted, their result is an empty
+            answer with score 0.0 and "attempted": False. The default None attempts every pair.
+        window_settings: None/WindowSettings
+            if set, the window size, the overlap and the aggregation of the windows of long texts (see qa_pipeline.py),
+            the results get the number of windows ("windows", "scored_windows"). The default None uses the defaults
+            of transformers.
 
         Returns
         -------
         final_dict: dict
             Dictionary where key is the entity (from the entity_context_tuple) and the key is another dictionary.
-            The other dictionary has the predicate as key, and the "nlp" dict as value (i.e. answers and the score)
+            The other dictionary has the predicate as key, and the "nlp" dict as value (i.e. answers, the score and the
+            start/end character offsets of the answer in the text)
         """
-        if len(questions_list) != len(predicate_list):
-            raise ValueError("Questions and lengths have different lengths, they are most likely "
-                             "incompatible!")
+        if isinstance(questions_list, QuestionMatrix):
+            question_matrix = questions_list
+        else:
+            question_matrix = QuestionMatrix(questions_list, predicate_list)
         entity = entity_context_tuple[0]
         context = entity_context_tuple[1]
-        questions_updated = [q.replace("__", entity) for q in questions_list]
-        german_predicate_list = [tup[0] for tup in predicate_list]
         dict_of_dicts = {}
         final_dict = {}
-        i = 0
-        for q in questions_updated:
-            # print(q)
-            q_dict = {'question': q, "context": context}  # create questions dictionary for query
-            q_dict_nlp = nlp(q_dict)  # get the answers and store them in a temporary dict
-            result_dict = {'answer': q_dict_nlp['answer'], 'score': q_dict_nlp['score']}  # create a final dict
-            dict_of_dicts[german_predicate_list[i]] = result_dict  # store the result dict as value for the property
-            i += 1
-        final_dict[entity] = dict_of_dicts
+        window_parameters = {} if window_settings is None else window_settings.call_parameters()
+        nlp = cls.nlp()
+        tracer = get_tracer()
+        with tracer.span("entity", entity=entity, questions=len(question_matrix)):
+            attempted = [True] * len(question_matrix) if pair_filter is None \
+                else pair_filter.attempted(question_matrix.predicates, context)
+            for q, predicate, attempt in zip(question_matrix.questions(entity), question_matrix.predicates, attempted):
+                # print(q)
+                if attempt is False:
+                    dict_of_dicts[predicate] = not_attempted_result(top_k)  # skipped by the pre-filter
+                    continue
+                q_dict = {'question': q, "context": context}  # create questions dictionary for query
+                with tracer.span("question", entity=entity, predicate=predicate):
+                    if window_parameters.get("aggregation") == "early_stop":
+                        # the windows are only skipped by answer_batch, which forwards them in rounds
+                        q_dict_nlp = nlp.answer_batch([q_dict], num_candidates=top_k, **window_parameters)[0]
+                    else:
+                        # get the answers and store them in a temporary dict
+                        q_dict_nlp = nlp(q_dict, num_candidates=top_k, **window_parameters)
+                # create a final dict and store it as value for the property
+                dict_of_dicts[predicate] = cls.result_dict(q_dict_nlp, top_k)
+            final_dict[entity] = dict_of_dicts
         return final_dict
 
-    def dict_list2json(self, list_of_dicts: list, question_type: str, persons_file_num=None):
+    @classmethod
+    def extract_triples_batched(cls, entity_context_tuples: list, questions_list, predicate_list=None, top_k=None,
+                                max_tokens=8192, chunk_size=32, pair_filter=None, window_settings=None):
         """
-        Stores any given dictionary to a .json file, primarily used for storing the extracted triples of this project
+        Extracts the triples of several entities like extract_triples, but answers the questions of chunk_size entities
+        at once with length-bucketed batches (see CandidateQuestionAnsweringPipeline.answer_batch), s.t. the windows
+        of short articles aren't padded to the length of long ones
 
         Parameters
         ----------
+        entity_context_tuples: list
+            List of (entity, Wikipedia text) tuples, e.g. as returned by load_entity_text_list
+        questions_list: list/QuestionMatrix
+            see extract_triples
+        predicate_list: None/list
+            see extract_triples
+        top_k: None/int
+            see extract_triples
+        max_tokens: int
+            maximum number of padded tokens per forward pass. The default is 8192.
+        chunk_size: int
+            number of entities whose questions are scheduled together. The default is 32.
+        pair_filter: None/PairFilter
+            see extract_triples
+        window_settings: None/WindowSettings
+            see extract_triples
+
+        Returns
+        -------
         list_of_dicts: list
-            a list of dictionaries
+            one dictionary per entity in the format of extract_triples, in the order of entity_context_tuples
+        """
+        if isinstance(questions_list, QuestionMatrix):
+            question_matrix = questions_list
+        else:
+            question_matrix = QuestionMatrix(questions_list, predicate_list)
+        list_of_dicts = []
+        window_parameters = {} if window_settings is None else window_settings.call_parameters()
+        nlp = cls.nlp()
+        for chunk_start in range(0, len(entity_context_tuples), chunk_size):
+            chunk = entity_context_tuples[chunk_start:chunk_start + chunk_size]
+            attempted = [[True] * len(question_matrix) if pair_filter is None
+                         else pair_filter.attempted(question_matrix.predicates, context) for entity, context in chunk]
+            # with the token cache of the question matrix, the pipeline only tokenizes the contexts
+            q_dicts = [{'question': q, "context": context, "question_encoding": encoding}
+                       for (entity, context), entity_attempted in zip(chunk, attempted)
+                       for q, encoding, attempt in zip(question_matrix.questions(entity),
+                                                       question_matrix.question_encodings(entity), entity_attempted)
+                       if attempt is True]
+            tracer = get_tracer()
+            chunk_start_time = time.perf_counter_ns()
+            with tracer.span("chunk", entities=len(chunk), questions=len(q_dicts)):
+                answers = iter(nlp.answer_batch(q_dicts, max_tokens=max_tokens, num_candidates=top_k,
+                                                **window_parameters))
+            if nlp.question_times is not None:
+                record_attributed_spans(tracer, chunk_start_time,
+                                        [(entity, predicate) for (entity, context), entity_attempted
+                                         in zip(chunk, attempted) for predicate, attempt
+                                         in zip(question_matrix.predicates, entity_attempted) if attempt is True],
+                                        nlp.question_times)
+            for (entity, context), entity_attempted in zip(chunk, attempted):
+                # answers are in the order of the questions, i.e. entity by entity and predicate by predicate
+                list_of_dicts.append({entity: {predicate: cls.result_dict(next(answers), top_k)
+                                               if attempt is True else not_attempted_result(top_k)
+                                               for predicate, attempt in zip(question_matrix.predicates,
+                                                                             entity_attempted)}})
+        return list_of_dicts
+
+    @staticmethod
+    def result_dict(q_dict_nlp: dict, top_k=None):
+        """
+        builds the result dictionary of one answer of the QA pipeline (answer, score, start, end and, with top_k, the
+        candidates and the null score, with window settings the number of windows)
+        """
+        result_dict = {'answer': q_dict_nlp['answer'], 'score': q_dict_nlp['score'],
+                       'start': q_dict_nlp['start'], 'end': q_dict_nlp['end']}
+        if top_k is not None:
+            result_dict['candidates'] = q_dict_nlp['candidates']
+            result_dict['null_score'] = q_dict_nlp['null_score']
+        if 'windows' in q_dict_nlp:
+            result_dict['windows'] = q_dict_nlp['windows']
+            result_dict['scored_windows'] = q_dict_nlp['scored_windows']
+        return result_dict
+
+    def result_file(self, question_type: str, persons_file_num=None, extension=".json"):
+        """
+        Builds the full filename of the result file for the category, entity position and question type
+
+        Parameters
+        ----------
         question_type: str
             Question type for the entities. Only "BL", "AG", "NL" are valid, otherwise a ValueError will be thrown
         persons_file_num: None/literal
-            Determines which filenumber of persons will be saved, should align with the persons_file_num from
-            "load_entity_text" function in order to make sense
+            Determines which filenumber of persons will be saved
+        extension: str
+            extension of the result file, e.g. ".json" or ".parquet". The default is ".json".
 
         Returns
         -------
-        returns nothing, merely stores the .json file
+        result_file: str
+            full filename of the result file
         """
-        global filename
         valid_question_types = ["BL", "AG", "NL"]
         if question_type not in valid_question_types:
             raise ValueError("Invalid input for question types: Must either be BL (baseline),"
                              "AG (automatically generated) or NL (natural language)")
         plural_entities = ["Building", "Disease", "Magazine", "Organization", "Park", "School", "Ship"]
-        json_path = "C:/Users/ubmen/Desktop/BA_Prog/TripleExtraction/Results/"
+        json_path = self.data_path + "TripleExtraction/Results/"
         if self.category_type != "Person" and self.category_type not in plural_entities:
             json_path += "OtherResults/" + self.category_type + "Results/"
-            filename = self.category_type + "Results" + self.entity_position + "withQuestions" + question_type + ".json"
+            filename = self.category_type + "Results" + self.entity_position + "withQuestions" + question_type + extension
         elif self.category_type != "Person" and self.category_type in plural_entities:
             json_path += "OtherResults/" + self.category_type + "sResults/"
-            filename = self.category_type + "sResults" + self.entity_position + "withQuestions" + question_type + ".json"
+            filename = self.category_type + "sResults" + self.entity_position + "withQuestions" + question_type + extension
         elif self.category_type == "Person" and persons_file_num is not None:
             json_path += "PersonsResults"
-            filename = "PersonsResults" + self.entity_position + "withQuestions" + question_type + str(persons_file_num) +".json"
+            filename = "PersonsResults" + self.entity_position + "withQuestions" + question_type + str(persons_file_num) + extension
         else:
             json_path += "PersonsResults"
-            filename = "PersonsResults" + self.entity_position + "withQuestions" + question_type + ".json"
-        with open(os.path.join(json_path, filename), 'w', encoding="utf-8-sig") as f:
-            for file in list_of_dicts:
-                json.dump(file, f, ensure_ascii=False)
-                f.write("\n")
-            f.close()
+            filename = "PersonsResults" + self.entity_position + "withQuestions" + question_type + extension
+        return os.path.join(json_path, filename)
+
+    def dict_list2json(self, list_of_dicts: list, question_type: str, persons_file_num=None, filename=None):
+        """
+        Stores any given dictionary to a .json file, primarily used for storing the extracted triples of this project.
+        Only answer and score are stored per predicate, the spans are stored by dict_list2columnar.
+
+        Parameters
+        ----------
+        list_of_dicts: list
+            a list of dictionaries
+        question_type: str
+            Question type for the entities. Only "BL", "AG", "NL" are valid, otherwise a ValueError will be thrown
+        persons_file_num: None/literal
+            Determines which filenumber of persons will be saved, should align with the persons_file_num from
+            "load_entity_text" function in order to make sense
+        filename: None/str
+            full path of the .json file. The default None stores it under result_file.
+
+        Returns
+        -------
+        returns nothing, merely stores the .json file
+        """
+        filename = self.result_file(question_type, persons_file_num) if filename is None else filename
+        with get_tracer().span("serialization", question_type=question_type, file_format="json"):
+            with open(filename, 'w', encoding="utf-8-sig") as f:
+                for file in list_of_dicts:
+                    json_dict = {entity: {predicate: {'answer': result['answer'], 'score': result['score']}
+                                          for predicate, result in predicate_dict.items()}
+                                 for entity, predicate_dict in file.items()}
+                    json.dump(json_dict, f, ensure_ascii=False)
+                    f.write("\n")
+                f.close()
+
+    def dict_list2columnar(self, list_of_dicts: list, question_type: str, persons_file_num=None,
+                           extension=".parquet"):
+        """
+        Stores the extracted triples in the columnar format of triple_store (one row per answer with entity, predicate,
+        answer, score, start, end, category, position, qtype and model) next to the .json file. If the triples were
+        extracted with top_k, the candidates are stored in an additional file ending with "Candidates".
+
+        Parameters
+        ----------
+        list_of_dicts: list
+            a list of dictionaries as returned by extract_triples
+        question_type: str
+            Question type for the entities. Only "BL", "AG", "NL" are valid, otherwise a ValueError will be thrown
+        persons_file_num: None/literal
+            Determines which filenumber of persons will be saved
+        extension: str
+            ".parquet" for Parquet or ".arrow" for Arrow IPC. The default is ".parquet".
+
+        Returns
+        -------
+        result_frame: pd.DataFrame
+            the stored results
+        """
+        with get_tracer().span("serialization", question_type=question_type, file_format=extension):
+            result_frame = results_to_frame(list_of_dicts, self.category_type, self.entity_position, question_type,
+                                            model=self.model_name)
+            write_results(result_frame, self.result_file(question_type, persons_file_num, extension=extension))
+            candidate_frame = candidates_to_frame(list_of_dicts, self.category_type, self.entity_position,
+                                                  question_type, model=self.model_name)
+            if len(candidate_frame) > 0:
+                write_results(candidate_frame, self.result_file(question_type, persons_file_num,
+                                                                extension="Candidates" + extension))
+        return result_frame
@@ -0,0 +1,295 @@
+# -*- coding: utf-8 -*-
+"""
+This Python file provides a columnar format for the extracted triples, as an addition to the .json files written by
+TripleExtractor.dict_list2json. Every answer is one row with the columns
+
+    entity, predicate, answer, score, start, end, attempted, category, position, qtype, model
+
+where all string columns are stored dictionary-encoded (pandas categoricals, which pyarrow writes as dictionary
+arrays), s.t. the entity, predicate and label columns cost one small integer per row. Files are written as Parquet
+(.parquet) or Arrow IPC (.arrow/.feather) depending on the extension, both require pyarrow. attempted is False for
+pairs that were skipped by the pre-filter of pair_filter.py.
+
+Triples extracted with top_k additionally have candidate answers, which are stored in a separate file with one row per
+candidate (candidate_columns: the result columns plus the rank of the candidate and the null score of the model).
+
+Triples extracted with window settings (see WindowSettings of qa_pipeline.py) have the number of context windows of
+every answer, window_counts_to_frame sums them up per entity.
+
+Existing .json result files can be converted with json_results_to_frame or, for the whole Results directory, with
+convert_results_tree.
+"""
+
+import os
+import re
+import json
+import pandas as pd
+
+result_columns = ["entity", "predicate", "answer", "score", "start", "end", "attempted", "category", "position",
+                  "qtype", "model"]
+candidate_columns = ["entity", "predicate", "rank", "answer", "score", "start", "end", "null_score", "category",
+                     "position", "qtype", "model"]
+dictionary_columns = ["entity", "predicate", "answer", "category", "position", "qtype", "model"]
+file_formats = {".parquet": "parquet", ".arrow": "arrow", ".feather": "arrow"}
+category_list = ["Person", "Building", "Disease", "History", "Literature", "Magazine", "Newspaper", "Organization",
+                 "Park", "School", "Ship"]
+result_filename_pattern = re.compile(r"^(\w+?)Results(SP|OP)withQuestions(BL|AG|NL)\w*\.json$")
+
+
+def results_to_frame(list_of_dicts: list, category: str, position: str, qtype: str, model=None):
+    """
+    converts the result dictionaries of extract_triples to the columnar format
+
+    Parameters
+    ----------
+    list_of_dicts: list
+        list of {entity: {predicate: {"answer", "score"(, "start", "end")}}} dictionaries as returned by extract_triples
+    category: str
+        category of the entities
+    position: str
+        entity position, "SP" or "OP"
+    qtype: str
+        question type, "BL", "AG" or "NL"
+    model: None/str
+        name of the QA model that extracted the answers
+
+    Returns
+    -------
+    result_frame: pd.DataFrame
+        DataFrame with the result_columns, one row per (entity, predicate)
+    """
+    columns = {column: [] for column in result_columns[:7]}
+    for entity_dict in list_of_dicts:
+        for entity, predicate_dict in entity_dict.items():
+            columns["entity"].extend([entity] * len(predicate_dict))
+            columns["predicate"].extend(predicate_dict.keys())
+            for result in predicate_dict.values():
+                columns["answer"].append(result["answer"])
+                columns["score"].append(result["score"])
+                columns["start"].append(result.get("start"))
+                columns["end"].append(result.get("end"))
+                columns["attempted"].append(result.get("attempted", True))
+    num_rows = len(columns["entity"])
+    result_frame = pd.DataFrame(columns)
+    result_frame["score"] = result_frame["score"].astype("float64")
+    result_frame["start"] = result_frame["start"].astype("Int64")
+    result_frame["end"] = result_frame["end"].astype("Int64")
+    result_frame["attempted"] = result_frame["attempted"].astype("bool")
+    for column, value in [("category", category), ("position", position), ("qtype", qtype), ("model", model)]:
+        result_frame[column] = pd.Categorical([value] * num_rows)
+    for column in dictionary_columns:
+        result_frame[column] = result_frame[column].astype("category")
+    return result_frame
+
+
+def candidates_to_frame(list_of_dicts: list, category: str, position: str, qtype: str, model=None):
+    """
+    converts the candidate answers of results extracted with top_k to the columnar format, results without candidates
+    are skipped
+
+    Parameters
+    ----------
+    list_of_dicts: list
+        list of dictionaries as returned by extract_triples with top_k
+    category: str
+        category of the entities
+    position: str
+        entity position, "SP" or "OP"
+    qtype: str
+        question type, "BL", "AG" or "NL"
+    model: None/str
+        name of the QA model that extracted the answers
+
+    Returns
+    -------
+    candidate_frame: pd.DataFrame
+        DataFrame with the candidate_columns, one row per candidate where rank 0 is the best candidate
+    """
+    columns = {column: [] for column in candidate_columns[:8]}
+    for entity_dict in list_of_dicts:
+        for entity, predicate_dict in entity_dict.items():
+            for predicate, result in predicate_dict.items():
+                for rank, candidate in enumerate(result.get("candidates", [])):
+                    columns["entity"].append(entity)
+                    columns["predicate"].append(predicate)
+                    columns["rank"].append(rank)
+                    columns["answer"].append(candidate["answer"])
+                    columns["score"].append(candidate["score"])
+                    columns["start"].append(candidate["start"])
+                    columns["end"].append(candidate["end"])
+                    columns["null_score"].append(result["null_score"])
+    num_rows = len(columns["entity"])
+    candidate_frame = pd.DataFrame(columns)
+    candidate_frame["rank"] = candidate_frame["rank"].astype("int16")
+    for column in ["score", "null_score"]:
+        candidate_frame[column] = candidate_frame[column].astype("float64")
+    for column in ["start", "end"]:
+        candidate_frame[column] = candidate_frame[column].astype("Int64")
+    for column, value in [("category", category), ("position", position), ("qtype", qtype), ("model", model)]:
+        candidate_frame[column] = pd.Categorical([value] * num_rows)
+    for column in dictionary_columns:
+        candidate_frame[column] = candidate_frame[column].astype("category")
+    return candidate_frame
+
+
+def window_counts_to_frame(list_of_dicts: list):
+    """
+    counts the context windows of every entity of results that were extracted with window settings
+
+    Parameters
+    ----------
+    list_of_dicts: list
+        list of {entity: {predicate: {..., "windows", "scored_windows"}}} dictionaries as returned by extract_triples
+
+    Returns
+    -------
+    window_frame: pd.DataFrame
+        DataFrame with one row per entity: the number of attempted questions, the windows of its text (per question,
+        the maximum over the questions), the windows of all questions, the forwarded windows and the skipped windows
+    """
+    rows = []
+    for entity_dict in list_of_dicts:
+        for entity, predicate_dict in entity_dict.items():
+            results = [result for result in predicate_dict.values() if "windows" in result]
+            rows.append({"entity": entity, "questions": len(results),
+                         "windows": max([result["windows"] for result in results], default=0),
+                         "total_windows": sum(result["windows"] for result in results),
+                         "scored_windows": sum(result["scored_windows"] for result in results)})
+    window_frame = pd.DataFrame(rows, columns=["entity", "questions", "windows", "total_windows", "scored_windows"])
+    window_frame["skipped_windows"] = window_frame["total_windows"] - window_frame["scored_windows"]
+    return window_frame
+
+
+def json_results_to_frame(json_file: str, category: str, position: str, qtype: str, model=None):
+    """
+    reads a .json result file (one {entity: {predicate: {"answer", "score"}}} dictionary per line) into the columnar
+    format, see results_to_frame
+    """
+    with open(json_file, encoding="utf-8-sig") as f:
+        list_of_dicts = [json.loads(line) for line in f if line.strip()]
+    return results_to_frame(list_of_dicts, category, position, qtype, model=model)
+
+
+def file_format(filename: str):
+    """
+    returns the format ("parquet" or "arrow") of a result file from its extension
+    """
+    extension = os.path.splitext(filename)[1].lower()
+    if extension not in file_formats:
+        raise ValueError("Incorrect file extension, must be either " + ", ".join(file_formats))
+    return file_formats[extension]
+
+
+def write_results(result_frame: pd.DataFrame, filename: str):
+    """
+    writes a result frame to a Parquet or Arrow IPC file, depending on the extension of the filename
+
+    Parameters
+    ----------
+    result_frame: pd.DataFrame
+        DataFrame in the format of results_to_frame
+    filename: str
+        full path of the file, must end with .parquet, .arrow or .feather
+
+    Returns
+    -------
+    None
+    """
+    if os.path.dirname(filename):
+        os.makedirs(os.path.dirname(filename), exist_ok=True)
+    result_frame = result_frame.reset_index(drop=True)
+    if file_format(filename) == "parquet":
+        result_frame.to_parquet(filename, index=False)
+    else:
+        result_frame.to_feather(filename)
+
+
+def read_results(filename: str, columns=None, filters=None):
+    """
+    reads a Parquet or Arrow IPC result file
+
+    Parameters
+    ----------
+    filename: str
+        full path of the file
+    columns: None/list
+        columns that will be read. The default None reads all columns.
+    filters: None/list
+        row filters in the pyarrow format, e.g. [("qtype", "==", "NL"), ("score", ">", 0.5)].
+        The default None reads all rows.
+
+    Returns
+    -------
+    result_frame: pd.DataFrame
+        DataFrame in the format of results_to_frame
+    """
+    if file_format(filename) == "parquet":
+        return pd.read_parquet(filename, columns=columns, filters=filters)
+    result_frame = pd.read_feather(filename, columns=columns)
+    if filters is not None:
+        operators = {"==": "__eq__", "!=": "__ne__", ">": "__gt__", ">=": "__ge__", "<": "__lt__", "<=": "__le__"}
+        for column, operator, value in filters:
+            if operator == "in":
+                result_frame = result_frame[result_frame[column].isin(value)]
+            else:
+                result_frame = result_frame[getattr(result_frame[column], operators[operator])(value)]
+        result_frame = result_frame.reset_index(drop=True)
+    return result_frame
+
+
+def result_file_labels(json_filename: str):
+    """
+    parses category, position and question type from the name of a .json result file, e.g.
+    "BuildingsResultsSPwithQuestionsBL.json" -> ("Building", "SP", "BL")
+
+    Returns
+    -------
+    labels: None/tuple
+        (category, position, qtype), None if the filename is not a result file
+    """
+    match = result_filename_pattern.match(os.path.basename(json_filename))
+    if match is None:
+        return None
+    category, position, qtype = match.groups()
+    if category not in category_list and category[:-1] in category_list:
+        category = category[:-1]
+    return category, position, qtype
+
+
+def convert_results_tree(results_path="C:/Users/ubmen/Desktop/BA_Prog/TripleExtraction/Results/",
+                         output_file="C:/Users/ubmen/Desktop/BA_Prog/TripleExtraction/Results/AllResults.parquet",
+                         model="Sahajtomar/GELECTRAQA"):
+    """
+    converts all .json result files below results_path into one columnar file
+
+    Parameters
+    ----------
+    results_path: str
+        path of the Results directory
+    output_file: str
+        full path of the output file (.parquet, .arrow or .feather)
+    model: None/str
+        name of the QA model that extracted the results. The default is "Sahajtomar/GELECTRAQA".
+
+    Returns
+    -------
+    result_frame: pd.DataFrame
+        the converted results of all files
+    """
+    frames = []
+    for directory, subdirectories, filenames in sorted(os.walk(results_path)):
+        for filename in sorted(filenames):
+            labels = result_file_labels(filename)
+            if labels is not None:
+                frames.append(json_results_to_frame(os.path.join(directory, filename), *labels, model=model))
+    result_frame = pd.concat(frames, ignore_index=True)
+    # concat turns categoricals with different categories into objects
+    for column in dictionary_columns:
+        result_frame[column] = result_frame[column].astype("category")
+    write_results(result_frame, output_file)
+    return result_frame
+
+
+if __name__ == "__main__":
+    all_results = convert_results_tree()
+    print(f"{len(all_results)} answers converted")